@@ -0,0 +1,20 @@
+"""
+Benchmarks offline para ``Server`` y ``RemoteAgent``.
+
+Todo se ejecuta sin red ni LLM real: los agentes usan ``FakeChatModel`` con
+latencia y número de tokens configurables.
+
+Uso::
+
+    python -m benchmarks --requests 200 --concurrency 16 --output results.json
+"""
+
+from .fake_model import FakeChatModel, build_agent
+from .runner import BenchmarkConfig, run_benchmarks
+
+__all__ = [
+    "FakeChatModel",
+    "build_agent",
+    "BenchmarkConfig",
+    "run_benchmarks",
+]
@@ -0,0 +1,63 @@
+"""
+CLI de los benchmarks: ``python -m benchmarks``.
+"""
+
+import argparse
+import json
+import sys
+
+from .runner import ENDPOINTS, TRANSPORTS, BenchmarkConfig, run_benchmarks
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks offline de langgraph-server")
+    parser.add_argument("--requests", type=int, default=100, help="Peticiones por escenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Clientes concurrentes")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latencia del modelo (s)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Latencia entre tokens (s)")
+    parser.add_argument("--tokens", type=int, default=16, help="Tokens por respuesta")
+    parser.add_argument("--token-bytes", type=int, default=0, help="Bytes de cada token")
+    parser.add_argument("--history", type=int, default=0, help="Turnos previos en cada petición")
+    parser.add_argument("--endpoints", nargs="+", default=list(ENDPOINTS), choices=ENDPOINTS)
+    parser.add_argument("--transports", nargs="+", default=list(TRANSPORTS), choices=TRANSPORTS)
+    parser.add_argument("--codecs", nargs="+", default=["json"], help="Codecs a medir")
+    parser.add_argument("--stream-mode", help="stream_mode de /stream y /astream (ej: messages)")
+    parser.add_argument("--output", help="Fichero JSON donde guardar los resultados")
+    args = parser.parse_args(argv)
+
+    config = BenchmarkConfig(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        latency=args.latency,
+        token_latency=args.token_latency,
+        tokens=args.tokens,
+        token_bytes=args.token_bytes,
+        history=args.history,
+        endpoints=args.endpoints,
+        transports=args.transports,
+        codecs=args.codecs,
+        stream_mode=args.stream_mode,
+    )
+    report = run_benchmarks(config)
+
+    for result in report["results"]:
+        latency = result["latency_seconds"]
+        line = (
+            f"{result['transport']:8} {result['codec']:10} {result['endpoint']:8} "
+            f"{result['throughput_rps']:9.1f} req/s  "
+            f"p50={latency['p50'] * 1000:7.2f}ms p95={latency['p95'] * 1000:7.2f}ms "
+            f"p99={latency['p99'] * 1000:7.2f}ms"
+        )
+        if "ttfc_seconds" in result:
+            line += f"  ttfc_p50={result['ttfc_seconds']['p50'] * 1000:7.2f}ms"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultados guardados en {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
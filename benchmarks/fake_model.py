@@ -0,0 +1,127 @@
+"""
+Modelo de chat determinista para benchmarks.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from langgraph_server.agents import Agent
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Modelo de chat falso con latencia y salida deterministas.
+
+    Attributes:
+        latency (float): Segundos de espera antes del primer token.
+        token_latency (float): Segundos de espera entre tokens al transmitir.
+        tokens (int): Número de tokens de la respuesta.
+        token (str): Texto de cada token.
+    """
+
+    latency: float = 0.0
+    token_latency: float = 0.0
+    tokens: int = 16
+    token: str = "tok "
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        # Los agentes del benchmark no llaman herramientas
+        return self
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency + self.token_latency * self.tokens)
+        message = AIMessage(content=self.token * self.tokens)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency + self.token_latency * self.tokens)
+        message = AIMessage(content=self.token * self.tokens)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        for _ in range(self.tokens):
+            time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=self.token))
+            if run_manager:
+                run_manager.on_llm_new_token(self.token, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        for _ in range(self.tokens):
+            await asyncio.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=self.token))
+            if run_manager:
+                await run_manager.on_llm_new_token(self.token, chunk=chunk)
+            yield chunk
+
+
+def build_agent(
+    name: str = "bench",
+    latency: float = 0.0,
+    token_latency: float = 0.0,
+    tokens: int = 16,
+    token_bytes: int = 0,
+) -> Any:
+    """
+    Crea un ``Agent`` respaldado por ``FakeChatModel``.
+
+    Args:
+        name (str, optional): Nombre del agente. Defaults to "bench".
+        latency (float, optional): Latencia antes del primer token. Defaults to 0.0.
+        token_latency (float, optional): Latencia entre tokens. Defaults to 0.0.
+        tokens (int, optional): Tokens de la respuesta. Defaults to 16.
+        token_bytes (int, optional): Tamaño de cada token, para medir chunks
+            grandes; 0 usa el token por defecto. Defaults to 0.
+
+    Returns:
+        Any: El agente compilado.
+    """
+    model = FakeChatModel(latency=latency, token_latency=token_latency, tokens=tokens)
+    if token_bytes:
+        model.token = "x" * token_bytes
+    return Agent(
+        name=name,
+        model=model,
+        tools=[],
+        description="Agente de benchmark con modelo falso",
+        skills=["benchmark"],
+    )
@@ -0,0 +1,334 @@
+"""
+Ejecución de los benchmarks sobre los endpoints de ``Server``.
+
+Cada escenario combina transporte (ASGI en proceso, uvicorn local o uvicorn
+con los chunks de los streams por un ring de memoria compartida), endpoint
+y codec, lanza ``requests`` peticiones con ``concurrency`` clientes
+simultáneos y resume latencias, throughput, tiempo al primer chunk y bytes.
+"""
+
+import asyncio
+import importlib.metadata
+import platform
+import socket
+import statistics
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+
+import httpx
+import uvicorn
+from langchain_core.messages import AIMessage, HumanMessage
+
+from langgraph_server.agents import Server
+from langgraph_server.agents.codecs import Codec, get_codec
+from langgraph_server.agents.ring import (
+    RING_HEADER,
+    RingConfig,
+    RingFrameDecoder,
+    SharedRing,
+    acquire_ring,
+    release_ring,
+)
+
+from .fake_model import build_agent
+
+ENDPOINTS = ("invoke", "ainvoke", "stream", "astream")
+STREAM_ENDPOINTS = ("stream", "astream")
+TRANSPORTS = ("asgi", "uvicorn", "ring")
+
+
+@dataclass
+class BenchmarkConfig:
+    """
+    Parámetros de una ejecución de benchmarks.
+
+    Attributes:
+        requests (int): Peticiones por escenario.
+        concurrency (int): Clientes concurrentes.
+        latency (float): Latencia del modelo falso antes del primer token.
+        token_latency (float): Latencia entre tokens del modelo falso.
+        tokens (int): Tokens por respuesta.
+        token_bytes (int): Tamaño de cada token (0 para el de por defecto); con
+            ``stream_mode="messages"`` fija el tamaño de los chunks.
+        history (int): Mensajes previos enviados en cada petición.
+        endpoints (List[str]): Endpoints a medir.
+        transports (List[str]): Transportes a medir ("asgi", "uvicorn", "ring";
+            este último solo en los endpoints de streaming).
+        codecs (List[str]): Codecs a medir.
+        stream_mode (str | None): ``stream_mode`` de los endpoints de streaming
+            (ej: "messages" para medir el tiempo al primer token).
+    """
+
+    requests: int = 100
+    concurrency: int = 8
+    latency: float = 0.0
+    token_latency: float = 0.0
+    tokens: int = 16
+    token_bytes: int = 0
+    history: int = 0
+    endpoints: List[str] = field(default_factory=lambda: list(ENDPOINTS))
+    transports: List[str] = field(default_factory=lambda: list(TRANSPORTS))
+    codecs: List[str] = field(default_factory=lambda: ["json"])
+    stream_mode: str | None = None
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percentile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "mean": statistics.fmean(values) if values else 0.0,
+        "p50": _percentile(values, 50),
+        "p95": _percentile(values, 95),
+        "p99": _percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def build_server(config: BenchmarkConfig) -> Server:
+    """
+    Monta un ``Server`` con un agente de benchmark en ``/bench``.
+
+    Args:
+        config (BenchmarkConfig): Parámetros del modelo falso.
+
+    Returns:
+        Server: El servidor listo para servir.
+    """
+    server = Server(title="LangGraph Benchmark Server")
+    server.add_agent(
+        agent=build_agent(
+            latency=config.latency,
+            token_latency=config.token_latency,
+            tokens=config.tokens,
+            token_bytes=config.token_bytes,
+        ),
+        path="/bench",
+        name="bench",
+        description="Agente de benchmark",
+        skills=["benchmark"],
+    )
+    return server
+
+
+def _payload(config: BenchmarkConfig, endpoint: str) -> Dict[str, Any]:
+    history = []
+    for i in range(config.history):
+        history.append(HumanMessage(content=f"Pregunta previa {i}"))
+        history.append(AIMessage(content=f"Respuesta previa {i}"))
+    history.append(HumanMessage(content="Hola, ¿qué tal?"))
+    payload: Dict[str, Any] = {"input": {"messages": history}}
+    if endpoint in STREAM_ENDPOINTS and config.stream_mode:
+        payload["stream_mode"] = config.stream_mode
+    return payload
+
+
+class _PayloadSize(Codec):
+    """Lee cada chunk del ring sin decodificarlo: el transporte HTTP tampoco decodifica."""
+
+    def decode(self, data: bytes) -> int:
+        return len(data)
+
+    def decode_buffer(self, data: memoryview) -> int:
+        return len(data)
+
+
+async def _one_request(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    body: bytes,
+    headers: Dict[str, str],
+    ring: SharedRing | None = None,
+) -> Dict[str, float]:
+    if ring is not None:
+        headers = {**headers, RING_HEADER: ring.name}
+    start = time.perf_counter()
+    first_chunk = None
+    received = 0
+    in_ring = 0
+    async with client.stream("POST", f"/bench/{endpoint}", content=body, headers=headers) as response:
+        response.raise_for_status()
+        decoder = None
+        if ring is not None and response.headers.get(RING_HEADER) == ring.name:
+            decoder = RingFrameDecoder(_PayloadSize(), ring)
+        async for data in response.aiter_bytes():
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+            received += len(data)
+            if decoder is not None:
+                in_ring += sum(decoder.feed(data))
+    elapsed = time.perf_counter() - start
+    return {
+        "latency": elapsed,
+        "ttfc": first_chunk if first_chunk is not None else elapsed,
+        "bytes_out": len(body),
+        "bytes_in": received,
+        "bytes_ring": in_ring,
+    }
+
+
+async def _run_scenario(
+    client: httpx.AsyncClient,
+    config: BenchmarkConfig,
+    endpoint: str,
+    codec_name: str,
+    ring: RingConfig | None = None,
+) -> Dict[str, Any]:
+    codec = get_codec(codec_name)
+    body = codec.encode(_payload(config, endpoint))
+    headers = {"Content-Type": codec.media_type, "Accept": codec.media_type}
+
+    async def request() -> Dict[str, float]:
+        # Un ring por stream en curso, como RemoteAgent
+        shared = acquire_ring(ring) if ring is not None else None
+        try:
+            sample = await _one_request(client, endpoint, body, headers, shared)
+        except BaseException:
+            if shared is not None:
+                release_ring(shared, False)
+            raise
+        if shared is not None:
+            release_ring(shared, True)
+        return sample
+
+    # Calentamiento: compila el grafo y abre conexiones
+    await request()
+
+    semaphore = asyncio.Semaphore(config.concurrency)
+    samples: List[Dict[str, float]] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        async with semaphore:
+            try:
+                samples.append(await request())
+            except httpx.HTTPError:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(config.requests)))
+    wall = time.perf_counter() - start
+
+    result = {
+        "endpoint": endpoint,
+        "codec": codec_name,
+        "requests": config.requests,
+        "errors": errors,
+        "wall_seconds": wall,
+        "throughput_rps": len(samples) / wall if wall else 0.0,
+        "latency_seconds": _summary([s["latency"] for s in samples]),
+        "bytes_per_request": {
+            "request": statistics.fmean([s["bytes_out"] for s in samples]) if samples else 0,
+            "response": statistics.fmean([s["bytes_in"] for s in samples]) if samples else 0,
+        },
+    }
+    if ring is not None:
+        # Bytes de los chunks que no pasaron por el socket
+        result["bytes_per_request"]["ring"] = (
+            statistics.fmean([s["bytes_ring"] for s in samples]) if samples else 0
+        )
+    if endpoint in STREAM_ENDPOINTS:
+        result["ttfc_seconds"] = _summary([s["ttfc"] for s in samples])
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _UvicornThread:
+    """Ejecuta uvicorn en un hilo en segundo plano sobre 127.0.0.1."""
+
+    def __init__(self, server: Server):
+        self.port = _free_port()
+        self.server = uvicorn.Server(
+            uvicorn.Config(server.app, host="127.0.0.1", port=self.port, log_level="warning")
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> str:
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return f"http://127.0.0.1:{self.port}"
+
+    def __exit__(self, *exc: Any) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+
+
+async def _run_transport(
+    transport: str, server: Server, config: BenchmarkConfig, base_url: str | None = None
+) -> List[Dict[str, Any]]:
+    limits = httpx.Limits(max_connections=config.concurrency)
+    if transport == "asgi":
+        # ASGITransport entrega el cuerpo completo: el TTFC coincide con la latencia
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=server.app), base_url="http://bench"
+        )
+    else:
+        client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60)
+
+    ring = RingConfig() if transport == "ring" else None
+    endpoints = [e for e in config.endpoints if ring is None or e in STREAM_ENDPOINTS]
+
+    results = []
+    async with client:
+        for codec_name in config.codecs:
+            for endpoint in endpoints:
+                result = await _run_scenario(client, config, endpoint, codec_name, ring)
+                result["transport"] = transport
+                results.append(result)
+    return results
+
+
+def run_benchmarks(config: BenchmarkConfig | None = None) -> Dict[str, Any]:
+    """
+    Ejecuta todos los escenarios configurados.
+
+    Args:
+        config (BenchmarkConfig | None, optional): Parámetros de la ejecución.
+            Defaults to None.
+
+    Returns:
+        Dict[str, Any]: Informe serializable a JSON con metadatos y resultados.
+    """
+    config = config or BenchmarkConfig()
+    results: List[Dict[str, Any]] = []
+
+    for transport in config.transports:
+        # Un servidor nuevo por transporte: cada uno corre en su propio event loop
+        server = build_server(config)
+        if transport == "asgi":
+            results.extend(asyncio.run(_run_transport(transport, server, config)))
+        elif transport in ("uvicorn", "ring"):
+            with _UvicornThread(server) as base_url:
+                results.extend(
+                    asyncio.run(_run_transport(transport, server, config, base_url))
+                )
+        else:
+            raise ValueError(f"Unknown transport '{transport}'")
+
+    try:
+        version = importlib.metadata.version("langgraph-server")
+    except importlib.metadata.PackageNotFoundError:
+        version = "unknown"
+
+    return {
+        "version": version,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": asdict(config),
+        "results": results,
+    }
@@ -7,7 +7,22 @@ from .agent import Agent
 
 # Componentes remotos (networking)
 from .server import Server  # ← Server exportado aquí
+from .executor import ExecutorConfig
+from .admission import AdmissionConfig
+from .cache import ResponseCache
+from .checkpoint import CheckpointStore
+from .idempotency import IdempotencyStore
+from .singleflight import SingleFlight
+from .metrics import ServerMetrics
+from .tracing import InMemoryExporter, JSONLExporter, Tracer
 from .client import RemoteAgent
+from .transport import PoolConfig, TransportRegistry
+from .ring import RingConfig
+from .balancer import BalancerConfig
+from .retry import HedgePolicy, RetryPolicy
+from .sessions import ThreadSessions
+from .deadline import DeadlineExceeded
+from .registry import Registry, RegistryService
 
 
 __all__ = [
@@ -15,6 +30,27 @@ __all__ = [
     "Agent",
     # 🖥️ SERVER (para alojar agentes)
     "Server",  # ← Alias principal
+    "ExecutorConfig",
+    "AdmissionConfig",
+    "ResponseCache",
+    "CheckpointStore",
+    "IdempotencyStore",
+    "SingleFlight",
+    "ServerMetrics",
+    "Tracer",
+    "JSONLExporter",
+    "InMemoryExporter",
     # 🌐 CLIENT (para conectar a agentes remotos)
     "RemoteAgent",
+    "PoolConfig",
+    "TransportRegistry",
+    "RingConfig",
+    "BalancerConfig",
+    "RetryPolicy",
+    "HedgePolicy",
+    "ThreadSessions",
+    "DeadlineExceeded",
+    # 🗂️ REGISTRY (descubrimiento de agentes)
+    "Registry",
+    "RegistryService",
 ]
@@ -0,0 +1,194 @@
+"""
+Control de admisión por agente para ``Server``.
+
+Limita las peticiones concurrentes de cada agente y mantiene una cola de
+espera acotada con clases de prioridad. Cuando la cola está llena, o una
+petición espera más de lo permitido, se rechaza de inmediato con
+``429``/``503`` y ``Retry-After`` en lugar de acumularse sobre el mismo LLM.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cabecera con la clase de prioridad de la petición
+PRIORITY_HEADER = "X-Priority"
+
+
+class Overloaded(RuntimeError):
+    """La petición se descarta por sobrecarga del agente."""
+
+    metric_status = "shed"
+
+    def __init__(self, status_code: int, retry_after: int, reason: str):
+        super().__init__(f"Agent overloaded ({reason}), retry after {retry_after}s")
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+@dataclass
+class AdmissionConfig:
+    """
+    Configuración del control de admisión de un agente.
+
+    Attributes:
+        max_concurrency (int | None): Peticiones ejecutándose a la vez. ``None``
+            usa el ``max_in_flight`` del pool del agente.
+        max_queue (int): Peticiones que pueden esperar turno; el resto recibe
+            ``429``. Defaults to 64.
+        priorities (Tuple[str, ...]): Clases de prioridad de mayor a menor.
+            Defaults to ("high", "normal", "low").
+        default_priority (str): Clase de las peticiones sin ``X-Priority`` o con
+            un valor desconocido. Defaults to "normal".
+        queue_timeout (float | None): Segundos máximos de espera en cola antes
+            de responder ``503``; None para esperar sin límite. Defaults to 30.0.
+        retry_after (float): ``Retry-After`` mínimo en segundos. Defaults to 1.0.
+    """
+
+    max_concurrency: int | None = None
+    max_queue: int = 64
+    priorities: Tuple[str, ...] = ("high", "normal", "low")
+    default_priority: str = "normal"
+    queue_timeout: float | None = 30.0
+    retry_after: float = 1.0
+
+
+class AdmissionController:
+    """
+    Semáforo con cola de prioridad acotada.
+
+    Al liberar un hueco se entrega directamente a la petición en espera de
+    mayor prioridad (FIFO dentro de cada clase).
+    """
+
+    def __init__(self, config: AdmissionConfig, max_concurrency: int):
+        """
+        Inicializa el controlador.
+
+        Args:
+            config (AdmissionConfig): La configuración de admisión.
+            max_concurrency (int): Límite por defecto si la configuración no fija uno.
+        """
+        self.config = config
+        self.max_concurrency = config.max_concurrency or max_concurrency
+        self._ranks = {name: rank for rank, name in enumerate(config.priorities)}
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+        self.in_flight = 0
+        self.queued: Dict[str, int] = {name: 0 for name in config.priorities}
+        self.admitted = 0
+        self.shed: Dict[str, int] = {"queue_full": 0, "timeout": 0}
+        # Media móvil del tiempo de servicio para estimar ``Retry-After``
+        self.avg_service_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(self.queued.values())
+
+    def priority_of(self, value: str | None) -> str:
+        """Normaliza el valor de la cabecera ``X-Priority``."""
+        value = (value or "").strip().lower()
+        return value if value in self._ranks else self.config.default_priority
+
+    def retry_after(self) -> int:
+        """Segundos sugeridos al cliente hasta que haya hueco."""
+        estimate = self.avg_service_seconds * (self.queue_depth + 1) / self.max_concurrency
+        return max(1, math.ceil(max(self.config.retry_after, estimate)))
+
+    def _shed(self, status_code: int, reason: str) -> Overloaded:
+        self.shed[reason] += 1
+        return Overloaded(status_code, self.retry_after(), reason)
+
+    async def acquire(self, priority: str) -> None:
+        """
+        Espera un hueco de ejecución.
+
+        Args:
+            priority (str): La clase de prioridad de la petición.
+
+        Raises:
+            Overloaded: Si la cola está llena (429) o se agota la espera (503).
+        """
+        if self.in_flight < self.max_concurrency and not self.queue_depth:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+        if self.queue_depth >= self.config.max_queue:
+            raise self._shed(429, "queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (self._ranks.get(priority, 0), next(self._seq), future))
+        self.queued[priority] += 1
+        try:
+            await asyncio.wait_for(future, self.config.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._shed(503, "timeout") from None
+        except asyncio.CancelledError:
+            # Si el hueco llegó justo al cancelar, se cede al siguiente
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        finally:
+            self.queued[priority] -= 1
+        self.admitted += 1
+
+    def release(self, service_seconds: float | None = None) -> None:
+        """
+        Libera un hueco, entregándolo a la siguiente petición en cola si la hay.
+
+        Args:
+            service_seconds (float | None, optional): Duración de la petición
+                terminada, para la estimación de ``Retry-After``. Defaults to None.
+        """
+        if service_seconds is not None:
+            self.avg_service_seconds += 0.2 * (service_seconds - self.avg_service_seconds)
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Devuelve el estado de la admisión.
+
+        Returns:
+            Dict[str, Any]: Huecos ocupados, profundidad de cola y descartes.
+        """
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "max_queue": self.config.max_queue,
+            "queued": self.queue_depth,
+            "queued_by_priority": dict(self.queued),
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "avg_service_seconds": self.avg_service_seconds,
+        }
+
+
+class AdmissionTicket:
+    """Hueco admitido; se libera una sola vez al terminar la petición."""
+
+    __slots__ = ("controller", "start", "released")
+
+    def __init__(self, controller: AdmissionController):
+        self.controller = controller
+        self.start = time.perf_counter()
+        self.released = False
+
+    def release(self, error: BaseException | None = None) -> None:
+        if self.released:
+            return
+        self.released = True
+        self.controller.release(time.perf_counter() - self.start)
@@ -0,0 +1,259 @@
+"""
+Balanceo de carga en el cliente entre réplicas de un agente.
+
+``RemoteAgent`` puede recibir varias URLs del mismo agente. Para cada llamada
+se elige réplica con "power of two choices": se toman dos réplicas sanas al
+azar y se usa la de menor coste, ``(peticiones en curso + 1) * EWMA de
+latencia``. Las conversaciones con ``thread_id`` se fijan a una réplica con
+hashing de rendezvous para que sigan en la que guarda su checkpoint.
+
+Las réplicas que fallan seguidas se expulsan durante un tiempo creciente
+(comprobación pasiva); opcionalmente un hilo las sondea periódicamente y las
+readmite en cuanto responden (comprobación activa).
+"""
+
+import hashlib
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BalancerConfig:
+    """
+    Configuración del balanceo entre réplicas.
+
+    Attributes:
+        ewma_decay (float): Peso de la última latencia en la media móvil.
+            Defaults to 0.3.
+        failure_threshold (int): Fallos consecutivos que expulsan una réplica.
+            Defaults to 3.
+        ejection_seconds (float): Duración de la primera expulsión; se duplica
+            con cada expulsión seguida. Defaults to 10.0.
+        max_ejection_seconds (float): Duración máxima de una expulsión.
+            Defaults to 300.0.
+        health_check_interval (float | None): Segundos entre sondeos activos
+            de las réplicas; None los desactiva. Defaults to None.
+        health_check_timeout (float): Timeout de cada sondeo. Defaults to 2.0.
+        sticky (bool): Fija las peticiones con ``thread_id`` a una réplica.
+            Defaults to True.
+    """
+
+    ewma_decay: float = 0.3
+    failure_threshold: int = 3
+    ejection_seconds: float = 10.0
+    max_ejection_seconds: float = 300.0
+    health_check_interval: float | None = None
+    health_check_timeout: float = 2.0
+    sticky: bool = True
+
+
+class Replica:
+    """Estado de una réplica visto desde el cliente."""
+
+    # Latencia inicial supuesta para no favorecer réplicas sin historial
+    INITIAL_LATENCY = 0.1
+
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.latency = self.INITIAL_LATENCY
+        self.failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    @property
+    def cost(self) -> float:
+        return (self.outstanding + 1) * self.latency
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "url": self.url,
+            "available": self.available(now),
+            "ejected_for": max(0.0, self.ejected_until - now),
+            "outstanding": self.outstanding,
+            "latency_ewma": self.latency,
+            "requests": self.requests,
+            "errors": self.errors,
+            "consecutive_failures": self.failures,
+            "ejections": self.ejections,
+        }
+
+
+def _rendezvous_weight(key: str, url: str) -> int:
+    digest = hashlib.blake2b(f"{key}|{url}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class ReplicaBalancer:
+    """
+    Selección de réplica y seguimiento de su salud.
+
+    Es segura entre hilos; las réplicas se identifican por su URL base.
+    """
+
+    def __init__(self, urls: Sequence[str], config: BalancerConfig | None = None):
+        """
+        Inicializa el balanceador.
+
+        Args:
+            urls (Sequence[str]): URLs base de las réplicas.
+            config (BalancerConfig | None, optional): Configuración. Defaults to None.
+        """
+        if not urls:
+            raise ValueError("At least one replica URL is required")
+        self.config = config or BalancerConfig()
+        self.replicas: List[Replica] = [Replica(url) for url in urls]
+        self._lock = threading.Lock()
+        self._checker: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def pick(self, key: str | None = None, exclude: Sequence[Replica] = ()) -> Replica:
+        """
+        Elige la réplica para una petición.
+
+        Args:
+            key (str | None, optional): Clave de afinidad (``thread_id``).
+                Defaults to None.
+            exclude (Sequence[Replica], optional): Réplicas ya probadas en esta
+                petición. Defaults to ().
+
+        Returns:
+            Replica: La réplica elegida.
+        """
+        if len(self.replicas) == 1:
+            return self.replicas[0]
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                r for r in self.replicas if r.available(now) and r not in exclude
+            ]
+            if not candidates:
+                # Todas expulsadas: se prueba la que antes vuelve a estar disponible
+                pool = [r for r in self.replicas if r not in exclude] or self.replicas
+                return min(pool, key=lambda r: r.ejected_until)
+            if key is not None and self.config.sticky:
+                # Rendezvous: el orden es estable y solo cambia si cae la réplica
+                return max(candidates, key=lambda r: _rendezvous_weight(key, r.url))
+            if len(candidates) == 1:
+                return candidates[0]
+            a, b = random.sample(candidates, 2)
+            return a if a.cost <= b.cost else b
+
+    def acquire(self, replica: Replica) -> float:
+        """Marca una petición en curso; devuelve el instante de inicio."""
+        with self._lock:
+            replica.outstanding += 1
+            replica.requests += 1
+        return time.perf_counter()
+
+    def release(self, replica: Replica) -> None:
+        """Marca el fin de una petición en curso."""
+        with self._lock:
+            replica.outstanding -= 1
+
+    def observe(self, replica: Replica, started: float, ok: bool) -> None:
+        """
+        Registra el resultado de una petición (comprobación pasiva).
+
+        Args:
+            replica (Replica): La réplica usada.
+            started (float): Instante devuelto por ``acquire``.
+            ok (bool): Si la réplica respondió correctamente.
+        """
+        latency = time.perf_counter() - started
+        decay = self.config.ewma_decay
+        with self._lock:
+            if ok:
+                replica.latency += decay * (latency - replica.latency)
+                replica.failures = 0
+                replica.ejections = 0
+                return
+            replica.errors += 1
+            replica.failures += 1
+            if replica.failures >= self.config.failure_threshold:
+                self._eject(replica)
+
+    def _eject(self, replica: Replica) -> None:
+        seconds = min(
+            self.config.ejection_seconds * (2 ** replica.ejections),
+            self.config.max_ejection_seconds,
+        )
+        replica.ejected_until = time.monotonic() + seconds
+        replica.ejections += 1
+        replica.failures = 0
+        logger.warning(f"Ejecting replica {replica.url} for {seconds:.0f}s")
+
+    def mark(self, replica: Replica, healthy: bool) -> None:
+        """Resultado de un sondeo activo: readmite o expulsa la réplica."""
+        with self._lock:
+            if healthy:
+                if not replica.available(time.monotonic()):
+                    logger.info(f"Replica {replica.url} is healthy again")
+                replica.ejected_until = 0.0
+                replica.failures = 0
+            elif replica.available(time.monotonic()):
+                self._eject(replica)
+
+    def check(self, probe: Callable[[str], bool]) -> Dict[str, bool]:
+        """
+        Sondea todas las réplicas una vez.
+
+        Args:
+            probe (Callable[[str], bool]): Función que comprueba una URL base.
+
+        Returns:
+            Dict[str, bool]: La salud de cada réplica.
+        """
+        results = {}
+        for replica in self.replicas:
+            try:
+                healthy = probe(replica.url)
+            except Exception:
+                healthy = False
+            self.mark(replica, healthy)
+            results[replica.url] = healthy
+        return results
+
+    def start_health_checks(self, probe: Callable[[str], bool]) -> None:
+        """Arranca (una vez) el hilo de comprobaciones activas si están configuradas."""
+        interval = self.config.health_check_interval
+        if interval is None or self._checker is not None or len(self.replicas) < 2:
+            return
+
+        stop = self._stop = threading.Event()
+
+        def run() -> None:
+            while not stop.wait(interval):
+                self.check(probe)
+
+        self._checker = threading.Thread(target=run, name="replica-health", daemon=True)
+        self._checker.start()
+
+    def stop_health_checks(self) -> None:
+        self._stop.set()
+        self._checker = None
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Devuelve el estado de cada réplica.
+
+        Returns:
+            List[Dict[str, Any]]: Carga, latencia y salud por réplica.
+        """
+        with self._lock:
+            return [replica.stats() for replica in self.replicas]
@@ -0,0 +1,353 @@
+"""
+Caché de respuestas por agente para ``Server``.
+
+Las peticiones se identifican por un hash canónico del payload decodificado
+(entrada, configuración sin campos volátiles y parámetros de ejecución). Las
+entradas viven en un LRU en memoria con TTL y, opcionalmente, en un directorio
+local que sobrevive a reinicios.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from langgraph_server.agents.codecs import to_wire
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - backend opcional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Campos de ``config`` que no afectan al resultado del agente
+VOLATILE_CONFIG_KEYS = frozenset(
+    {"callbacks", "run_id", "run_name", "tags", "metadata", "max_concurrency"}
+)
+
+# Valores de ``Cache-Control`` que entiende el servidor
+NO_CACHE = "no-cache"  # no leer de la caché, pero sí guardar el resultado
+NO_STORE = "no-store"  # no leer ni guardar
+
+
+def _strip_message_ids(obj: Any) -> Any:
+    """Elimina los ids de los mensajes ``lc``: no cambian la respuesta."""
+    if isinstance(obj, dict):
+        if obj.get("lc") == 1 and isinstance(obj.get("kwargs"), dict):
+            kwargs = {k: v for k, v in obj["kwargs"].items() if k != "id"}
+            return {**obj, "kwargs": _strip_message_ids(kwargs)}
+        return {k: _strip_message_ids(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_strip_message_ids(v) for v in obj]
+    return obj
+
+
+def canonical_hash(kind: str, input: Any, kwargs: Dict[str, Any]) -> str:
+    """
+    Calcula el hash canónico de una petición.
+
+    Args:
+        kind (str): Tipo de endpoint ("invoke" o "stream"); invoke y ainvoke
+            comparten entradas, igual que stream y astream.
+        input (Any): La entrada del agente.
+        kwargs (Dict[str, Any]): Parámetros de ejecución (config, output_keys...).
+
+    Returns:
+        str: El hash SHA-256 en hexadecimal.
+    """
+    params = dict(kwargs)
+    config = params.get("config")
+    if isinstance(config, dict):
+        params["config"] = {
+            k: v for k, v in config.items() if k not in VOLATILE_CONFIG_KEYS
+        }
+    wire = _strip_message_ids(to_wire({"kind": kind, "input": input, "params": params}))
+    if orjson is not None:
+        data = orjson.dumps(wire, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(wire, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_cacheable(kwargs: Dict[str, Any]) -> bool:
+    """
+    Indica si una petición se puede cachear.
+
+    Las peticiones con ``thread_id`` dependen del estado del checkpointer y
+    además lo modifican, así que nunca se sirven desde la caché.
+    """
+    config = kwargs.get("config")
+    if isinstance(config, dict):
+        configurable = config.get("configurable") or {}
+        if configurable.get("thread_id") is not None:
+            return False
+    return True
+
+
+def parse_cache_control(header: str | None) -> Tuple[bool, bool]:
+    """
+    Interpreta la cabecera ``Cache-Control`` de la petición.
+
+    Args:
+        header (str | None): El valor de la cabecera.
+
+    Returns:
+        Tuple[bool, bool]: ``(leer, guardar)``.
+    """
+    directives = {d.strip().lower() for d in (header or "").split(",")}
+    if NO_STORE in directives:
+        return False, False
+    if NO_CACHE in directives:
+        return False, True
+    return True, True
+
+
+class ResponseCache:
+    """
+    Caché LRU con TTL y un nivel opcional en disco.
+
+    Es segura entre hilos; los valores deben ser serializables con ``pickle``
+    para poder guardarse en disco.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float | None = 300.0,
+        disk_path: str | None = None,
+    ):
+        """
+        Inicializa la caché.
+
+        Args:
+            max_entries (int, optional): Entradas máximas en memoria. Defaults to 1024.
+            ttl (float | None, optional): Segundos de validez de una entrada;
+                None para no expirar. Defaults to 300.0.
+            disk_path (str | None, optional): Directorio del nivel en disco.
+                Defaults to None.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = disk_path
+        if disk_path:
+            os.makedirs(disk_path, exist_ok=True)
+
+        self._entries: "OrderedDict[str, Tuple[float, float | None, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.disk_path, key[:2], f"{key}.pkl")
+
+    def _read_disk(self, key: str) -> Tuple[float, float | None, Any] | None:
+        try:
+            with open(self._file(key), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+            self._remove_disk(key)
+            return None
+
+    def _write_disk(self, key: str, entry: Tuple[float, float | None, Any]) -> None:
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.warning(f"Could not persist cache entry {key}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _remove_disk(self, key: str) -> None:
+        try:
+            os.remove(self._file(key))
+        except FileNotFoundError:
+            pass
+
+    def get(self, key: str) -> Tuple[bool, Any, float]:
+        """
+        Busca una entrada.
+
+        Args:
+            key (str): El hash canónico de la petición.
+
+        Returns:
+            Tuple[bool, Any, float]: ``(encontrada, valor, edad en segundos)``.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value, now - stored_at
+                del self._entries[key]
+                self.expirations += 1
+
+        if self.disk_path:
+            entry = self._read_disk(key)
+            if entry is not None:
+                stored_at, expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    with self._lock:
+                        self._insert(key, entry)
+                        self.disk_hits += 1
+                    return True, value, now - stored_at
+                self._remove_disk(key)
+                with self._lock:
+                    self.expirations += 1
+
+        with self._lock:
+            self.misses += 1
+        return False, None, 0.0
+
+    def _insert(self, key: str, entry: Tuple[float, float | None, Any]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Guarda una entrada.
+
+        Args:
+            key (str): El hash canónico de la petición.
+            value (Any): La respuesta (o la lista de chunks de un stream).
+        """
+        now = time.time()
+        entry = (now, now + self.ttl if self.ttl is not None else None, value)
+        with self._lock:
+            self._insert(key, entry)
+            self.stores += 1
+        if self.disk_path:
+            self._write_disk(key, entry)
+
+    def lookup(
+        self,
+        kind: str,
+        input: Any,
+        kwargs: Dict[str, Any],
+        cache_control: str | None = None,
+    ) -> "CacheLookup":
+        """
+        Consulta la caché para una petición respetando ``Cache-Control``.
+
+        Args:
+            kind (str): Tipo de endpoint ("invoke" o "stream").
+            input (Any): La entrada del agente.
+            kwargs (Dict[str, Any]): Parámetros de ejecución.
+            cache_control (str | None, optional): Cabecera ``Cache-Control``.
+                Defaults to None.
+
+        Returns:
+            CacheLookup: El resultado de la consulta.
+        """
+        read, store = parse_cache_control(cache_control)
+        if not (read or store) or not is_cacheable(kwargs):
+            return CacheLookup(self)
+        key = canonical_hash(kind, input, kwargs)
+        if read:
+            hit, value, age = self.get(key)
+            if hit:
+                return CacheLookup(self, key, store, hit=True, value=value, age=age)
+        return CacheLookup(self, key, store)
+
+    def clear(self) -> None:
+        """Vacía la memoria y el nivel en disco."""
+        with self._lock:
+            self._entries.clear()
+        if self.disk_path:
+            for root, _, files in os.walk(self.disk_path):
+                for name in files:
+                    if name.endswith(".pkl"):
+                        os.remove(os.path.join(root, name))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Devuelve los contadores de la caché.
+
+        Returns:
+            Dict[str, Any]: Aciertos, fallos, tamaño y expulsiones.
+        """
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "disk": bool(self.disk_path),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class CacheLookup:
+    """
+    Resultado de consultar la caché para una petición concreta.
+
+    Permite guardar la respuesta una vez calculada y genera las cabeceras
+    ``X-Cache`` / ``Age`` de la respuesta.
+    """
+
+    def __init__(
+        self,
+        cache: "ResponseCache | None" = None,
+        key: str | None = None,
+        store: bool = False,
+        hit: bool = False,
+        value: Any = None,
+        age: float = 0.0,
+    ):
+        self.cache = cache
+        self.key = key
+        self.hit = hit
+        self.value = value
+        self.age = age
+        self._store = store
+
+    @property
+    def status(self) -> str:
+        if self.hit:
+            return "HIT"
+        if self.cache is not None and self.key is not None and self._store:
+            return "MISS"
+        return "BYPASS"
+
+    def store(self, value: Any) -> None:
+        """Guarda la respuesta si la petición lo permite."""
+        if self.cache is not None and self.key is not None and self._store:
+            self.cache.set(self.key, value)
+
+    def headers(self) -> Dict[str, str]:
+        """Cabeceras informativas para la respuesta."""
+        if self.cache is None:
+            return {}
+        headers = {"X-Cache": self.status}
+        if self.hit:
+            headers["Age"] = str(int(self.age))
+        return headers
@@ -0,0 +1,748 @@
+"""
+Checkpointer persistente local para los agentes servidos.
+
+``CheckpointStore`` guarda los checkpoints de LangGraph en un fichero SQLite
+en modo WAL, de modo que el estado de cada hilo sobrevive a los reinicios, y
+mantiene delante un LRU en memoria con el último checkpoint de los hilos
+activos:
+
+- Las lecturas del último estado de un hilo caliente no tocan el disco.
+- Las escrituras se encolan y un hilo de fondo las agrupa en una sola
+  transacción cada ``flush_interval`` segundos (write-behind). Una caída del
+  proceso puede perder como mucho ese intervalo.
+- Los hilos sin actividad durante ``ttl`` segundos se borran.
+
+Cada agente recibe su propio checkpointer (``store.saver(path)``) sobre el
+mismo fichero; los ``thread_id`` de agentes distintos no se mezclan.
+
+Ejemplo::
+
+    server = Server(checkpoints=CheckpointStore("state/agents.sqlite"))
+    server.add_agent(agente, "/math")  # sin ``memory``: usa el del servidor
+"""
+
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+
+from langgraph_server.agents.workers import FACTORY_ENV
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS threads_last_access ON threads (last_access);
+"""
+
+Typed = Tuple[str, bytes]
+# (task_id, channel, valor serializado, task_path) por (task_id, idx)
+Writes = Dict[Tuple[str, int], Tuple[str, str, Typed, str]]
+
+
+@dataclass
+class _HotCheckpoint:
+    """Último checkpoint de un hilo, serializado, con sus canales y escrituras."""
+
+    checkpoint_id: str
+    parent_id: str | None
+    checkpoint: Typed
+    metadata: Typed
+    blobs: Dict[str, Typed]
+    writes: Writes = field(default_factory=dict)
+
+
+class CheckpointStore:
+    """SQLite/WAL con un LRU de hilos calientes y escrituras agrupadas en segundo plano."""
+
+    def __init__(
+        self,
+        path: str = "langgraph_checkpoints.sqlite",
+        hot_threads: int = 256,
+        flush_interval: float = 0.05,
+        ttl: float | None = 7 * 24 * 3600.0,
+        cleanup_interval: float = 300.0,
+        shared: bool | None = None,
+    ):
+        """
+        Inicializa el almacén (el fichero se crea si no existe).
+
+        Args:
+            path (str, optional): Fichero SQLite. Defaults to "langgraph_checkpoints.sqlite".
+            hot_threads (int, optional): Hilos cuyo último checkpoint se guarda
+                en memoria. Defaults to 256.
+            flush_interval (float, optional): Segundos máximos que una escritura
+                espera en la cola antes de llegar al disco. Defaults to 0.05.
+            ttl (float | None, optional): Segundos sin actividad tras los que se
+                borra un hilo; None para no borrar nunca. Defaults to una semana.
+            cleanup_interval (float, optional): Cada cuántos segundos se buscan
+                hilos caducados. Defaults to 300.0.
+            shared (bool | None, optional): Varios procesos escriben en el mismo
+                fichero: las escrituras se hacen síncronas y los aciertos en
+                memoria se validan contra el disco. None lo activa en el modo
+                multiproceso de ``Server``. Defaults to None.
+        """
+        self.path = path
+        self.hot_threads = hot_threads
+        self.flush_interval = flush_interval
+        self.ttl = ttl
+        self.cleanup_interval = cleanup_interval
+        self.shared = shared if shared is not None else os.environ.get(FACTORY_ENV) is not None
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+
+        # ``_db_lock`` serializa el acceso a la conexión; ``_lock`` protege la memoria
+        self._db_lock = threading.RLock()
+        self._lock = threading.Lock()
+        self._hot: "OrderedDict[Tuple[str, str], _HotCheckpoint]" = OrderedDict()
+        self._pending: List[Tuple[str, Sequence[Any]]] = []
+        self._pending_since: float | None = None
+        self._touched: Dict[str, float] = {}
+
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._writer: threading.Thread | None = None
+        self._next_cleanup = time.monotonic() + cleanup_interval
+
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self.written = 0
+        self.flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.max_write_lag = 0.0
+        self.expired = 0
+
+    def saver(self, scope: str) -> "LocalCheckpointer":
+        """
+        Devuelve el checkpointer de un agente.
+
+        Args:
+            scope (str): Espacio de nombres de los hilos (la ruta del agente).
+
+        Returns:
+            LocalCheckpointer: Checkpointer de LangGraph sobre este almacén.
+        """
+        return LocalCheckpointer(self, scope)
+
+    # --- Escrituras en segundo plano ---
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._writer is not None or self._stopped.is_set():
+                return
+            self._writer = threading.Thread(
+                target=self._run, name="checkpoint-writer", daemon=True
+            )
+        self._writer.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if self.ttl is not None and time.monotonic() >= self._next_cleanup:
+                    self._next_cleanup = time.monotonic() + self.cleanup_interval
+                    self.expire()
+            except Exception as e:
+                logger.error(f"Checkpoint writer failed: {e}")
+
+    def enqueue(self, ops: List[Tuple[str, Sequence[Any]]]) -> None:
+        """Encola sentencias SQL para la siguiente escritura agrupada."""
+        with self._lock:
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+            self._pending.extend(ops)
+        if self.shared:
+            self.flush()
+        else:
+            self._start()
+
+    def touch(self, key: str) -> None:
+        """Marca actividad en un hilo (para el TTL)."""
+        with self._lock:
+            self._touched[key] = time.time()
+
+    def flush(self) -> None:
+        """Escribe en el disco todo lo encolado, en una sola transacción."""
+        with self._db_lock:
+            with self._lock:
+                ops, self._pending = self._pending, []
+                since, self._pending_since = self._pending_since, None
+                touched, self._touched = self._touched, {}
+            if not ops and not touched:
+                return
+            started = time.monotonic()
+            self._conn.execute("BEGIN")
+            try:
+                for sql, params in ops:
+                    self._conn.execute(sql, params)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO threads (thread_id, last_access) VALUES (?, ?)",
+                    touched.items(),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            finished = time.monotonic()
+            with self._lock:
+                self.flushes += 1
+                self.written += len(ops)
+                self.flush_seconds += finished - started
+                self.max_flush_seconds = max(self.max_flush_seconds, finished - started)
+                if since is not None:
+                    self.max_write_lag = max(self.max_write_lag, finished - since)
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        """Ejecuta una lectura tras volcar las escrituras pendientes."""
+        with self._db_lock:
+            self.flush()
+            return self._conn.execute(sql, params).fetchall()
+
+    def expire(self) -> int:
+        """
+        Borra los hilos sin actividad durante ``ttl`` segundos.
+
+        Returns:
+            int: El número de hilos borrados.
+        """
+        if self.ttl is None:
+            return 0
+        cutoff = time.time() - self.ttl
+        keys = [row[0] for row in self.query(
+            "SELECT thread_id FROM threads WHERE last_access < ?", (cutoff,)
+        )]
+        for key in keys:
+            self.delete(key)
+        if keys:
+            logger.info(f"Expired {len(keys)} idle checkpoint threads")
+        with self._lock:
+            self.expired += len(keys)
+        return len(keys)
+
+    def delete(self, key: str) -> None:
+        """Borra un hilo del disco y de la memoria."""
+        with self._lock:
+            for hot_key in [k for k in self._hot if k[0] == key]:
+                del self._hot[hot_key]
+            self._touched.pop(key, None)
+        with self._db_lock:
+            self.flush()
+            self._conn.execute("BEGIN")
+            try:
+                for table in ("checkpoints", "blobs", "writes", "threads"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (key,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # --- Nivel en memoria ---
+
+    def hot_get(self, key: str, ns: str) -> _HotCheckpoint | None:
+        with self._lock:
+            entry = self._hot.get((key, ns))
+            if entry is not None:
+                self._hot.move_to_end((key, ns))
+                # Copia: otras tareas siguen añadiendo escrituras a la entrada
+                entry = replace(entry, writes=dict(entry.writes))
+        if entry is not None and self.shared:
+            # Otro proceso puede haber escrito un checkpoint más reciente
+            latest = self.query(
+                "SELECT max(checkpoint_id) FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?",
+                (key, ns),
+            )
+            if latest[0][0] != entry.checkpoint_id:
+                entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def hot_put(self, key: str, ns: str, entry: _HotCheckpoint | None) -> None:
+        with self._lock:
+            if entry is None:
+                self._hot.pop((key, ns), None)
+                return
+            self._hot[(key, ns)] = entry
+            self._hot.move_to_end((key, ns))
+            while len(self._hot) > self.hot_threads:
+                self._hot.popitem(last=False)
+
+    def hot_peek(self, key: str, ns: str) -> _HotCheckpoint | None:
+        with self._lock:
+            return self._hot.get((key, ns))
+
+    def hot_write(
+        self, key: str, ns: str, checkpoint_id: str, writes: Writes, replace_existing: bool
+    ) -> None:
+        with self._lock:
+            entry = self._hot.get((key, ns))
+            if entry is None or entry.checkpoint_id != checkpoint_id:
+                return
+            for write_key, write in writes.items():
+                if replace_existing or write_key not in entry.writes:
+                    entry.writes[write_key] = write
+
+    def close(self) -> None:
+        """Vuelca las escrituras pendientes y cierra el fichero."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+            self._writer = None
+        with self._db_lock:
+            self.flush()
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Devuelve el estado del almacén.
+
+        Returns:
+            Dict[str, Any]: Hilos en memoria, aciertos, fallos, escrituras
+            pendientes y latencias de escritura.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "hot_threads": len(self._hot),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "pending_writes": len(self._pending),
+                "flushes": self.flushes,
+                "written": self.written,
+                "avg_flush_seconds": self.flush_seconds / self.flushes if self.flushes else 0.0,
+                "max_flush_seconds": self.max_flush_seconds,
+                "max_write_lag_seconds": self.max_write_lag,
+                "expired_threads": self.expired,
+            }
+
+
+class LocalCheckpointer(BaseCheckpointSaver[str]):
+    """Checkpointer de LangGraph de un agente sobre un ``CheckpointStore``."""
+
+    def __init__(self, store: CheckpointStore, scope: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.store = store
+        self.scope = scope
+
+    def _key(self, thread_id: Any) -> str:
+        return f"{self.scope}:{thread_id}"
+
+    def _config(self, thread_id: str, ns: str, checkpoint_id: str | None) -> RunnableConfig | None:
+        if not checkpoint_id:
+            return None
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": ns,
+                "checkpoint_id": checkpoint_id,
+            }
+        }
+
+    def _tuple(self, thread_id: str, ns: str, entry: _HotCheckpoint) -> CheckpointTuple:
+        loads = self.serde.loads_typed
+        checkpoint: Checkpoint = loads(entry.checkpoint)
+        writes = sorted(entry.writes.items(), key=lambda kv: writes_sort_key(kv[1][3], *kv[0]))
+        return CheckpointTuple(
+            config=self._config(thread_id, ns, entry.checkpoint_id),
+            checkpoint={
+                **checkpoint,
+                "channel_values": {
+                    channel: loads(blob)
+                    for channel, blob in entry.blobs.items()
+                    if blob[0] != "empty"
+                },
+            },
+            metadata=loads(entry.metadata),
+            pending_writes=[
+                (task_id, channel, loads(value)) for _, (task_id, channel, value, _) in writes
+            ],
+            parent_config=self._config(thread_id, ns, entry.parent_id),
+        )
+
+    def _load(self, key: str, ns: str, checkpoint_id: str | None) -> _HotCheckpoint | None:
+        if checkpoint_id:
+            rows = self.store.query(
+                "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (key, ns, checkpoint_id),
+            )
+        else:
+            rows = self.store.query(
+                "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT 1",
+                (key, ns),
+            )
+        if not rows:
+            return None
+        return self._entry(key, ns, rows[0])
+
+    def _entry(self, key: str, ns: str, row: Tuple[Any, ...]) -> _HotCheckpoint:
+        checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata = row
+        versions = self.serde.loads_typed((type_, checkpoint)).get("channel_versions", {})
+        blobs: Dict[str, Typed] = {}
+        for channel, version in versions.items():
+            found = self.store.query(
+                "SELECT type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+                "AND channel = ? AND version = ?",
+                (key, ns, channel, str(version)),
+            )
+            if found:
+                blobs[channel] = (found[0][0], found[0][1])
+        writes: Writes = {
+            (task_id, idx): (task_id, channel, (value_type, value), task_path)
+            for task_id, idx, channel, value_type, value, task_path in self.store.query(
+                "SELECT task_id, idx, channel, type, value, task_path FROM writes "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (key, ns, checkpoint_id),
+            )
+        }
+        return _HotCheckpoint(
+            checkpoint_id, parent_id, (type_, checkpoint), (metadata_type, metadata), blobs, writes
+        )
+
+    def _hot_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        key = self._key(thread_id)
+        entry = self.store.hot_get(key, ns)
+        checkpoint_id = get_checkpoint_id(config)
+        if entry is None or (checkpoint_id and checkpoint_id != entry.checkpoint_id):
+            return None
+        self.store.touch(key)
+        return self._tuple(thread_id, ns, entry)
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        """
+        Lee un checkpoint: el último de un hilo caliente sale de memoria.
+
+        Args:
+            config (RunnableConfig): Hilo, espacio y, opcionalmente, ``checkpoint_id``.
+
+        Returns:
+            CheckpointTuple | None: El checkpoint, o None si no existe.
+        """
+        hit = self._hot_tuple(config)
+        if hit is not None:
+            return hit
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        key = self._key(thread_id)
+        checkpoint_id = get_checkpoint_id(config)
+        entry = self._load(key, ns, checkpoint_id)
+        if entry is None:
+            return None
+        self.store.touch(key)
+        if not checkpoint_id:
+            self.store.hot_put(key, ns, entry)
+        return self._tuple(thread_id, ns, entry)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: Dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        """
+        Lista checkpoints (del más reciente al más antiguo) desde el disco.
+
+        Args:
+            config (RunnableConfig | None): Hilo (y espacio) a listar; None para todos.
+            filter (Dict[str, Any] | None, optional): Valores exigidos en los metadatos.
+            before (RunnableConfig | None, optional): Solo checkpoints anteriores a este.
+            limit (int | None, optional): Número máximo de resultados.
+
+        Yields:
+            Iterator[CheckpointTuple]: Los checkpoints encontrados.
+        """
+        prefix = f"{self.scope}:"
+        where, params = ["substr(thread_id, 1, ?) = ?"], [len(prefix), prefix]
+        if config is not None:
+            where.append("thread_id = ?")
+            params.append(self._key(config["configurable"]["thread_id"]))
+            ns = config["configurable"].get("checkpoint_ns")
+            if ns is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            params.append(before_id)
+        rows = self.store.query(
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, "
+            "checkpoint, metadata_type, metadata FROM checkpoints WHERE "
+            + " AND ".join(where)
+            + " ORDER BY checkpoint_id DESC",
+            params,
+        )
+        for key, ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            metadata = self.serde.loads_typed((row[4], row[5]))
+            if filter and not all(metadata.get(k) == v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield self._tuple(key[len(prefix):], ns, self._entry(key, ns, tuple(row)))
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """
+        Guarda un checkpoint: pasa a ser el caliente del hilo y se encola para el disco.
+
+        Args:
+            config (RunnableConfig): El config del checkpoint padre.
+            checkpoint (Checkpoint): El checkpoint.
+            metadata (CheckpointMetadata): Sus metadatos.
+            new_versions (ChannelVersions): Canales que cambian en este checkpoint.
+
+        Returns:
+            RunnableConfig: El config del checkpoint guardado.
+        """
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        key = self._key(thread_id)
+        dumps = self.serde.dumps_typed
+
+        stored = checkpoint.copy()
+        values: Dict[str, Any] = stored.pop("channel_values")  # type: ignore[misc]
+        new_blobs = {
+            channel: dumps(values[channel]) if channel in values else ("empty", b"")
+            for channel in new_versions
+        }
+        serialized = dumps(stored)
+        serialized_metadata = dumps(get_checkpoint_metadata(config, metadata))
+
+        ops: List[Tuple[str, Sequence[Any]]] = [
+            (
+                "INSERT OR REPLACE INTO blobs (thread_id, checkpoint_ns, channel, version, type, blob) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, ns, channel, str(new_versions[channel]), blob[0], blob[1]),
+            )
+            for channel, blob in new_blobs.items()
+        ]
+        ops.append(
+            (
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, "
+                "parent_checkpoint_id, type, checkpoint, metadata_type, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, ns, checkpoint["id"], parent_id, *serialized, *serialized_metadata),
+            )
+        )
+
+        # El nuevo checkpoint solo queda en memoria si se conocen todos sus canales
+        previous = self.store.hot_peek(key, ns)
+        blobs: Dict[str, Typed] | None = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            if channel in new_blobs:
+                blobs[channel] = new_blobs[channel]
+            elif (
+                previous is not None
+                and channel in previous.blobs
+                and previous.checkpoint_id == parent_id
+            ):
+                blobs[channel] = previous.blobs[channel]
+            elif values.get(channel) is not None:
+                blobs[channel] = dumps(values[channel])
+            else:
+                blobs = None
+                break
+        self.store.hot_put(
+            key,
+            ns,
+            _HotCheckpoint(checkpoint["id"], parent_id, serialized, serialized_metadata, blobs)
+            if blobs is not None
+            else None,
+        )
+        self.store.touch(key)
+        self.store.enqueue(ops)
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """
+        Guarda las escrituras pendientes de una tarea.
+
+        Args:
+            config (RunnableConfig): El config del checkpoint.
+            writes (Sequence[Tuple[str, Any]]): Pares ``(canal, valor)``.
+            task_id (str): La tarea que escribe.
+            task_path (str, optional): La ruta de la tarea. Defaults to "".
+        """
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        key = self._key(thread_id)
+        # Las escrituras especiales (errores, interrupciones) se reemplazan; el resto no
+        replace = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        ops: List[Tuple[str, Sequence[Any]]] = []
+        hot: Writes = {}
+        for index, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, index)
+            serialized = self.serde.dumps_typed(value)
+            ops.append(
+                (
+                    f"{verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, "
+                    "channel, type, value, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, ns, checkpoint_id, task_id, idx, channel, *serialized, task_path),
+                )
+            )
+            hot[(task_id, idx)] = (task_id, channel, serialized, task_path)
+        self.store.hot_write(key, ns, checkpoint_id, hot, replace)
+        self.store.enqueue(ops)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Borra todos los checkpoints y escrituras de un hilo."""
+        self.store.delete(self._key(thread_id))
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        """Versión asíncrona de ``get_tuple``: solo los fallos salen del event loop."""
+        if not self.store.shared:
+            hit = self._hot_tuple(config)
+            if hit is not None:
+                return hit
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: Dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """Versión asíncrona de ``list``."""
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Versión asíncrona de ``put``: sin disco salvo en modo compartido."""
+        if self.store.shared:
+            return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Versión asíncrona de ``put_writes``."""
+        if self.store.shared:
+            return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Versión asíncrona de ``delete_thread``."""
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: str | None, channel: None) -> str:
+        # Mismo formato que los savers de LangGraph: contador y sufijo aleatorio
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
@@ -1,53 +1,882 @@
-import jsonpickle
 from langgraph.typing import InputT
 from langgraph.types import RunnableConfig, StreamMode, All, Sequence, Any
 
+import asyncio
+import concurrent.futures
 import httpx
-from typing import Any, AsyncIterator, Iterator, Sequence
+import random
+import threading
+import time
+import uuid
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Sequence, Tuple
 import logging
 
+from langchain_core.runnables import Runnable
 
-class RemoteAgent:
+from langgraph_server.agents.admission import PRIORITY_HEADER
+from langgraph_server.agents.balancer import BalancerConfig, Replica, ReplicaBalancer
+from langgraph_server.agents.codecs import (
+    INPROC_CODEC,
+    LEGACY_CODEC,
+    Codec,
+    FrameDecoder,
+    codec_for_content_type,
+    get_codec,
+)
+from langgraph_server.agents.deadline import call_deadline, deadline_headers, remaining
+from langgraph_server.agents.inproc import INPROC_SCHEME
+from langgraph_server.agents.relay import RemoteRun, sanitize_config
+from langgraph_server.agents.ring import (
+    RING_HEADER,
+    RingConfig,
+    RingFrameDecoder,
+    SharedRing,
+    acquire_ring,
+    release_ring,
+    same_host,
+)
+from langgraph_server.agents.retry import (
+    IDEMPOTENCY_HEADER,
+    HedgePolicy,
+    LatencyTracker,
+    RetryBudget,
+    RetryPolicy,
+    hedge_delay,
+    is_retryable_error,
+)
+from langgraph_server.agents.sessions import SESSION_HEADER, ThreadSessions
+from langgraph_server.agents.tracing import Span, Tracer, get_tracer
+from langgraph_server.agents.transport import (
+    PoolConfig,
+    TransportRegistry,
+    default_registry,
+    origin_of,
+)
+
+
+# Respuestas de sobrecarga del servidor que se reintentan tras ``Retry-After``
+_OVERLOAD_STATUS = (429, 503)
+
+# Espera máxima entre reintentos por sobrecarga
+_MAX_OVERLOAD_DELAY = 30.0
+
+# Respuestas que cuentan como fallo de la réplica (no de la petición)
+_REPLICA_FAILURE_STATUS = (502, 504)
+
+# Frames que un stream duplicado puede adelantar mientras se decide el ganador
+_HEDGE_QUEUE_SIZE = 16
+
+# Hilos para las peticiones síncronas duplicadas (se crean al primer uso)
+_hedge_pool: concurrent.futures.ThreadPoolExecutor | None = None
+_hedge_pool_lock = threading.Lock()
+
+
+def _get_hedge_pool() -> concurrent.futures.ThreadPoolExecutor:
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="remote-hedge")
+        return _hedge_pool
+
+
+def _thread_key(payload: Any) -> str | None:
+    """Devuelve el ``thread_id`` del payload, si lo hay, para la afinidad."""
+    config = payload.get("config") if isinstance(payload, dict) else None
+    if not isinstance(config, dict):
+        return None
+    thread_id = (config.get("configurable") or {}).get("thread_id")
+    return str(thread_id) if thread_id is not None else None
+
+
+def _mutates_thread(payload: Any) -> bool:
+    """Indica si alguna entrada del payload (también las de un batch) escribe en un hilo."""
+    config = payload.get("config") if isinstance(payload, dict) else None
+    configs = config if isinstance(config, list) else [config]
+    return any(
+        isinstance(item, dict) and (item.get("configurable") or {}).get("thread_id") is not None
+        for item in configs
+    )
+
+
+def _retry_after_seconds(value: str | None) -> float | None:
+    """Interpreta ``Retry-After`` en segundos o como fecha HTTP."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _from_frame(frame: Any, stream_mode: Any, subgraphs: bool) -> Any:
+    """
+    Reconstruye localmente la forma del chunk que devolvería LangGraph.
+
+    Args:
+        frame (Any): El frame ``{ns, mode, data}`` recibido del servidor.
+        stream_mode (Any): El ``stream_mode`` solicitado.
+        subgraphs (bool): Si se pidieron los streams de los subgrafos.
+
+    Returns:
+        Any: ``data``, ``(mode, data)``, ``(ns, data)`` o ``(ns, mode, data)``.
+    """
+    if not isinstance(frame, dict) or "data" not in frame:
+        return frame
+    mode, data = frame.get("mode"), frame["data"]
+    # En modo "messages" cada chunk es la tupla (mensaje, metadatos)
+    if mode == "messages" and isinstance(data, list) and len(data) == 2:
+        data = tuple(data)
+    multi = isinstance(stream_mode, (list, tuple))
+    if subgraphs:
+        ns = tuple(frame.get("ns") or ())
+        return (ns, mode, data) if multi else (ns, data)
+    return (mode, data) if multi else data
+
+
+class RemoteAgent(Runnable[Any, Any]):
     """
     Cliente para interactuar con un agente remoto.
 
     Esta clase permite invocar, transmitir y obtener información de un agente
     que se ejecuta en un servidor remoto.
+
+    Es un ``Runnable``: dentro de otro grafo se comporta como un subgrafo.
+    Si quien llama consume eventos (un grafo padre que hace stream o
+    callbacks, como ``astream_events``), la ejecución remota se pide por
+    streaming y se reproduce en local a medida que llega (ver ``relay``).
     """
-    def __init__(self, path: str):
+    def __init__(
+        self,
+        path: str | Sequence[str],
+        codec: str | Codec | None = None,
+        cache_control: str | None = None,
+        *,
+        metadata: Dict[str, Any] | None = None,
+        metadata_ttl: float | None = None,
+        pool: PoolConfig | None = None,
+        registry: TransportRegistry | None = None,
+        timeout: float | None = None,
+        tracer: Tracer | None = None,
+        priority: str | None = None,
+        overload_retries: int = 3,
+        overload_backoff: float = 0.5,
+        balancer: BalancerConfig | None = None,
+        retry: RetryPolicy | None = None,
+        hedge: HedgePolicy | None = None,
+        sessions: ThreadSessions | None = None,
+        ring: RingConfig | None = None,
+    ):
         """
         Inicializa el cliente del agente remoto.
 
+        No realiza ninguna petición: los metadatos (``/info``) se cargan de forma
+        perezosa la primera vez que se necesitan y se guardan en caché. Usa
+        ``await RemoteAgent.create(...)`` para precargarlos de forma asíncrona.
+
         Args:
-            path (str): La URL base del servidor del agente remoto.
+            path (str | Sequence[str]): La URL base del agente remoto, o una
+                lista de URLs de réplicas del mismo agente. Además de
+                ``http(s)://`` admite ``unix://<socket>:<ruta>`` (un ``Server``
+                en un socket Unix) e ``inproc://<servidor>/<ruta>`` (un
+                ``Server`` del mismo proceso creado con ``name``).
+            codec (str | Codec | None, optional): Codec de transporte ("json",
+                "msgpack" o "jsonpickle" para servidores antiguos). Defaults to
+                None ("inproc", sin serialización, si todas las réplicas son
+                ``inproc://``; si no, "json").
+            cache_control (str | None, optional): Cabecera ``Cache-Control`` por
+                defecto ("no-cache" o "no-store" para saltarse la caché del
+                servidor). Defaults to None.
+            metadata (Dict[str, Any] | None, optional): Metadatos ya conocidos del
+                agente; evitan la petición a ``/info``. Defaults to None.
+            metadata_ttl (float | None, optional): Segundos tras los que los
+                metadatos se revalidan con ``ETag``; None para no revalidar.
+                Defaults to None.
+            pool (PoolConfig | None, optional): Configuración del pool de
+                conexiones del origen. Defaults to None.
+            registry (TransportRegistry | None, optional): Registro de pools
+                compartidos; por defecto el global del proceso. Defaults to None.
+            timeout (float | None, optional): Timeout por defecto de cada
+                llamada; None usa el del pool. Se envía al servidor en
+                ``X-Request-Timeout`` (junto con los reintentos, la llamada
+                entera debe caber en él) y se acota por el plazo de la
+                petición en curso si la llamada es anidada. Defaults to None.
+            tracer (Tracer | None, optional): Tracer de los spans de cliente;
+                por defecto el del proceso. Defaults to None.
+            priority (str | None, optional): Clase de prioridad enviada en
+                ``X-Priority`` ("high", "normal", "low"). Defaults to None.
+            overload_retries (int, optional): Reintentos cuando el servidor
+                responde 429/503 por sobrecarga. Defaults to 3.
+            overload_backoff (float, optional): Espera base en segundos del
+                backoff exponencial; se respeta ``Retry-After`` si es mayor.
+                Defaults to 0.5.
+            balancer (BalancerConfig | None, optional): Balanceo y comprobaciones
+                de salud entre réplicas. Defaults to None.
+            retry (RetryPolicy | None, optional): Reintentos con backoff tras
+                errores de red o 502/504; None los desactiva. Con reintentos o
+                ``hedge`` cada llamada lleva ``Idempotency-Key``. Defaults to None.
+            hedge (HedgePolicy | None, optional): Envía un duplicado a otra
+                réplica cuando la respuesta tarda más que el percentil
+                configurado; None lo desactiva. Las llamadas con ``thread_id``
+                nunca se duplican. Defaults to None.
+            sessions (ThreadSessions | None, optional): Modo sesión para
+                ``invoke``/``ainvoke`` con ``thread_id``: solo se envían los
+                mensajes nuevos y se reciben los añadidos, con el historial en
+                el checkpointer del servidor. None lo desactiva. Defaults to None.
+            ring (RingConfig | None, optional): Recibe los chunks de ``stream``
+                y ``astream`` por un ring de memoria compartida cuando la
+                réplica está en esta máquina (loopback o socket Unix); por el
+                socket solo pasa el control. None lo desactiva. Defaults to None.
         """
-        self.base_url = path.rstrip("/")
-        self.http_client_sync = httpx.Client(timeout=360)
-        self.http_client_async = httpx.AsyncClient(timeout=360)
-
-        self.info = self.info()
-        self.name = self.info.get("name")
-        self.description = self.info.get("description")
-        self.skills = self.info.get("skills")
+        urls = [path] if isinstance(path, str) else list(path)
+        self.replicas = ReplicaBalancer([url.rstrip("/") for url in urls], balancer)
+        self.base_url = self.replicas.replicas[0].url
+        if codec is None:
+            in_process = all(url.startswith(f"{INPROC_SCHEME}://") for url in urls)
+            codec = INPROC_CODEC if in_process else "json"
+        self.codec = get_codec(codec)
+        self.cache_control = cache_control
+        self.metadata_ttl = metadata_ttl
         self.tools = []
 
+        self._metadata: Dict[str, Any] | None = metadata
+        self._metadata_etag: str | None = None
+        self._metadata_fetched_at = time.monotonic() if metadata is not None else 0.0
+        self._overrides: Dict[str, Any] = {}
+
+        # Los clientes HTTP se comparten por origen a través del registro
+        self.pool = pool or PoolConfig()
+        self.registry = registry or default_registry
+        self.timeout = timeout
+        self._pool_keys: Dict[str, Any] = {}
+        self._tracer = tracer
+        self.priority = priority
+        self.overload_retries = overload_retries
+        self.overload_backoff = overload_backoff
+
+        # Reintentos y duplicados comparten presupuesto para no amplificar una caída
+        self.retry = retry
+        self.hedge = hedge
+        budget = retry or RetryPolicy()
+        self.retry_budget = RetryBudget(budget.budget_ratio, budget.budget_min_per_second)
+        self._latency: Dict[str, LatencyTracker] = {}
+        self.sessions = sessions
+        self.ring = ring
+
+    @classmethod
+    async def create(cls, path: str | Sequence[str], **kwargs: Any) -> "RemoteAgent":
+        """
+        Crea un ``RemoteAgent`` con los metadatos ya cargados de forma asíncrona.
+
+        Args:
+            path (str | Sequence[str]): La URL base del agente o sus réplicas.
+            **kwargs (Any): Argumentos del constructor.
+
+        Returns:
+            RemoteAgent: El agente con los metadatos en caché.
+        """
+        agent = cls(path, **kwargs)
+        await agent.ainfo()
+        return agent
+
+    @classmethod
+    async def create_many(
+        cls, paths: Sequence[str | Sequence[str]], **kwargs: Any
+    ) -> List["RemoteAgent"]:
+        """
+        Crea varios ``RemoteAgent`` cargando sus metadatos en paralelo.
+
+        Args:
+            paths (Sequence[str]): Las URLs base de los agentes.
+            **kwargs (Any): Argumentos comunes del constructor.
+
+        Returns:
+            List[RemoteAgent]: Los agentes en el mismo orden que ``paths``.
+        """
+        return list(await asyncio.gather(*(cls.create(p, **kwargs) for p in paths)))
+
+    # --- Clientes HTTP y ciclo de vida ---
+
+    def _acquire_pool(self, url: str | None = None):
+        # Una referencia por origen: las réplicas pueden estar en hosts distintos
+        url = url or self.base_url
+        origin = origin_of(url)
+        key = self._pool_keys.get(origin)
+        if key is None:
+            key = self._pool_keys[origin] = self.registry.acquire(url, self.pool)
+        return key
+
+    def _client_sync(self, url: str) -> httpx.Client:
+        return self.registry.sync_client(self._acquire_pool(url))
+
+    def _client_async(self, url: str) -> httpx.AsyncClient:
+        return self.registry.async_client(self._acquire_pool(url))
+
+    @property
+    def http_client_sync(self) -> httpx.Client:
+        return self._client_sync(self.base_url)
+
+    @property
+    def http_client_async(self) -> httpx.AsyncClient:
+        return self._client_async(self.base_url)
+
+    def _probe(self, url: str) -> bool:
+        """Comprobación activa de una réplica (``GET /info``)."""
+        response = self._client_sync(url).get(
+            f"{url}/info", timeout=self.replicas.config.health_check_timeout
+        )
+        return response.status_code == 200
+
+    def check_replicas(self) -> Dict[str, bool]:
+        """
+        Sondea todas las réplicas y actualiza su estado.
+
+        Returns:
+            Dict[str, bool]: La salud de cada réplica por URL.
+        """
+        return self.replicas.check(self._probe)
+
+    def replica_stats(self) -> List[Dict[str, Any]]:
+        """
+        Devuelve la carga, latencia y salud de cada réplica.
+
+        Returns:
+            List[Dict[str, Any]]: Estadísticas por réplica.
+        """
+        return self.replicas.stats()
+
+    def _deadline(self, timeout: float | None) -> float | None:
+        """Plazo de una llamada: su timeout (o el del cliente), acotado por el plazo activo."""
+        return call_deadline(timeout if timeout is not None else self.timeout)
+
+    @staticmethod
+    def _timeout(deadline: float | None) -> Any:
+        """Timeout HTTP de un intento: lo que queda hasta el plazo."""
+        left = remaining(deadline)
+        if left is None:
+            return httpx.USE_CLIENT_DEFAULT
+        return max(0.0, left)
+
+    def close(self) -> None:
+        """Libera las referencias a los pools compartidos de sus orígenes."""
+        self.replicas.stop_health_checks()
+        keys, self._pool_keys = list(self._pool_keys.values()), {}
+        for key in keys:
+            self.registry.release(key)
+
+    async def aclose(self) -> None:
+        """Versión asíncrona de ``close``."""
+        self.replicas.stop_health_checks()
+        keys, self._pool_keys = list(self._pool_keys.values()), {}
+        for key in keys:
+            await self.registry.arelease(key)
+
+    def __enter__(self) -> "RemoteAgent":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "RemoteAgent":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+    # --- Metadatos ---
+
+    # Las propiedades no hacen peticiones: usan los metadatos ya obtenidos con
+    # ``info``/``create`` (aunque haya que revalidarlos) o, si no hay, la URL
+
+    @property
+    def name(self) -> str | None:
+        return (
+            self._overrides.get("name")
+            or (self._metadata or {}).get("name")
+            or self.base_url.rstrip("/").rsplit("/", 1)[-1]
+        )
+
+    @name.setter
+    def name(self, value: str | None) -> None:
+        self._overrides["name"] = value
+
+    @property
+    def description(self) -> str | None:
+        return self._overrides.get("description") or (self._metadata or {}).get("description")
+
+    @description.setter
+    def description(self, value: str | None) -> None:
+        self._overrides["description"] = value
+
+    @property
+    def skills(self) -> List[str] | None:
+        return self._overrides.get("skills") or (self._metadata or {}).get("skills")
+
+    @skills.setter
+    def skills(self, value: List[str] | None) -> None:
+        self._overrides["skills"] = value
+
+    def _metadata_stale(self, refresh: bool) -> bool:
+        if self._metadata is None or refresh:
+            return True
+        if self.metadata_ttl is None:
+            return False
+        return time.monotonic() - self._metadata_fetched_at > self.metadata_ttl
+
+    def _info_headers(self) -> Dict[str, str]:
+        if self._metadata_etag and self._metadata is not None:
+            return {"If-None-Match": self._metadata_etag}
+        return {}
+
+    def _store_info(self, response: httpx.Response) -> Dict[str, Any]:
+        self._metadata_fetched_at = time.monotonic()
+        if response.status_code == 304 and self._metadata is not None:
+            return self._metadata
+        response.raise_for_status()
+        self._metadata = response.json()
+        self._metadata_etag = response.headers.get("etag")
+        return self._metadata
+
+    @property
+    def tracer(self) -> Tracer:
+        return self._tracer or get_tracer()
+
+    def _start_span(self, path: str) -> Span:
+        """Abre el span de cliente de una llamada (hijo del span activo)."""
+        return self.tracer.start_span(
+            f"remote/{path}",
+            kind="client",
+            attributes={"agent": self.base_url, "codec": self.codec.name},
+        )
+
+    def _headers(
+        self, cache_control: str | None = None, span: Span | None = None
+    ) -> Dict[str, str]:
+        """Cabeceras de negociación del codec, control de caché y traza."""
+        headers = {
+            "Content-Type": self.codec.media_type,
+            "Accept": self.codec.media_type,
+        }
+        cache_control = cache_control or self.cache_control
+        if cache_control:
+            headers["Cache-Control"] = cache_control
+        if self.priority:
+            headers[PRIORITY_HEADER] = self.priority
+        if span is not None:
+            self.tracer.inject(headers, span)
+        return headers
+
+    def _overload_delay(self, response: httpx.Response, attempt: int) -> float | None:
+        """
+        Calcula la espera antes de reintentar una respuesta de sobrecarga.
+
+        Args:
+            response (httpx.Response): La respuesta recibida.
+            attempt (int): Número de intentos ya realizados (desde 0).
+
+        Returns:
+            float | None: Segundos de espera, o None si no se debe reintentar.
+        """
+        if response.status_code not in _OVERLOAD_STATUS or attempt >= self.overload_retries:
+            return None
+        backoff = self.overload_backoff * (2 ** attempt)
+        retry_after = _retry_after_seconds(response.headers.get("retry-after")) or 0.0
+        # Jitter para que los clientes rechazados a la vez no vuelvan a la vez
+        delay = max(backoff, retry_after) * random.uniform(1.0, 1.25)
+        logging.info(
+            f"{response.url} overloaded ({response.status_code}), retrying in {delay:.2f}s"
+        )
+        return min(delay, _MAX_OVERLOAD_DELAY)
+
+    def _release(self, content: bytes) -> None:
+        """Libera los objetos de la petición pasados por referencia (codec ``inproc``)."""
+        if self.codec.local_only:
+            self.codec.discard(content)
+
+    def _decode_response(self, response: httpx.Response) -> Any:
+        """Decodifica una respuesta con el codec de su ``Content-Type``."""
+        codec = codec_for_content_type(response.headers.get("content-type"), self.codec.local_only)
+        return codec.decode_response(response.content)
+
+    def _acquire_ring(self, url: str) -> SharedRing | None:
+        """Ring de memoria compartida para un stream, si la réplica está en esta máquina."""
+        if self.ring is None or not same_host(url):
+            return None
+        return acquire_ring(self.ring)
+
+    def _stream_headers(
+        self, headers: Dict[str, str], deadline: float | None, ring: SharedRing | None
+    ) -> Dict[str, str]:
+        headers = deadline_headers(headers, deadline)
+        if ring is None:
+            return headers
+        return {**headers, RING_HEADER: ring.name}
+
+    def _frame_decoder(self, response: httpx.Response, ring: SharedRing | None) -> FrameDecoder:
+        """Decodificador de los frames del stream (por el ring si el servidor lo usa)."""
+        codec = codec_for_content_type(response.headers.get("content-type"), self.codec.local_only)
+        if ring is not None and response.headers.get(RING_HEADER) == ring.name:
+            return RingFrameDecoder(codec, ring)
+        return codec.frame_decoder()
+
+    @staticmethod
+    def _release_ring(
+        ring: SharedRing | None, response: httpx.Response | None, completed: bool
+    ) -> None:
+        # Si el servidor escribía en el ring y el stream se cortó, puede seguir haciéndolo
+        if ring is not None:
+            unused = response is not None and RING_HEADER not in response.headers
+            release_ring(ring, completed or unused)
+
+    def _pick(self, payload: Any, exclude: Sequence[Replica]) -> Replica:
+        """Elige réplica (con afinidad por ``thread_id``) sin repetir las ya probadas."""
+        self.replicas.start_health_checks(self._probe)
+        return self.replicas.pick(_thread_key(payload), exclude)
+
+    def _failover(
+        self, replica: Replica, started: float, error: Exception, tried: List[Replica], span: Span
+    ) -> bool:
+        """
+        Registra un error de transporte y decide si se prueba otra réplica.
+
+        Solo los errores de conexión se reintentan: la petición no llegó al
+        servidor, así que repetirla en otra réplica es seguro.
+        """
+        self.replicas.observe(replica, started, ok=False)
+        span.set_attribute("attempts", span.attributes.get("attempts", 0) + 1)
+        tried.append(replica)
+        if isinstance(error, httpx.ConnectError) and len(tried) < len(self.replicas):
+            logging.warning(f"Replica {replica.url} unreachable, trying another one: {error}")
+            return True
+        return False
+
+    def _observe_response(
+        self, replica: Replica, started: float, response: httpx.Response, span: Span
+    ) -> None:
+        self.replicas.observe(
+            replica, started, ok=response.status_code not in _REPLICA_FAILURE_STATUS
+        )
+        span.set_attribute("replica", replica.url)
+        span.set_attribute("status_code", response.status_code)
+        span.set_attribute("attempts", span.attributes.get("attempts", 0) + 1)
+
+    # --- Reintentos y duplicados ---
+
+    def _latency_for(self, path: str) -> LatencyTracker:
+        tracker = self._latency.get(path)
+        if tracker is None:
+            window = self.hedge.window if self.hedge is not None else 256
+            tracker = self._latency[path] = LatencyTracker(window)
+        return tracker
+
+    def _hedge_delay(self, path: str, payload: Any) -> float | None:
+        """
+        Espera antes de duplicar una llamada, o None si no se duplica.
+
+        Las llamadas con ``thread_id`` (en cualquier entrada de un batch)
+        modifican el checkpoint del hilo y no se pueden ejecutar dos veces.
+        """
+        if self.hedge is None or _mutates_thread(payload):
+            return None
+        return hedge_delay(self.hedge, self._latency_for(path))
+
+    def _should_retry(
+        self,
+        attempt: int,
+        status: int | None = None,
+        error: BaseException | None = None,
+        replayable: bool = True,
+    ) -> bool:
+        """
+        Decide si se repite una llamada fallida.
+
+        Args:
+            attempt (int): Reintentos ya realizados (desde 0).
+            status (int | None, optional): Estado HTTP de la respuesta. Defaults to None.
+            error (BaseException | None, optional): Error de transporte. Defaults to None.
+            replayable (bool, optional): Si la petición puede repetirse aunque
+                haya llegado al servidor. Defaults to True.
+
+        Returns:
+            bool: Si se reintenta (consumiendo presupuesto).
+        """
+        policy = self.retry
+        if policy is None or attempt + 1 >= policy.max_attempts:
+            return False
+        if error is not None:
+            if not is_retryable_error(error):
+                return False
+            # Sin idempotencia en el servidor solo se repite lo que no llegó a enviarse
+            if not replayable and not isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+                return False
+        elif status not in policy.retry_on_status or not replayable:
+            return False
+        if not self.retry_budget.withdraw():
+            logging.warning(f"Retry budget exhausted for {self.base_url}, not retrying")
+            return False
+        logging.info(f"Retrying {self.base_url} (attempt {attempt + 2}): {error or status}")
+        return True
+
+    def _call_headers(self, cache_control: str | None, span: Span) -> Dict[str, str]:
+        """
+        Cabeceras de una llamada lógica: la misma clave en todos sus intentos.
+
+        La clave solo se envía si hay reintentos o duplicados: obliga al
+        servidor a recordar el resultado durante un tiempo.
+        """
+        self.retry_budget.deposit()
+        headers = self._headers(cache_control, span)
+        if self.retry is not None or self.hedge is not None:
+            headers[IDEMPOTENCY_HEADER] = uuid.uuid4().hex
+        return headers
+
+    @staticmethod
+    def _hedge_headers(headers: Dict[str, str]) -> Dict[str, str]:
+        # El duplicado lleva su propia clave: debe ejecutarse, no unirse al original
+        return {**headers, IDEMPOTENCY_HEADER: f"{headers[IDEMPOTENCY_HEADER]}-hedge"}
+
+    @staticmethod
+    def _usable(response: httpx.Response) -> bool:
+        return response.status_code < 500
+
+    # --- Envío de peticiones ---
+
+    def _send_sync(
+        self,
+        path: str,
+        content: bytes,
+        payload: Any,
+        headers: Dict[str, str],
+        deadline: float | None,
+        span: Span,
+        picked: List[Replica],
+    ) -> httpx.Response:
+        """
+        Envía una petición a una réplica con failover y reintentos por sobrecarga.
+
+        Args:
+            path (str): La ruta del endpoint.
+            content (bytes): El payload codificado.
+            payload (Any): El payload original (para la afinidad).
+            headers (Dict[str, str]): Las cabeceras de la llamada.
+            deadline (float | None): Plazo de la llamada.
+            span (Span): El span de cliente de la llamada.
+            picked (List[Replica]): Réplicas ya elegidas por otros intentos
+                simultáneos de la misma llamada; se evitan y se amplía con la elegida.
+
+        Returns:
+            httpx.Response: La respuesta recibida.
+        """
+        tried: List[Replica] = []
+        attempt = 0
+        while True:
+            replica = self._pick(payload, [*picked, *tried])
+            picked.append(replica)
+            started = self.replicas.acquire(replica)
+            try:
+                response = self._client_sync(replica.url).post(
+                    f"{replica.url}/{path}",
+                    content=content,
+                    headers=deadline_headers(headers, deadline),
+                    timeout=self._timeout(deadline),
+                )
+            except httpx.TransportError as e:
+                if self._failover(replica, started, e, tried, span):
+                    continue
+                raise
+            finally:
+                self.replicas.release(replica)
+            self._observe_response(replica, started, response, span)
+            delay = self._overload_delay(response, attempt)
+            if delay is None:
+                if self._usable(response):
+                    self._latency_for(path).observe(time.perf_counter() - started)
+                return response
+            attempt += 1
+            time.sleep(delay)
+
+    async def _send_async(
+        self,
+        path: str,
+        content: bytes,
+        payload: Any,
+        headers: Dict[str, str],
+        deadline: float | None,
+        span: Span,
+        picked: List[Replica],
+    ) -> httpx.Response:
+        """Versión asíncrona de ``_send_sync``."""
+        tried: List[Replica] = []
+        attempt = 0
+        while True:
+            replica = self._pick(payload, [*picked, *tried])
+            picked.append(replica)
+            started = self.replicas.acquire(replica)
+            try:
+                response = await self._client_async(replica.url).post(
+                    f"{replica.url}/{path}",
+                    content=content,
+                    headers=deadline_headers(headers, deadline),
+                    timeout=self._timeout(deadline),
+                )
+            except httpx.TransportError as e:
+                if self._failover(replica, started, e, tried, span):
+                    continue
+                raise
+            finally:
+                self.replicas.release(replica)
+            self._observe_response(replica, started, response, span)
+            delay = self._overload_delay(response, attempt)
+            if delay is None:
+                if self._usable(response):
+                    self._latency_for(path).observe(time.perf_counter() - started)
+                return response
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _hedged_sync(
+        self,
+        path: str,
+        content: bytes,
+        payload: Any,
+        headers: Dict[str, str],
+        deadline: float | None,
+        span: Span,
+    ) -> httpx.Response:
+        """
+        Envía la petición y, si tarda más de lo habitual, un duplicado.
+
+        Gana la primera respuesta utilizable. Una petición síncrona no se puede
+        cancelar: la perdedora termina en su hilo y se descarta.
+        """
+        picked: List[Replica] = []
+        delay = self._hedge_delay(path, payload)
+        if delay is None:
+            return self._send_sync(path, content, payload, headers, deadline, span, picked)
+
+        pool = _get_hedge_pool()
+        primary = pool.submit(self._send_sync, path, content, payload, headers, deadline, span, picked)
+        try:
+            return primary.result(timeout=delay)
+        except concurrent.futures.TimeoutError:
+            pass
+        if not self.retry_budget.withdraw():
+            return primary.result()
+        span.set_attribute("hedged", True)
+        hedge = pool.submit(
+            self._send_sync, path, content, payload, self._hedge_headers(headers), deadline, span, picked
+        )
+        futures, pending = [primary, hedge], {primary, hedge}
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in futures:
+                if future in done and future.exception() is None and self._usable(future.result()):
+                    span.set_attribute("hedge_won", future is hedge)
+                    return future.result()
+        # Ninguna respuesta utilizable: se devuelve la del original
+        return primary.result()
+
+    async def _hedged_async(
+        self,
+        path: str,
+        content: bytes,
+        payload: Any,
+        headers: Dict[str, str],
+        deadline: float | None,
+        span: Span,
+    ) -> httpx.Response:
+        """Versión asíncrona de ``_hedged_sync``: la petición perdedora se cancela."""
+        picked: List[Replica] = []
+        delay = self._hedge_delay(path, payload)
+        if delay is None:
+            return await self._send_async(path, content, payload, headers, deadline, span, picked)
+
+        tasks = [
+            asyncio.ensure_future(
+                self._send_async(path, content, payload, headers, deadline, span, picked)
+            )
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self.retry_budget.withdraw():
+                return await tasks[0]
+            span.set_attribute("hedged", True)
+            tasks.append(
+                asyncio.ensure_future(
+                    self._send_async(
+                        path, content, payload, self._hedge_headers(headers), deadline, span, picked
+                    )
+                )
+            )
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in tasks:
+                    if task in done and task.exception() is None and self._usable(task.result()):
+                        span.set_attribute("hedge_won", task is tasks[1])
+                        return task.result()
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
     def _request_sync(self, path: str = "", **kwargs: Any) -> Any:
         """
         Realiza una petición síncrona al servidor remoto.
 
         Args:
             path (str, optional): La ruta específica del endpoint. Defaults to "".
-            **kwargs (Any): Argumentos adicionales para la petición.
+            **kwargs (Any): Argumentos adicionales para la petición
+                (``json`` con el payload, ``cache_control``, ``timeout``,
+                ``headers`` extra y ``with_headers`` para devolver también
+                las cabeceras de la respuesta).
 
         Returns:
             Any: La respuesta del servidor decodificada.
         """
         dict_con_objetos = kwargs.get("json", {})
-        logging.debug(f"Requesting {self.base_url}/{path} with objects: {dict_con_objetos}")
-        data_pickled_string = jsonpickle.encode(dict_con_objetos, unpicklable=False)
-        response = self.http_client_sync.post(f"{self.base_url}/{path}", content=data_pickled_string)
-        response.raise_for_status()
-        return jsonpickle.decode(response.json())
+        # El repr del payload (todo el historial) es caro: solo si se va a registrar
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f"Requesting {self.base_url}/{path} with objects: {dict_con_objetos}")
+        span = self._start_span(path)
+        content = b""
+        try:
+            content = self.codec.encode(dict_con_objetos)
+            headers = {
+                **self._call_headers(kwargs.get("cache_control"), span),
+                **(kwargs.get("headers") or {}),
+            }
+            deadline = self._deadline(kwargs.get("timeout"))
+            attempt = 0
+            while True:
+                try:
+                    response = self._hedged_sync(
+                        path, content, dict_con_objetos, headers, deadline, span
+                    )
+                except httpx.TransportError as e:
+                    if not self._should_retry(attempt, error=e):
+                        raise
+                else:
+                    if not self._should_retry(attempt, status=response.status_code):
+                        break
+                time.sleep(self.retry.delay(attempt))
+                attempt += 1
+            response.raise_for_status()
+            if kwargs.get("with_headers"):
+                return self._decode_response(response), response.headers
+            return self._decode_response(response)
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            self._release(content)
+            span.end()
 
     async def _request_async(self, path: str = "", **kwargs: Any) -> Any:
         """
@@ -55,23 +884,529 @@ class RemoteAgent:
 
         Args:
             path (str, optional): La ruta específica del endpoint. Defaults to "".
-            **kwargs (Any): Argumentos adicionales para la petición.
+            **kwargs (Any): Argumentos adicionales para la petición
+                (``json`` con el payload, ``cache_control``, ``timeout``,
+                ``headers`` extra y ``with_headers`` para devolver también
+                las cabeceras de la respuesta).
 
         Returns:
             Any: La respuesta del servidor decodificada.
         """
         dict_con_objetos = kwargs.get("json", {})
-        logging.debug(f"Requesting {self.base_url}/{path} with objects: {dict_con_objetos}")
-        data_pickled_string = jsonpickle.encode(dict_con_objetos, unpicklable=False)
-        response = await self.http_client_async.post(
-            f"{self.base_url}/{path}",
-            content=data_pickled_string,
-            headers={"Content-Type": "application/json"} # Buena práctica
+        # El repr del payload (todo el historial) es caro: solo si se va a registrar
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f"Requesting {self.base_url}/{path} with objects: {dict_con_objetos}")
+        span = self._start_span(path)
+        content = b""
+        try:
+            content = self.codec.encode(dict_con_objetos)
+            headers = {
+                **self._call_headers(kwargs.get("cache_control"), span),
+                **(kwargs.get("headers") or {}),
+            }
+            deadline = self._deadline(kwargs.get("timeout"))
+            attempt = 0
+            while True:
+                try:
+                    response = await self._hedged_async(
+                        path, content, dict_con_objetos, headers, deadline, span
+                    )
+                except httpx.TransportError as e:
+                    if not self._should_retry(attempt, error=e):
+                        raise
+                else:
+                    if not self._should_retry(attempt, status=response.status_code):
+                        break
+                await asyncio.sleep(self.retry.delay(attempt))
+                attempt += 1
+            response.raise_for_status()
+            if kwargs.get("with_headers"):
+                return self._decode_response(response), response.headers
+            return self._decode_response(response)
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            self._release(content)
+            span.end()
+
+    def _invoke_sync(self, path: str, **kwargs: Any) -> Any:
+        """
+        ``_request_sync`` con modo sesión si el cliente lo tiene y hay ``thread_id``.
+
+        Si el servidor detecta que el hilo divergió (409) no ha ejecutado nada
+        y se repite la llamada con una sincronización completa. Si ya ejecutó
+        pero la diferencia recibida no encaja, la llamada no se repite: se lee
+        el estado completo del hilo.
+        """
+        payload = kwargs.pop("json")
+        thread_id = _thread_key(payload)
+        if self.sessions is None or thread_id is None:
+            return self._request_sync(path, json=payload, **kwargs)
+        try:
+            result, headers = self._session_call_sync(path, payload, thread_id, False, kwargs)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 409:
+                raise
+            self.sessions.forget(thread_id, diverged=True)
+            result, headers = self._session_call_sync(path, payload, thread_id, True, kwargs)
+        merged = self.sessions.update(thread_id, result, headers)
+        if merged is None:
+            self.sessions.forget(thread_id, diverged=True)
+            result, headers = self._request_sync(
+                "state", json=self._state_payload(payload), with_headers=True, **kwargs
+            )
+            merged = self.sessions.update(thread_id, result, headers)
+        return merged
+
+    async def _invoke_async(self, path: str, **kwargs: Any) -> Any:
+        """Versión asíncrona de ``_invoke_sync``."""
+        payload = kwargs.pop("json")
+        thread_id = _thread_key(payload)
+        if self.sessions is None or thread_id is None:
+            return await self._request_async(path, json=payload, **kwargs)
+        try:
+            result, headers = await self._session_call_async(
+                path, payload, thread_id, False, kwargs
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 409:
+                raise
+            self.sessions.forget(thread_id, diverged=True)
+            result, headers = await self._session_call_async(
+                path, payload, thread_id, True, kwargs
+            )
+        merged = self.sessions.update(thread_id, result, headers)
+        if merged is None:
+            self.sessions.forget(thread_id, diverged=True)
+            result, headers = await self._request_async(
+                "state", json=self._state_payload(payload), with_headers=True, **kwargs
+            )
+            merged = self.sessions.update(thread_id, result, headers)
+        return merged
+
+    def _session_call_sync(
+        self, path: str, payload: Dict[str, Any], thread_id: str, full: bool, kwargs: Dict[str, Any]
+    ) -> Tuple[Any, httpx.Headers]:
+        input, version = self.sessions.prepare(thread_id, payload["input"], full)
+        return self._request_sync(
+            path,
+            json={**payload, "input": input},
+            headers={SESSION_HEADER: version},
+            with_headers=True,
+            **kwargs,
         )
 
-        response.raise_for_status()
+    async def _session_call_async(
+        self, path: str, payload: Dict[str, Any], thread_id: str, full: bool, kwargs: Dict[str, Any]
+    ) -> Tuple[Any, httpx.Headers]:
+        input, version = self.sessions.prepare(thread_id, payload["input"], full)
+        return await self._request_async(
+            path,
+            json={**payload, "input": input},
+            headers={SESSION_HEADER: version},
+            with_headers=True,
+            **kwargs,
+        )
+
+    @staticmethod
+    def _state_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+        # Lectura del hilo: sin entrada, solo la config que lo identifica
+        return {"input": None, "config": payload.get("config")}
+
+    def _send_stream_sync(
+        self,
+        path: str,
+        content: bytes,
+        payload: Any,
+        headers: Dict[str, str],
+        deadline: float | None,
+        span: Span,
+        picked: List[Replica],
+    ) -> Iterator[Any]:
+        """
+        Abre un stream en una réplica y decodifica sus frames.
+
+        Las respuestas de sobrecarga y los fallos de conexión llegan antes del
+        primer frame, así que se reintentan aquí mismo.
+        """
+        tried: List[Replica] = []
+        attempt = 0
+        while True:
+            replica = self._pick(payload, [*picked, *tried])
+            picked.append(replica)
+            started = self.replicas.acquire(replica)
+            ring = self._acquire_ring(replica.url)
+            response = None
+            completed = False
+            try:
+                with self._client_sync(replica.url).stream(
+                    "POST",
+                    f"{replica.url}/{path}",
+                    content=content,
+                    headers=self._stream_headers(headers, deadline, ring),
+                    timeout=self._timeout(deadline),
+                ) as response:
+                    self._observe_response(replica, started, response, span)
+                    delay = self._overload_delay(response, attempt)
+                    if delay is None:
+                        response.raise_for_status()
+                        decoder = self._frame_decoder(response, ring)
+                        first = True
+                        for data in response.iter_bytes():
+                            try:
+                                frames = decoder.feed(data)
+                            except Exception as e:
+                                logging.error(f"Error decoding stream chunk: {e}")
+                                continue
+                            if first and frames:
+                                first = False
+                                self._latency_for(path).observe(time.perf_counter() - started)
+                            yield from frames
+                        completed = True
+                        return
+            except httpx.TransportError as e:
+                if self._failover(replica, started, e, tried, span):
+                    continue
+                raise
+            finally:
+                self.replicas.release(replica)
+                self._release_ring(ring, response, completed)
+            attempt += 1
+            time.sleep(delay)
+
+    async def _send_stream_async(
+        self,
+        path: str,
+        content: bytes,
+        payload: Any,
+        headers: Dict[str, str],
+        deadline: float | None,
+        span: Span,
+        picked: List[Replica],
+    ) -> AsyncIterator[Any]:
+        """Versión asíncrona de ``_send_stream_sync``."""
+        tried: List[Replica] = []
+        attempt = 0
+        while True:
+            replica = self._pick(payload, [*picked, *tried])
+            picked.append(replica)
+            started = self.replicas.acquire(replica)
+            ring = self._acquire_ring(replica.url)
+            response = None
+            completed = False
+            try:
+                async with self._client_async(replica.url).stream(
+                    "POST",
+                    f"{replica.url}/{path}",
+                    content=content,
+                    headers=self._stream_headers(headers, deadline, ring),
+                    timeout=self._timeout(deadline),
+                ) as response:
+                    self._observe_response(replica, started, response, span)
+                    delay = self._overload_delay(response, attempt)
+                    if delay is None:
+                        response.raise_for_status()
+                        decoder = self._frame_decoder(response, ring)
+                        first = True
+                        async for data in response.aiter_bytes():
+                            try:
+                                frames = decoder.feed(data)
+                            except Exception as e:
+                                logging.error(f"Error decoding async stream chunk: {e}")
+                                continue
+                            if first and frames:
+                                first = False
+                                self._latency_for(path).observe(time.perf_counter() - started)
+                            for frame in frames:
+                                yield frame
+                        completed = True
+                        return
+            except httpx.TransportError as e:
+                if self._failover(replica, started, e, tried, span):
+                    continue
+                raise
+            finally:
+                self.replicas.release(replica)
+                self._release_ring(ring, response, completed)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _pump(frames: AsyncIterator[Any], queue: asyncio.Queue) -> None:
+        """Copia los frames de un stream a una cola (para competir con su duplicado)."""
+        try:
+            async for frame in frames:
+                await queue.put(("frame", frame))
+            await queue.put(("done", None))
+        except Exception as e:
+            await queue.put(("error", e))
+        finally:
+            await frames.aclose()
+
+    async def _hedged_stream_async(
+        self,
+        path: str,
+        content: bytes,
+        payload: Any,
+        headers: Dict[str, str],
+        deadline: float | None,
+        span: Span,
+    ) -> AsyncIterator[Any]:
+        """
+        Abre el stream y, si el primer frame tarda más de lo habitual, un duplicado.
+
+        Gana el primero que entrega un frame; el otro se cancela y desde ahí
+        solo se sigue el ganador.
+        """
+        picked: List[Replica] = []
+        delay = self._hedge_delay(path, payload)
+        if delay is None:
+            frames = self._send_stream_async(path, content, payload, headers, deadline, span, picked)
+            try:
+                async for frame in frames:
+                    yield frame
+            finally:
+                await frames.aclose()
+            return
+
+        queues: List[asyncio.Queue] = []
+        tasks: List[asyncio.Task] = []
+        getters: Dict[asyncio.Future, int] = {}
+
+        def launch(call_headers: Dict[str, str]) -> None:
+            queue: asyncio.Queue = asyncio.Queue(maxsize=_HEDGE_QUEUE_SIZE)
+            frames = self._send_stream_async(path, content, payload, call_headers, deadline, span, picked)
+            tasks.append(asyncio.ensure_future(self._pump(frames, queue)))
+            getters[asyncio.ensure_future(queue.get())] = len(queues)
+            queues.append(queue)
+
+        try:
+            launch(headers)
+            done, _ = await asyncio.wait(getters, timeout=delay)
+            if not done and self.retry_budget.withdraw():
+                span.set_attribute("hedged", True)
+                launch(self._hedge_headers(headers))
+
+            winner: Tuple[int, Tuple[str, Any]] | None = None
+            errors: List[BaseException] = []
+            while winner is None and getters:
+                done, _ = await asyncio.wait(getters, return_when=asyncio.FIRST_COMPLETED)
+                for getter in sorted(done, key=getters.get):
+                    index, item = getters.pop(getter), getter.result()
+                    if item[0] == "error":
+                        errors.append(item[1])
+                    elif winner is None:
+                        winner = (index, item)
+            if winner is None:
+                raise errors[0]
+
+            index, item = winner
+            if len(tasks) > 1:
+                span.set_attribute("hedge_won", index == 1)
+            for i, task in enumerate(tasks):
+                if i != index:
+                    task.cancel()
+            while item[0] == "frame":
+                yield item[1]
+                item = await queues[index].get()
+            if item[0] == "error":
+                raise item[1]
+        finally:
+            for future in [*getters, *tasks]:
+                future.cancel()
+
+    def _stream_sync(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        cache_control: str | None = None,
+        timeout: float | None = None,
+    ) -> Iterator[Any]:
+        """
+        Realiza una petición de streaming síncrona y decodifica sus frames.
+
+        Los errores antes del primer frame se reintentan según ``retry``.
 
-        return jsonpickle.decode(response.text)
+        Args:
+            path (str): La ruta del endpoint (ej: "stream").
+            payload (Dict[str, Any]): El payload de la petición.
+            cache_control (str | None, optional): Cabecera ``Cache-Control``. Defaults to None.
+            timeout (float | None, optional): Timeout de la petición. Defaults to None.
+
+        Yields:
+            Iterator[Any]: Los frames decodificados.
+        """
+        # El span no se activa: el consumidor del generador no es su hijo
+        span = self._start_span(path)
+        content = b""
+        try:
+            content = self.codec.encode(payload)
+            headers = self._call_headers(cache_control, span)
+            # El servidor no deduplica streams: los de un hilo solo se repiten si no se enviaron
+            replayable = not _mutates_thread(payload)
+            deadline = self._deadline(timeout)
+            attempt = 0
+            while True:
+                started = False
+                frames = self._send_stream_sync(path, content, payload, headers, deadline, span, [])
+                try:
+                    for frame in frames:
+                        started = True
+                        yield frame
+                    return
+                except httpx.HTTPStatusError as e:
+                    if started or not self._should_retry(
+                        attempt, status=e.response.status_code, replayable=replayable
+                    ):
+                        raise
+                except httpx.TransportError as e:
+                    if started or not self._should_retry(attempt, error=e, replayable=replayable):
+                        raise
+                finally:
+                    frames.close()
+                time.sleep(self.retry.delay(attempt))
+                attempt += 1
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                span.record_exception(e)
+            raise
+        finally:
+            self._release(content)
+            span.end()
+
+    async def _stream_async(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        cache_control: str | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Realiza una petición de streaming asíncrona y decodifica sus frames.
+
+        Hasta el primer frame la petición puede duplicarse (``hedge``) y
+        reintentarse (``retry``); después ya no se repite.
+
+        Args:
+            path (str): La ruta del endpoint (ej: "astream").
+            payload (Dict[str, Any]): El payload de la petición.
+            cache_control (str | None, optional): Cabecera ``Cache-Control``. Defaults to None.
+            timeout (float | None, optional): Timeout de la petición. Defaults to None.
+
+        Yields:
+            AsyncIterator[Any]: Los frames decodificados.
+        """
+        span = self._start_span(path)
+        content = b""
+        try:
+            content = self.codec.encode(payload)
+            headers = self._call_headers(cache_control, span)
+            replayable = not _mutates_thread(payload)
+            deadline = self._deadline(timeout)
+            attempt = 0
+            while True:
+                started = False
+                frames = self._hedged_stream_async(path, content, payload, headers, deadline, span)
+                try:
+                    async for frame in frames:
+                        started = True
+                        yield frame
+                    return
+                except httpx.HTTPStatusError as e:
+                    if started or not self._should_retry(
+                        attempt, status=e.response.status_code, replayable=replayable
+                    ):
+                        raise
+                except httpx.TransportError as e:
+                    if started or not self._should_retry(attempt, error=e, replayable=replayable):
+                        raise
+                finally:
+                    await frames.aclose()
+                await asyncio.sleep(self.retry.delay(attempt))
+                attempt += 1
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                span.record_exception(e)
+            raise
+        finally:
+            self._release(content)
+            span.end()
+
+    # --- Retransmisión a quien llama ---
+
+    def _relay(self, config: RunnableConfig | None) -> RemoteRun | None:
+        """La retransmisión de una llamada, o None si nadie consume sus eventos."""
+        if self.codec is LEGACY_CODEC:
+            return None
+        relay = RemoteRun(config, self.name)
+        return relay if relay.active else None
+
+    def _relayed_sync(
+        self,
+        path: str,
+        input: Any,
+        payload: Dict[str, Any],
+        relay: RemoteRun,
+        cache_control: str | None,
+        timeout: float | None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Pide la ejecución por streaming (con subgrafos) y reproduce cada frame.
+
+        Yields:
+            Iterator[Dict[str, Any]]: Los frames ``{ns, mode, data}`` remotos.
+        """
+        relay.start(input)
+        output = None
+        try:
+            for frame in self._stream_sync(path, payload, cache_control, timeout):
+                relay.on_frame(frame)
+                if frame.get("mode") == "values" and not frame.get("ns"):
+                    output = frame.get("data")
+                yield frame
+        except BaseException as e:
+            relay.error(e)
+            raise
+        relay.end(output)
+
+    async def _relayed_async(
+        self,
+        path: str,
+        input: Any,
+        payload: Dict[str, Any],
+        relay: RemoteRun,
+        cache_control: str | None,
+        timeout: float | None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Versión asíncrona de ``_relayed_sync``."""
+        await relay.astart(input)
+        output = None
+        try:
+            async for frame in self._stream_async(path, payload, cache_control, timeout):
+                await relay.aon_frame(frame)
+                if frame.get("mode") == "values" and not frame.get("ns"):
+                    output = frame.get("data")
+                yield frame
+        except BaseException as e:
+            await relay.aerror(e)
+            raise
+        await relay.aend(output)
+
+    @staticmethod
+    def _relay_payload(payload: Dict[str, Any], relay: RemoteRun, requested: List[str]) -> Dict[str, Any]:
+        return {**payload, "stream_mode": relay.stream_modes(requested), "subgraphs": True}
+
+    @staticmethod
+    def _requested_modes(stream_mode: Any) -> List[str]:
+        if stream_mode is None:
+            return ["values"]
+        return list(stream_mode) if isinstance(stream_mode, (list, tuple)) else [stream_mode]
+
+    @staticmethod
+    def _wanted(frame: Dict[str, Any], requested: List[str], subgraphs: bool) -> bool:
+        """Si un frame retransmitido es de los que pidió quien llama."""
+        return frame.get("mode") in requested and (subgraphs or not frame.get("ns"))
 
     def invoke(
         self,
@@ -96,23 +1431,40 @@ class RemoteAgent:
             output_keys (str | Sequence[str] | None, optional): Claves de salida. Defaults to None.
             interrupt_before (All | Sequence[str] | None = None, optional): Interrupciones antes de la ejecución. Defaults to None.
             interrupt_after (All | Sequence[str] | None = None, optional): Interrupciones después de la ejecución. Defaults to None.
-            **kwargs (Any): Argumentos adicionales.
+            **kwargs (Any): Argumentos adicionales. ``cache_control`` y
+                ``timeout`` se aplican a la petición HTTP en lugar de enviarse
+                en el payload.
 
         Returns:
             dict[str, Any] | Any: La respuesta del agente.
         """
-        return self._request_sync(
+        cache_control = kwargs.pop("cache_control", None)
+        timeout = kwargs.pop("timeout", None)
+        payload = {
+            "input": input,
+            "config": sanitize_config(config),
+            "stream_mode": stream_mode,
+            "print_mode": print_mode,
+            "output_keys": output_keys,
+            "interrupt_before": interrupt_before,
+            "interrupt_after": interrupt_after,
+            **kwargs,
+        }
+        # Con un consumidor de eventos en local, la ejecución se retransmite
+        relay = self._relay(config) if stream_mode == "values" else None
+        if relay is not None:
+            output = None
+            for frame in self._relayed_sync(
+                "stream", input, self._relay_payload(payload, relay, []), relay, cache_control, timeout
+            ):
+                if frame.get("mode") == "values" and not frame.get("ns"):
+                    output = frame.get("data")
+            return output
+        return self._invoke_sync(
             path="invoke",
-            json={
-                "input": input,
-                "config": config,
-                "stream_mode": stream_mode,
-                "print_mode": print_mode,
-                "output_keys": output_keys,
-                "interrupt_before": interrupt_before,
-                "interrupt_after": interrupt_after,
-                **kwargs,
-            },
+            cache_control=cache_control,
+            timeout=timeout,
+            json=payload,
         )
 
     async def ainvoke(
@@ -138,23 +1490,40 @@ class RemoteAgent:
             output_keys (str | Sequence[str] | None = None, optional): Claves de salida. Defaults to None.
             interrupt_before (All | Sequence[str] | None = None, optional): Interrupciones antes de la ejecución. Defaults to None.
             interrupt_after (All | Sequence[str] | None = None, optional): Interrupciones después de la ejecución. Defaults to None.
-            **kwargs (Any): Argumentos adicionales.
+            **kwargs (Any): Argumentos adicionales. ``cache_control`` y
+                ``timeout`` se aplican a la petición HTTP en lugar de enviarse
+                en el payload.
 
         Returns:
             dict[str, Any] | Any: La respuesta del agente.
         """
-        return await self._request_async(
+        cache_control = kwargs.pop("cache_control", None)
+        timeout = kwargs.pop("timeout", None)
+        payload = {
+            "input": input,
+            "config": sanitize_config(config),
+            "stream_mode": stream_mode,
+            "print_mode": print_mode,
+            "output_keys": output_keys,
+            "interrupt_before": interrupt_before,
+            "interrupt_after": interrupt_after,
+            **kwargs,
+        }
+        # Con un consumidor de eventos en local, la ejecución se retransmite
+        relay = self._relay(config) if stream_mode == "values" else None
+        if relay is not None:
+            output = None
+            async for frame in self._relayed_async(
+                "astream", input, self._relay_payload(payload, relay, []), relay, cache_control, timeout
+            ):
+                if frame.get("mode") == "values" and not frame.get("ns"):
+                    output = frame.get("data")
+            return output
+        return await self._invoke_async(
             path="ainvoke",
-            json={
-                "input": input,
-                "config": config,
-                "stream_mode": stream_mode,
-                "print_mode": print_mode,
-                "output_keys": output_keys,
-                "interrupt_before": interrupt_before,
-                "interrupt_after": interrupt_after,
-                **kwargs,
-            },
+            cache_control=cache_control,
+            timeout=timeout,
+            json=payload,
         )
 
     def stream(
@@ -170,6 +1539,8 @@ class RemoteAgent:
         checkpoint_during: bool | None = None,
         debug: bool | None = None,
         subgraphs: bool = False,
+        cache_control: str | None = None,
+        timeout: float | None = None,
     ) -> Iterator[dict[str, Any] | Any]:
         """
         Transmite la salida del agente remoto de forma síncrona.
@@ -185,13 +1556,15 @@ class RemoteAgent:
             checkpoint_during (bool | None = None, optional): Checkpoint durante la ejecución. Defaults to None.
             debug (bool | None = None, optional): Modo de depuración. Defaults to None.
             subgraphs (bool = False, optional): Incluir subgrafos. Defaults to False.
+            cache_control (str | None = None, optional): Cabecera ``Cache-Control`` de la petición. Defaults to None.
+            timeout (float | None = None, optional): Timeout de la petición. Defaults to None.
 
         Yields:
             Iterator[dict[str, Any] | Any]: Los chunks de la respuesta del agente.
         """
         payload = {
             "input": input,
-            "config": config,
+            "config": sanitize_config(config),
             "stream_mode": stream_mode,
             "print_mode": print_mode,
             "output_keys": output_keys,
@@ -201,17 +1574,20 @@ class RemoteAgent:
             "debug": debug,
             "subgraphs": subgraphs,
         }
-        data_pickled_string = jsonpickle.encode(payload, unpicklable=False)
-        with self.http_client_sync.stream(
-            "POST", f"{self.base_url}/stream", content=data_pickled_string
-        ) as response:
-            response.raise_for_status()
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        yield jsonpickle.decode(line)
-                    except Exception as e:
-                        logging.error(f"Error decoding stream chunk: {e}")
+        relay = self._relay(config)
+        if relay is not None:
+            requested = self._requested_modes(stream_mode)
+            for frame in self._relayed_sync(
+                "stream", input, self._relay_payload(payload, relay, requested), relay, cache_control, timeout
+            ):
+                if self._wanted(frame, requested, subgraphs):
+                    yield _from_frame(frame, stream_mode or "values", subgraphs)
+            return
+        for frame in self._stream_sync("stream", payload, cache_control, timeout):
+            if self.codec is LEGACY_CODEC:
+                yield frame
+            else:
+                yield _from_frame(frame, stream_mode, subgraphs)
 
     async def astream(
         self,
@@ -226,6 +1602,8 @@ class RemoteAgent:
         checkpoint_during: bool | None = None,
         debug: bool | None = None,
         subgraphs: bool = False,
+        cache_control: str | None = None,
+        timeout: float | None = None,
     ) -> AsyncIterator[dict[str, Any] | Any]:
         """
         Transmite la salida del agente remoto de forma asíncrona.
@@ -241,13 +1619,15 @@ class RemoteAgent:
             checkpoint_during (bool | None = None, optional): Checkpoint durante la ejecución. Defaults to None.
             debug (bool | None = None, optional): Modo de depuración. Defaults to None.
             subgraphs (bool = False, optional): Incluir subgrafos. Defaults to False.
+            cache_control (str | None = None, optional): Cabecera ``Cache-Control`` de la petición. Defaults to None.
+            timeout (float | None = None, optional): Timeout de la petición. Defaults to None.
 
         Yields:
             AsyncIterator[dict[str, Any] | Any]: Los chunks de la respuesta del agente.
         """
         payload = {
             "input": input,
-            "config": config,
+            "config": sanitize_config(config),
             "stream_mode": stream_mode,
             "print_mode": print_mode,
             "output_keys": output_keys,
@@ -257,26 +1637,201 @@ class RemoteAgent:
             "debug": debug,
             "subgraphs": subgraphs,
         }
-        data_pickled_string = jsonpickle.encode(payload, unpicklable=False)
-        async with self.http_client_async.stream(
-            "POST",
-            f"{self.base_url}/astream",
-            content=data_pickled_string,
-        ) as response:
-            response.raise_for_status()
-            async for line in response.aiter_lines():
-                if line:
-                    try:
-                        yield jsonpickle.decode(line)
-                    except Exception as e:
-                        logging.error(f"Error decoding async stream chunk: {e}")
+        relay = self._relay(config)
+        if relay is not None:
+            requested = self._requested_modes(stream_mode)
+            async for frame in self._relayed_async(
+                "astream", input, self._relay_payload(payload, relay, requested), relay, cache_control, timeout
+            ):
+                if self._wanted(frame, requested, subgraphs):
+                    yield _from_frame(frame, stream_mode or "values", subgraphs)
+            return
+        async for frame in self._stream_async("astream", payload, cache_control, timeout):
+            if self.codec is LEGACY_CODEC:
+                yield frame
+            else:
+                yield _from_frame(frame, stream_mode, subgraphs)
+
+    def _batch_payload(
+        self,
+        inputs: List[InputT],
+        config: RunnableConfig | List[RunnableConfig] | None,
+        kwargs: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        # max_concurrency viaja en la config (como en Runnable.batch)
+        max_concurrency = kwargs.pop("max_concurrency", None)
+        configs = config if isinstance(config, list) else [config]
+        for item in configs:
+            if isinstance(item, dict) and item.get("max_concurrency"):
+                max_concurrency = max_concurrency or item["max_concurrency"]
+        return {
+            "inputs": list(inputs),
+            "config": (
+                [sanitize_config(item) for item in config]
+                if isinstance(config, list)
+                else sanitize_config(config)
+            ),
+            "max_concurrency": max_concurrency,
+            **kwargs,
+        }
+
+    @staticmethod
+    def _batch_result(frame: Dict[str, Any], return_exceptions: bool) -> Any:
+        if "error" in frame:
+            error = RuntimeError(f"Remote batch item {frame['index']} failed: {frame['error']}")
+            if not return_exceptions:
+                raise error
+            return error
+        return frame.get("output")
+
+    def batch_as_completed(
+        self,
+        inputs: Sequence[InputT],
+        config: RunnableConfig | List[RunnableConfig] | None = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> Iterator[tuple[int, Any]]:
+        """
+        Ejecuta varias entradas en el servidor y entrega cada resultado al terminar.
+
+        Args:
+            inputs (Sequence[InputT]): Las entradas para el agente.
+            config (RunnableConfig | List[RunnableConfig] | None, optional): Configuración común o una por entrada; ``max_concurrency`` limita la concurrencia en el servidor. Defaults to None.
+            return_exceptions (bool, optional): Devuelve los errores en lugar de lanzarlos. Defaults to False.
+            **kwargs (Any): Argumentos adicionales (``cache_control``, ``timeout`` y parámetros de ``invoke``).
+
+        Yields:
+            Iterator[tuple[int, Any]]: Pares ``(índice, resultado)`` en orden de finalización.
+        """
+        cache_control = kwargs.pop("cache_control", None)
+        timeout = kwargs.pop("timeout", None)
+        payload = self._batch_payload(list(inputs), config, kwargs)
+        for frame in self._stream_sync("batch", payload, cache_control, timeout):
+            yield frame["index"], self._batch_result(frame, return_exceptions)
+
+    async def abatch_as_completed(
+        self,
+        inputs: Sequence[InputT],
+        config: RunnableConfig | List[RunnableConfig] | None = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> AsyncIterator[tuple[int, Any]]:
+        """
+        Versión asíncrona de ``batch_as_completed``.
+
+        Args:
+            inputs (Sequence[InputT]): Las entradas para el agente.
+            config (RunnableConfig | List[RunnableConfig] | None, optional): Configuración común o una por entrada. Defaults to None.
+            return_exceptions (bool, optional): Devuelve los errores en lugar de lanzarlos. Defaults to False.
+            **kwargs (Any): Argumentos adicionales (``cache_control``, ``timeout`` y parámetros de ``invoke``).
+
+        Yields:
+            AsyncIterator[tuple[int, Any]]: Pares ``(índice, resultado)`` en orden de finalización.
+        """
+        cache_control = kwargs.pop("cache_control", None)
+        timeout = kwargs.pop("timeout", None)
+        payload = self._batch_payload(list(inputs), config, kwargs)
+        async for frame in self._stream_async("batch", payload, cache_control, timeout):
+            yield frame["index"], self._batch_result(frame, return_exceptions)
+
+    def batch(
+        self,
+        inputs: Sequence[InputT],
+        config: RunnableConfig | List[RunnableConfig] | None = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> List[Any]:
+        """
+        Invoca el agente remoto con varias entradas en una sola petición.
+
+        Args:
+            inputs (Sequence[InputT]): Las entradas para el agente.
+            config (RunnableConfig | List[RunnableConfig] | None, optional): Configuración común o una por entrada. Defaults to None.
+            return_exceptions (bool, optional): Devuelve los errores en lugar de lanzarlos. Defaults to False.
+            **kwargs (Any): Argumentos adicionales.
 
-    def info(self):
+        Returns:
+            List[Any]: Los resultados en el mismo orden que ``inputs``.
+        """
+        results: List[Any] = [None] * len(inputs)
+        for index, output in self.batch_as_completed(
+            inputs, config, return_exceptions=return_exceptions, **kwargs
+        ):
+            results[index] = output
+        return results
+
+    async def abatch(
+        self,
+        inputs: Sequence[InputT],
+        config: RunnableConfig | List[RunnableConfig] | None = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> List[Any]:
+        """
+        Versión asíncrona de ``batch``.
+
+        Args:
+            inputs (Sequence[InputT]): Las entradas para el agente.
+            config (RunnableConfig | List[RunnableConfig] | None, optional): Configuración común o una por entrada. Defaults to None.
+            return_exceptions (bool, optional): Devuelve los errores en lugar de lanzarlos. Defaults to False.
+            **kwargs (Any): Argumentos adicionales.
+
+        Returns:
+            List[Any]: Los resultados en el mismo orden que ``inputs``.
+        """
+        results: List[Any] = [None] * len(inputs)
+        async for index, output in self.abatch_as_completed(
+            inputs, config, return_exceptions=return_exceptions, **kwargs
+        ):
+            results[index] = output
+        return results
+
+    def cached_info(self) -> Dict[str, Any] | None:
+        """
+        Devuelve los metadatos en caché sin hacer ninguna petición.
+
+        Returns:
+            Dict[str, Any] | None: Los metadatos, o None si faltan o hay que revalidarlos.
+        """
+        return None if self._metadata_stale(False) else self._metadata
+
+    def info(self, refresh: bool = False) -> Dict[str, Any]:
         """
         Obtiene información sobre el agente remoto.
 
+        Los metadatos se piden una sola vez y se guardan en caché; al
+        revalidarlos se envía ``If-None-Match`` y un ``304`` reutiliza la copia.
+
+        Args:
+            refresh (bool, optional): Fuerza la revalidación. Defaults to False.
+
         Returns:
             dict: Un diccionario con la información del agente.
         """
-        response = self.http_client_sync.get(f"{self.base_url}/info")
-        return response.json()
+        if not self._metadata_stale(refresh):
+            return self._metadata
+        url = self._pick(None, []).url
+        response = self._client_sync(url).get(f"{url}/info", headers=self._info_headers())
+        return self._store_info(response)
+
+    async def ainfo(self, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Versión asíncrona de ``info``.
+
+        Args:
+            refresh (bool, optional): Fuerza la revalidación. Defaults to False.
+
+        Returns:
+            dict: Un diccionario con la información del agente.
+        """
+        if not self._metadata_stale(refresh):
+            return self._metadata
+        url = self._pick(None, []).url
+        response = await self._client_async(url).get(
+            f"{url}/info", headers=self._info_headers()
+        )
+        return self._store_info(response)
@@ -0,0 +1,447 @@
+"""
+Codecs de transporte entre ``RemoteAgent`` y ``Server``.
+
+Cada codec convierte los objetos de LangChain/LangGraph a una representación
+neutral (``to_wire``) y la serializa con un backend rápido. Los mensajes de
+LangChain viajan con el formato ``lc`` de ``Serializable.to_json()`` y se
+reconstruyen exactamente al decodificar (``from_wire``).
+
+El codec se elige por cabeceras HTTP: ``Content-Type`` para el cuerpo de la
+petición y ``Accept`` para la respuesta. Si el cliente no indica un codec
+conocido se usa ``jsonpickle`` con el formato original del servidor.
+
+Entre agentes del mismo proceso (``inproc://``) el codec ``inproc`` no
+serializa: pasa los objetos por referencia y quien los recibe se queda una
+copia profunda.
+"""
+
+import copy
+import itertools
+import json
+import struct
+import warnings
+from typing import Any, Dict, Iterator, List
+
+import jsonpickle
+from langchain_core.load import load
+from langchain_core.load.serializable import Serializable, to_json_not_implemented
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - backend opcional
+    orjson = None
+
+try:
+    import ormsgpack as _msgpack
+except ImportError:  # pragma: no cover - backend opcional
+    try:
+        import msgpack as _msgpack
+    except ImportError:
+        _msgpack = None
+
+
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+def to_wire(obj: Any) -> Any:
+    """
+    Convierte un objeto a estructuras primitivas serializables.
+
+    Args:
+        obj (Any): El objeto a convertir (mensajes, estados, chunks...).
+
+    Returns:
+        Any: Una estructura de dicts, listas y primitivos.
+    """
+    if isinstance(obj, _PRIMITIVES):
+        return obj
+    if isinstance(obj, dict):
+        return {str(k): to_wire(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set)):
+        return [to_wire(v) for v in obj]
+    if isinstance(obj, Serializable):
+        return to_wire(obj.to_json())
+    if isinstance(obj, BaseModel):
+        return to_wire(obj.model_dump())
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", errors="replace")
+    return to_json_not_implemented(obj)
+
+
+def _revive(obj: Dict[str, Any]) -> Any:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return load(obj, allowed_objects="core")
+
+
+def from_wire(obj: Any) -> Any:
+    """
+    Reconstruye los objetos de LangChain a partir de su representación ``lc``.
+
+    Args:
+        obj (Any): La estructura decodificada del cuerpo.
+
+    Returns:
+        Any: La misma estructura con los mensajes reconstruidos.
+    """
+    if isinstance(obj, dict):
+        if obj.get("lc") == 1 and obj.get("type") == "constructor" and "id" in obj:
+            return _revive(obj)
+        return {k: from_wire(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [from_wire(v) for v in obj]
+    return obj
+
+
+class Codec:
+    """
+    Interfaz base de un codec de transporte.
+
+    Los streams se transmiten como una secuencia de frames; ``FrameDecoder``
+    reconstruye los objetos a partir de los bytes recibidos.
+    """
+
+    name: str = ""
+    media_type: str = ""
+    # Media type de las respuestas de streaming (frames)
+    stream_media_type: str = ""
+    # Solo válido dentro del proceso: nunca se negocia con peticiones de red
+    local_only: bool = False
+
+    def encode(self, obj: Any) -> bytes:
+        """Serializa un objeto completo."""
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> Any:
+        """Deserializa un objeto completo."""
+        raise NotImplementedError
+
+    def decode_buffer(self, data: memoryview) -> Any:
+        """Deserializa un objeto desde un buffer (p. ej. memoria compartida)."""
+        return self.decode(bytes(data))
+
+    def encode_response(self, obj: Any) -> bytes:
+        """Serializa el cuerpo de una respuesta unaria."""
+        return self.encode(obj)
+
+    def decode_response(self, data: bytes) -> Any:
+        """Deserializa el cuerpo de una respuesta unaria (inverso de ``encode_response``)."""
+        return self.decode(data)
+
+    def encode_frame(self, obj: Any) -> bytes:
+        """Serializa un chunk de stream delimitado por salto de línea."""
+        return self.encode(obj) + b"\n"
+
+    def frame_decoder(self) -> "FrameDecoder":
+        """Devuelve un decodificador incremental de frames."""
+        return LineFrameDecoder(self)
+
+
+class FrameDecoder:
+    """Decodificador incremental de frames de stream."""
+
+    def __init__(self, codec: Codec):
+        self.codec = codec
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Any]:
+        """
+        Añade bytes al buffer y devuelve los frames completos.
+
+        Args:
+            data (bytes): Bytes recibidos de la conexión.
+
+        Returns:
+            List[Any]: Los objetos decodificados disponibles.
+        """
+        raise NotImplementedError
+
+
+class LineFrameDecoder(FrameDecoder):
+    """Frames delimitados por ``\\n`` (JSON y jsonpickle)."""
+
+    def feed(self, data: bytes) -> List[Any]:
+        self.buffer.extend(data)
+        frames = []
+        while True:
+            index = self.buffer.find(b"\n")
+            if index < 0:
+                break
+            line = bytes(self.buffer[:index])
+            del self.buffer[: index + 1]
+            if line.strip():
+                frames.append(self.codec.decode(line))
+        return frames
+
+
+class LengthPrefixedFrameDecoder(FrameDecoder):
+    """Frames binarios con un prefijo de longitud de 4 bytes (big-endian)."""
+
+    def feed(self, data: bytes) -> List[Any]:
+        self.buffer.extend(data)
+        frames = []
+        while len(self.buffer) >= 4:
+            (size,) = struct.unpack_from(">I", self.buffer)
+            if len(self.buffer) < 4 + size:
+                break
+            payload = bytes(self.buffer[4 : 4 + size])
+            del self.buffer[: 4 + size]
+            frames.append(self.codec.decode(payload))
+        return frames
+
+
+class JSONCodec(Codec):
+    """JSON sin pérdida de tipos de LangChain; usa ``orjson`` si está disponible."""
+
+    name = "json"
+    media_type = "application/json"
+    stream_media_type = "application/x-ndjson"
+
+    def encode(self, obj: Any) -> bytes:
+        wire = to_wire(obj)
+        if orjson is not None:
+            return orjson.dumps(wire, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(wire, default=str, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        if orjson is not None:
+            return from_wire(orjson.loads(data))
+        return from_wire(json.loads(data))
+
+    def decode_buffer(self, data: memoryview) -> Any:
+        # orjson lee el buffer directamente, sin copiarlo a un ``bytes``
+        if orjson is not None:
+            return from_wire(orjson.loads(data))
+        return self.decode(bytes(data))
+
+
+class MsgpackCodec(Codec):
+    """MessagePack binario; usa ``ormsgpack`` o ``msgpack``."""
+
+    name = "msgpack"
+    media_type = "application/msgpack"
+    stream_media_type = "application/vnd.msgpack-stream"
+
+    def encode(self, obj: Any) -> bytes:
+        if _msgpack is None:
+            raise RuntimeError(
+                "The msgpack codec requires 'ormsgpack' or 'msgpack' to be installed"
+            )
+        return _msgpack.packb(to_wire(obj))
+
+    def decode(self, data: bytes) -> Any:
+        if _msgpack is None:
+            raise RuntimeError(
+                "The msgpack codec requires 'ormsgpack' or 'msgpack' to be installed"
+            )
+        return from_wire(_msgpack.unpackb(data))
+
+    def decode_buffer(self, data: memoryview) -> Any:
+        # Ambos backends aceptan cualquier objeto con el protocolo buffer
+        return self.decode(data)
+
+    def encode_frame(self, obj: Any) -> bytes:
+        payload = self.encode(obj)
+        return struct.pack(">I", len(payload)) + payload
+
+    def frame_decoder(self) -> FrameDecoder:
+        return LengthPrefixedFrameDecoder(self)
+
+
+class JsonPickleCodec(Codec):
+    """
+    Codec de compatibilidad con el formato original.
+
+    Las respuestas unarias se envían como un string JSON que contiene el
+    documento jsonpickle, tal y como lo hacía el servidor original.
+    """
+
+    name = "jsonpickle"
+    media_type = "application/x-jsonpickle"
+    # Los clientes originales no miran el Content-Type del stream
+    stream_media_type = "application/x-jsonpickle-stream"
+
+    def encode(self, obj: Any) -> bytes:
+        return jsonpickle.encode(obj).encode("utf-8")
+
+    def encode_response(self, obj: Any) -> bytes:
+        return json.dumps(jsonpickle.encode(obj)).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return jsonpickle.decode(data)
+
+    def decode_response(self, data: bytes) -> Any:
+        # Las respuestas unarias vienen envueltas en un string JSON; los
+        # cuerpos y los frames no, así que un string decodificado se conserva
+        envelope = json.loads(data)
+        if isinstance(envelope, str):
+            return jsonpickle.decode(envelope)
+        return self.decode(data)
+
+
+class InProcCodec(Codec):
+    """
+    Codec sin serialización para las llamadas dentro del proceso.
+
+    El cuerpo solo lleva un token; el objeto se guarda en una tabla del
+    proceso y quien decodifica recibe una copia profunda. Así ninguna de las
+    dos partes ve los cambios de la otra, igual que con un codec que
+    serializa: el servidor no modifica la entrada de quien llama y los
+    resultados compartidos (caché, ejecuciones compartidas, idempotencia) no
+    se alteran desde fuera. Solo se acepta en peticiones que no han salido
+    del proceso (``local_only``).
+    """
+
+    name = "inproc"
+    media_type = "application/x-langgraph-inproc"
+    stream_media_type = "application/x-langgraph-inproc-stream"
+    local_only = True
+
+    _PREFIX = b"inproc:"
+
+    def __init__(self):
+        self._objects: Dict[int, Any] = {}
+        self._tokens = itertools.count()
+
+    def encode(self, obj: Any) -> bytes:
+        token = next(self._tokens)
+        self._objects[token] = obj
+        return self._PREFIX + str(token).encode("ascii")
+
+    def decode(self, data: bytes) -> Any:
+        token = self._token(data)
+        try:
+            obj = self._objects.pop(token)
+        except KeyError:
+            raise ValueError(f"Unknown in-process object {token}") from None
+        return copy.deepcopy(obj)
+
+    def share(self, data: bytes) -> bytes:
+        """
+        Crea otra referencia al mismo objeto.
+
+        Cada envío de una petición (reintentos y duplicados incluidos) lleva
+        la suya, así que el decodificar de un envío no deja sin objeto al
+        siguiente.
+
+        Args:
+            data (bytes): El cuerpo con la referencia original.
+
+        Returns:
+            bytes: Un cuerpo con una referencia nueva.
+        """
+        token = self._token(data)
+        try:
+            return self.encode(self._objects[token])
+        except KeyError:
+            raise ValueError(f"Unknown in-process object {token}") from None
+
+    def discard(self, data: bytes) -> None:
+        """
+        Libera los objetos de un cuerpo o de frames que nadie va a decodificar.
+
+        Args:
+            data (bytes): El cuerpo o los frames sin consumir.
+        """
+        for line in data.split(b"\n"):
+            if line.startswith(self._PREFIX):
+                self._objects.pop(self._token(line), None)
+
+    def _token(self, data: bytes) -> int:
+        data = data.strip()
+        if not data.startswith(self._PREFIX):
+            raise ValueError("Not an in-process object reference")
+        return int(data[len(self._PREFIX):])
+
+    def pending(self) -> int:
+        """Objetos guardados a la espera de decodificarse."""
+        return len(self._objects)
+
+
+_CODECS: Dict[str, Codec] = {}
+
+
+def register_codec(codec: Codec) -> None:
+    """
+    Registra un codec por nombre y por media type.
+
+    Args:
+        codec (Codec): El codec a registrar.
+    """
+    _CODECS[codec.name] = codec
+    _CODECS[codec.media_type] = codec
+    if codec.stream_media_type:
+        _CODECS[codec.stream_media_type] = codec
+
+
+for _codec in (JSONCodec(), MsgpackCodec(), JsonPickleCodec(), InProcCodec()):
+    register_codec(_codec)
+
+DEFAULT_CODEC = _CODECS["json"]
+LEGACY_CODEC = _CODECS["jsonpickle"]
+INPROC_CODEC = _CODECS["inproc"]
+
+
+def get_codec(codec: str | Codec) -> Codec:
+    """
+    Obtiene un codec por nombre o media type.
+
+    Args:
+        codec (str | Codec): Nombre ("json", "msgpack", "jsonpickle", "inproc"), media type
+            o una instancia de ``Codec``.
+
+    Returns:
+        Codec: El codec registrado.
+    """
+    if isinstance(codec, Codec):
+        return codec
+    try:
+        return _CODECS[codec]
+    except KeyError:
+        raise ValueError(f"Unknown codec '{codec}'") from None
+
+
+def _media_types(header: str | None) -> Iterator[str]:
+    for part in (header or "").split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type:
+            yield media_type
+
+
+def _lookup(header: str | None, local: bool) -> Codec:
+    for media_type in _media_types(header):
+        codec = _CODECS.get(media_type)
+        if codec is not None and (local or not codec.local_only):
+            return codec
+    return LEGACY_CODEC
+
+
+def codec_for_content_type(content_type: str | None, local: bool = False) -> Codec:
+    """
+    Elige el codec para decodificar un cuerpo según su ``Content-Type``.
+
+    Args:
+        content_type (str | None): El valor de la cabecera.
+        local (bool, optional): Si el cuerpo no ha salido del proceso (admite
+            los codecs ``local_only``). Defaults to False.
+
+    Returns:
+        Codec: El codec correspondiente o el de compatibilidad.
+    """
+    return _lookup(content_type, local)
+
+
+def negotiate(accept: str | None, local: bool = False) -> Codec:
+    """
+    Elige el codec de la respuesta según la cabecera ``Accept``.
+
+    Args:
+        accept (str | None): El valor de la cabecera.
+        local (bool, optional): Si la petición no ha salido del proceso
+            (admite los codecs ``local_only``). Defaults to False.
+
+    Returns:
+        Codec: El primer codec registrado aceptado o el de compatibilidad.
+    """
+    return _lookup(accept, local)
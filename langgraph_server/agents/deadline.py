@@ -0,0 +1,225 @@
+"""
+Plazos y cancelación de las ejecuciones.
+
+``RemoteAgent`` envía en ``X-Request-Timeout`` los segundos que le quedan a
+la llamada. ``Server`` los convierte en un plazo local (sin depender de que
+los relojes estén sincronizados) y aborta el trabajo que ya no se puede
+entregar. El plazo viaja en una variable de contexto, así que las llamadas
+remotas anidadas que haga el agente heredan lo que queda de él.
+
+Las ejecuciones asíncronas se cancelan directamente. Las síncronas corren en
+un hilo que no se puede interrumpir: ``CancellationHandler`` las detiene en
+el siguiente nodo, llamada al LLM o herramienta.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, Mapping, TypeVar
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Segundos que le quedan a la petición para ser útil
+DEADLINE_HEADER = "X-Request-Timeout"
+
+# Plazo de la petición en curso (``time.monotonic()``)
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "langgraph_deadline", default=None
+)
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(RuntimeError):
+    """El plazo de la petición ha vencido."""
+
+    metric_status = "deadline"
+    status_code = 504
+
+
+class ClientDisconnected(RuntimeError):
+    """El cliente cerró la conexión antes de recibir la respuesta."""
+
+    metric_status = "disconnected"
+    # Código de nginx para "el cliente cerró la petición"
+    status_code = 499
+
+
+class ExecutionCancelled(RuntimeError):
+    """Se lanza dentro del grafo para detener una ejecución síncrona cancelada."""
+
+
+def current_deadline() -> float | None:
+    """Devuelve el plazo activo, si lo hay."""
+    return _deadline.get()
+
+
+def remaining(deadline: float | None = None) -> float | None:
+    """
+    Segundos que quedan hasta el plazo.
+
+    Args:
+        deadline (float | None, optional): El plazo; por defecto el activo.
+            Defaults to None.
+
+    Returns:
+        float | None: Los segundos restantes (pueden ser negativos) o None sin plazo.
+    """
+    deadline = deadline if deadline is not None else _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def call_deadline(timeout: float | None) -> float | None:
+    """
+    Plazo de una llamada saliente: su timeout, acotado por el plazo activo.
+
+    Args:
+        timeout (float | None): Timeout propio de la llamada.
+
+    Returns:
+        float | None: El plazo más cercano, o None si no hay ninguno.
+    """
+    deadline = _deadline.get()
+    if timeout is not None:
+        own = time.monotonic() + timeout
+        deadline = own if deadline is None else min(deadline, own)
+    return deadline
+
+
+@contextmanager
+def use_deadline(deadline: float | None) -> Iterator[float | None]:
+    """Activa un plazo mientras dure el bloque ``with``."""
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        try:
+            _deadline.reset(token)
+        except ValueError:
+            # Generadores cerrados desde otro contexto
+            pass
+
+
+def deadline_from_headers(headers: Mapping[str, str]) -> float | None:
+    """
+    Convierte ``X-Request-Timeout`` en un plazo local.
+
+    Args:
+        headers (Mapping[str, str]): Cabeceras de la petición.
+
+    Returns:
+        float | None: El plazo, o None si no viene (o no es válido).
+    """
+    value = headers.get(DEADLINE_HEADER)
+    if not value:
+        return None
+    try:
+        return time.monotonic() + float(value)
+    except ValueError:
+        return None
+
+
+def deadline_headers(headers: Dict[str, str], deadline: float | None) -> Dict[str, str]:
+    """
+    Añade a unas cabeceras el tiempo que queda hasta el plazo.
+
+    Raises:
+        DeadlineExceeded: Si el plazo ya ha vencido.
+    """
+    left = remaining(deadline) if deadline is not None else None
+    if left is None:
+        return headers
+    if left <= 0:
+        raise DeadlineExceeded("Deadline exceeded before sending the request")
+    return {**headers, DEADLINE_HEADER: f"{left:.3f}"}
+
+
+async def wait_until(awaitable: Awaitable[T], deadline: float | None) -> T:
+    """
+    Espera una corrutina como mucho hasta el plazo.
+
+    Raises:
+        DeadlineExceeded: Si el plazo vence antes; la corrutina se cancela.
+    """
+    if deadline is None:
+        return await awaitable
+    # En la misma tarea: los generadores no cambian de contexto entre pasos
+    timeout = asyncio.timeout(max(0.0, deadline - time.monotonic()))
+    try:
+        async with timeout:
+            return await awaitable
+    except TimeoutError:
+        if timeout.expired():
+            raise DeadlineExceeded("Deadline exceeded") from None
+        raise
+
+
+async def bounded(chunks: AsyncIterator[T], deadline: float | None) -> AsyncIterator[T]:
+    """
+    Recorre un stream con el plazo activo, cortándolo cuando vence.
+
+    El plazo se activa en cada paso, así que el productor (y las llamadas
+    remotas que haga) lo heredan aunque el stream se consuma fuera de la
+    petición.
+
+    Raises:
+        DeadlineExceeded: Si el plazo vence antes de terminar el stream.
+    """
+    try:
+        while True:
+            with use_deadline(deadline):
+                try:
+                    chunk = await wait_until(chunks.__anext__(), deadline)
+                except StopAsyncIteration:
+                    return
+            yield chunk
+    finally:
+        await chunks.aclose()
+
+
+class CancellationHandler(BaseCallbackHandler):
+    """
+    Detiene una ejecución síncrona en su siguiente paso tras cancelarla.
+
+    Los callbacks con ``raise_error`` propagan la excepción al grafo, que
+    corta la ejecución en el siguiente nodo, LLM o herramienta.
+    """
+
+    raise_error = True
+    run_inline = True
+
+    def __init__(self, event: threading.Event):
+        self.event = event
+
+    def _check(self, *args: Any, **kwargs: Any) -> None:
+        if self.event.is_set():
+            raise ExecutionCancelled("Execution cancelled: the client is gone or its deadline passed")
+
+    on_chain_start = _check
+    on_llm_start = _check
+    on_chat_model_start = _check
+    on_tool_start = _check
+
+
+def cancellable(kwargs: Dict[str, Any], event: threading.Event) -> Dict[str, Any]:
+    """
+    Añade ``CancellationHandler`` a los callbacks de la config de una ejecución.
+
+    Args:
+        kwargs (Dict[str, Any]): Argumentos de ``invoke``/``stream``.
+        event (threading.Event): Se activa al cancelar.
+
+    Returns:
+        Dict[str, Any]: Los argumentos con el handler añadido.
+    """
+    config = dict(kwargs.get("config") or {})
+    callbacks = config.get("callbacks")
+    if callbacks is not None and not isinstance(callbacks, list):
+        # Un CallbackManager ya construido: se respeta tal cual
+        return kwargs
+    config["callbacks"] = [*(callbacks or []), CancellationHandler(event)]
+    return {**kwargs, "config": config}
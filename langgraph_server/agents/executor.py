@@ -0,0 +1,317 @@
+"""
+Capa de ejecución para las llamadas síncronas de los agentes servidos.
+
+Los handlers de FastAPI son corrutinas; si llaman directamente a
+``agent.invoke`` o iteran ``agent.stream`` bloquean el event loop del worker
+de uvicorn. ``AgentExecutor`` mueve esas llamadas a un pool acotado (hilos o,
+opcionalmente, procesos) y limita las peticiones en vuelo por agente.
+"""
+
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+import threading
+import time
+from contextlib import asynccontextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Literal
+
+from langgraph_server.agents.deadline import cancellable
+
+logger = logging.getLogger(__name__)
+
+ExecutorKind = Literal["thread", "process"]
+
+# Centinela para señalar el fin de un generador ejecutado en el pool
+_DONE = object()
+
+
+@dataclass
+class ExecutorConfig:
+    """
+    Configuración del pool de ejecución de un agente.
+
+    Attributes:
+        kind (ExecutorKind): ``"thread"`` o ``"process"``. Defaults to "thread".
+            El modo ``"process"`` hereda el agente con ``fork`` y no admite
+            agentes con checkpointer: cada proceso tendría su propia copia.
+        max_workers (int): Número máximo de workers del pool. Defaults to 8.
+        max_in_flight (int | None): Peticiones concurrentes admitidas por agente
+            (síncronas y asíncronas). ``None`` usa ``max_workers``.
+    """
+
+    kind: ExecutorKind = "thread"
+    max_workers: int = 8
+    max_in_flight: int | None = None
+
+
+# --- Funciones de worker para el pool de procesos ---
+# El agente se envía una sola vez a cada proceso mediante el ``initializer``
+# y queda guardado en un global del proceso hijo. Los grafos compilados no se
+# pueden serializar, así que los procesos se crean siempre con ``fork``.
+
+_process_agent: Any = None
+
+
+def _init_process_worker(agent: Any) -> None:
+    global _process_agent
+    _process_agent = agent
+
+
+def _process_invoke(method: str, args: tuple, kwargs: dict) -> Any:
+    return getattr(_process_agent, method)(*args, **kwargs)
+
+
+def _process_stream(args: tuple, kwargs: dict) -> list:
+    return list(_process_agent.stream(*args, **kwargs))
+
+
+def _check_process_agent(agent: Any) -> None:
+    """
+    Comprueba que un agente se puede ejecutar en un pool de procesos.
+
+    Raises:
+        ValueError: Si la plataforma no permite ``fork`` o si el agente tiene
+            checkpointer (los hilos de conversación se repartirían entre copias
+            independientes y perderían historial).
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        raise ValueError("Process executors need the 'fork' start method, not available on this platform")
+    if getattr(agent, "checkpointer", None) is not None:
+        raise ValueError(
+            "Process executors cannot run agents with a checkpointer: each process "
+            "would keep its own copy of the threads"
+        )
+
+
+class AgentExecutor:
+    """
+    Pool acotado de ejecución para un agente.
+
+    Ejecuta las llamadas bloqueantes fuera del event loop y aplica un límite de
+    peticiones en vuelo. Mantiene contadores sencillos para observar la cola.
+    """
+
+    def __init__(self, agent: Any, config: ExecutorConfig | None = None):
+        """
+        Inicializa el ejecutor.
+
+        Args:
+            agent (Any): El agente al que pertenece el pool.
+            config (ExecutorConfig | None, optional): Configuración del pool.
+                Defaults to None.
+
+        Raises:
+            ValueError: Si se pide un pool de procesos para un agente que no se
+                puede ejecutar en él.
+        """
+        self.agent = agent
+        self.config = config or ExecutorConfig()
+        if self.config.kind == "process":
+            _check_process_agent(agent)
+        self.max_in_flight = self.config.max_in_flight or self.config.max_workers
+
+        self._pool: Executor | None = None
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        # Métricas de la cola
+        self.in_flight = 0
+        self.queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @property
+    def pool(self) -> Executor:
+        """Crea el pool de forma perezosa en la primera llamada."""
+        if self._pool is None:
+            if self.config.kind == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.config.max_workers,
+                    mp_context=multiprocessing.get_context("fork"),
+                    initializer=_init_process_worker,
+                    initargs=(self.agent,),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.config.max_workers,
+                    thread_name_prefix=f"agent-{getattr(self.agent, 'name', None) or 'worker'}",
+                )
+        return self._pool
+
+    async def _acquire(self) -> None:
+        self.queued += 1
+        start = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        waited = time.perf_counter() - start
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.in_flight += 1
+
+    def _release(self, failed: bool) -> None:
+        self.in_flight -= 1
+        if failed:
+            self.failed += 1
+        else:
+            self.completed += 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Reserva un hueco de ejecución mientras dure el bloque ``async with``.
+
+        Se usa también para las llamadas nativamente asíncronas (``ainvoke``,
+        ``astream``), que no necesitan el pool pero sí el límite de concurrencia.
+        """
+        await self._acquire()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self._release(failed)
+
+    async def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Ejecuta un método síncrono del agente en el pool.
+
+        Si la llamada se cancela (cliente desconectado o plazo vencido), el
+        hilo no se puede interrumpir, pero la ejecución se detiene en su
+        siguiente nodo, LLM o herramienta. En modo ``"process"`` sigue hasta
+        el final.
+
+        Args:
+            method (str): Nombre del método del agente (ej: "invoke").
+            *args (Any): Argumentos posicionales.
+            **kwargs (Any): Argumentos con nombre.
+
+        Returns:
+            Any: El resultado del método.
+        """
+        loop = asyncio.get_running_loop()
+        async with self.slot():
+            if self.config.kind == "process":
+                return await loop.run_in_executor(
+                    self.pool, _process_invoke, method, args, kwargs
+                )
+            # Copia el contexto (span activo, etc.) al hilo del worker
+            context = contextvars.copy_context()
+            fn = getattr(self.agent, method)
+            cancelled = threading.Event()
+            kwargs = cancellable(kwargs, cancelled)
+            try:
+                return await loop.run_in_executor(
+                    self.pool, lambda: context.run(fn, *args, **kwargs)
+                )
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+    async def acall(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Ejecuta una corrutina respetando el límite de peticiones en vuelo.
+
+        Args:
+            fn (Callable[..., Any]): Función asíncrona a ejecutar.
+            *args (Any): Argumentos posicionales.
+            **kwargs (Any): Argumentos con nombre.
+
+        Returns:
+            Any: El resultado de la corrutina.
+        """
+        async with self.slot():
+            return await fn(*args, **kwargs)
+
+    async def iterate(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        """
+        Itera ``agent.stream`` en el pool y entrega los chunks al event loop.
+
+        El generador síncrono se consume completo en un único worker (LangGraph
+        depende de variables de contexto del hilo) y cada chunk se publica en una
+        cola asíncrona en cuanto se produce. En modo ``"process"`` los chunks se
+        materializan en el proceso hijo y se entregan al terminar.
+
+        Si el consumidor abandona el stream, el worker deja de producir y la
+        ejecución se detiene en su siguiente nodo, LLM o herramienta.
+
+        Yields:
+            AsyncIterator[Any]: Los chunks producidos por el agente.
+        """
+        loop = asyncio.get_running_loop()
+        async with self.slot():
+            if self.config.kind == "process":
+                chunks = await loop.run_in_executor(
+                    self.pool, _process_stream, args, kwargs
+                )
+                for chunk in chunks:
+                    yield chunk
+                return
+
+            queue: asyncio.Queue = asyncio.Queue()
+            cancelled = threading.Event()
+            stream_kwargs = cancellable(kwargs, cancelled)
+
+            def produce() -> None:
+                try:
+                    iterator: Iterator[Any] = self.agent.stream(*args, **stream_kwargs)
+                    try:
+                        for item in iterator:
+                            if cancelled.is_set():
+                                break
+                            loop.call_soon_threadsafe(queue.put_nowait, item)
+                    finally:
+                        getattr(iterator, "close", lambda: None)()
+                except BaseException as e:  # se relanza en el event loop
+                    if not cancelled.is_set():
+                        loop.call_soon_threadsafe(queue.put_nowait, e)
+                finally:
+                    if not loop.is_closed():
+                        loop.call_soon_threadsafe(queue.put_nowait, _DONE)
+
+            context = contextvars.copy_context()
+            future = loop.run_in_executor(self.pool, context.run, produce)
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is _DONE:
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+                    yield item
+                await future
+            finally:
+                # Consumidor desconectado o plazo vencido: se detiene el worker
+                cancelled.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Devuelve las métricas actuales del pool.
+
+        Returns:
+            Dict[str, Any]: Contadores de cola, ejecución y espera.
+        """
+        finished = self.completed + self.failed
+        return {
+            "kind": self.config.kind,
+            "max_workers": self.config.max_workers,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_seconds": self.total_wait_seconds / finished if finished else 0.0,
+            "max_wait_seconds": self.max_wait_seconds,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Libera el pool de workers."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,190 @@
+"""
+Deduplicación de reintentos en ``Server`` por ``Idempotency-Key``.
+
+``RemoteAgent`` repite la misma clave en todos los reintentos de una llamada.
+Si el intento original sigue ejecutándose, el reintento espera su resultado;
+si ya terminó hace poco, lo recibe sin volver a ejecutar el agente. Así un
+reintento tras un timeout de red no duplica mensajes en el checkpoint.
+
+Solo se recuerdan las ejecuciones correctas: tras un error el reintento
+vuelve a ejecutar. Los resultados recordados ocupan como mucho ``max_bytes``
+(medidos por su representación serializada); los que no caben se olvidan. Si todos los clientes de una ejecución se van, se le da
+un margen para que llegue el reintento y después se cancela.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from langgraph_server.agents.codecs import to_wire
+from langgraph_server.agents.deadline import remaining
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - backend opcional
+    orjson = None
+
+
+def _size_of(result: Any) -> int:
+    """Tamaño aproximado de un resultado: bytes de su representación JSON."""
+    wire = to_wire(result)
+    if orjson is not None:
+        return len(orjson.dumps(wire, default=str, option=orjson.OPT_NON_STR_KEYS))
+    return len(json.dumps(wire, default=str).encode("utf-8"))
+
+
+class IdempotencyStore:
+    """Resultados recientes (y ejecuciones en curso) indexados por clave."""
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_entries: int = 1024,
+        grace: float = 5.0,
+        max_bytes: int = 32 * 1024 * 1024,
+    ):
+        """
+        Inicializa el almacén.
+
+        Args:
+            ttl (float, optional): Segundos que se recuerda un resultado.
+                Defaults to 60.0.
+            max_entries (int, optional): Resultados recordados como máximo; se
+                descartan los más antiguos. Defaults to 1024.
+            grace (float, optional): Segundos que sigue una ejecución sin
+                nadie esperándola antes de cancelarse. Defaults to 5.0.
+            max_bytes (int, optional): Tamaño total de los resultados
+                recordados; se descartan los más antiguos. Defaults to 32 MiB.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.grace = grace
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[float, asyncio.Future]]" = OrderedDict()
+        # Tamaño de cada resultado recordado y su suma
+        self._sizes: Dict[Hashable, int] = {}
+        self.bytes = 0
+        # Clientes esperando cada ejecución en curso y su cancelación programada
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self._abandoned: Dict[asyncio.Future, asyncio.TimerHandle] = {}
+        self.executions = 0
+        self.replays = 0
+        self.abandoned = 0
+
+    def _forget(self, key: Hashable) -> None:
+        del self._entries[key]
+        self.bytes -= self._sizes.pop(key, 0)
+
+    def _evict(self, now: float) -> None:
+        # Las entradas están ordenadas por caducidad; las que siguen en curso se conservan.
+        # Solo se recorre el principio: copiar todas las claves costaba O(n) por petición.
+        expired = []
+        excess = len(self._entries) - self.max_entries
+        excess_bytes = self.bytes - self.max_bytes
+        for key, (expires, future) in self._entries.items():
+            if expires > now and excess <= 0 and excess_bytes <= 0:
+                break
+            if future.done():
+                expired.append(key)
+                excess -= 1
+                excess_bytes -= self._sizes.get(key, 0)
+        for key in expired:
+            self._forget(key)
+
+    async def _wait(self, task: asyncio.Future) -> Any:
+        # La tarea sobrevive al cliente, pero solo durante ``grace`` si nadie más la espera
+        handle = self._abandoned.pop(task, None)
+        if handle is not None:
+            handle.cancel()
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Tras el plazo de la llamada ya no llegará ningún reintento
+                    left = remaining()
+                    grace = self.grace if left is None else max(0.0, min(self.grace, left))
+                    self._abandoned[task] = asyncio.get_running_loop().call_later(
+                        grace, self._cancel, task
+                    )
+
+    def _cancel(self, task: asyncio.Future) -> None:
+        self._abandoned.pop(task, None)
+        if not task.done():
+            self.abandoned += 1
+            task.cancel()
+
+    async def run(
+        self, key: Hashable, execute: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Ejecuta ``execute`` una sola vez por clave.
+
+        La ejecución corre en su propia tarea: si el cliente del intento
+        original se desconecta, sigue adelante durante ``grace`` segundos
+        para que el reintento la aproveche.
+
+        Args:
+            key (Hashable): La clave de idempotencia (con la ruta del agente).
+            execute (Callable[[], Awaitable[Any]]): La ejecución del agente.
+
+        Returns:
+            Tuple[Any, bool]: El resultado y si se ha reutilizado uno anterior.
+        """
+        now = time.monotonic()
+        self._evict(now)
+        entry = self._entries.get(key)
+        if entry is not None and (entry[0] > now or not entry[1].done()):
+            self.replays += 1
+            return await self._wait(entry[1]), True
+
+        task = asyncio.ensure_future(execute())
+        if entry is not None:
+            self._forget(key)
+        self._entries[key] = (now + self.ttl, task)
+        self.executions += 1
+
+        def forget_failure(done: asyncio.Future) -> None:
+            handle = self._abandoned.pop(done, None)
+            if handle is not None:
+                handle.cancel()
+            if self._entries.get(key, (None, None))[1] is not done:
+                return
+            if done.cancelled() or done.exception() is not None:
+                self._forget(key)
+                return
+            size = _size_of(done.result())
+            if size > self.max_bytes:
+                # Ni siquiera solo cabe: los reintentos volverán a ejecutar
+                self._forget(key)
+                return
+            # El TTL cuenta desde el final de la ejecución
+            self._entries[key] = (time.monotonic() + self.ttl, done)
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self.bytes += size
+            self._evict(time.monotonic())
+
+        task.add_done_callback(forget_failure)
+        return await self._wait(task), False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Devuelve el estado del almacén.
+
+        Returns:
+            Dict[str, Any]: Entradas, bytes recordados, ejecuciones,
+            reutilizaciones y abandonos.
+        """
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "executions": self.executions,
+            "replays": self.replays,
+            "abandoned": self.abandoned,
+        }
@@ -0,0 +1,457 @@
+"""
+Transporte en el mismo proceso (``inproc://<servidor>/<ruta>``).
+
+Cuando el supervisor y sus agentes viven en el mismo proceso, un
+``RemoteAgent`` con URL ``inproc://`` entrega la petición directamente a la
+aplicación ASGI del ``Server`` publicado con ese nombre, sin sockets ni
+serialización (codec ``inproc``). La petición recorre exactamente el mismo
+código que una de red: admisión, caché, idempotencia, plazos, sesiones,
+métricas y trazas.
+
+Las rutas de los agentes se despachan directamente a su handler (sin el
+enrutado ni los middlewares de FastAPI, que no aportan nada dentro del
+proceso); el resto de rutas pasan por la aplicación completa.
+
+La aplicación corre siempre en un único event loop por servidor: el de
+uvicorn si el servidor además se sirve por red, o uno propio en un hilo de
+fondo. Las llamadas asíncronas hechas desde ese mismo loop no cambian de
+hilo.
+"""
+
+import asyncio
+import contextvars
+import logging
+import queue
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Mapping, Tuple
+
+import httpx
+from starlette.requests import Request
+
+from langgraph_server.agents.codecs import INPROC_CODEC
+
+logger = logging.getLogger(__name__)
+
+INPROC_SCHEME = "inproc"
+
+# Extensión ASGI que marca las peticiones que no han salido del proceso
+INPROC_EXTENSION = "langgraph.inproc"
+
+# Fin de la ejecución de la aplicación
+_DONE = object()
+
+
+def is_inproc(scope: Dict[str, Any]) -> bool:
+    """Indica si una petición ASGI llegó por el transporte en proceso."""
+    return INPROC_EXTENSION in (scope.get("extensions") or {})
+
+
+class _InProcApp:
+    """Una aplicación publicada y el event loop en el que se ejecuta."""
+
+    def __init__(self, name: str, app: Callable, routes: Mapping[Tuple[str, str], Callable]):
+        self.name = name
+        self.app = app
+        self.routes = routes
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._own_loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    def bind(self, loop: asyncio.AbstractEventLoop | None) -> None:
+        self._loop = loop
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """El loop del servidor si está sirviendo; si no, uno propio en un hilo."""
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            return loop
+        with self._lock:
+            if self._own_loop is None or self._own_loop.is_closed():
+                self._own_loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._own_loop.run_forever, name=f"inproc-{self.name}", daemon=True
+                )
+                self._thread.start()
+            return self._own_loop
+
+    def close(self) -> None:
+        with self._lock:
+            loop, self._own_loop = self._own_loop, None
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(loop.stop)
+
+
+_APPS: Dict[str, _InProcApp] = {}
+_APPS_LOCK = threading.Lock()
+
+
+def register_inproc(
+    name: str, app: Callable, routes: Mapping[Tuple[str, str], Callable] | None = None
+) -> None:
+    """
+    Publica una aplicación ASGI en el proceso como ``inproc://<name>``.
+
+    Args:
+        name (str): Nombre del servidor en las URLs ``inproc://``.
+        app (Callable): La aplicación ASGI.
+        routes (Mapping[Tuple[str, str], Callable] | None, optional): Handlers
+            ``(Request) -> Response`` por ``(método, ruta)`` que se llaman
+            directamente. Puede seguir llenándose tras el registro.
+            Defaults to None.
+    """
+    with _APPS_LOCK:
+        if name in _APPS and _APPS[name].app is not app:
+            raise RuntimeError(f"In-process server '{name}' already registered")
+        _APPS.setdefault(name, _InProcApp(name, app, routes if routes is not None else {}))
+
+
+def unregister_inproc(name: str) -> None:
+    """Retira una aplicación publicada y detiene su loop propio."""
+    with _APPS_LOCK:
+        target = _APPS.pop(name, None)
+    if target is not None:
+        target.close()
+
+
+def bind_inproc_loop(name: str, loop: asyncio.AbstractEventLoop | None) -> None:
+    """
+    Fija el event loop en el que se ejecutan las peticiones en proceso.
+
+    ``Server`` lo llama al arrancar uvicorn para que las peticiones en proceso
+    y las de red compartan loop (y con él la admisión y los pools).
+
+    Args:
+        name (str): Nombre del servidor publicado.
+        loop (asyncio.AbstractEventLoop | None): El loop, o None para volver
+            al loop propio.
+    """
+    with _APPS_LOCK:
+        target = _APPS.get(name)
+    if target is not None:
+        target.bind(loop)
+
+
+def _target(request: httpx.Request) -> _InProcApp:
+    with _APPS_LOCK:
+        target = _APPS.get(request.url.host)
+    if target is None:
+        # Como un servidor caído: los reintentos y el balanceo lo tratan igual
+        raise httpx.ConnectError(f"No in-process server '{request.url.host}'", request=request)
+    return target
+
+
+# Ejecuciones en curso: el loop solo guarda referencias débiles a sus tareas
+_RUNNING: set = set()
+
+
+def _spawn(loop: asyncio.AbstractEventLoop, exchange: "_Exchange", target: _InProcApp) -> None:
+    """Arranca la petición en el loop del servidor con un contexto vacío."""
+
+    def start() -> None:
+        # Como por red: no hereda la config de LangChain, el plazo ni el span de
+        # quien llama (``run_coroutine_threadsafe`` copiaría el contexto del hilo)
+        task = loop.create_task(exchange.run(target), context=contextvars.Context())
+        _RUNNING.add(task)
+        task.add_done_callback(_RUNNING.discard)
+
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        start()
+    else:
+        loop.call_soon_threadsafe(start)
+
+
+def _by_reference(content_type: str | None) -> bool:
+    return (content_type or "").startswith(INPROC_CODEC.media_type)
+
+
+def _read_timeout(request: httpx.Request) -> float | None:
+    return (request.extensions.get("timeout") or {}).get("read")
+
+
+class _Exchange:
+    """Una petición entregada a la aplicación ASGI sin pasar por la red."""
+
+    def __init__(self, request: httpx.Request, body: bytes, deliver: Callable[[Any], None]):
+        self.request = request
+        # Referencia propia de este envío; la original es de quien llama
+        if _by_reference(request.headers.get("content-type")):
+            body = INPROC_CODEC.share(body)
+        self.body = body
+        self.deliver = deliver
+        self.scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": request.method,
+            "scheme": "http",
+            "path": request.url.path,
+            "raw_path": request.url.raw_path.split(b"?")[0],
+            "root_path": "",
+            "query_string": request.url.query,
+            "headers": [(k.lower(), v) for k, v in request.headers.raw],
+            "server": (request.url.host, None),
+            "client": (INPROC_SCHEME, 0),
+            "extensions": {INPROC_EXTENSION: {}},
+        }
+        self._body_sent = False
+        self._client_closed = False
+        self._closed: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._content_type: str | None = None
+        # Ordena las entregas frente al cierre: tras él nada llega a la cola
+        self._lock = threading.Lock()
+
+    async def run(self, target: _InProcApp) -> None:
+        self._closed = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        if self._client_closed:
+            self._closed.set()
+        try:
+            endpoint = target.routes.get((self.scope["method"], self.scope["path"]))
+            if endpoint is None:
+                await target.app(self.scope, self._receive, self._send)
+            else:
+                request = Request(self.scope, self._receive)
+                if asyncio.iscoroutinefunction(endpoint):
+                    response = await endpoint(request)
+                else:
+                    response = endpoint(request)
+                await response(self.scope, self._receive, self._send)
+        except BaseException as e:
+            self.deliver(e)
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            self.deliver(_DONE)
+            self.release(self.body, self.request.headers.get("content-type"))
+
+    async def _receive(self) -> Dict[str, Any]:
+        if not self._body_sent:
+            self._body_sent = True
+            return {"type": "http.request", "body": self.body, "more_body": False}
+        await self._closed.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            for key, value in message.get("headers") or []:
+                if key.lower() == b"content-type":
+                    self._content_type = value.decode("latin-1")
+        with self._lock:
+            if not self._client_closed:
+                self.deliver(message)
+                return
+        self.discard(message)
+
+    @property
+    def client_closed(self) -> bool:
+        return self._client_closed
+
+    def discard(self, item: Any) -> None:
+        """Libera un mensaje de la respuesta que ya no tiene lector."""
+        if isinstance(item, dict) and item.get("body"):
+            self.release(item["body"], self._content_type)
+
+    def close(self) -> None:
+        """El cliente cierra la respuesta: la aplicación ve la desconexión."""
+        with self._lock:
+            self._client_closed = True
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # Si aún no ha empezado, ``run`` verá la marca al arrancar
+            return
+        try:
+            loop.call_soon_threadsafe(self._closed.set)
+        except RuntimeError:  # loop ya cerrado
+            pass
+
+    @staticmethod
+    def release(data: bytes, content_type: str | None) -> None:
+        # Objetos pasados por referencia que nadie va a recoger
+        if data and _by_reference(content_type):
+            INPROC_CODEC.discard(data)
+
+
+class _Reader:
+    """Lee los mensajes ASGI de la respuesta en el orden en que llegan."""
+
+    def __init__(self, exchange: _Exchange):
+        self.exchange = exchange
+        self.complete = False
+
+    def start(self, item: Any, stream: Any) -> httpx.Response | None:
+        """Convierte el primer mensaje en la respuesta (o en un error 500)."""
+        if isinstance(item, dict) and item["type"] == "http.response.start":
+            headers: List[Tuple[bytes, bytes]] = list(item.get("headers") or [])
+            return httpx.Response(
+                item["status"], headers=headers, stream=stream, request=self.exchange.request
+            )
+        if isinstance(item, BaseException) or item is _DONE:
+            # Como uvicorn: un error antes de responder es un 500
+            if isinstance(item, BaseException):
+                logger.error(f"In-process request failed: {item!r}", exc_info=item)
+            self.complete = True
+            return httpx.Response(
+                500,
+                headers={"content-type": "text/plain; charset=utf-8"},
+                content=b"Internal Server Error",
+                request=self.exchange.request,
+            )
+        return None
+
+    def body(self, item: Any) -> bytes | None:
+        """Devuelve el trozo de cuerpo; None cuando la respuesta termina."""
+        if isinstance(item, dict):
+            if item["type"] != "http.response.body":
+                return b""
+            if not item.get("more_body", False):
+                self.complete = True
+            return item.get("body", b"")
+        if self.complete:
+            return None
+        # La aplicación falló a mitad de la respuesta: como una conexión cortada
+        raise httpx.RemoteProtocolError(
+            "In-process server closed the response before completing it",
+            request=self.exchange.request,
+        )
+
+    def discard(self, item: Any) -> None:
+        self.exchange.discard(item)
+
+
+class _SyncBody(httpx.SyncByteStream):
+    def __init__(self, reader: _Reader, items: "queue.Queue[Any]", timeout: float | None):
+        self.reader = reader
+        self.items = items
+        self.timeout = timeout
+
+    def __iter__(self) -> Iterator[bytes]:
+        while not self.reader.complete:
+            chunk = self.reader.body(_get(self.items, self.timeout, self.reader.exchange.request))
+            if chunk is None:
+                return
+            if chunk:
+                yield chunk
+
+    def close(self) -> None:
+        self.reader.exchange.close()
+        # Frames ya producidos que nadie va a leer
+        while True:
+            try:
+                self.reader.discard(self.items.get_nowait())
+            except queue.Empty:
+                return
+
+
+class _AsyncBody(httpx.AsyncByteStream):
+    def __init__(self, reader: _Reader, items: asyncio.Queue, timeout: float | None):
+        self.reader = reader
+        self.items = items
+        self.timeout = timeout
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while not self.reader.complete:
+            chunk = self.reader.body(
+                await _aget(self.items, self.timeout, self.reader.exchange.request)
+            )
+            if chunk is None:
+                return
+            if chunk:
+                yield chunk
+
+    async def aclose(self) -> None:
+        self.reader.exchange.close()
+        while not self.items.empty():
+            self.reader.discard(self.items.get_nowait())
+
+
+def _get(items: "queue.Queue[Any]", timeout: float | None, request: httpx.Request) -> Any:
+    try:
+        return items.get(timeout=timeout)
+    except queue.Empty:
+        raise httpx.ReadTimeout("In-process read timed out", request=request) from None
+
+
+async def _aget(items: asyncio.Queue, timeout: float | None, request: httpx.Request) -> Any:
+    try:
+        # ``asyncio.timeout`` no crea una tarea por lectura, a diferencia de ``wait_for``
+        async with asyncio.timeout(timeout):
+            return await items.get()
+    except TimeoutError:
+        raise httpx.ReadTimeout("In-process read timed out", request=request) from None
+
+
+class InProcTransport(httpx.BaseTransport):
+    """Transporte síncrono de ``httpx`` hacia una aplicación del mismo proceso."""
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        target = _target(request)
+        loop = target.loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            raise RuntimeError(
+                f"Blocking in-process call to '{target.name}' from its own event loop; "
+                "use the async API (ainvoke/astream)"
+            )
+        items: "queue.Queue[Any]" = queue.Queue()
+        exchange = _Exchange(request, request.read(), items.put)
+        _spawn(loop, exchange, target)
+        reader = _Reader(exchange)
+        timeout = _read_timeout(request)
+        body = _SyncBody(reader, items, timeout)
+        try:
+            response = None
+            while response is None:
+                response = reader.start(_get(items, timeout, request), body)
+        except BaseException:
+            body.close()
+            raise
+        return response
+
+
+class AsyncInProcTransport(httpx.AsyncBaseTransport):
+    """Transporte asíncrono de ``httpx`` hacia una aplicación del mismo proceso."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        target = _target(request)
+        loop = target.loop()
+        caller = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        if loop is caller:
+            deliver = items.put_nowait
+        else:
+
+            def accept(item: Any) -> None:
+                # Entregado antes del cierre pero encolado después: nadie lo leerá
+                if exchange.client_closed:
+                    exchange.discard(item)
+                else:
+                    items.put_nowait(item)
+
+            def deliver(item: Any) -> None:
+                try:
+                    caller.call_soon_threadsafe(accept, item)
+                except RuntimeError:  # el loop de quien llama ya terminó
+                    exchange.discard(item)
+
+        exchange = _Exchange(request, await request.aread(), deliver)
+        _spawn(loop, exchange, target)
+        reader = _Reader(exchange)
+        timeout = _read_timeout(request)
+        body = _AsyncBody(reader, items, timeout)
+        try:
+            response = None
+            while response is None:
+                response = reader.start(await _aget(items, timeout, request), body)
+        except BaseException:
+            await body.aclose()
+            raise
+        return response
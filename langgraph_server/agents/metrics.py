@@ -0,0 +1,295 @@
+"""
+Métricas del servidor en formato de texto de Prometheus.
+
+Implementación mínima sin dependencias: contadores, gauges e histogramas con
+etiquetas, pensada para tener un coste despreciable en el camino caliente
+(un acceso a diccionario y una búsqueda binaria por observación).
+"""
+
+import logging
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Buckets por defecto (segundos), desde milisegundos hasta llamadas a LLM largas
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type: str = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _labels(self, values: Labels) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Contador monótono con etiquetas."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in list(self._values.items()):
+            yield self.name, self._labels(labels), value
+
+
+class Gauge(_Metric):
+    """Valor instantáneo con etiquetas."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) - amount
+
+    def set(self, labels: Labels, value: float) -> None:
+        self._values[labels] = value
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in list(self._values.items()):
+            yield self.name, self._labels(labels), value
+
+
+class Histogram(_Metric):
+    """Histograma acumulativo con buckets fijos."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por etiquetas: [conteos por bucket..., conteo +Inf, suma]
+        self._values: Dict[Labels, List[float]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, state in list(self._values.items()):
+            base = self._labels(labels)
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket", {**base, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_count", base, cumulative
+            yield f"{self.name}_sum", base, state[-1]
+
+
+# Un collector devuelve métricas calculadas en el momento del scrape
+Collector = Callable[[], Iterable[_Metric]]
+
+
+class MetricsRegistry:
+    """Conjunto de métricas y collectors que se exponen juntos."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: _Metric) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        """Registra una función que produce métricas en cada scrape."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Genera el documento en formato de texto de Prometheus.
+
+        Returns:
+            str: Las métricas con sus líneas ``# HELP`` y ``# TYPE``.
+        """
+        metrics = list(self._metrics)
+        for collector in self._collectors:
+            metrics.extend(collector())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class RequestObservation:
+    """
+    Medición de una petición a un endpoint de agente.
+
+    Se crea al empezar la petición (incrementa el gauge de peticiones en
+    vuelo) y se cierra con ``finish``; es idempotente para que los streams
+    puedan cerrarla desde el generador. Los callbacks registrados con
+    ``add_done_callback`` se ejecutan al cerrarla (spans, huecos de admisión...).
+    """
+
+    __slots__ = ("metrics", "labels", "start", "first_chunk", "finished", "_callbacks")
+
+    def __init__(self, metrics: "ServerMetrics", labels: Labels):
+        self.metrics = metrics
+        self.labels = labels
+        self.start = time.perf_counter()
+        self.first_chunk = False
+        self.finished = False
+        self._callbacks: List[Callable[[BaseException | None], None]] = []
+        metrics.in_flight.inc(labels)
+
+    def add_done_callback(self, callback: Callable[[BaseException | None], None]) -> None:
+        """Registra una función que recibe el error (o None) al cerrar la petición."""
+        self._callbacks.append(callback)
+
+    def decoded(self, nbytes: int, seconds: float) -> None:
+        self.metrics.request_bytes.inc(self.labels, nbytes)
+        self.metrics.serialization.observe(self.labels + ("decode",), seconds)
+
+    def encoded(self, nbytes: int, seconds: float) -> None:
+        self.metrics.response_bytes.inc(self.labels, nbytes)
+        self.metrics.serialization.observe(self.labels + ("encode",), seconds)
+
+    def chunk(self, nbytes: int, seconds: float) -> None:
+        if not self.first_chunk:
+            self.first_chunk = True
+            self.metrics.first_chunk.observe(
+                self.labels, time.perf_counter() - self.start
+            )
+        self.encoded(nbytes, seconds)
+
+    def finish(self, error: BaseException | None = None) -> None:
+        if self.finished:
+            return
+        self.finished = True
+        metrics = self.metrics
+        metrics.in_flight.dec(self.labels)
+        metrics.duration.observe(self.labels, time.perf_counter() - self.start)
+        # Los errores pueden declarar su propio estado (ej: "shed" por sobrecarga)
+        status = "ok" if error is None else getattr(error, "metric_status", "error")
+        metrics.requests.inc(self.labels + (status,))
+        if error is not None:
+            metrics.errors.inc(self.labels + (type(error).__name__,))
+        for callback in self._callbacks:
+            try:
+                callback(error)
+            except Exception as e:
+                logger.warning(f"Request done callback failed: {e}")
+
+
+class ServerMetrics(MetricsRegistry):
+    """Métricas estándar de ``Server`` por agente y endpoint."""
+
+    def __init__(self, prefix: str = "langgraph"):
+        super().__init__()
+        labels = ("agent", "endpoint")
+        self.requests = self.counter(
+            f"{prefix}_requests_total", "Peticiones atendidas.", labels + ("status",)
+        )
+        self.errors = self.counter(
+            f"{prefix}_errors_total", "Peticiones fallidas por tipo de error.", labels + ("error",)
+        )
+        self.duration = self.histogram(
+            f"{prefix}_request_duration_seconds", "Duración total de la petición.", labels
+        )
+        self.first_chunk = self.histogram(
+            f"{prefix}_time_to_first_chunk_seconds", "Tiempo hasta el primer chunk de un stream.", labels
+        )
+        self.in_flight = self.gauge(
+            f"{prefix}_requests_in_flight", "Peticiones en curso.", labels
+        )
+        self.request_bytes = self.counter(
+            f"{prefix}_request_bytes_total", "Bytes recibidos en los cuerpos de petición.", labels
+        )
+        self.response_bytes = self.counter(
+            f"{prefix}_response_bytes_total", "Bytes enviados en las respuestas.", labels
+        )
+        self.serialization = self.histogram(
+            f"{prefix}_serialization_seconds",
+            "Tiempo de codificación/decodificación del cuerpo.",
+            labels + ("direction",),
+            buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+        )
+
+    def observe(self, agent: str, endpoint: str) -> RequestObservation:
+        """
+        Empieza a medir una petición.
+
+        Args:
+            agent (str): La ruta del agente.
+            endpoint (str): El endpoint (invoke, stream...).
+
+        Returns:
+            RequestObservation: La medición en curso.
+        """
+        return RequestObservation(self, (agent, endpoint))
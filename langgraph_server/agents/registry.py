@@ -0,0 +1,648 @@
+"""
+Registro de agentes de la malla.
+
+Tres piezas:
+
+- ``RegistryService``: el directorio. Cada ``Server`` lo mantiene al día con
+  un *lease* (registro + heartbeats); si deja de latir, sus agentes
+  desaparecen. Cada cambio incrementa la versión del directorio y queda en un
+  historial corto, así que los clientes piden solo lo que cambió desde su
+  versión, esperando con long-poll a que haya algo nuevo. Puede ir embebido
+  en un ``Server`` o ejecutarse solo (``RegistryService().run(port=9000)``).
+- ``Registrar``: lo usa ``Server`` para registrar sus agentes y enviar heartbeats.
+- ``Registry``: el cliente. Guarda una copia local del directorio y devuelve
+  ``RemoteAgent`` con sus metadatos ya cargados (sin pedir ``/info``); las
+  réplicas con el mismo nombre se agrupan en un solo ``RemoteAgent``.
+
+Ejemplo::
+
+    # Servidor de agentes
+    server = Server(registry="http://registry:9000", advertise_url="http://rrhh-host:8000")
+    server.add_agent(agente_hr, "rrhh")
+    server.run(host="0.0.0.0", port=8000)
+
+    # Supervisor
+    registry = Registry("http://registry:9000").start()
+    supervisor = SupervisorChatGroup(["recursos_humanos"], registry=registry, model=llm)
+"""
+
+import asyncio
+import logging
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, List, Set, Tuple
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+
+from langgraph_server.agents.transport import PoolConfig, TransportRegistry, default_registry
+
+if TYPE_CHECKING:
+    from langgraph_server.agents.client import RemoteAgent
+
+logger = logging.getLogger(__name__)
+
+# URL pública del servidor, heredada por los workers de ``Server.run``
+ADVERTISE_ENV = "LANGGRAPH_SERVER_ADVERTISE_URL"
+
+# Prefijo de las rutas del registro
+REGISTRY_PREFIX = "/registry"
+
+
+def advertised_url(host: str, port: int) -> str:
+    """URL con la que otros procesos pueden alcanzar un servidor en ``host:port``."""
+    if host in ("0.0.0.0", "::", ""):
+        host = socket.gethostname()
+    return f"http://{host}:{port}"
+
+
+class RegistryService:
+    """
+    Directorio versionado de agentes con leases.
+
+    Un agente se identifica por su URL; sigue en el directorio mientras algún
+    lease vivo lo declare (varios workers del mismo servidor lo comparten).
+    """
+
+    def __init__(self, ttl: float = 30.0, history: int = 1024):
+        """
+        Inicializa el directorio.
+
+        Args:
+            ttl (float, optional): Segundos de vida de un lease sin heartbeat.
+                Defaults to 30.0.
+            history (int, optional): Cambios que se recuerdan para las
+                actualizaciones incrementales; un cliente más atrasado recibe
+                el directorio completo. Defaults to 1024.
+        """
+        self.ttl = ttl
+        self.version = 0
+        # Identifica esta instancia: las versiones de otra no son comparables
+        self.epoch = uuid.uuid4().hex
+        self._agents: Dict[str, Dict[str, Any]] = {}
+        self._holders: Dict[str, Set[str]] = {}
+        self._leases: Dict[str, Tuple[float, Set[str]]] = {}
+        self._log: Deque[Tuple[int, str, Dict[str, Any] | None]] = deque(maxlen=history)
+        self._changed = asyncio.Event()
+
+    # --- Leases ---
+
+    def _set(self, url: str, entry: Dict[str, Any] | None) -> None:
+        if entry is None:
+            self._agents.pop(url, None)
+        else:
+            self._agents[url] = entry
+        self.version += 1
+        self._log.append((self.version, url, entry))
+        # Despierta a los long-polls pendientes
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _release(self, lease: str, urls: Set[str]) -> None:
+        for url in urls:
+            holders = self._holders.get(url)
+            if holders is None:
+                continue
+            holders.discard(lease)
+            if not holders:
+                del self._holders[url]
+                self._set(url, None)
+
+    def expire(self) -> None:
+        """Elimina los leases sin heartbeat y los agentes que solo ellos declaraban."""
+        now = time.monotonic()
+        for lease, (expires, urls) in list(self._leases.items()):
+            if expires <= now:
+                logger.warning(f"Registry lease {lease} expired")
+                del self._leases[lease]
+                self._release(lease, urls)
+
+    def register(self, lease: str, agents: List[Dict[str, Any]], ttl: float | None = None) -> int:
+        """
+        Registra (o actualiza) los agentes de un lease.
+
+        Args:
+            lease (str): Identificador del lease (uno por proceso servidor).
+            agents (List[Dict[str, Any]]): Entradas de los agentes; cada una
+                con al menos ``url`` y ``name``.
+            ttl (float | None, optional): Vida del lease. Defaults to None
+                (el del directorio).
+
+        Returns:
+            int: La versión del directorio.
+        """
+        self.expire()
+        urls = set()
+        for entry in agents:
+            url = entry["url"]
+            urls.add(url)
+            self._holders.setdefault(url, set()).add(lease)
+            # Solo cuenta como cambio si el contenido es distinto
+            if self._agents.get(url) != entry:
+                self._set(url, entry)
+        _, previous = self._leases.get(lease, (0.0, set()))
+        self._release(lease, previous - urls)
+        self._leases[lease] = (time.monotonic() + (ttl or self.ttl), urls)
+        return self.version
+
+    def heartbeat(self, lease: str, ttl: float | None = None) -> bool:
+        """
+        Renueva un lease.
+
+        Returns:
+            bool: False si el lease ya no existe y hay que volver a registrarse.
+        """
+        self.expire()
+        if lease not in self._leases:
+            return False
+        _, urls = self._leases[lease]
+        self._leases[lease] = (time.monotonic() + (ttl or self.ttl), urls)
+        return True
+
+    def deregister(self, lease: str) -> None:
+        """Da de baja un lease y sus agentes."""
+        _, urls = self._leases.pop(lease, (0.0, set()))
+        self._release(lease, urls)
+
+    # --- Consultas ---
+
+    def changes(self, since: int | None = None, epoch: str | None = None) -> Dict[str, Any]:
+        """
+        Devuelve los cambios del directorio desde una versión.
+
+        Args:
+            since (int | None, optional): Última versión conocida por el
+                cliente. Defaults to None (directorio completo).
+            epoch (str | None, optional): Instancia del registro a la que
+                pertenece ``since``. Defaults to None.
+
+        Returns:
+            Dict[str, Any]: ``{"version", "epoch", "full": True, "agents"}`` o
+            ``{"version", "epoch", "full": False, "upserts", "removed"}``.
+        """
+        self.expire()
+        oldest = self._log[0][0] if self._log else self.version + 1
+        # Sin historial suficiente (o un registro reiniciado) se manda todo
+        if since is None or epoch != self.epoch or since < oldest - 1:
+            return {
+                "version": self.version,
+                "epoch": self.epoch,
+                "full": True,
+                "agents": list(self._agents.values()),
+            }
+        latest: Dict[str, Dict[str, Any] | None] = {}
+        for version, url, entry in self._log:
+            if version > since:
+                latest[url] = entry
+        return {
+            "version": self.version,
+            "epoch": self.epoch,
+            "full": False,
+            "upserts": [entry for entry in latest.values() if entry is not None],
+            "removed": [url for url, entry in latest.items() if entry is None],
+        }
+
+    async def wait(
+        self, since: int | None, epoch: str | None, timeout: float
+    ) -> Dict[str, Any]:
+        """
+        Long-poll: espera hasta que el directorio pase de ``since`` o venza ``timeout``.
+
+        Args:
+            since (int | None): Última versión conocida por el cliente.
+            epoch (str | None): Instancia del registro a la que pertenece ``since``.
+            timeout (float): Espera máxima en segundos.
+
+        Returns:
+            Dict[str, Any]: Los cambios (vacíos si no hubo ninguno).
+        """
+        deadline = time.monotonic() + timeout
+        while since == self.version and epoch == self.epoch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                # Se despierta a menudo para caducar leases aunque nadie más consulte
+                await asyncio.wait_for(self._changed.wait(), min(remaining, 1.0))
+            except asyncio.TimeoutError:
+                self.expire()
+        return self.changes(since, epoch)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"version": self.version, "agents": len(self._agents), "leases": len(self._leases)}
+
+    # --- HTTP ---
+
+    def mount(self, app: FastAPI, prefix: str = REGISTRY_PREFIX) -> None:
+        """
+        Añade las rutas del registro a una aplicación.
+
+        Args:
+            app (FastAPI): La aplicación (la de un ``Server`` o una propia).
+            prefix (str, optional): Prefijo de las rutas. Defaults to "/registry".
+        """
+
+        async def register(request: Request):
+            body = await request.json()
+            version = self.register(body["lease"], body.get("agents") or [], body.get("ttl"))
+            return {"version": version, "ttl": body.get("ttl") or self.ttl}
+
+        async def heartbeat(lease: str, request: Request):
+            body = await request.json() if await request.body() else {}
+            if not self.heartbeat(lease, body.get("ttl")):
+                raise HTTPException(status_code=404, detail=f"Unknown lease '{lease}'")
+            return {"version": self.version}
+
+        async def deregister(lease: str):
+            self.deregister(lease)
+            return {"version": self.version}
+
+        async def agents(since: int | None = None, epoch: str | None = None, wait: float = 0.0):
+            if wait > 0:
+                return await self.wait(since, epoch, min(wait, 60.0))
+            return self.changes(since, epoch)
+
+        app.add_api_route(f"{prefix}/leases", register, methods=["POST"])
+        app.add_api_route(f"{prefix}/leases/{{lease}}", heartbeat, methods=["PUT"])
+        app.add_api_route(f"{prefix}/leases/{{lease}}", deregister, methods=["DELETE"])
+        app.add_api_route(f"{prefix}/agents", agents, methods=["GET"])
+
+    def create_app(self) -> FastAPI:
+        """Aplicación independiente con solo el registro."""
+        app = FastAPI(title="LangGraph Mesh Registry")
+        self.mount(app)
+        app.get("/health")(lambda: {"status": "healthy", **self.stats()})
+        return app
+
+    def run(self, host: str = "localhost", port: int = 9000, **kwargs: Any) -> None:
+        """
+        Ejecuta el registro como servicio independiente (un solo proceso).
+
+        Args:
+            host (str, optional): Host de escucha. Defaults to "localhost".
+            port (int, optional): Puerto de escucha. Defaults to 9000.
+            **kwargs (Any): Opciones adicionales de ``uvicorn.run``.
+        """
+        uvicorn.run(self.create_app(), host=host, port=port, **kwargs)
+
+
+class Registrar:
+    """Registra los agentes de un ``Server`` y mantiene vivo su lease."""
+
+    def __init__(
+        self,
+        target: "str | RegistryService",
+        entries: Callable[[str], List[Dict[str, Any]]],
+        ttl: float = 30.0,
+    ):
+        """
+        Inicializa el registrador.
+
+        Args:
+            target (str | RegistryService): URL del registro o el registro
+                embebido en el propio proceso.
+            entries (Callable[[str], List[Dict[str, Any]]]): Genera las entradas
+                de los agentes a partir de la URL pública del servidor.
+            ttl (float, optional): Vida del lease; el heartbeat se envía cada
+                tercio. Defaults to 30.0.
+        """
+        self.target = target
+        self.entries = entries
+        self.ttl = ttl
+        self.lease = uuid.uuid4().hex
+        self._task: asyncio.Task | None = None
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def _url(self) -> str:
+        return f"{str(self.target).rstrip('/')}{REGISTRY_PREFIX}"
+
+    async def _register(self, base_url: str) -> None:
+        agents = self.entries(base_url)
+        if isinstance(self.target, RegistryService):
+            self.target.register(self.lease, agents, self.ttl)
+            return
+        response = await self._client.post(
+            f"{self._url}/leases", json={"lease": self.lease, "agents": agents, "ttl": self.ttl}
+        )
+        response.raise_for_status()
+
+    async def _heartbeat(self) -> bool:
+        if isinstance(self.target, RegistryService):
+            return self.target.heartbeat(self.lease, self.ttl)
+        response = await self._client.put(f"{self._url}/leases/{self.lease}", json={"ttl": self.ttl})
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    async def _run(self, base_url: str) -> None:
+        registered = False
+        while True:
+            try:
+                # El registro puede haberse reiniciado: un lease desconocido se recrea
+                if not registered or not await self._heartbeat():
+                    await self._register(base_url)
+                    if not registered:
+                        logger.info(f"Registered agents of {base_url} in {self.target}")
+                    registered = True
+            except (httpx.HTTPError, OSError) as e:
+                logger.warning(f"Registry {self.target} unreachable: {e}")
+            await asyncio.sleep(self.ttl / 3)
+
+    async def start(self, base_url: str) -> None:
+        """
+        Arranca el registro y los heartbeats en segundo plano.
+
+        Args:
+            base_url (str): URL pública del servidor.
+        """
+        if not isinstance(self.target, RegistryService):
+            self._client = httpx.AsyncClient(timeout=10.0)
+        self._task = asyncio.create_task(self._run(base_url))
+
+    async def stop(self) -> None:
+        """Detiene los heartbeats y da de baja el lease."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            if isinstance(self.target, RegistryService):
+                self.target.deregister(self.lease)
+            elif self._client is not None:
+                await self._client.delete(f"{self._url}/leases/{self.lease}")
+        except (httpx.HTTPError, OSError) as e:
+            logger.warning(f"Could not deregister from {self.target}: {e}")
+        finally:
+            if self._client is not None:
+                await self._client.aclose()
+                self._client = None
+
+
+class Registry:
+    """
+    Cliente del registro con copia local del directorio.
+
+    ``refresh``/``arefresh`` traen solo los cambios desde la última versión;
+    ``start`` mantiene la copia al día con long-poll en un hilo.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        poll_timeout: float = 30.0,
+        pool: PoolConfig | None = None,
+        registry: TransportRegistry | None = None,
+        agent_options: Dict[str, Any] | None = None,
+    ):
+        """
+        Inicializa el cliente.
+
+        Args:
+            url (str): URL base del registro (un ``Server`` que lo embebe o el
+                servicio independiente).
+            poll_timeout (float, optional): Espera máxima de cada long-poll.
+                Defaults to 30.0.
+            pool (PoolConfig | None, optional): Pool de conexiones del registro.
+                Defaults to None.
+            registry (TransportRegistry | None, optional): Registro de pools
+                compartidos. Defaults to None (el global del proceso).
+            agent_options (Dict[str, Any] | None, optional): Argumentos para los
+                ``RemoteAgent`` que se construyen (codec, retry, hedge...).
+                Defaults to None.
+        """
+        self.url = url.rstrip("/")
+        self.poll_timeout = poll_timeout
+        self.transports = registry or default_registry
+        self._pool_key = self.transports.acquire(self.url, pool or PoolConfig())
+        self.agent_options = agent_options or {}
+        self.version: int | None = None
+        self.epoch: str | None = None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._agents: Dict[str, Tuple[Tuple[str, ...], "RemoteAgent"]] = {}
+        self._lock = threading.Lock()
+        self._watcher: threading.Thread | None = None
+        self._stop = threading.Event()
+        # Hilos de long-poll vivos; el último en salir tras ``close`` libera el pool
+        self._watching = 0
+        self._closed = False
+
+    # --- Sincronización ---
+
+    def _apply(self, data: Dict[str, Any]) -> bool:
+        with self._lock:
+            if data.get("full"):
+                entries = {entry["url"]: entry for entry in data.get("agents") or []}
+                changed = entries != self._entries
+                self._entries = entries
+            else:
+                changed = bool(data.get("upserts") or data.get("removed"))
+                for entry in data.get("upserts") or []:
+                    self._entries[entry["url"]] = entry
+                for url in data.get("removed") or []:
+                    self._entries.pop(url, None)
+            self.version = data["version"]
+            self.epoch = data.get("epoch")
+            return changed
+
+    def _params(self, wait: float | None) -> Dict[str, Any]:
+        params: Dict[str, Any] = {}
+        if self.version is not None:
+            params["since"] = self.version
+            params["epoch"] = self.epoch
+        if wait:
+            params["wait"] = wait
+        return params
+
+    def refresh(self, wait: float | None = None) -> bool:
+        """
+        Trae los cambios del directorio desde la versión local.
+
+        Args:
+            wait (float | None, optional): Segundos de long-poll si no hay
+                cambios. Defaults to None (respuesta inmediata).
+
+        Returns:
+            bool: Si el directorio local ha cambiado.
+        """
+        response = self.transports.sync_client(self._pool_key).get(
+            f"{self.url}{REGISTRY_PREFIX}/agents",
+            params=self._params(wait),
+            timeout=(wait or 0) + 10.0,
+        )
+        response.raise_for_status()
+        return self._apply(response.json())
+
+    async def arefresh(self, wait: float | None = None) -> bool:
+        """Versión asíncrona de ``refresh``."""
+        response = await self.transports.async_client(self._pool_key).get(
+            f"{self.url}{REGISTRY_PREFIX}/agents",
+            params=self._params(wait),
+            timeout=(wait or 0) + 10.0,
+        )
+        response.raise_for_status()
+        return self._apply(response.json())
+
+    def start(self) -> "Registry":
+        """
+        Carga el directorio y lo mantiene al día en un hilo con long-poll.
+
+        Returns:
+            Registry: El propio cliente, para encadenar.
+        """
+        if self._watcher is not None:
+            return self
+        if self.version is None:
+            self.refresh()
+        stop = self._stop = threading.Event()
+
+        def watch() -> None:
+            backoff = 1.0
+            try:
+                while not stop.is_set():
+                    try:
+                        self.refresh(wait=self.poll_timeout)
+                        backoff = 1.0
+                    except Exception as e:
+                        # Tras ``close`` el long-poll en curso falla: no es un error
+                        if stop.is_set():
+                            break
+                        if isinstance(e, httpx.HTTPError):
+                            logger.warning(
+                                f"Registry {self.url} unreachable, retrying in {backoff:.0f}s: {e}"
+                            )
+                        else:
+                            logger.warning(
+                                f"Registry {self.url} refresh failed, retrying in {backoff:.0f}s: "
+                                f"{type(e).__name__}: {e}"
+                            )
+                        stop.wait(backoff)
+                        backoff = min(backoff * 2, 30.0)
+            finally:
+                with self._lock:
+                    self._watching -= 1
+                    release = self._closed and not self._watching
+                if release:
+                    self.transports.release(self._pool_key)
+
+        with self._lock:
+            self._watching += 1
+        self._watcher = threading.Thread(target=watch, name="registry-watch", daemon=True)
+        self._watcher.start()
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Detiene el hilo de actualización y espera a que termine.
+
+        El hilo sale al acabar su long-poll en curso (como mucho
+        ``poll_timeout`` segundos).
+
+        Args:
+            timeout (float | None, optional): Espera máxima en segundos; 0 no
+                espera. Defaults to None (sin límite).
+        """
+        self._stop.set()
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None and watcher is not threading.current_thread() and timeout != 0:
+            watcher.join(timeout)
+
+    def close(self) -> None:
+        """
+        Detiene la actualización y libera el pool de conexiones.
+
+        No espera al long-poll en curso: si el hilo sigue en él, libera el
+        pool al salir.
+        """
+        self.stop(timeout=0)
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            release = not self._watching
+        if release:
+            self.transports.release(self._pool_key)
+
+    def _ensure_loaded(self) -> None:
+        if self.version is None:
+            self.refresh()
+
+    # --- Resolución ---
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        Devuelve las entradas del directorio local.
+
+        Returns:
+            List[Dict[str, Any]]: Una entrada por réplica de cada agente.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._entries.values())
+
+    def _agent(self, name: str, group: List[Dict[str, Any]]) -> "RemoteAgent":
+        from langgraph_server.agents.client import RemoteAgent
+
+        urls = tuple(sorted(entry["url"] for entry in group))
+        with self._lock:
+            cached = self._agents.get(name)
+            if cached is not None and cached[0] == urls:
+                return cached[1]
+            # Los metadatos del directorio evitan la petición a /info
+            agent = RemoteAgent(list(urls), metadata=dict(group[0]), **self.agent_options)
+            self._agents[name] = (urls, agent)
+            return agent
+
+    def _groups(self, match: Callable[[Dict[str, Any]], bool]) -> Dict[str, List[Dict[str, Any]]]:
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in self.entries():
+            if match(entry):
+                groups.setdefault(entry.get("name") or entry["url"], []).append(entry)
+        return groups
+
+    def resolve(self, name: str) -> "RemoteAgent":
+        """
+        Devuelve el agente con ese nombre (o ruta), con todas sus réplicas.
+
+        Args:
+            name (str): Nombre del agente (``info()["name"]``) o su ruta ("rrhh").
+
+        Returns:
+            RemoteAgent: El agente, con los metadatos ya cargados.
+
+        Raises:
+            LookupError: Si el agente no está registrado.
+        """
+        path = "/" + name.lstrip("/")
+        groups = self._groups(lambda e: e.get("name") == name or e.get("path") == path)
+        if not groups:
+            raise LookupError(f"Agent '{name}' is not registered in {self.url}")
+        group_name, group = next(iter(groups.items()))
+        return self._agent(group_name, group)
+
+    def find(self, skill: str) -> List["RemoteAgent"]:
+        """
+        Devuelve los agentes que declaran una habilidad.
+
+        Args:
+            skill (str): La habilidad (sin distinguir mayúsculas).
+
+        Returns:
+            List[RemoteAgent]: Los agentes, uno por nombre.
+        """
+        skill = skill.lower()
+        groups = self._groups(
+            lambda e: skill in (s.lower() for s in e.get("skills") or [])
+        )
+        return [self._agent(name, group) for name, group in groups.items()]
+
+    def __enter__(self) -> "Registry":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,300 @@
+"""
+Retransmisión local de las ejecuciones de un ``RemoteAgent``.
+
+Cuando un ``RemoteAgent`` se ejecuta como nodo de otro grafo (por ejemplo,
+dentro de ``SupervisorChatGroup``), quien hace stream del grafo padre espera
+ver lo que produce el agente a medida que ocurre, igual que con un subgrafo
+local. ``RemoteRun`` lo consigue pidiendo la ejecución remota por streaming
+y reproduciéndola en local:
+
+- Los tokens (chunks de ``stream_mode="messages"``) se reproducen como
+  ejecuciones de chat model en los callbacks locales. Así llegan al modo
+  ``messages`` del grafo padre, a ``astream_events`` y a los tracers. Los
+  mensajes completos (herramientas, respuestas sin streaming) llegan al
+  terminar la llamada, como salida del nodo que la hace.
+- Los demás modos (``updates``, ``values``, ``custom``...) se envían al stream
+  del grafo padre con el namespace del nodo que llama como prefijo, como los
+  de un subgrafo.
+
+Los callbacks y las claves internas de LangGraph no pueden cruzar la red:
+``sanitize_config`` deja en la config solo lo que tiene sentido en el servidor.
+Cada salto repite el proceso, así que los tokens atraviesan cualquier número
+de agentes remotos encadenados.
+"""
+
+import uuid
+from typing import Any, Dict, List, Sequence, Tuple
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForChainRun,
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForChainRun,
+)
+from langchain_core.messages import AIMessageChunk, BaseMessage, message_chunk_to_message
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, LLMResult
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import (
+    get_async_callback_manager_for_config,
+    get_callback_manager_for_config,
+)
+
+try:
+    # Claves internas de LangGraph sin API pública; si cambian de módulo se
+    # usan sus valores, que forman parte del formato de los checkpoints
+    from langgraph._internal._constants import (
+        CONF,
+        CONFIG_KEY_CHECKPOINT_ID,
+        CONFIG_KEY_CHECKPOINT_MAP,
+        CONFIG_KEY_CHECKPOINT_NS,
+        CONFIG_KEY_STREAM,
+        NS_SEP,
+    )
+except ImportError:  # pragma: no cover - depende de la versión de langgraph
+    CONF = "configurable"
+    CONFIG_KEY_CHECKPOINT_ID = "checkpoint_id"
+    CONFIG_KEY_CHECKPOINT_MAP = "checkpoint_map"
+    CONFIG_KEY_CHECKPOINT_NS = "checkpoint_ns"
+    CONFIG_KEY_STREAM = "__pregel_stream"
+    NS_SEP = "|"
+
+# Claves de ``configurable`` que describen la posición en el grafo que llama
+_CALLER_KEYS = (CONFIG_KEY_CHECKPOINT_NS, CONFIG_KEY_CHECKPOINT_ID, CONFIG_KEY_CHECKPOINT_MAP)
+
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+def _serializable(value: Any) -> bool:
+    if isinstance(value, _PRIMITIVES):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(_serializable(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and _serializable(v) for k, v in value.items())
+    return False
+
+
+def sanitize_config(config: RunnableConfig | None) -> RunnableConfig | None:
+    """
+    Deja en una config solo lo que puede enviarse al servidor.
+
+    Se quitan los callbacks, las claves internas de LangGraph (``__pregel_*``
+    y la posición en el grafo que llama) y los valores no serializables.
+
+    Args:
+        config (RunnableConfig | None): La config local.
+
+    Returns:
+        RunnableConfig | None: La config para el payload.
+    """
+    if not config:
+        return config
+    sanitized: Dict[str, Any] = {}
+    for key in ("recursion_limit", "max_concurrency", "run_name"):
+        if config.get(key) is not None:
+            sanitized[key] = config[key]
+    if config.get("tags"):
+        sanitized["tags"] = [tag for tag in config["tags"] if isinstance(tag, str)]
+    if config.get("metadata"):
+        # El grafo remoto pone sus propios metadatos ``langgraph_*``
+        sanitized["metadata"] = {
+            key: value
+            for key, value in config["metadata"].items()
+            if isinstance(key, str) and not key.startswith("langgraph_") and _serializable(value)
+        }
+    if config.get(CONF):
+        sanitized[CONF] = {
+            key: value
+            for key, value in config[CONF].items()
+            if isinstance(key, str)
+            and not key.startswith("__")
+            and key not in _CALLER_KEYS
+            and _serializable(value)
+        }
+    return sanitized
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block) for block in content
+    )
+
+
+class RemoteRun:
+    """
+    Reproduce en local los eventos de una ejecución remota.
+
+    Se crea con la config local de la llamada. ``active`` indica si alguien
+    en local consume los eventos (un grafo padre que hace stream o callbacks);
+    si no, la llamada puede hacerse sin streaming.
+    """
+
+    def __init__(self, config: RunnableConfig | None, name: str):
+        """
+        Inicializa la retransmisión.
+
+        Args:
+            config (RunnableConfig | None): La config local de la llamada.
+            name (str): Nombre de la ejecución en los callbacks.
+        """
+        self.config: RunnableConfig = config or {}
+        self.name = name
+        configurable = self.config.get(CONF) or {}
+        # Stream del grafo padre (solo si hace stream con ``subgraphs``)
+        self.parent_stream = configurable.get(CONFIG_KEY_STREAM)
+        caller_ns = configurable.get(CONFIG_KEY_CHECKPOINT_NS)
+        self.caller_ns: Tuple[str, ...] = tuple(caller_ns.split(NS_SEP)) if caller_ns else ()
+        callbacks = self.config.get("callbacks")
+        handlers = getattr(callbacks, "handlers", callbacks)
+        self.has_callbacks = bool(handlers)
+        self.active = self.parent_stream is not None or self.has_callbacks
+        self._run: CallbackManagerForChainRun | AsyncCallbackManagerForChainRun | None = None
+        # Ejecuciones de chat model abiertas por id de mensaje
+        self._llm_runs: Dict[str, Tuple[Any, AIMessageChunk]] = {}
+
+    def stream_modes(self, requested: Sequence[str]) -> List[str]:
+        """
+        Modos a pedir al servidor: los pedidos más los que consume el grafo padre.
+
+        Args:
+            requested (Sequence[str]): Los modos que pidió quien llama.
+
+        Returns:
+            List[str]: Los modos de la petición remota (siempre con ``values``).
+        """
+        modes = list(dict.fromkeys(requested))
+        if self.parent_stream is not None:
+            modes += [mode for mode in self.parent_stream.modes if mode not in modes]
+        if self.has_callbacks and "messages" not in modes:
+            modes.append("messages")
+        if "values" not in modes:
+            modes.append("values")
+        return modes
+
+    def _namespace(self, frame: Dict[str, Any]) -> Tuple[str, ...]:
+        return self.caller_ns + tuple(frame.get("ns") or ())
+
+    def _llm_metadata(self, frame: Dict[str, Any], metadata: Dict[str, Any]) -> Dict[str, Any]:
+        # El namespace del nodo remoto, colgado del nodo que llama
+        remote_ns = metadata.get("langgraph_checkpoint_ns") or NS_SEP.join(
+            [*(frame.get("ns") or ()), self.name]
+        )
+        return {
+            **metadata,
+            "langgraph_checkpoint_ns": NS_SEP.join([*self.caller_ns, remote_ns]),
+        }
+
+    def _forward(self, frame: Dict[str, Any]) -> bool:
+        """Envía un frame al stream del padre; devuelve True si es un token a reproducir."""
+        mode, data = frame.get("mode"), frame.get("data")
+        if mode == "messages":
+            # Los mensajes completos los emite el modo ``messages`` del padre al
+            # terminar el nodo que llama (sin duplicar los ya transmitidos)
+            return (
+                self.has_callbacks
+                and isinstance(data, (list, tuple))
+                and isinstance(data[0], AIMessageChunk)
+            )
+        if self.parent_stream is not None and mode in self.parent_stream.modes:
+            self.parent_stream((self._namespace(frame), mode, data))
+        return False
+
+    @staticmethod
+    def _generation(chunk: AIMessageChunk) -> LLMResult:
+        return LLMResult(generations=[[ChatGeneration(message=message_chunk_to_message(chunk))]])
+
+    # --- Síncrono ---
+
+    def start(self, input: Any) -> None:
+        """Abre la ejecución local (``on_chain_start``)."""
+        if self.has_callbacks:
+            self._run = get_callback_manager_for_config(self.config).on_chain_start(
+                None, input, name=self.name, run_id=self.config.get("run_id")
+            )
+
+    def on_frame(self, frame: Dict[str, Any]) -> None:
+        """Reproduce un frame remoto."""
+        if not self._forward(frame) or self._run is None:
+            return
+        chunk, metadata = frame["data"]
+        key = chunk.id or ""
+        entry = self._llm_runs.get(key)
+        if entry is None:
+            manager = self._run.get_child()
+            manager.add_metadata(self._llm_metadata(frame, metadata or {}))
+            run = manager.on_chat_model_start(
+                {"name": self.name}, [[]], run_id=uuid.uuid4(), name=self.name
+            )[0]
+            entry = (run, chunk)
+        else:
+            entry = (entry[0], entry[1] + chunk)
+        self._llm_runs[key] = entry
+        entry[0].on_llm_new_token(_text(chunk), chunk=ChatGenerationChunk(message=chunk))
+        if chunk.chunk_position == "last":
+            self._llm_runs.pop(key)
+            entry[0].on_llm_end(self._generation(entry[1]))
+
+    def end(self, output: Any) -> None:
+        """Cierra la ejecución local (y los chat models que sigan abiertos)."""
+        for run, chunk in self._llm_runs.values():
+            run.on_llm_end(self._generation(chunk))
+        self._llm_runs.clear()
+        if self._run is not None:
+            self._run.on_chain_end(output)
+
+    def error(self, error: BaseException) -> None:
+        """Cierra la ejecución local con un error."""
+        for run, _ in self._llm_runs.values():
+            run.on_llm_error(error)
+        self._llm_runs.clear()
+        if self._run is not None:
+            self._run.on_chain_error(error)
+
+    # --- Asíncrono ---
+
+    async def astart(self, input: Any) -> None:
+        """Versión asíncrona de ``start``."""
+        if self.has_callbacks:
+            self._run = await get_async_callback_manager_for_config(self.config).on_chain_start(
+                None, input, name=self.name, run_id=self.config.get("run_id")
+            )
+
+    async def aon_frame(self, frame: Dict[str, Any]) -> None:
+        """Versión asíncrona de ``on_frame``."""
+        if not self._forward(frame) or self._run is None:
+            return
+        chunk, metadata = frame["data"]
+        key = chunk.id or ""
+        entry = self._llm_runs.get(key)
+        if entry is None:
+            manager = self._run.get_child()
+            manager.add_metadata(self._llm_metadata(frame, metadata or {}))
+            runs: List[AsyncCallbackManagerForLLMRun] = await manager.on_chat_model_start(
+                {"name": self.name}, [[]], run_id=uuid.uuid4(), name=self.name
+            )
+            entry = (runs[0], chunk)
+        else:
+            entry = (entry[0], entry[1] + chunk)
+        self._llm_runs[key] = entry
+        await entry[0].on_llm_new_token(_text(chunk), chunk=ChatGenerationChunk(message=chunk))
+        if chunk.chunk_position == "last":
+            self._llm_runs.pop(key)
+            await entry[0].on_llm_end(self._generation(entry[1]))
+
+    async def aend(self, output: Any) -> None:
+        """Versión asíncrona de ``end``."""
+        for run, chunk in self._llm_runs.values():
+            await run.on_llm_end(self._generation(chunk))
+        self._llm_runs.clear()
+        if self._run is not None:
+            await self._run.on_chain_end(output)
+
+    async def aerror(self, error: BaseException) -> None:
+        """Versión asíncrona de ``error``."""
+        for run, _ in self._llm_runs.values():
+            await run.on_llm_error(error)
+        self._llm_runs.clear()
+        if self._run is not None:
+            await self._run.on_chain_error(error)
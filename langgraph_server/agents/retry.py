@@ -0,0 +1,167 @@
+"""
+Reintentos y peticiones de cobertura (hedging) para ``RemoteAgent``.
+
+Con reintentos o duplicados activados, cada llamada lleva una cabecera
+``Idempotency-Key`` que se repite en sus reintentos y duplicados, de modo
+que ``Server`` puede reconocerlos y devolver el resultado de la ejecución
+original en lugar de repetirla.
+
+Los reintentos y los duplicados consumen un presupuesto compartido: cada
+petición deposita una fracción de reintento y cada reintento retira uno
+entero, así que en plena caída del servidor los clientes no multiplican la
+carga.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Tuple
+
+import httpx
+
+# Cabecera que identifica los intentos de una misma llamada lógica
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Política de reintentos de ``RemoteAgent``.
+
+    Attributes:
+        max_attempts (int): Intentos totales por llamada. Defaults to 3.
+        backoff (float): Espera base en segundos; crece exponencialmente con
+            jitter completo. Defaults to 0.2.
+        max_backoff (float): Espera máxima entre intentos. Defaults to 5.0.
+        retry_on_status (Tuple[int, ...]): Estados HTTP que se reintentan.
+            Defaults to (502, 504).
+        budget_ratio (float): Reintentos permitidos por petición enviada.
+            Defaults to 0.1.
+        budget_min_per_second (float): Reintentos por segundo permitidos
+            aunque haya poco tráfico. Defaults to 1.0.
+    """
+
+    max_attempts: int = 3
+    backoff: float = 0.2
+    max_backoff: float = 5.0
+    retry_on_status: Tuple[int, ...] = (502, 504)
+    budget_ratio: float = 0.1
+    budget_min_per_second: float = 1.0
+
+    def delay(self, attempt: int) -> float:
+        """Espera antes del intento ``attempt + 1`` (full jitter)."""
+        return random.uniform(0.0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+
+@dataclass
+class HedgePolicy:
+    """
+    Política de peticiones de cobertura.
+
+    Attributes:
+        percentile (float): Percentil de latencia observada tras el que se envía
+            el duplicado. Defaults to 0.95.
+        initial_delay (float): Espera antes del duplicado mientras no hay
+            suficientes muestras. Defaults to 1.0.
+        min_delay (float): Espera mínima antes del duplicado. Defaults to 0.05.
+        min_samples (int): Muestras necesarias para usar el percentil.
+            Defaults to 20.
+        window (int): Latencias recientes que se conservan. Defaults to 256.
+    """
+
+    percentile: float = 0.95
+    initial_delay: float = 1.0
+    min_delay: float = 0.05
+    min_samples: int = 20
+    window: int = 256
+
+
+class RetryBudget:
+    """Presupuesto de reintentos compartido por las llamadas de un cliente."""
+
+    def __init__(self, ratio: float = 0.1, min_per_second: float = 1.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        # Se permite acumular como mucho 10 s de reserva
+        self._cap = max(1.0, min_per_second * 10)
+        self._balance = self._cap
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.granted = 0
+        self.denied = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._balance = min(
+            self._cap, self._balance + (now - self._updated) * self.min_per_second
+        )
+        self._updated = now
+
+    def deposit(self) -> None:
+        """Cuenta una petición original."""
+        with self._lock:
+            self._refill()
+            self._balance = min(self._cap, self._balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Pide permiso para un reintento o duplicado."""
+        with self._lock:
+            self._refill()
+            if self._balance >= 1.0:
+                self._balance -= 1.0
+                self.granted += 1
+                return True
+            self.denied += 1
+            return False
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            self._refill()
+            return {"balance": self._balance, "granted": self.granted, "denied": self.denied}
+
+
+class LatencyTracker:
+    """Ventana de latencias recientes para estimar percentiles."""
+
+    def __init__(self, window: int = 256):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float | None:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def hedge_delay(policy: HedgePolicy, tracker: LatencyTracker) -> float:
+    """
+    Calcula cuánto esperar antes de enviar el duplicado.
+
+    Args:
+        policy (HedgePolicy): La política de cobertura.
+        tracker (LatencyTracker): Latencias observadas del endpoint.
+
+    Returns:
+        float: Segundos de espera.
+    """
+    if len(tracker) < policy.min_samples:
+        return max(policy.min_delay, policy.initial_delay)
+    return max(policy.min_delay, tracker.percentile(policy.percentile) or 0.0)
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Errores de transporte tras los que se puede repetir la llamada."""
+    return isinstance(
+        error, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+    )
@@ -0,0 +1,369 @@
+"""
+Streams por memoria compartida entre procesos del mismo host.
+
+Cuando un ``Server`` alimenta a un cliente de la misma máquina (otro proceso
+por loopback o por socket Unix), cada chunk grande de un stream se copia al
+socket, del socket al cliente y de nuevo al buffer del decodificador. Con
+``RemoteAgent(..., ring=RingConfig())`` los chunks viajan por un ring buffer
+en memoria compartida y por el socket solo pasa un canal de control:
+
+- El cliente crea el ring (un fichero en ``/dev/shm`` mapeado en memoria) y
+  envía su nombre en ``X-Stream-Ring``.
+- El servidor lo abre, escribe cada chunk codificado en el ring y envía por
+  el stream un registro de control con su posición; los chunks pequeños, o
+  los que no caben mientras el cliente no libera espacio, van en línea en el
+  propio registro. Responde con la misma cabecera para indicar que la usa.
+- El cliente decodifica cada chunk directamente desde la memoria compartida
+  (sin copiarlo a un ``bytes``) y libera su espacio al terminar.
+
+Si el servidor no puede abrir el ring (otro host, servidor antiguo) no
+devuelve la cabecera y el stream sigue el camino HTTP normal.
+"""
+
+import functools
+import ipaddress
+import logging
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import uuid
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from langgraph_server.agents.codecs import Codec, FrameDecoder
+from langgraph_server.agents.transport import UNIX_SCHEME
+
+logger = logging.getLogger(__name__)
+
+# Nombre del ring del cliente; el servidor la devuelve si escribe en él
+RING_HEADER = "X-Stream-Ring"
+
+# Directorio de los rings: memoria compartida si existe, si no el temporal
+RING_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+_PREFIX = "lgring-"
+_NAME = re.compile(rf"^{_PREFIX}[0-9a-f]{{32}}$")
+
+# Cabecera del ring: magic, capacidad, tamaño mínimo de chunk y posición
+# liberada por el lector (la única que escribe el otro proceso)
+_MAGIC = b"LGRING01"
+_LAYOUT = struct.Struct("<8sQQ")
+_TAIL = struct.Struct("<Q")
+_TAIL_OFFSET = _LAYOUT.size
+_HEADER_SIZE = 64
+
+# Registros de control: tipo y tamaño; los del ring llevan además su posición
+_RECORD = struct.Struct(">BI")
+_POSITION = struct.Struct(">Q")
+_INLINE = 0
+_IN_RING = 1
+
+# Rings ociosos que se conservan por tamaño para las siguientes peticiones
+_MAX_IDLE = 8
+
+_LOOPBACK_HOSTS = ("localhost",)
+
+
+@dataclass(frozen=True)
+class RingConfig:
+    """
+    Configuración del ring de memoria compartida de los streams.
+
+    Attributes:
+        size (int): Bytes de datos del ring. Un chunk mayor viaja en línea.
+            Defaults to 8 MiB.
+        min_frame (int): Los chunks más pequeños viajan en línea por el
+            socket: el registro de control costaría lo mismo. Defaults to 1024.
+    """
+
+    size: int = 8 * 1024 * 1024
+    min_frame: int = 1024
+
+
+def _is_loopback(host: str | None) -> bool:
+    if not host or host in _LOOPBACK_HOSTS:
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+@functools.lru_cache(maxsize=1024)
+def same_host(url: str) -> bool:
+    """
+    Indica si una URL apunta a un servidor de esta máquina (socket Unix o loopback).
+
+    Args:
+        url (str): La URL del agente.
+
+    Returns:
+        bool: True si el ring puede compartirse con el servidor.
+    """
+    parsed = httpx.URL(url)
+    if parsed.scheme == UNIX_SCHEME:
+        return True
+    return parsed.scheme in ("http", "https") and _is_loopback(parsed.host)
+
+
+def local_client(client: Tuple[str, int] | None) -> bool:
+    """
+    Indica si una petición llega de esta máquina.
+
+    Args:
+        client (Tuple[str, int] | None): El ``scope["client"]`` de la petición
+            (None en sockets Unix).
+
+    Returns:
+        bool: True si la petición puede usar un ring.
+    """
+    return client is None or _is_loopback(client[0])
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class SharedRing:
+    """
+    Ring del lado del cliente (lector): lo crea, lo lee y libera su espacio.
+
+    Un ring sirve a un único stream a la vez; al terminar vuelve al pool
+    con ``release_ring``.
+    """
+
+    def __init__(self, config: RingConfig):
+        """
+        Crea el fichero del ring y lo mapea en memoria.
+
+        Args:
+            config (RingConfig): Tamaño del ring y tamaño mínimo de chunk.
+        """
+        self.config = config
+        self.name = f"{_PREFIX}{uuid.uuid4().hex}"
+        self.path = os.path.join(RING_DIR, self.name)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            os.ftruncate(fd, _HEADER_SIZE + config.size)
+            self._map = mmap.mmap(fd, _HEADER_SIZE + config.size)
+        except BaseException:
+            _unlink(self.path)
+            raise
+        finally:
+            os.close(fd)
+        _LAYOUT.pack_into(self._map, 0, _MAGIC, config.size, config.min_frame)
+        self.reset()
+        # El fichero se borra aunque el ring no se cierre (también al salir)
+        self._finalizer = weakref.finalize(self, _unlink, self.path)
+
+    def reset(self) -> None:
+        """Deja el ring vacío para un stream nuevo."""
+        _TAIL.pack_into(self._map, _TAIL_OFFSET, 0)
+
+    def view(self, position: int, size: int) -> memoryview:
+        """
+        Devuelve el chunk escrito en ``position`` sin copiarlo.
+
+        Args:
+            position (int): Posición absoluta del chunk.
+            size (int): Bytes del chunk.
+
+        Returns:
+            memoryview: Vista sobre la memoria compartida (hay que liberarla).
+        """
+        offset = _HEADER_SIZE + position % self.config.size
+        return memoryview(self._map)[offset : offset + size]
+
+    def consumed(self, position: int) -> None:
+        """Libera el espacio del ring hasta ``position`` para que el servidor lo reutilice."""
+        _TAIL.pack_into(self._map, _TAIL_OFFSET, position)
+
+    def close(self) -> None:
+        """Desmapea el ring y borra su fichero."""
+        self._finalizer()
+        self._map.close()
+
+
+class RingWriter:
+    """
+    Ring del lado del servidor (escritor) de un stream.
+
+    Escribe cada chunk codificado en el ring si cabe y devuelve el registro
+    de control que lo referencia; si no, el registro lleva el chunk en línea.
+    """
+
+    def __init__(self, ring: mmap.mmap, size: int, min_frame: int):
+        self._map = ring
+        self.size = size
+        self.min_frame = min_frame
+        self.position = _TAIL.unpack_from(ring, _TAIL_OFFSET)[0]
+
+    @classmethod
+    def open(cls, name: str | None) -> "RingWriter | None":
+        """
+        Abre el ring que anuncia un cliente.
+
+        Solo se aceptan rings con el nombre y la cabecera esperados, del mismo
+        usuario y en ``RING_DIR``: la cabecera no puede apuntar a otro fichero.
+
+        Args:
+            name (str | None): El valor de ``X-Stream-Ring``.
+
+        Returns:
+            RingWriter | None: El escritor, o None si el ring no es utilizable.
+        """
+        if not name or not _NAME.match(name):
+            return None
+        try:
+            fd = os.open(os.path.join(RING_DIR, name), os.O_RDWR | getattr(os, "O_NOFOLLOW", 0))
+        except OSError:
+            return None
+        try:
+            stat = os.fstat(fd)
+            if hasattr(os, "geteuid") and stat.st_uid != os.geteuid():
+                return None
+            if stat.st_size <= _HEADER_SIZE:
+                return None
+            ring = mmap.mmap(fd, stat.st_size)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Stream ring {name} not usable: {e}")
+            return None
+        finally:
+            os.close(fd)
+        magic, size, min_frame = _LAYOUT.unpack_from(ring, 0)
+        if magic != _MAGIC or size != stat.st_size - _HEADER_SIZE:
+            ring.close()
+            return None
+        return cls(ring, size, min_frame)
+
+    def _reserve(self, size: int) -> int | None:
+        """Posición donde cabe un chunk contiguo, o None si el lector no ha liberado espacio."""
+        if size < self.min_frame or size > self.size:
+            return None
+        position = self.position
+        offset = position % self.size
+        if offset + size > self.size:
+            # No cabe antes del final: se salta al principio del ring
+            position += self.size - offset
+        tail = _TAIL.unpack_from(self._map, _TAIL_OFFSET)[0]
+        if position + size - tail > self.size:
+            return None
+        return position
+
+    def frame(self, payload: bytes) -> bytes:
+        """
+        Escribe un chunk y devuelve su registro de control.
+
+        Args:
+            payload (bytes): El chunk codificado.
+
+        Returns:
+            bytes: El registro a enviar por el stream.
+        """
+        size = len(payload)
+        position = self._reserve(size)
+        if position is None:
+            return _RECORD.pack(_INLINE, size) + payload
+        offset = _HEADER_SIZE + position % self.size
+        self._map[offset : offset + size] = payload
+        self.position = position + size
+        return _RECORD.pack(_IN_RING, size) + _POSITION.pack(position)
+
+    def close(self) -> None:
+        """Desmapea el ring."""
+        self._map.close()
+
+
+class RingFrameDecoder(FrameDecoder):
+    """
+    Decodifica los registros de control de un stream servido por un ring.
+
+    Los chunks del ring se decodifican desde la memoria compartida y su
+    espacio se libera en cuanto el objeto está reconstruido.
+    """
+
+    def __init__(self, codec: Codec, ring: SharedRing):
+        super().__init__(codec)
+        self.ring = ring
+
+    def feed(self, data: bytes) -> List[Any]:
+        self.buffer.extend(data)
+        frames = []
+        start = 0
+        while len(self.buffer) - start >= _RECORD.size:
+            kind, size = _RECORD.unpack_from(self.buffer, start)
+            body = start + _RECORD.size
+            if kind == _IN_RING:
+                if len(self.buffer) - body < _POSITION.size:
+                    break
+                (position,) = _POSITION.unpack_from(self.buffer, body)
+                start = body + _POSITION.size
+                view = self.ring.view(position, size)
+                try:
+                    frames.append(self.codec.decode_buffer(view))
+                finally:
+                    view.release()
+                    self.ring.consumed(position + size)
+            else:
+                if len(self.buffer) - body < size:
+                    break
+                start = body + size
+                frames.append(self.codec.decode(bytes(self.buffer[body:start])))
+        del self.buffer[:start]
+        return frames
+
+
+_idle: Dict[RingConfig, List[SharedRing]] = {}
+_idle_lock = threading.Lock()
+
+
+def acquire_ring(config: RingConfig) -> SharedRing | None:
+    """
+    Obtiene un ring libre del pool del proceso (o crea uno).
+
+    Args:
+        config (RingConfig): La configuración del ring.
+
+    Returns:
+        SharedRing | None: El ring, o None si no se puede crear (el stream
+        sigue por HTTP).
+    """
+    with _idle_lock:
+        rings = _idle.get(config)
+        if rings:
+            return rings.pop()
+    try:
+        return SharedRing(config)
+    except OSError as e:
+        logger.warning(f"Could not create a stream ring in {RING_DIR}: {e}")
+        return None
+
+
+def release_ring(ring: SharedRing, reusable: bool) -> None:
+    """
+    Devuelve un ring al pool.
+
+    Un stream cortado a medias puede seguir escribiendo en el ring hasta que
+    el servidor detecta la desconexión: ese ring no se reutiliza.
+
+    Args:
+        ring (SharedRing): El ring del stream.
+        reusable (bool): Si el servidor ya no va a escribir en él.
+    """
+    if reusable:
+        ring.reset()
+        with _idle_lock:
+            rings = _idle.setdefault(ring.config, [])
+            if len(rings) < _MAX_IDLE:
+                rings.append(ring)
+                return
+    ring.close()
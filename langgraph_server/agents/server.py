@@ -1,4 +1,10 @@
-from typing import List, Dict, Any, Callable, Optional
+import asyncio
+from contextlib import asynccontextmanager
+import hashlib
+import json
+import os
+import time
+from typing import List, Dict, Any, Callable, Optional, Tuple
 import logging
 
 
@@ -6,10 +12,65 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 import uvicorn
-import jsonpickle
-from starlette.responses import StreamingResponse
+from starlette.responses import Response, StreamingResponse
 
 from langgraph_server.agents import Agent
+from langgraph_server.agents.admission import (
+    PRIORITY_HEADER,
+    AdmissionConfig,
+    AdmissionController,
+    AdmissionTicket,
+    Overloaded,
+)
+from langgraph_server.agents.cache import CacheLookup, ResponseCache
+from langgraph_server.agents.codecs import (
+    LEGACY_CODEC,
+    Codec,
+    codec_for_content_type,
+    negotiate,
+)
+from langgraph_server.agents.deadline import (
+    ClientDisconnected,
+    DeadlineExceeded,
+    bounded,
+    current_deadline,
+    deadline_from_headers,
+    remaining,
+    use_deadline,
+    wait_until,
+)
+from langgraph_server.agents.executor import AgentExecutor, ExecutorConfig
+from langgraph_server.agents.checkpoint import CheckpointStore
+from langgraph_server.agents.idempotency import IdempotencyStore
+from langgraph_server.agents.inproc import (
+    bind_inproc_loop,
+    is_inproc,
+    register_inproc,
+)
+from langgraph_server.agents.sessions import (
+    SESSION_HEADER,
+    ThreadDiverged,
+    read_session,
+    run_session,
+)
+from langgraph_server.agents.singleflight import SingleFlight
+from langgraph_server.agents.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    Counter,
+    Gauge,
+    RequestObservation,
+    ServerMetrics,
+)
+from langgraph_server.agents.registry import (
+    ADVERTISE_ENV,
+    Registrar,
+    RegistryService,
+    advertised_url,
+)
+from langgraph_server.agents.retry import IDEMPOTENCY_HEADER
+from langgraph_server.agents.ring import RING_HEADER, RingWriter, local_client
+from langgraph_server.agents.tracing import Span, Tracer, current_span, get_tracer, use_span
+from langgraph_server.agents.workers import run_workers
 from langgraph_server.types import AgentMetadata, InvokeParams, StreamParams
 from pydantic import BaseModel
 
@@ -26,6 +87,166 @@ class RequestServer(BaseModel):
     stream: Optional[bool] = False
 
 
+def _split_payload(payload: Any) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Separa la entrada del agente de los parámetros de ejecución.
+
+    ``RemoteAgent`` envía un diccionario con la forma de ``InvokeParams`` /
+    ``StreamParams``; los valores vacíos se descartan para usar los defaults
+    del grafo. Cualquier otro payload se trata como la entrada directa.
+
+    Args:
+        payload (Any): El payload decodificado de la petición.
+
+    Returns:
+        Tuple[Any, Dict[str, Any]]: La entrada y los kwargs para el agente.
+    """
+    if not isinstance(payload, dict) or "input" not in payload:
+        return payload, {}
+    kwargs = {
+        key: value
+        for key, value in payload.items()
+        if key != "input" and value is not None and value != ()
+    }
+    return payload["input"], kwargs
+
+
+async def _decode_request(
+    request: Request, observation: RequestObservation | None = None
+) -> Any:
+    """Decodifica el cuerpo con el codec indicado en ``Content-Type``."""
+    raw_body = await request.body()
+    codec = codec_for_content_type(request.headers.get("content-type"), is_inproc(request.scope))
+    started = time.perf_counter()
+    payload = codec.decode(raw_body)
+    if observation is not None:
+        observation.decoded(len(raw_body), time.perf_counter() - started)
+    return payload
+
+
+async def _wait_disconnect(request: Request) -> None:
+    """Espera a que el cliente cierre la conexión (con el cuerpo ya leído)."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _guarded(request: Request, awaitable: Any, deadline: float | None) -> Any:
+    """
+    Ejecuta un handler y lo cancela si el cliente se desconecta o vence su plazo.
+
+    Args:
+        request (Request): La petición (con el cuerpo ya leído).
+        awaitable (Any): La corrutina del handler.
+        deadline (float | None): Plazo de la petición.
+
+    Returns:
+        Any: El resultado del handler.
+    """
+    task = asyncio.ensure_future(awaitable)
+    watcher = asyncio.ensure_future(_wait_disconnect(request))
+    try:
+        left = remaining(deadline)
+        done, _ = await asyncio.wait(
+            {task, watcher},
+            timeout=None if left is None else max(0.0, left),
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if task in done:
+            return task.result()
+        if watcher in done:
+            raise ClientDisconnected("Client disconnected")
+        raise DeadlineExceeded("Deadline exceeded")
+    finally:
+        task.cancel()
+        watcher.cancel()
+
+
+def _encode_response(
+    request: Request,
+    result: Any,
+    headers: Dict[str, str] | None = None,
+    observation: RequestObservation | None = None,
+) -> Response:
+    """Codifica el resultado con el codec negociado por ``Accept``."""
+    codec = negotiate(request.headers.get("accept"), is_inproc(request.scope))
+    started = time.perf_counter()
+    content = codec.encode_response(result)
+    if observation is not None:
+        observation.encoded(len(content), time.perf_counter() - started)
+    return Response(content=content, media_type=codec.media_type, headers=headers)
+
+
+# Endpoints que ``add_agent`` crea para cada agente
+_AGENT_ENDPOINTS = ("info", "invoke", "ainvoke", "stream", "astream", "batch", "state")
+
+# Cabeceras para que proxies y navegadores no acumulen los frames
+_STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+class _ObservedStream(StreamingResponse):
+    """
+    Stream que cierra su petición (métricas, span y hueco de admisión) al terminar.
+
+    El cierre no puede quedarse solo en el generador de frames: si el cliente
+    se desconecta antes de recibir el primer frame, el generador nunca arranca
+    y su ``finally`` no se ejecuta.
+    """
+
+    def __init__(
+        self,
+        content: Any,
+        observation: RequestObservation,
+        ring: RingWriter | None = None,
+        **kwargs: Any,
+    ):
+        super().__init__(content, **kwargs)
+        self.observation = observation
+        self.ring = ring
+
+    async def __call__(self, scope, receive, send) -> None:
+        error: BaseException | None = None
+        try:
+            await super().__call__(scope, receive, send)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            await self.body_iterator.aclose()
+            if self.ring is not None:
+                self.ring.close()
+            self.observation.finish(error)
+
+
+def _to_frame(chunk: Any, stream_mode: Any, subgraphs: bool) -> Dict[str, Any]:
+    """
+    Normaliza un chunk de ``stream``/``astream`` a un frame ``{ns, mode, data}``.
+
+    LangGraph devuelve ``data``, ``(mode, data)``, ``(ns, data)`` o
+    ``(ns, mode, data)`` según ``stream_mode`` y ``subgraphs``; el frame
+    conserva esa información para que ``RemoteAgent`` reconstruya la misma
+    forma en el cliente.
+
+    Args:
+        chunk (Any): El chunk producido por el grafo.
+        stream_mode (Any): El ``stream_mode`` solicitado (str, lista o None).
+        subgraphs (bool): Si se pidieron los streams de los subgrafos.
+
+    Returns:
+        Dict[str, Any]: El frame listo para codificar.
+    """
+    multi = isinstance(stream_mode, (list, tuple))
+    ns: Tuple[str, ...] = ()
+    if subgraphs and isinstance(chunk, tuple):
+        ns, chunk = chunk[0], chunk[1] if len(chunk) == 2 else chunk[1:]
+    if multi and isinstance(chunk, tuple):
+        mode, data = chunk
+    else:
+        mode, data = stream_mode, chunk
+    return {"ns": list(ns), "mode": mode, "data": data}
+
+
 class Server:
     """
     Servidor para desplegar agentes de LangGraph dinámicamente.
@@ -33,15 +254,54 @@ class Server:
     Esta clase facilita la creación de un servidor FastAPI que puede registrar
     y ejecutar agentes de LangGraph con endpoints generados automáticamente.
     """
-    def __init__(self, title: str = "LangGraph Dynamic Server"):
+    def __init__(
+        self,
+        title: str = "LangGraph Dynamic Server",
+        executor: ExecutorConfig | None = None,
+        cache: ResponseCache | None = None,
+        tracer: Tracer | None = None,
+        idempotency: IdempotencyStore | None = None,
+        registry: str | RegistryService | None = None,
+        registry_service: RegistryService | None = None,
+        advertise_url: str | None = None,
+        registry_ttl: float = 30.0,
+        checkpoints: CheckpointStore | None = None,
+        name: str | None = None,
+    ):
         """
         Inicializa el servidor.
 
         Args:
             title (str, optional): El título de la aplicación FastAPI.
                 Defaults to "LangGraph Dynamic Server".
+            executor (ExecutorConfig | None, optional): Configuración por defecto
+                del pool de ejecución de cada agente. Defaults to None.
+            tracer (Tracer | None, optional): Tracer para los spans de cada
+                petición. Defaults to None (el tracer por defecto del proceso).
+            idempotency (IdempotencyStore | None, optional): Resultados recientes
+                por ``Idempotency-Key`` para no repetir la ejecución de un
+                reintento. Defaults to None (un almacén con TTL de 60 s).
+            registry (str | RegistryService | None, optional): Registro de la
+                malla en el que se publican los agentes (URL o instancia en el
+                mismo proceso), con heartbeats mientras el servidor vive.
+                Defaults to None.
+            registry_service (RegistryService | None, optional): Registro que
+                este servidor aloja en ``/registry``; si no se indica
+                ``registry``, los agentes propios se publican en él. Solo tiene
+                sentido con un único worker. Defaults to None.
+            advertise_url (str | None, optional): URL con la que otros procesos
+                alcanzan este servidor. Defaults to None (se deduce del host y
+                puerto de ``run``).
+            registry_ttl (float, optional): Vida del registro sin heartbeat.
+                Defaults to 30.0.
+            checkpoints (CheckpointStore | None, optional): Checkpointer
+                persistente que ``add_agent`` asigna a los agentes sin
+                ``memory``. Defaults to None.
+            name (str | None, optional): Publica el servidor en el proceso:
+                sus agentes se alcanzan con ``RemoteAgent("inproc://<name>/<ruta>")``
+                sin red ni serialización. Defaults to None.
         """
-        self.app = FastAPI(title=title)
+        self.app = FastAPI(title=title, lifespan=self._lifespan)
 
         self.app.add_middleware(
             CORSMiddleware,
@@ -53,11 +313,40 @@ class Server:
 
         self.registered_paths: List[str] = []
         self.agents: Dict[str, Any] = {}
+        self.executor_config = executor or ExecutorConfig()
+        self.executors: Dict[str, AgentExecutor] = {}
+        self.caches: Dict[str, ResponseCache] = {}
+        self.admission: Dict[str, AdmissionController] = {}
+        self.singleflights: Dict[str, SingleFlight] = {}
+
+        # Métricas en memoria; pools y cachés se leen en cada scrape
+        self.metrics = ServerMetrics()
+        self.metrics.add_collector(self._runtime_metrics)
+        self.tracer = tracer or get_tracer()
+        self.idempotency = idempotency or IdempotencyStore()
+        self.checkpoints = checkpoints
+
+        # Registro de la malla: alojado aquí y/o en el que se publican los agentes
+        self.registry_service = registry_service
+        if registry_service is not None:
+            registry_service.mount(self.app)
+        registry = registry or registry_service
+        self.registrar = (
+            Registrar(registry, self._registry_entries, registry_ttl) if registry is not None else None
+        )
+        self.advertise_url = advertise_url
+
+        # Transporte en proceso: mismos handlers, sin sockets ni enrutado
+        self.name = name
+        self._handlers: Dict[Tuple[str, str], Callable] = {}
+        if name is not None:
+            register_inproc(name, self.app, self._handlers)
 
         # Mapeo de métodos de agente a configuraciones de endpoint
 
         # Endpoints globales
         self.app.get("/health")(self._health_check)
+        self.app.get("/metrics")(self._metrics)
 
     def add_agent(
         self,
@@ -66,16 +355,35 @@ class Server:
         name: str = None,
         description: str = None,
         skills: List[str] = None,
+        executor: ExecutorConfig | None = None,
+        cache: ResponseCache | None = None,
+        admission: AdmissionConfig | None = None,
+        singleflight: SingleFlight | None = None,
     ):
         """
         Registra un agente y crea endpoints automáticamente para todos sus métodos.
 
+        Si el servidor tiene ``checkpoints`` y el agente no tiene checkpointer
+        propio, se le asigna uno persistente con sus hilos separados por ruta.
+
         Args:
             agent: El agente a registrar (Agent wrapper o CompiledStateGraph)
             path: Ruta base del agente (ej: "/math")
             name
             description
             skills
+            executor: Configuración del pool de ejecución del agente. Si es None
+                se usa la configuración por defecto del servidor. Un pool de
+                procesos no admite agentes con checkpointer propio.
+            cache: Caché de respuestas del agente (opcional). Las peticiones con
+                ``thread_id`` nunca se cachean.
+            admission: Control de admisión del agente (opcional): límite de
+                concurrencia y cola acotada con prioridades (cabecera
+                ``X-Priority``). Lo que no cabe se rechaza con 429/503 y
+                ``Retry-After``.
+            singleflight: Ejecuciones compartidas (opcional): las peticiones
+                idénticas simultáneas sin ``thread_id`` reciben el resultado, o
+                los chunks, de una sola ejecución. No guarda nada al terminar.
         """
         if skills is None:
             skills = []
@@ -88,6 +396,10 @@ class Server:
         if not path.startswith("/"):
             path = "/" + path
 
+        # Pool acotado para no bloquear el event loop con llamadas síncronas.
+        # Se crea antes de registrar la ruta: rechaza agentes que no caben en él
+        agent_executor = AgentExecutor(agent, executor or self.executor_config)
+
         self.registered_paths.append(path)
 
         # 🎯 DETECCIÓN AUTOMÁTICA DE METADATA DEL AGENT
@@ -102,77 +414,665 @@ class Server:
         # Guardar agente con metadata (automática o manual)
         self.agents[path] = agent_metadata
 
-        def info():
-            return agent.info()
+        self.executors[path] = agent_executor
+        if cache is not None:
+            self.caches[path] = cache
+        self._attach_checkpointer(agent, path, agent_executor)
+        tracer = self.tracer
+        idempotency = self.idempotency
+        if admission is not None:
+            admission = AdmissionController(admission, agent_executor.max_in_flight)
+            self.admission[path] = admission
+        if singleflight is not None:
+            self.singleflights[path] = singleflight
+
+        def _lookup(request: Request, kind: str, input: Any, kwargs: Dict[str, Any]):
+            if cache is None:
+                return CacheLookup()
+            return cache.lookup(
+                kind, input, kwargs, request.headers.get("cache-control")
+            )
+
+        def _flight_key(
+            request: Request, kind: str, input: Any, kwargs: Dict[str, Any], cached: CacheLookup
+        ) -> Tuple[str, str] | None:
+            if singleflight is None:
+                return None
+            # La caché ya calculó el hash canónico de la petición
+            key = SingleFlight.key(
+                kind, input, kwargs, request.headers.get("cache-control"), cached.key
+            )
+            # Con la ruta: la misma instancia puede servir a varios agentes
+            return None if key is None else (path, key)
+
+        def _shared(
+            request: Request,
+            input: Any,
+            kwargs: Dict[str, Any],
+            cached: CacheLookup,
+            execute: Callable,
+        ) -> Callable:
+            # Las peticiones idénticas simultáneas esperan la misma ejecución
+            key = _flight_key(request, "invoke", input, kwargs, cached)
+            if key is None:
+                return execute
+
+            async def shared():
+                result, joined = await singleflight.run(key, execute)
+                current_span().set_attribute("singleflight", "shared" if joined else "leader")
+                return result
+
+            return shared
+
+        def info(request: Request):
+            # ETag para que los clientes revaliden sin volver a descargar
+            body = json.dumps(agent.info(), sort_keys=True, default=str).encode("utf-8")
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            if request.headers.get("if-none-match") == etag:
+                return Response(status_code=304, headers={"ETag": etag})
+            return Response(
+                content=body, media_type="application/json", headers={"ETag": etag}
+            )
+
+        def _end_span(span: Span):
+            def end(error: BaseException | None) -> None:
+                if error is not None:
+                    span.record_exception(error)
+                span.end()
+
+            return end
+
+        def _observed(endpoint: str, handler: Callable):
+            # Los streams cierran la petición (métricas, span y hueco de
+            # admisión) al terminar de enviar los frames
+            async def observed(request: Request):
+                observation = self.metrics.observe(path, endpoint)
+                span = tracer.start_span(
+                    f"{path}/{endpoint}",
+                    Tracer.extract(request.headers),
+                    kind="server",
+                    attributes={"agent": path, "endpoint": endpoint},
+                )
+                observation.add_done_callback(_end_span(span))
+                # El plazo lo heredan la ejecución y las llamadas remotas anidadas
+                deadline = deadline_from_headers(request.headers)
+                with use_span(span), use_deadline(deadline):
+                    try:
+                        if deadline is not None:
+                            span.set_attribute("deadline_seconds", round(remaining(deadline), 3))
+                        if admission is not None:
+                            priority = admission.priority_of(request.headers.get(PRIORITY_HEADER))
+                            span.set_attribute("priority", priority)
+                            await wait_until(admission.acquire(priority), deadline)
+                            observation.add_done_callback(AdmissionTicket(admission).release)
+                        with tracer.span("decode"):
+                            payload = await _decode_request(request, observation)
+                        response = await _guarded(
+                            request, handler(request, payload, observation), deadline
+                        )
+                    except (Overloaded, DeadlineExceeded, ClientDisconnected, ThreadDiverged) as e:
+                        observation.finish(e)
+                        headers = {"Retry-After": str(e.retry_after)} if isinstance(e, Overloaded) else None
+                        return Response(
+                            content=json.dumps(
+                                {"detail": str(e), "reason": getattr(e, "reason", e.metric_status)}
+                            ),
+                            status_code=e.status_code,
+                            media_type="application/json",
+                            headers=headers,
+                        )
+                    except BaseException as e:
+                        observation.finish(e)
+                        raise
+                if not isinstance(response, StreamingResponse):
+                    observation.finish()
+                return response
+
+            observed.__name__ = endpoint
+            return observed
+
+        def _traced(kwargs: Dict[str, Any], span: Span, in_process: bool = True) -> Dict[str, Any]:
+            # Spans por nodo/herramienta; los callbacks no pueden cruzar a otro proceso
+            if not tracer.enabled or not in_process:
+                return kwargs
+            config = dict(kwargs.get("config") or {})
+            callbacks = config.get("callbacks")
+            if callbacks is not None and not isinstance(callbacks, list):
+                return kwargs
+            config["callbacks"] = [*(callbacks or []), tracer.callback_handler(span)]
+            return {**kwargs, "config": config}
+
+        in_process = agent_executor.config.kind == "thread"
+
+        def _respond(
+            request: Request,
+            result: Any,
+            cached: CacheLookup,
+            observation: RequestObservation,
+            headers: Dict[str, str] | None = None,
+        ):
+            current_span().set_attribute("cache", cached.status)
+            with tracer.span("encode"):
+                return _encode_response(
+                    request, result, {**cached.headers(), **(headers or {})}, observation
+                )
+
+        # Las sesiones necesitan leer el checkpoint desde este proceso
+        sessions_enabled = bool(getattr(agent, "checkpointer", None)) and hasattr(agent, "aget_state")
+
+        def _session_of(request: Request, kwargs: Dict[str, Any], local: bool) -> str | None:
+            # Modo sesión: el cliente envía solo los mensajes nuevos y recibe la diferencia
+            requested = request.headers.get(SESSION_HEADER)
+            config = kwargs.get("config") or {}
+            if (
+                requested is None
+                or not sessions_enabled
+                or not local
+                or (config.get("configurable") or {}).get("thread_id") is None
+            ):
+                return None
+            current_span().set_attribute("session", requested)
+            return requested
+
+        async def _run(execute: Callable, session: str | None, read_state: Callable):
+            if session is None:
+                return await execute(), None
+            return await run_session(session, read_state, execute)
+
+        async def _once(request: Request, execute: Callable) -> Any:
+            # Los reintentos de RemoteAgent repiten la clave: se reutiliza la ejecución
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return await execute()
+            result, replayed = await idempotency.run((path, key), execute)
+            current_span().set_attribute("idempotent_replay", replayed)
+            return result
 
         # Crear endpoints para cada método disponible
-        async def invoke(request: Request):
-            raw_body = await request.body()
-            payload = jsonpickle.decode(raw_body)
+        async def invoke(request: Request, payload: Any, observation: RequestObservation):
+            input, kwargs = _split_payload(payload)
+            cached = _lookup(request, "invoke", input, kwargs)
+            if cached.hit:
+                return _respond(request, cached.value, cached, observation)
+
+            session = _session_of(request, kwargs, in_process)
+
+            async def execute():
+                with tracer.span("execute") as span:
+                    return await agent_executor.call(
+                        "invoke", input, **_traced(kwargs, span, in_process)
+                    )
+
+            async def read_state():
+                return await asyncio.to_thread(agent.get_state, kwargs["config"])
+
+            execute = _shared(request, input, kwargs, cached, execute)
+            response, headers = await _once(request, lambda: _run(execute, session, read_state))
+            cached.store(response)
+            return _respond(request, response, cached, observation, headers)
 
-            print("kwargs received and decoded:", payload)
+        async def ainvoke(request: Request, payload: Any, observation: RequestObservation):
+            input, kwargs = _split_payload(payload)
+            cached = _lookup(request, "invoke", input, kwargs)
+            if cached.hit:
+                return _respond(request, cached.value, cached, observation)
 
-            response = agent.invoke(payload)
-            print("response", response)
-            return jsonpickle.encode(response)
+            session = _session_of(request, kwargs, True)
 
-        async def ainvoke(request: InvokeParams):
-            raw_body = await request.body()
-            payload = jsonpickle.decode(raw_body)
+            async def execute():
+                with tracer.span("execute") as span:
+                    return await agent_executor.acall(
+                        agent.ainvoke, input, **_traced(kwargs, span)
+                    )
 
-            print("kwargs received and decoded:", payload)
-            response = await agent.ainvoke(payload)
-            print("response", response)
-            return jsonpickle.encode(response)
+            async def read_state():
+                return await agent.aget_state(kwargs["config"])
 
-        async def stream(request: StreamParams):
-            raw_body = await request.body()
-            payload = jsonpickle.decode(raw_body)
+            execute = _shared(request, input, kwargs, cached, execute)
+            response, headers = await _once(request, lambda: _run(execute, session, read_state))
+            cached.store(response)
+            return _respond(request, response, cached, observation, headers)
 
-            print("kwargs received and decoded:", payload)
-            return StreamingResponse(
-                content=_event_generator(payload),
-                media_type="application/json",
+        async def state(request: Request, payload: Any, observation: RequestObservation):
+            # Estado completo de un hilo en modo sesión, sin ejecutar el agente
+            _, kwargs = _split_payload(payload)
+            config = kwargs.get("config") or {}
+            if not sessions_enabled or (config.get("configurable") or {}).get("thread_id") is None:
+                return Response(
+                    content=json.dumps({"detail": "No thread state for this agent"}),
+                    status_code=404,
+                    media_type="application/json",
+                )
+            values, headers = await read_session(lambda: agent.aget_state(config))
+            return _respond(request, values, CacheLookup(), observation, headers)
+
+        def _stream_response(
+            request: Request, payload: Any, chunks_for, observation: RequestObservation
+        ) -> StreamingResponse:
+            codec = negotiate(request.headers.get("accept"), is_inproc(request.scope))
+            input, kwargs = _split_payload(payload)
+            # Los clientes originales esperan solo la salida del nodo "agent"
+            legacy = codec is LEGACY_CODEC
+            kind = "stream:legacy" if legacy else "stream"
+            cached = _lookup(request, kind, input, kwargs)
+            span = current_span()
+            span.set_attribute("cache", cached.status)
+            key = None if cached.hit else _flight_key(request, kind, input, kwargs, cached)
+            if key is None:
+                source = chunks_for(input, kwargs, span)
+            else:
+                # Cada suscriptor recibe los chunks de la ejecución compartida
+                source = singleflight.stream(
+                    key,
+                    lambda: chunks_for(input, kwargs, span),
+                    lambda joined: span.set_attribute(
+                        "singleflight", "shared" if joined else "leader"
+                    ),
+                )
+            chunks = _frames(bounded(source, current_deadline()), kwargs, legacy)
+            headers = {**_STREAM_HEADERS, **cached.headers()}
+            # Clientes del mismo host: los chunks van por su ring de memoria compartida
+            ring = None
+            if RING_HEADER in request.headers and local_client(request.scope.get("client")):
+                ring = RingWriter.open(request.headers[RING_HEADER])
+            if ring is not None:
+                span.set_attribute("stream_ring", True)
+                headers[RING_HEADER] = request.headers[RING_HEADER]
+            return _ObservedStream(
+                _encode_frames(chunks, codec, cached, observation, ring),
+                observation,
+                ring,
+                media_type=codec.stream_media_type,
+                headers=headers,
             )
 
-        async def astream(request: StreamParams):
-            raw_body = await request.body()
-            payload = jsonpickle.decode(raw_body)
+        async def stream(request: Request, payload: Any, observation: RequestObservation):
+            return _stream_response(request, payload, _event_generator, observation)
+
+        async def astream(request: Request, payload: Any, observation: RequestObservation):
+            return _stream_response(request, payload, _async_event_generator, observation)
+
+        async def _frames(chunks, kwargs: Dict[str, Any], legacy: bool):
+            stream_mode = kwargs.get("stream_mode") or getattr(agent, "stream_mode", None)
+            subgraphs = bool(kwargs.get("subgraphs"))
+            try:
+                async for chunk in chunks:
+                    if legacy:
+                        if isinstance(chunk, dict) and "agent" in chunk:
+                            yield chunk.get("agent")
+                        continue
+                    yield _to_frame(chunk, stream_mode, subgraphs)
+            finally:
+                await chunks.aclose()
+
+        def _encode_frame(
+            codec: Codec, chunk: Any, observation: RequestObservation, ring: RingWriter | None
+        ) -> bytes:
+            started = time.perf_counter()
+            if ring is None:
+                frame = codec.encode_frame(chunk)
+                size = len(frame)
+            else:
+                payload = codec.encode(chunk)
+                size = len(payload)
+                frame = ring.frame(payload)
+            observation.chunk(size, time.perf_counter() - started)
+            return frame
 
-            print("kwargs received and decoded:", payload)
-            return StreamingResponse(
-                content=_async_event_generator(payload),
-                media_type="application/json",
+        async def _encode_frames(
+            chunks,
+            codec: Codec,
+            cached: CacheLookup,
+            observation: RequestObservation,
+            ring: RingWriter | None = None,
+        ):
+            error: BaseException | None = None
+            try:
+                # Un acierto reproduce los chunks guardados sin ejecutar el agente
+                if cached.hit:
+                    await chunks.aclose()
+                    for chunk in cached.value:
+                        yield _encode_frame(codec, chunk, observation, ring)
+                    return
+                produced = []
+                async for chunk in chunks:
+                    produced.append(chunk)
+                    yield _encode_frame(codec, chunk, observation, ring)
+                cached.store(produced)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                observation.finish(error)
+
+        async def batch(request: Request, payload: Any, observation: RequestObservation):
+            codec = negotiate(request.headers.get("accept"), is_inproc(request.scope))
+            span = current_span()
+
+            return _ObservedStream(
+                _encode_frames(
+                    bounded(_batch_generator(request, payload, span), current_deadline()),
+                    codec,
+                    CacheLookup(),
+                    observation,
+                ),
+                observation,
+                media_type=codec.stream_media_type,
+                headers=_STREAM_HEADERS,
             )
 
-        async def _async_event_generator(request):
-            async for chunk in agent.astream(request):
-                print("chunk", chunk)
-                yield jsonpickle.encode(chunk.get("agent")) + "\n"
+        async def _batch_generator(request: Request, payload: Dict[str, Any], parent: Span):
+            # Cada resultado se envía en cuanto termina, etiquetado con su índice
+            inputs = payload.get("inputs") or []
+            configs = payload.get("config")
+            max_concurrency = payload.get("max_concurrency") or agent_executor.max_in_flight
+            common = {
+                key: value
+                for key, value in payload.items()
+                if key not in ("inputs", "config", "max_concurrency", "return_exceptions")
+                and value is not None
+                and value != ()
+            }
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def run_one(index: int, input: Any) -> Dict[str, Any]:
+                config = configs[index] if isinstance(configs, list) else configs
+                kwargs = dict(common)
+                if config is not None:
+                    kwargs["config"] = config
+                async with semaphore:
+                    try:
+                        cached = _lookup(request, "invoke", input, kwargs)
+                        if cached.hit:
+                            return {"index": index, "output": cached.value}
+                        with tracer.span("execute", parent, attributes={"index": index}) as span:
+                            output = await agent_executor.acall(
+                                agent.ainvoke, input, **_traced(kwargs, span)
+                            )
+                        cached.store(output)
+                        return {"index": index, "output": output}
+                    except Exception as e:
+                        logger.warning(f"Batch item {index} failed on {path}: {e}")
+                        return {"index": index, "error": f"{type(e).__name__}: {e}"}
+
+            tasks = [asyncio.create_task(run_one(i, x)) for i, x in enumerate(inputs)]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
 
-        async def _event_generator(request):
-            for chunk in agent.stream(request):
-                print("chunk", chunk)
-                yield jsonpickle.encode(chunk.get("agent")) + "\n"
+        async def _async_event_generator(input, kwargs, parent: Span):
+            span = tracer.start_span("execute", parent)
+            try:
+                async with agent_executor.slot():
+                    with use_span(span):
+                        async for chunk in agent.astream(input, **_traced(kwargs, span)):
+                            yield chunk
+            except BaseException as e:
+                span.record_exception(e)
+                raise
+            finally:
+                span.end()
 
-        self.app.add_api_route(f"{path}/info", info, methods=["GET"])
-        self.app.add_api_route(f"{path}/invoke", invoke, methods=["POST"])
-        self.app.add_api_route(f"{path}/ainvoke", ainvoke, methods=["POST"])
-        self.app.add_api_route(f"{path}/stream", stream, methods=["POST"])
-        self.app.add_api_route(f"{path}/astream", astream, methods=["POST"])
+        async def _event_generator(input, kwargs, parent: Span):
+            span = tracer.start_span("execute", parent)
+            try:
+                # El contexto activo se copia al hilo que consume agent.stream
+                with use_span(span):
+                    async for chunk in agent_executor.iterate(
+                        input, **_traced(kwargs, span, in_process)
+                    ):
+                        yield chunk
+            except BaseException as e:
+                span.record_exception(e)
+                raise
+            finally:
+                span.end()
+
+        self._add_route(f"{path}/info", info, "GET")
+        self._add_route(f"{path}/invoke", _observed("invoke", invoke), "POST")
+        self._add_route(f"{path}/ainvoke", _observed("ainvoke", ainvoke), "POST")
+        self._add_route(f"{path}/stream", _observed("stream", stream), "POST")
+        self._add_route(f"{path}/astream", _observed("astream", astream), "POST")
+        self._add_route(f"{path}/batch", _observed("batch", batch), "POST")
+        self._add_route(f"{path}/state", _observed("state", state), "POST")
 
         logger.info(f"Description: {agent_metadata['description']}")
 
+    def _add_route(self, route: str, handler: Callable, method: str) -> None:
+        """Registra un endpoint en la aplicación y en el transporte en proceso."""
+        self.app.add_api_route(route, handler, methods=[method])
+        self._handlers[(method, route)] = handler
+
+    def _attach_checkpointer(self, agent: Any, path: str, agent_executor: AgentExecutor) -> None:
+        """Asigna el checkpointer del servidor a un agente que no tiene uno propio."""
+        if self.checkpoints is None or getattr(agent, "checkpointer", None) is not None:
+            return
+        if not hasattr(agent, "get_state"):
+            return
+        if agent_executor.config.kind == "process":
+            # El checkpointer no se puede copiar a los procesos del pool
+            logger.warning(f"Agent {path} runs in a process pool: server checkpointer not attached")
+            return
+        agent.checkpointer = self.checkpoints.saver(path)
+
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        """Ciclo de vida de la aplicación: registra los agentes y libera los pools al apagar."""
+        # Las peticiones en proceso comparten el loop de uvicorn mientras sirve
+        if self.name is not None:
+            bind_inproc_loop(self.name, asyncio.get_running_loop())
+        base_url = self.advertise_url or os.environ.get(ADVERTISE_ENV)
+        if self.registrar is not None:
+            if base_url:
+                await self.registrar.start(base_url)
+            else:
+                logger.warning("No advertise_url: agents are not published in the registry")
+        yield
+        if self.name is not None:
+            bind_inproc_loop(self.name, None)
+        if self.registrar is not None:
+            await self.registrar.stop()
+        for agent_executor in self.executors.values():
+            agent_executor.shutdown(wait=False)
+        if self.checkpoints is not None:
+            self.checkpoints.close()
+
     async def _health_check(self):
         """Health check global del servidor"""
         return {
             "status": "healthy",
+            "worker": os.getpid(),
             "registered_agents": len(self.registered_paths),
             "agent_paths": self.registered_paths,
+            "executors": self.executor_stats(),
+            "caches": {path: c.stats() for path, c in self.caches.items()},
+            "admission": {path: a.stats() for path, a in self.admission.items()},
+            "idempotency": self.idempotency.stats(),
+            "singleflight": {path: f.stats() for path, f in self.singleflights.items()},
+            **({"registry": self.registry_service.stats()} if self.registry_service else {}),
+            **({"checkpoints": self.checkpoints.stats()} if self.checkpoints else {}),
         }
 
-    def run(self, host: str = "localhost", port: int = 8000, **kwargs):
-        """Ejecuta el servidor con banner ASCII"""
+    async def _metrics(self):
+        """Métricas en formato de texto de Prometheus"""
+        return Response(content=self.metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+    def _runtime_metrics(self) -> List[Any]:
+        """Convierte las estadísticas de pools y cachés en métricas del scrape."""
+        in_flight = Gauge("langgraph_executor_in_flight", "Llamadas ejecutándose en el pool.", ("agent",))
+        queued = Gauge("langgraph_executor_queued", "Llamadas esperando hueco en el pool.", ("agent",))
+        executed = Counter(
+            "langgraph_executor_calls_total", "Llamadas terminadas en el pool.", ("agent", "status")
+        )
+        wait = Gauge("langgraph_executor_max_wait_seconds", "Espera máxima por un hueco.", ("agent",))
+        for path, ex in self.executors.items():
+            stats = ex.stats()
+            in_flight.set((path,), stats["in_flight"])
+            queued.set((path,), stats["queued"])
+            executed.inc((path, "ok"), stats["completed"])
+            executed.inc((path, "error"), stats["failed"])
+            wait.set((path,), stats["max_wait_seconds"])
+
+        lookups = Counter(
+            "langgraph_cache_lookups_total", "Consultas a la caché de respuestas.", ("agent", "result")
+        )
+        entries = Gauge("langgraph_cache_entries", "Entradas en memoria de la caché.", ("agent",))
+        for path, cache in self.caches.items():
+            stats = cache.stats()
+            lookups.inc((path, "hit"), stats["hits"])
+            lookups.inc((path, "disk_hit"), stats["disk_hits"])
+            lookups.inc((path, "miss"), stats["misses"])
+            entries.set((path,), stats["entries"])
+
+        admitted = Counter(
+            "langgraph_admission_admitted_total", "Peticiones admitidas.", ("agent",)
+        )
+        shed = Counter(
+            "langgraph_admission_shed_total", "Peticiones rechazadas por sobrecarga.", ("agent", "reason")
+        )
+        depth = Gauge(
+            "langgraph_admission_queue_depth", "Peticiones esperando turno.", ("agent", "priority")
+        )
+        for path, controller in self.admission.items():
+            stats = controller.stats()
+            admitted.inc((path,), stats["admitted"])
+            for reason, count in stats["shed"].items():
+                shed.inc((path, reason), count)
+            for priority, count in stats["queued_by_priority"].items():
+                depth.set((path, priority), count)
+
+        replays = Counter(
+            "langgraph_idempotent_replays_total",
+            "Reintentos resueltos con el resultado de una ejecución anterior.",
+        )
+        replays.inc((), self.idempotency.stats()["replays"])
+
+        flights = Counter(
+            "langgraph_singleflight_requests_total",
+            "Peticiones que iniciaron una ejecución o se unieron a una en curso.",
+            ("agent", "role"),
+        )
+        flying = Gauge("langgraph_singleflight_in_flight", "Ejecuciones compartibles en curso.", ("agent",))
+        for path, group in self.singleflights.items():
+            stats = group.stats()
+            flights.inc((path, "leader"), stats["executions"])
+            flights.inc((path, "shared"), stats["shared"])
+            flying.set((path,), stats["in_flight"])
+        metrics = [
+            in_flight, queued, executed, wait, lookups, entries, admitted, shed, depth, replays,
+            flights, flying,
+        ]
+
+        if self.checkpoints is not None:
+            stats = self.checkpoints.stats()
+            reads = Counter(
+                "langgraph_checkpoint_reads_total", "Lecturas del último checkpoint de un hilo.", ("result",)
+            )
+            reads.inc(("hit",), stats["hits"])
+            reads.inc(("miss",), stats["misses"])
+            hot = Gauge("langgraph_checkpoint_hot_threads", "Hilos con su checkpoint en memoria.")
+            hot.set((), stats["hot_threads"])
+            pending = Gauge("langgraph_checkpoint_pending_writes", "Escrituras esperando el volcado a disco.")
+            pending.set((), stats["pending_writes"])
+            flush = Gauge(
+                "langgraph_checkpoint_flush_seconds", "Duración de los volcados a disco.", ("stat",)
+            )
+            flush.set(("avg",), stats["avg_flush_seconds"])
+            flush.set(("max",), stats["max_flush_seconds"])
+            lag = Gauge(
+                "langgraph_checkpoint_max_write_lag_seconds", "Espera máxima de una escritura en la cola."
+            )
+            lag.set((), stats["max_write_lag_seconds"])
+            expired = Counter("langgraph_checkpoint_expired_threads_total", "Hilos borrados por inactividad.")
+            expired.inc((), stats["expired_threads"])
+            metrics += [reads, hot, pending, flush, lag, expired]
+        return metrics
+
+    def _registry_entries(self, base_url: str) -> List[Dict[str, Any]]:
+        """
+        Entradas de los agentes para el registro de la malla.
+
+        Args:
+            base_url (str): URL pública del servidor.
+
+        Returns:
+            List[Dict[str, Any]]: Los metadatos de ``/info`` de cada agente con
+            su URL, ruta y endpoints.
+        """
+        entries = []
+        for path, metadata in self.agents.items():
+            agent = metadata["agent"]
+            if callable(getattr(agent, "info", None)):
+                info = agent.info()
+            else:
+                info = {key: metadata[key] for key in ("name", "description", "skills")}
+            entries.append(
+                {
+                    **info,
+                    "url": f"{base_url.rstrip('/')}{path}",
+                    "path": path,
+                    "endpoints": list(_AGENT_ENDPOINTS),
+                }
+            )
+        return entries
+
+    def executor_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Devuelve las métricas de los pools de ejecución por agente.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Métricas indexadas por la ruta del agente.
+        """
+        return {path: ex.stats() for path, ex in self.executors.items()}
+
+    def run(
+        self,
+        host: str = "localhost",
+        port: int = 8000,
+        workers: int = 1,
+        factory: str | None = None,
+        cpu_affinity: bool | List[int] = False,
+        max_requests: int | None = None,
+        max_requests_jitter: int = 0,
+        uds: str | None = None,
+        **kwargs,
+    ):
+        """
+        Ejecuta el servidor con banner ASCII.
+
+        Con ``workers > 1`` (o con ``factory``) arranca varios procesos de
+        uvicorn; cada uno importa ``factory`` y reconstruye sus agentes, así que
+        la serialización y las herramientas con mucha CPU escalan por núcleos.
+        Las métricas y cachés en memoria son propias de cada worker.
+
+        Args:
+            host (str, optional): Host de escucha. Defaults to "localhost".
+            port (int, optional): Puerto de escucha. Defaults to 8000.
+            workers (int, optional): Número de procesos. Defaults to 1.
+            factory (str | None, optional): Cadena ``"modulo:funcion"`` que
+                devuelve este ``Server``; obligatoria con varios workers.
+                Defaults to None.
+            cpu_affinity (bool | List[int], optional): Fija cada worker a una
+                CPU. Defaults to False.
+            max_requests (int | None, optional): Peticiones tras las que se
+                recicla cada worker para acotar el crecimiento de memoria. Con
+                un solo proceso, el servidor termina y debe reiniciarlo un
+                supervisor externo. Defaults to None.
+            max_requests_jitter (int, optional): Variación aleatoria de
+                ``max_requests``. Defaults to 0.
+            uds (str | None, optional): Escucha en este socket Unix en lugar
+                de ``host:port``; los agentes del mismo pod lo alcanzan con
+                ``RemoteAgent("unix://<uds>:<ruta>")``. Defaults to None.
+        """
+        multiprocess = workers > 1 or factory is not None
+        if multiprocess and factory is None:
+            raise ValueError(
+                "Running several workers requires an importable factory "
+                "('module:function' returning the Server)"
+            )
 
         # 🎨 BANNER ASCII PERSONALIZADO
         self._print_startup_banner(host, port)
@@ -186,7 +1086,41 @@ class Server:
 
         logger.info(f"Starting server with {len(self.agents)} agents")
 
-        uvicorn.run(self.app, host=host, port=port, **kwargs)
+        # Los workers heredan la URL pública para publicarse en el registro
+        if self.registrar is not None and self.advertise_url is None:
+            os.environ.setdefault(
+                ADVERTISE_ENV, f"unix://{uds}:" if uds else advertised_url(host, port)
+            )
+        if uds is not None:
+            kwargs["uds"] = uds
+
+        if multiprocess:
+            run_workers(
+                factory,
+                host=host,
+                port=port,
+                workers=workers,
+                cpu_affinity=cpu_affinity,
+                max_requests=max_requests,
+                max_requests_jitter=max_requests_jitter,
+                **kwargs,
+            )
+            return
+
+        if max_requests:
+            # Nadie reinicia el único proceso cuando uvicorn lo recicla
+            logger.warning(
+                "With a single worker the process exits after max_requests; "
+                "use workers >= 2 or an external supervisor to restart it"
+            )
+        uvicorn.run(
+            self.app,
+            host=host,
+            port=port,
+            limit_max_requests=max_requests,
+            limit_max_requests_jitter=max_requests_jitter,
+            **kwargs,
+        )
 
     def _print_startup_banner(self, host: str, port: int):
         """Imprime el banner ASCII de inicio"""
@@ -226,6 +1160,7 @@ class Server:
 │  🔗 URL:  {BOLD}{BLUE}http://{host}:{port}{RESET}{GREEN}                           │
 │  📚 Docs: {BOLD}{BLUE}http://{host}:{port}/docs{RESET}{GREEN}                      │
 │  ❤️  Health: {BOLD}{BLUE}http://{host}:{port}/health{RESET}{GREEN}                   │
+│  📈 Metrics: {BOLD}{BLUE}http://{host}:{port}/metrics{RESET}{GREEN}                 │
 │  🤖 Agents: {BOLD}{YELLOW}{len(self.agents)} registered{RESET}{GREEN}                              │
 └─────────────────────────────────────────────────────────────┘{RESET}
 '''
@@ -246,6 +1181,7 @@ class Server:
                 endpoints_info += f'''
 │  {BOLD}{CYAN}{path}{RESET}{BLUE} → {agent_name}                                    │
 │    📤 POST {BOLD}{path}/invoke{RESET}{BLUE}                                │
+│    📦 POST {BOLD}{path}/batch{RESET}{BLUE}                                 │
 │    ℹ️  GET  {BOLD}{path}/info{RESET}{BLUE}                                  │
 │    ❤️  GET  {BOLD}{path}/health{RESET}{BLUE}                                │'''
 
@@ -0,0 +1,244 @@
+"""
+Sesiones por hilo: solo viajan los mensajes nuevos.
+
+Sin sesiones, cada ``RemoteAgent.invoke`` con ``thread_id`` envía el
+historial completo y recibe el estado completo, así que el tamaño de las
+peticiones crece con la conversación. En modo sesión el servidor guarda el
+historial en el checkpointer del agente y ambos extremos solo intercambian
+diferencias:
+
+- El cliente envía en ``X-Thread-Version`` la versión del hilo que conoce
+  (el ``checkpoint_id`` del último estado recibido) y solo los mensajes que
+  el servidor aún no tiene.
+- El servidor comprueba que la versión coincide con la del checkpoint, ejecuta
+  y devuelve solo los mensajes añadidos, indicando en ``X-Thread-Offset``
+  cuántos había antes y en ``X-Thread-Version`` la nueva versión.
+- Si la versión no coincide (otro cliente escribió en el hilo, o el servidor
+  perdió el estado) responde 409 sin ejecutar nada y el cliente repite la
+  llamada con ``X-Thread-Version: full``, que devuelve el estado completo.
+- Si el agente ya se ejecutó pero la diferencia no encaja con la copia del
+  cliente (la olvidó, o dos llamadas simultáneas en el mismo hilo), el
+  cliente no repite la llamada: lee el estado completo del hilo en
+  ``/state``, que no ejecuta el agente.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Tuple
+
+# Versión del hilo que conoce el cliente ("full" para una sincronización completa)
+SESSION_HEADER = "X-Thread-Version"
+# Mensajes del hilo anteriores a los devueltos
+OFFSET_HEADER = "X-Thread-Offset"
+FULL_SYNC = "full"
+
+
+class ThreadDiverged(RuntimeError):
+    """La versión del hilo del cliente no coincide con la del servidor."""
+
+    metric_status = "diverged"
+    status_code = 409
+
+
+def _message_id(message: Any) -> Any:
+    if isinstance(message, dict):
+        return message.get("id")
+    return getattr(message, "id", None)
+
+
+def _messages_of(state: Any) -> List[Any] | None:
+    if isinstance(state, dict) and isinstance(state.get("messages"), list):
+        return state["messages"]
+    return None
+
+
+def _version_of(snapshot: Any) -> str:
+    configurable = (getattr(snapshot, "config", None) or {}).get("configurable") or {}
+    return str(configurable.get("checkpoint_id") or "")
+
+
+async def run_session(
+    requested: str,
+    read_state: Callable[[], Awaitable[Any]],
+    run: Callable[[], Awaitable[Any]],
+) -> Tuple[Any, Dict[str, str]]:
+    """
+    Ejecuta el agente en modo sesión y recorta el resultado a los mensajes nuevos.
+
+    Args:
+        requested (str): Valor de ``X-Thread-Version`` de la petición.
+        read_state (Callable[[], Awaitable[Any]]): Lee el ``StateSnapshot`` del hilo.
+        run (Callable[[], Awaitable[Any]]): Ejecuta el agente.
+
+    Returns:
+        Tuple[Any, Dict[str, str]]: El resultado (recortado si es posible) y
+            las cabeceras de sesión de la respuesta.
+
+    Raises:
+        ThreadDiverged: Si la versión del cliente no es la del hilo.
+    """
+    before = await read_state()
+    current = _version_of(before)
+    if requested != FULL_SYNC and requested != current:
+        raise ThreadDiverged(
+            f"Thread version mismatch (client {requested or '-'}, server {current or '-'})"
+        )
+    known = _messages_of(getattr(before, "values", None)) or []
+
+    result = await run()
+    version = _version_of(await read_state())
+    messages = _messages_of(result)
+    offset = len(known) if requested != FULL_SYNC else 0
+    # Solo se recorta si los mensajes anteriores siguen en su sitio
+    if (
+        messages is None
+        or len(messages) < offset
+        or (offset and _message_id(messages[offset - 1]) != _message_id(known[offset - 1]))
+    ):
+        offset = 0
+    if offset:
+        result = {**result, "messages": messages[offset:]}
+    return result, {SESSION_HEADER: version, OFFSET_HEADER: str(offset)}
+
+
+async def read_session(read_state: Callable[[], Awaitable[Any]]) -> Tuple[Any, Dict[str, str]]:
+    """
+    Lee el estado completo del hilo sin ejecutar el agente.
+
+    Args:
+        read_state (Callable[[], Awaitable[Any]]): Lee el ``StateSnapshot`` del hilo.
+
+    Returns:
+        Tuple[Any, Dict[str, str]]: Los valores del hilo y las cabeceras de
+            sesión de una sincronización completa.
+    """
+    snapshot = await read_state()
+    return snapshot.values, {SESSION_HEADER: _version_of(snapshot), OFFSET_HEADER: "0"}
+
+
+@dataclass
+class _Session:
+    version: str
+    messages: List[Any] = field(default_factory=list)
+
+
+class ThreadSessions:
+    """
+    Historial de los hilos en modo sesión en el lado de ``RemoteAgent``.
+
+    Guarda, por ``thread_id``, la versión del hilo y los mensajes que tiene el
+    servidor, para no reenviarlos y para reconstruir el estado completo a
+    partir de las diferencias que devuelve.
+    """
+
+    def __init__(self, max_threads: int = 1024):
+        """
+        Inicializa las sesiones.
+
+        Args:
+            max_threads (int, optional): Hilos recordados como máximo; se
+                olvidan los menos usados. Defaults to 1024.
+        """
+        self.max_threads = max_threads
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.delta_calls = 0
+        self.full_syncs = 0
+        self.divergences = 0
+        self.messages_skipped = 0
+
+    def prepare(self, thread_id: str, input: Any, full: bool = False) -> Tuple[Any, str]:
+        """
+        Prepara la entrada de una llamada: quita los mensajes que el servidor ya tiene.
+
+        Si la entrada empieza por el historial conocido (el llamante reenvía la
+        conversación entera) se envía solo el resto; si no, se envía tal cual
+        (el llamante ya pasa solo los mensajes nuevos).
+
+        Args:
+            thread_id (str): El hilo de la llamada.
+            input (Any): La entrada del agente.
+            full (bool, optional): Fuerza una sincronización completa. Defaults to False.
+
+        Returns:
+            Tuple[Any, str]: La entrada a enviar y el valor de ``X-Thread-Version``.
+        """
+        with self._lock:
+            session = self._sessions.get(thread_id)
+            if session is None or full:
+                self.full_syncs += 1
+                return input, FULL_SYNC
+            self._sessions.move_to_end(thread_id)
+            self.delta_calls += 1
+            messages = _messages_of(input)
+            known = session.messages
+            if (
+                messages is not None
+                and known
+                and len(messages) >= len(known)
+                and all(
+                    _message_id(a) is not None and _message_id(a) == _message_id(b)
+                    for a, b in zip(messages, known)
+                )
+            ):
+                self.messages_skipped += len(known)
+                input = {**input, "messages": messages[len(known):]}
+            return input, session.version
+
+    def update(self, thread_id: str, result: Any, headers: Mapping[str, str]) -> Any:
+        """
+        Incorpora la respuesta de una llamada y devuelve el estado completo.
+
+        Args:
+            thread_id (str): El hilo de la llamada.
+            result (Any): El resultado recibido (completo o solo con los mensajes nuevos).
+            headers (Mapping[str, str]): Cabeceras de la respuesta.
+
+        Returns:
+            Any: El resultado con el historial completo, o None si la
+                diferencia no encaja con lo que se conoce del hilo.
+        """
+        version = headers.get(SESSION_HEADER)
+        messages = _messages_of(result)
+        with self._lock:
+            if not version or messages is None:
+                # El servidor no admite sesiones para este agente
+                self._sessions.pop(thread_id, None)
+                return result
+            offset = int(headers.get(OFFSET_HEADER) or 0)
+            session = self._sessions.get(thread_id)
+            if offset:
+                if session is None or len(session.messages) != offset:
+                    self._sessions.pop(thread_id, None)
+                    return None
+                messages = [*session.messages, *messages]
+            self._sessions[thread_id] = _Session(version, messages)
+            self._sessions.move_to_end(thread_id)
+            while len(self._sessions) > self.max_threads:
+                self._sessions.popitem(last=False)
+        return {**result, "messages": list(messages)}
+
+    def forget(self, thread_id: str, diverged: bool = False) -> None:
+        """Olvida un hilo (la próxima llamada será una sincronización completa)."""
+        with self._lock:
+            self._sessions.pop(thread_id, None)
+            if diverged:
+                self.divergences += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Devuelve el estado de las sesiones.
+
+        Returns:
+            Dict[str, int]: Hilos, llamadas por diferencias, sincronizaciones
+                completas, divergencias y mensajes no reenviados.
+        """
+        with self._lock:
+            return {
+                "threads": len(self._sessions),
+                "delta_calls": self.delta_calls,
+                "full_syncs": self.full_syncs,
+                "divergences": self.divergences,
+                "messages_skipped": self.messages_skipped,
+            }
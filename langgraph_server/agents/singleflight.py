@@ -0,0 +1,211 @@
+"""
+Ejecuciones compartidas entre peticiones idénticas simultáneas (singleflight).
+
+Cuando muchas peticiones iguales llegan a la vez (la misma pregunta de muchos
+usuarios), ``Server`` ejecutaría el agente una vez por petición y pagaría N
+veces el LLM. Con ``add_agent(..., singleflight=SingleFlight())`` las
+peticiones con el mismo hash canónico del payload (``canonical_hash``) y sin
+``thread_id`` se unen a la ejecución en curso:
+
+- ``invoke``/``ainvoke``: todas reciben el resultado (o el error) de la misma
+  ejecución.
+- ``stream``/``astream``: cada suscriptor recibe todos los chunks desde el
+  principio, aunque se una a mitad, y después los nuevos según se producen.
+
+A diferencia de ``ResponseCache`` no se guarda nada: en cuanto la ejecución
+termina, la siguiente petición igual vuelve a ejecutar. Si todos los que
+esperan una ejecución se van, se cancela. La ejecución compartida hereda la
+traza y el plazo de la petición que la inició.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+from langgraph_server.agents.cache import NO_CACHE, NO_STORE, canonical_hash, is_cacheable
+
+
+class _Flight:
+    """Una ejecución en curso y quienes la esperan."""
+
+    def __init__(self):
+        self.task: asyncio.Future | None = None
+        self.subscribers = 0
+        # Solo streams: chunks producidos y aviso de cambios a los suscriptores
+        self.chunks: List[Any] = []
+        self.finished = False
+        self.error: BaseException | None = None
+        self._changed: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def notify(self) -> None:
+        if not self._changed.done():
+            self._changed.set_result(None)
+        self._changed = asyncio.get_running_loop().create_future()
+
+    async def changed(self) -> None:
+        await asyncio.shield(self._changed)
+
+
+class SingleFlight:
+    """Ejecuciones en curso de un agente indexadas por el hash de su petición."""
+
+    def __init__(self):
+        """Inicializa el registro de ejecuciones en curso."""
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.executions = 0
+        self.shared = 0
+        self.cancelled = 0
+
+    @staticmethod
+    def key(
+        kind: str,
+        input: Any,
+        kwargs: Dict[str, Any],
+        cache_control: str | None = None,
+        digest: str | None = None,
+    ) -> str | None:
+        """
+        Calcula la clave con la que se comparte una petición.
+
+        Las peticiones con ``thread_id`` leen y modifican su hilo, así que nunca
+        se comparten; tampoco las que piden una respuesta nueva con
+        ``Cache-Control: no-cache`` o ``no-store``.
+
+        Args:
+            kind (str): Tipo de endpoint ("invoke" o "stream").
+            input (Any): La entrada del agente.
+            kwargs (Dict[str, Any]): Parámetros de ejecución.
+            cache_control (str | None, optional): Cabecera ``Cache-Control``.
+                Defaults to None.
+            digest (str | None, optional): El hash canónico si ya se calculó
+                (p. ej. para la caché). Defaults to None.
+
+        Returns:
+            str | None: El hash canónico, o None si la petición no se comparte.
+        """
+        directives = {d.strip().lower() for d in (cache_control or "").split(",")}
+        if NO_CACHE in directives or NO_STORE in directives or not is_cacheable(kwargs):
+            return None
+        return digest or canonical_hash(kind, input, kwargs)
+
+    def _join(self, key: Hashable) -> Tuple[_Flight, bool]:
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.shared += 1
+            joined = True
+        else:
+            flight = self._flights[key] = _Flight()
+            self.executions += 1
+            joined = False
+        flight.subscribers += 1
+        return flight, joined
+
+    def _leave(self, key: Hashable, flight: _Flight) -> None:
+        flight.subscribers -= 1
+        if flight.subscribers or flight.task is None or flight.task.done():
+            return
+        # Nadie espera ya el resultado: la siguiente petición empieza de cero
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        self.cancelled += 1
+        flight.task.cancel()
+
+    def _track(self, key: Hashable, flight: _Flight, task: asyncio.Future) -> None:
+        flight.task = task
+
+        def forget(_: asyncio.Future) -> None:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+        task.add_done_callback(forget)
+
+    async def run(self, key: Hashable, execute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Ejecuta ``execute`` o se une a la ejecución en curso con la misma clave.
+
+        Args:
+            key (Hashable): La clave de la petición (ver ``key``).
+            execute (Callable[[], Awaitable[Any]]): La ejecución del agente.
+
+        Returns:
+            Tuple[Any, bool]: El resultado y si se ha compartido una ejecución.
+        """
+        flight, joined = self._join(key)
+        if not joined:
+            self._track(key, flight, asyncio.ensure_future(execute()))
+        try:
+            return await asyncio.shield(flight.task), joined
+        finally:
+            self._leave(key, flight)
+
+    async def stream(
+        self,
+        key: Hashable,
+        chunks_for: Callable[[], AsyncIterator[Any]],
+        on_join: Callable[[bool], None] | None = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Transmite los chunks de ``chunks_for`` o se suscribe al stream en curso.
+
+        El stream compartido lo consume una tarea propia que guarda los chunks
+        mientras dura la ejecución; cada suscriptor los lee a su ritmo. La
+        suscripción empieza al pedir el primer chunk: un stream que nunca se
+        recorre no pone en marcha el agente.
+
+        Args:
+            key (Hashable): La clave de la petición (ver ``key``).
+            chunks_for (Callable[[], AsyncIterator[Any]]): Crea el stream del agente.
+            on_join (Callable[[bool], None] | None, optional): Recibe al
+                suscribirse si se comparte una ejecución. Defaults to None.
+
+        Yields:
+            AsyncIterator[Any]: Los chunks de la ejecución, desde el primero.
+        """
+        flight, joined = self._join(key)
+        if not joined:
+            self._track(key, flight, asyncio.ensure_future(self._produce(flight, chunks_for())))
+        index = 0
+        try:
+            if on_join is not None:
+                on_join(joined)
+            while True:
+                while index < len(flight.chunks):
+                    yield flight.chunks[index]
+                    index += 1
+                if flight.finished:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                await flight.changed()
+        finally:
+            self._leave(key, flight)
+
+    @staticmethod
+    async def _produce(flight: _Flight, chunks: AsyncIterator[Any]) -> None:
+        try:
+            async for chunk in chunks:
+                flight.chunks.append(chunk)
+                flight.notify()
+        except Exception as e:
+            # El error llega a cada suscriptor, no a la tarea
+            flight.error = e
+        except asyncio.CancelledError as e:
+            flight.error = e
+            raise
+        finally:
+            flight.finished = True
+            flight.notify()
+            await chunks.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Devuelve los contadores de ejecuciones compartidas.
+
+        Returns:
+            Dict[str, Any]: Ejecuciones en curso, iniciadas, compartidas y canceladas.
+        """
+        return {
+            "in_flight": len(self._flights),
+            "executions": self.executions,
+            "shared": self.shared,
+            "cancelled": self.cancelled,
+        }
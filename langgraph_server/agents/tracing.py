@@ -0,0 +1,468 @@
+"""
+Trazas distribuidas entre ``RemoteAgent`` y ``Server``.
+
+El contexto viaja en la cabecera W3C ``traceparent``: ``RemoteAgent`` la
+inyecta en cada petición y ``Server`` abre un span por petición que cuelga del
+span del cliente. Dentro del servidor hay spans para la decodificación, la
+ejecución del grafo, cada nodo de LangGraph, las llamadas a herramientas y al
+modelo, y la codificación.
+
+El span activo se guarda en una variable de contexto, así que las llamadas a
+otros ``RemoteAgent`` hechas desde un agente servido (por ejemplo un
+supervisor) quedan enlazadas en la misma traza. Para enlazar las llamadas de
+un proceso cliente basta con abrir un span raíz::
+
+    tracer = Tracer(JSONLExporter("traces.jsonl"))
+    set_tracer(tracer)
+    with tracer.span("supervisor"):
+        group.invoke(...)
+
+Sin exportador los spans se siguen creando (para propagar el contexto) pero
+no se registran en ningún sitio.
+"""
+
+import json
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Mapping, MutableMapping
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - backend opcional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+
+_TRACEPARENT_RE = re.compile(
+    r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$"
+)
+
+_current_span: ContextVar["Span | None"] = ContextVar("langgraph_current_span", default=None)
+
+
+class SpanContext:
+    """Identificadores de un span que viajan entre procesos."""
+
+    __slots__ = ("trace_id", "span_id", "flags")
+
+    def __init__(self, trace_id: str, span_id: str, flags: str = "01"):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.flags = flags
+
+    def to_traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{self.flags}"
+
+    @classmethod
+    def from_traceparent(cls, header: str | None) -> "SpanContext | None":
+        """
+        Interpreta una cabecera ``traceparent``.
+
+        Args:
+            header (str | None): El valor de la cabecera.
+
+        Returns:
+            SpanContext | None: El contexto, o None si falta o no es válido.
+        """
+        if not header:
+            return None
+        match = _TRACEPARENT_RE.match(header.strip().lower())
+        if match is None:
+            return None
+        version, trace_id, span_id, flags = match.groups()
+        if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+            return None
+        return cls(trace_id, span_id, flags)
+
+
+def _new_trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+class Span:
+    """
+    Una operación con inicio, fin y atributos.
+
+    Se cierra con ``end``; al cerrarse se entrega al exportador del tracer.
+    """
+
+    __slots__ = (
+        "tracer", "name", "kind", "context", "parent_id",
+        "attributes", "start_time", "end_time", "_start", "status", "error",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        context: SpanContext,
+        parent_id: str | None = None,
+        kind: str = "internal",
+        attributes: Dict[str, Any] | None = None,
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.end_time: float | None = None
+        self.status = "ok"
+        self.error: str | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, error: BaseException) -> None:
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        """Cierra el span (idempotente) y lo exporta."""
+        if self.end_time is not None:
+            return
+        self.end_time = self.start_time + (time.perf_counter() - self._start)
+        self.tracer._export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        end_time = self.end_time or time.time()
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "service": self.tracer.service_name,
+            "start_time": self.start_time,
+            "end_time": end_time,
+            "duration_ms": (end_time - self.start_time) * 1000.0,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter:
+    """Destino de los spans terminados."""
+
+    def export(self, span: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JSONLExporter(SpanExporter):
+    """Escribe un span por línea en un fichero local para analizarlo offline."""
+
+    def __init__(self, path: str):
+        """
+        Abre el fichero en modo ``append``.
+
+        Args:
+            path (str): Ruta del fichero JSONL.
+        """
+        self.path = path
+        self._file = open(path, "ab")
+        self._lock = threading.Lock()
+
+    def export(self, span: Dict[str, Any]) -> None:
+        if orjson is not None:
+            line = orjson.dumps(span, default=str) + b"\n"
+        else:
+            line = (json.dumps(span, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class InMemoryExporter(SpanExporter):
+    """Guarda los spans en una lista; útil para inspeccionarlos en el proceso."""
+
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Dict[str, Any]) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+
+def current_span() -> "Span | None":
+    """Devuelve el span activo en el contexto actual."""
+    return _current_span.get()
+
+
+class Tracer:
+    """
+    Crea spans y los entrega a un exportador.
+
+    Attributes:
+        exporter (SpanExporter | None): Destino de los spans. Sin exportador
+            solo se propaga el contexto.
+        service_name (str): Nombre del servicio que aparece en cada span.
+    """
+
+    def __init__(
+        self, exporter: SpanExporter | None = None, service_name: str = "langgraph"
+    ):
+        self.exporter = exporter
+        self.service_name = service_name
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_span(
+        self,
+        name: str,
+        parent: "Span | SpanContext | None" = None,
+        kind: str = "internal",
+        attributes: Dict[str, Any] | None = None,
+    ) -> Span:
+        """
+        Abre un span sin activarlo.
+
+        Args:
+            name (str): Nombre de la operación.
+            parent (Span | SpanContext | None, optional): El padre; por defecto
+                el span activo. Sin padre se empieza una traza nueva.
+            kind (str, optional): ``internal``, ``server`` o ``client``.
+                Defaults to "internal".
+            attributes (Dict[str, Any] | None, optional): Atributos iniciales.
+
+        Returns:
+            Span: El span abierto.
+        """
+        if parent is None:
+            parent = _current_span.get()
+        if isinstance(parent, Span):
+            parent = parent.context
+        if parent is None:
+            context = SpanContext(_new_trace_id(), _new_span_id())
+            parent_id = None
+        else:
+            context = SpanContext(parent.trace_id, _new_span_id(), parent.flags)
+            parent_id = parent.span_id
+        return Span(self, name, context, parent_id, kind, attributes)
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        parent: "Span | SpanContext | None" = None,
+        kind: str = "internal",
+        attributes: Dict[str, Any] | None = None,
+    ) -> Iterator[Span]:
+        """Abre un span, lo activa durante el bloque y lo cierra al salir."""
+        span = self.start_span(name, parent, kind, attributes)
+        with use_span(span):
+            try:
+                yield span
+            except BaseException as e:
+                span.record_exception(e)
+                raise
+            finally:
+                span.end()
+
+    def inject(
+        self, headers: MutableMapping[str, str], span: "Span | None" = None
+    ) -> MutableMapping[str, str]:
+        """Añade ``traceparent`` con el span indicado o el activo."""
+        span = span or _current_span.get()
+        if span is not None:
+            headers[TRACEPARENT_HEADER] = span.context.to_traceparent()
+        return headers
+
+    @staticmethod
+    def extract(headers: Mapping[str, str]) -> SpanContext | None:
+        """Lee el contexto remoto de la cabecera ``traceparent``."""
+        return SpanContext.from_traceparent(headers.get(TRACEPARENT_HEADER))
+
+    def callback_handler(self, parent: Span) -> "TracingCallbackHandler":
+        """Callback de LangChain que abre spans por nodo, herramienta y modelo."""
+        return TracingCallbackHandler(self, parent)
+
+    def _export(self, span: Span) -> None:
+        if self.exporter is None:
+            return
+        try:
+            self.exporter.export(span.to_dict())
+        except Exception as e:
+            logger.warning(f"Could not export span {span.name}: {e}")
+
+    def shutdown(self) -> None:
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+@contextmanager
+def use_span(span: Span | None) -> Iterator[Span | None]:
+    """Activa ``span`` en el contexto actual durante el bloque."""
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Un generador cerrado desde otro contexto no puede restaurarlo
+            pass
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    Traduce los callbacks de LangChain en spans.
+
+    Los nodos del grafo se reconocen por los metadatos ``langgraph_node``; las
+    cadenas internas de cada nodo no generan span pero sus hijos cuelgan del
+    span del nodo que las contiene.
+    """
+
+    run_inline = True
+
+    def __init__(self, tracer: Tracer, parent: Span):
+        self.tracer = tracer
+        self.parent = parent
+        self._spans: Dict[UUID, Span] = {}
+        # Para las cadenas sin span propio, el span del que cuelgan sus hijos
+        self._owners: Dict[UUID, Span] = {}
+        self._lock = threading.Lock()
+
+    def _parent_of(self, parent_run_id: UUID | None) -> Span:
+        if parent_run_id is None:
+            return self.parent
+        return self._owners.get(parent_run_id, self.parent)
+
+    def _start(self, run_id: UUID, parent_run_id: UUID | None, name: str, attributes: Dict[str, Any]) -> None:
+        with self._lock:
+            span = self.tracer.start_span(
+                name, self._parent_of(parent_run_id), attributes=attributes
+            )
+            self._spans[run_id] = span
+            self._owners[run_id] = span
+
+    def _end(self, run_id: UUID, error: BaseException | None = None) -> None:
+        with self._lock:
+            span = self._spans.pop(run_id, None)
+            self._owners.pop(run_id, None)
+        if span is not None:
+            if error is not None:
+                span.record_exception(error)
+            span.end()
+
+    def on_chain_start(
+        self,
+        serialized: Dict[str, Any] | None,
+        inputs: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: Dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        name = kwargs.get("name")
+        if node is not None and name == node:
+            self._start(
+                run_id,
+                parent_run_id,
+                f"node:{node}",
+                {"langgraph.node": node, "langgraph.step": (metadata or {}).get("langgraph_step")},
+            )
+        else:
+            with self._lock:
+                self._owners[run_id] = self._parent_of(parent_run_id)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+    def on_tool_start(
+        self,
+        serialized: Dict[str, Any] | None,
+        input_str: str,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        **kwargs: Any,
+    ) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+        self._start(run_id, parent_run_id, f"tool:{name}", {"tool.name": name})
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any] | None,
+        messages: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        **kwargs: Any,
+    ) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name") or "model"
+        self._start(run_id, parent_run_id, f"llm:{name}", {"llm.name": name})
+
+    def on_llm_start(
+        self,
+        serialized: Dict[str, Any] | None,
+        prompts: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        **kwargs: Any,
+    ) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name") or "model"
+        self._start(run_id, parent_run_id, f"llm:{name}", {"llm.name": name})
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+
+# Tracer del proceso: sin exportador hasta que se configure uno
+_default_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Devuelve el tracer por defecto del proceso."""
+    return _default_tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    """Sustituye el tracer por defecto del proceso."""
+    global _default_tracer
+    _default_tracer = tracer
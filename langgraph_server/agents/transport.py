@@ -0,0 +1,338 @@
+"""
+Registro de pools de conexiones HTTP compartidos entre ``RemoteAgent``.
+
+Varios agentes servidos por el mismo ``Server`` (``/rrhh``, ``/soporte``...)
+comparten origen; en lugar de abrir un ``httpx.Client`` por agente, el
+registro mantiene un único cliente síncrono y uno asíncrono por origen y
+configuración de pool, con keep-alive y HTTP/2 opcional.
+
+Además de ``http(s)://``, los agentes co-localizados se alcanzan sin TCP:
+
+- ``unix://<socket>:<ruta>``: un ``Server`` escuchando en un socket Unix
+  (``Server.run(uds=...)``), p. ej. ``unix:///tmp/mesh.sock:/rrhh``.
+- ``inproc://<servidor>/<ruta>``: un ``Server`` del mismo proceso publicado
+  con ``Server(name=...)``, sin red ni serialización (ver ``inproc``).
+"""
+
+import asyncio
+import functools
+import importlib.util
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+import httpx
+
+from langgraph_server.agents.inproc import INPROC_SCHEME, AsyncInProcTransport, InProcTransport
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """
+    Configuración de un pool de conexiones por origen.
+
+    Attributes:
+        max_connections (int): Conexiones simultáneas máximas. Defaults to 100.
+        max_keepalive_connections (int): Conexiones ociosas que se conservan.
+            Defaults to 20.
+        keepalive_expiry (float): Segundos que una conexión ociosa sigue abierta.
+            Defaults to 30.0.
+        http2 (bool): Multiplexa las peticiones sobre HTTP/2 (requiere ``h2``).
+            Defaults to False.
+        timeout (float): Timeout por defecto de cada petición. Defaults to 360.0.
+        connect_timeout (float): Timeout de conexión. Defaults to 10.0.
+    """
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    timeout: float = 360.0
+    connect_timeout: float = 10.0
+
+    def client_kwargs(self) -> Dict[str, Any]:
+        """Argumentos para construir ``httpx.Client`` / ``httpx.AsyncClient``."""
+        if self.http2 and importlib.util.find_spec("h2") is None:
+            raise RuntimeError("HTTP/2 requires the 'h2' package (pip install httpx[http2])")
+        return {
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            "timeout": httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            "http2": self.http2,
+        }
+
+
+UNIX_SCHEME = "unix"
+
+
+def split_unix_url(url: str | httpx.URL) -> Tuple[str, str]:
+    """
+    Separa una URL ``unix://<socket>:<ruta>`` en el socket y la ruta HTTP.
+
+    Args:
+        url (str | httpx.URL): La URL completa.
+
+    Returns:
+        Tuple[str, str]: La ruta del socket y la ruta de la petición.
+    """
+    parsed = httpx.URL(url) if isinstance(url, str) else url
+    socket_path, separator, path = parsed.path.partition(":")
+    if not separator or not socket_path:
+        raise ValueError(f"Unix socket URLs must look like 'unix:///path.sock:/agent', got '{url}'")
+    return socket_path, path or "/"
+
+
+@functools.lru_cache(maxsize=1024)
+def origin_of(url: str) -> str:
+    """
+    Devuelve el origen (``scheme://host:port``) de una URL.
+
+    Para ``unix://`` el origen es el socket y para ``inproc://`` el servidor.
+
+    Args:
+        url (str): La URL completa.
+
+    Returns:
+        str: El origen normalizado.
+    """
+    parsed = httpx.URL(url)
+    if parsed.scheme == UNIX_SCHEME:
+        return f"{UNIX_SCHEME}://{split_unix_url(parsed)[0]}"
+    if parsed.scheme == INPROC_SCHEME:
+        return f"{INPROC_SCHEME}://{parsed.host}"
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    return f"{parsed.scheme}://{parsed.host}:{port}"
+
+
+def _over_unix(request: httpx.Request) -> None:
+    """Reescribe una petición ``unix://`` como HTTP normal sobre el socket."""
+    _, path = split_unix_url(request.url)
+    request.url = httpx.URL(scheme="http", host="localhost", path=path, query=request.url.query)
+    request.headers["Host"] = "localhost"
+
+
+async def _aover_unix(request: httpx.Request) -> None:
+    _over_unix(request)
+
+
+class _OriginPool:
+    """Clientes y contadores de un origen."""
+
+    def __init__(self, origin: str, config: PoolConfig):
+        self.origin = origin
+        self.config = config
+        self.refs = 0
+        self.sync_client: httpx.Client | None = None
+        # Un cliente asíncrono por event loop: httpx no puede compartirlos
+        self.async_clients: Dict[int, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+        self.requests = 0
+        self.responses = 0
+        self.errors = 0
+
+    def _on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+
+    def _on_response(self, response: httpx.Response) -> None:
+        self.responses += 1
+        if response.status_code >= 500:
+            self.errors += 1
+
+    async def _aon_request(self, request: httpx.Request) -> None:
+        self._on_request(request)
+
+    async def _aon_response(self, response: httpx.Response) -> None:
+        self._on_response(response)
+
+    def _client_kwargs(self, asynchronous: bool) -> Dict[str, Any]:
+        # Los orígenes unix:// e inproc:// llevan su propio transporte
+        kwargs = self.config.client_kwargs()
+        hooks = (
+            {"request": [self._aon_request], "response": [self._aon_response]}
+            if asynchronous
+            else {"request": [self._on_request], "response": [self._on_response]}
+        )
+        scheme, _, target = self.origin.partition("://")
+        if scheme == UNIX_SCHEME:
+            transport = httpx.AsyncHTTPTransport if asynchronous else httpx.HTTPTransport
+            kwargs["transport"] = transport(
+                uds=target, limits=kwargs.pop("limits"), http2=kwargs.pop("http2")
+            )
+            # La URL se reescribe antes de enviarla: el socket ya está en el transporte
+            hooks["request"].insert(0, _aover_unix if asynchronous else _over_unix)
+        elif scheme == INPROC_SCHEME:
+            del kwargs["limits"], kwargs["http2"]
+            kwargs["transport"] = AsyncInProcTransport() if asynchronous else InProcTransport()
+        return {**kwargs, "event_hooks": hooks}
+
+    def sync(self) -> httpx.Client:
+        if self.sync_client is None:
+            self.sync_client = httpx.Client(**self._client_kwargs(False))
+        return self.sync_client
+
+    def async_(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        entry = self.async_clients.get(id(loop))
+        if entry is None or entry[0] is not loop or entry[1].is_closed:
+            client = httpx.AsyncClient(**self._client_kwargs(True))
+            self.async_clients[id(loop)] = (loop, client)
+            return client
+        return entry[1]
+
+    def close_sync(self) -> None:
+        if self.sync_client is not None:
+            self.sync_client.close()
+            self.sync_client = None
+
+    async def aclose(self) -> None:
+        self.close_sync()
+        loop = asyncio.get_running_loop()
+        for key, (client_loop, client) in list(self.async_clients.items()):
+            if client_loop is loop:
+                await client.aclose()
+            elif client_loop.is_closed():
+                # Las conexiones de un loop cerrado ya no se pueden cerrar limpiamente
+                pass
+            else:
+                client_loop.call_soon_threadsafe(client_loop.create_task, client.aclose())
+            del self.async_clients[key]
+
+    def close(self) -> None:
+        self.close_sync()
+        for key, (client_loop, client) in list(self.async_clients.items()):
+            # Solo se puede cerrar un cliente asíncrono desde su propio loop
+            if client_loop.is_running():
+                client_loop.call_soon_threadsafe(client_loop.create_task, client.aclose())
+            del self.async_clients[key]
+
+    @staticmethod
+    def _connection_stats(client: Any) -> Dict[str, int]:
+        # httpcore no expone una API pública de estadísticas: se lee el pool
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None) or []
+        idle = sum(1 for c in connections if getattr(c, "is_idle", lambda: False)())
+        return {"connections": len(connections), "idle": idle, "active": len(connections) - idle}
+
+    def stats(self) -> Dict[str, Any]:
+        totals = {"connections": 0, "idle": 0, "active": 0}
+        clients = [self.sync_client] if self.sync_client is not None else []
+        clients += [client for _, client in self.async_clients.values()]
+        for client in clients:
+            for key, value in self._connection_stats(client).items():
+                totals[key] += value
+        return {
+            "origin": self.origin,
+            "http2": self.config.http2,
+            "max_connections": self.config.max_connections,
+            "refs": self.refs,
+            "clients": len(clients),
+            "requests": self.requests,
+            "responses": self.responses,
+            "server_errors": self.errors,
+            **totals,
+        }
+
+
+class TransportRegistry:
+    """
+    Registro de pools compartidos por origen.
+
+    Cada ``RemoteAgent`` adquiere una referencia al pool de su origen y la
+    libera al cerrarse; el pool se cierra cuando no quedan referencias.
+    """
+
+    def __init__(self):
+        self._pools: Dict[Tuple[str, PoolConfig], _OriginPool] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str, config: PoolConfig | None = None) -> Tuple[str, PoolConfig]:
+        """
+        Registra un usuario del pool del origen de ``url``.
+
+        Args:
+            url (str): URL del agente remoto.
+            config (PoolConfig | None, optional): Configuración del pool.
+                Defaults to None.
+
+        Returns:
+            Tuple[str, PoolConfig]: La clave del pool para las demás operaciones.
+        """
+        key = (origin_of(url), config or PoolConfig())
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = _OriginPool(*key)
+            pool.refs += 1
+        return key
+
+    def sync_client(self, key: Tuple[str, PoolConfig]) -> httpx.Client:
+        """Devuelve el cliente síncrono compartido del pool."""
+        with self._lock:
+            return self._pools[key].sync()
+
+    def async_client(self, key: Tuple[str, PoolConfig]) -> httpx.AsyncClient:
+        """Devuelve el cliente asíncrono compartido del pool para el loop actual."""
+        with self._lock:
+            return self._pools[key].async_()
+
+    def release(self, key: Tuple[str, PoolConfig]) -> None:
+        """Libera una referencia; cierra el pool si era la última."""
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                return
+            pool.refs -= 1
+            if pool.refs > 0:
+                return
+            del self._pools[key]
+        pool.close()
+
+    async def arelease(self, key: Tuple[str, PoolConfig]) -> None:
+        """Versión asíncrona de ``release``."""
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                return
+            pool.refs -= 1
+            if pool.refs > 0:
+                return
+            del self._pools[key]
+        await pool.aclose()
+
+    def close_all(self) -> None:
+        """Cierra todos los pools del registro."""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    async def aclose_all(self) -> None:
+        """Cierra todos los pools del registro desde código asíncrono."""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            await pool.aclose()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Devuelve el uso de cada pool.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Estadísticas indexadas por origen.
+        """
+        with self._lock:
+            pools = list(self._pools.values())
+        stats: Dict[str, Dict[str, Any]] = {}
+        for pool in pools:
+            name = pool.origin if pool.origin not in stats else f"{pool.origin}#{id(pool.config)}"
+            stats[name] = pool.stats()
+        return stats
+
+
+# Registro compartido por defecto para todos los RemoteAgent del proceso
+default_registry = TransportRegistry()
@@ -0,0 +1,221 @@
+"""
+Modo multiproceso de ``Server``.
+
+uvicorn solo puede lanzar varios workers a partir de una cadena de import, no
+de un objeto ``FastAPI`` ya construido. Aquí se define esa cadena: el proceso
+padre publica en variables de entorno la factoría de la aplicación
+(``"modulo:funcion"`` que devuelve un ``Server``) y cada worker la importa,
+reconstruye sus agentes y, opcionalmente, se fija a una CPU.
+
+El reciclado de workers usa ``limit_max_requests`` de uvicorn: tras N
+peticiones el worker termina las que tiene en curso, sale, y el supervisor de
+uvicorn arranca uno nuevo en su lugar.
+
+Ejemplo::
+
+    # mi_app.py
+    def build_server() -> Server:
+        server = Server()
+        server.add_agent(mi_agente, "mi_agente")
+        return server
+
+    if __name__ == "__main__":
+        build_server().run(workers=4, factory="mi_app:build_server",
+                           cpu_affinity=True, max_requests=1000)
+"""
+
+import importlib
+import logging
+import os
+import tempfile
+from typing import Any, Callable, List, Sequence
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+# Variables de entorno heredadas por los workers
+FACTORY_ENV = "LANGGRAPH_SERVER_FACTORY"
+CPU_DIR_ENV = "LANGGRAPH_SERVER_CPU_DIR"
+CPUS_ENV = "LANGGRAPH_SERVER_CPUS"
+
+# Cadena de import de la factoría que ejecuta uvicorn en cada worker
+APP_FACTORY = "langgraph_server.agents.workers:create_app"
+
+
+def load_factory(path: str) -> Callable[[], Any]:
+    """
+    Importa una factoría a partir de ``"modulo:atributo"``.
+
+    Args:
+        path (str): La cadena de import (ej: "mi_app:build_server").
+
+    Returns:
+        Callable[[], Any]: La factoría.
+    """
+    module_name, _, attribute = path.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"Factory must be given as 'module:attribute', got '{path}'")
+    target: Any = importlib.import_module(module_name)
+    for part in attribute.split("."):
+        target = getattr(target, part)
+    if not callable(target):
+        raise ValueError(f"Factory '{path}' is not callable")
+    return target
+
+
+def available_cpus() -> List[int]:
+    """CPUs en las que puede ejecutarse el proceso actual."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def claim_cpu(directory: str, cpus: Sequence[int]) -> int | None:
+    """
+    Reserva una CPU libre para el worker actual.
+
+    Cada reserva es un fichero ``cpu-N`` con el pid del worker; la de un
+    worker reciclado (pid muerto) se reutiliza.
+
+    Args:
+        directory (str): Directorio compartido de reservas.
+        cpus (Sequence[int]): CPUs candidatas.
+
+    Returns:
+        int | None: La CPU reservada, o None si están todas ocupadas.
+    """
+    pid = os.getpid()
+    for cpu in cpus:
+        path = os.path.join(directory, f"cpu-{cpu}")
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                with open(path) as f:
+                    owner = int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                continue
+            if owner and _pid_alive(owner):
+                continue
+            # Reserva huérfana: se sustituye de forma atómica
+            tmp = f"{path}.{pid}"
+            with open(tmp, "w") as f:
+                f.write(str(pid))
+            os.replace(tmp, path)
+            with open(path) as f:
+                if f.read().strip() == str(pid):
+                    return cpu
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(str(pid))
+        return cpu
+    return None
+
+
+def pin_worker() -> int | None:
+    """Fija el worker actual a una CPU si el padre lo ha pedido."""
+    directory = os.environ.get(CPU_DIR_ENV)
+    if not directory:
+        return None
+    if not hasattr(os, "sched_setaffinity"):
+        logger.warning("CPU pinning is not supported on this platform")
+        return None
+    cpus = [int(c) for c in os.environ.get(CPUS_ENV, "").split(",") if c] or available_cpus()
+    cpu = claim_cpu(directory, cpus)
+    if cpu is None:
+        logger.warning(f"No free CPU to pin worker {os.getpid()}, leaving it unpinned")
+        return None
+    os.sched_setaffinity(0, {cpu})
+    logger.info(f"Worker {os.getpid()} pinned to CPU {cpu}")
+    return cpu
+
+
+def create_app() -> Any:
+    """
+    Factoría que uvicorn ejecuta en cada worker.
+
+    Returns:
+        FastAPI: La aplicación del ``Server`` construido por la factoría del usuario.
+    """
+    path = os.environ.get(FACTORY_ENV)
+    if not path:
+        raise RuntimeError(f"{FACTORY_ENV} is not set; start workers through Server.run")
+    pin_worker()
+    built = load_factory(path)()
+    # La factoría puede devolver un Server o directamente la app ASGI
+    return getattr(built, "app", built)
+
+
+def run_workers(
+    factory: str,
+    host: str = "localhost",
+    port: int = 8000,
+    workers: int = 2,
+    cpu_affinity: bool | Sequence[int] = False,
+    max_requests: int | None = None,
+    max_requests_jitter: int = 0,
+    **kwargs: Any,
+) -> None:
+    """
+    Lanza varios workers de uvicorn que reconstruyen el servidor con ``factory``.
+
+    Args:
+        factory (str): Cadena ``"modulo:funcion"`` que devuelve un ``Server``.
+        host (str, optional): Host de escucha. Defaults to "localhost".
+        port (int, optional): Puerto de escucha. Defaults to 8000.
+        workers (int, optional): Número de procesos. Defaults to 2.
+        cpu_affinity (bool | Sequence[int], optional): Fija cada worker a una
+            CPU (``True`` para usar todas las disponibles o una lista de CPUs).
+            Defaults to False.
+        max_requests (int | None, optional): Peticiones tras las que se recicla
+            cada worker. Defaults to None.
+        max_requests_jitter (int, optional): Variación aleatoria de
+            ``max_requests`` para que no se reciclen todos a la vez. Defaults to 0.
+        **kwargs (Any): Opciones adicionales de ``uvicorn.run``.
+    """
+    # Falla en el padre si la factoría no se puede importar
+    load_factory(factory)
+    os.environ[FACTORY_ENV] = factory
+
+    cpu_dir = None
+    if cpu_affinity:
+        cpus = available_cpus() if cpu_affinity is True else list(cpu_affinity)
+        if workers > len(cpus):
+            logger.warning(f"{workers} workers for {len(cpus)} CPUs: some workers will not be pinned")
+        cpu_dir = tempfile.mkdtemp(prefix="langgraph-cpus-")
+        os.environ[CPU_DIR_ENV] = cpu_dir
+        os.environ[CPUS_ENV] = ",".join(str(c) for c in cpus)
+
+    if workers < 2 and max_requests:
+        logger.warning(
+            "With a single worker the process exits after max_requests; "
+            "use workers >= 2 or an external supervisor to restart it"
+        )
+
+    try:
+        uvicorn.run(
+            APP_FACTORY,
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+            limit_max_requests=max_requests,
+            limit_max_requests_jitter=max_requests_jitter,
+            **kwargs,
+        )
+    finally:
+        if cpu_dir is not None:
+            for name in os.listdir(cpu_dir):
+                os.remove(os.path.join(cpu_dir, name))
+            os.rmdir(cpu_dir)
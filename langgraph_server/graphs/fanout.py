@@ -0,0 +1,380 @@
+"""
+Reparto en paralelo (fan-out/fan-in) para ``SupervisorChatGroup``.
+
+En el modo por traspasos el supervisor delega en un agente cada vez: cada
+agente consultado cuesta un turno completo del LLM del supervisor y una ida y
+vuelta al agente. En el modo fan-out el supervisor dispone de una única
+herramienta, ``dispatch_agents``, con la que encarga tareas a varios agentes
+en el mismo paso:
+
+- Las ramas se ejecutan a la vez (como mucho ``max_parallel``), cada una con
+  su propio timeout. Los ``RemoteAgent`` heredan el plazo de la rama, así que
+  el servidor abandona el trabajo que ya no se va a usar.
+- Las ramas que no terminan a tiempo o fallan no detienen a las demás: el
+  resultado es parcial y lo indica.
+- ``reducer`` combina los resultados en el mensaje que lee el supervisor en
+  su siguiente turno.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Literal
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, StructuredTool
+from pydantic import BaseModel, Field, create_model
+
+from langgraph_server.agents import RemoteAgent
+from langgraph_server.agents.deadline import (
+    DeadlineExceeded,
+    call_deadline,
+    cancellable,
+    use_deadline,
+)
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_TOOL_NAME = "dispatch_agents"
+
+BranchStatus = Literal["ok", "timeout", "error"]
+
+
+@dataclass
+class BranchResult:
+    """
+    Resultado de una rama del reparto.
+
+    Attributes:
+        agent (str): Nombre del agente.
+        task (str): Tarea encargada.
+        status (BranchStatus): ``ok``, ``timeout`` o ``error``.
+        output (str | None): Respuesta final del agente (su último mensaje).
+        error (str | None): Motivo del fallo, si lo hubo.
+        elapsed (float): Segundos que tardó la rama desde que empezó.
+    """
+
+    agent: str
+    task: str
+    status: BranchStatus
+    output: str | None = None
+    error: str | None = None
+    elapsed: float = 0.0
+
+
+def concat_results(results: List[BranchResult]) -> str:
+    """
+    Reductor por defecto: un bloque por agente con su respuesta o su fallo.
+
+    Args:
+        results (List[BranchResult]): Resultados de las ramas, en el orden del reparto.
+
+    Returns:
+        str: El contenido del mensaje que recibe el supervisor.
+    """
+    blocks = []
+    for result in results:
+        if result.status == "ok":
+            body = result.output or "(sin respuesta)"
+        elif result.status == "timeout":
+            body = f"Sin respuesta: no terminó en {result.elapsed:.1f} s."
+        else:
+            body = f"Sin respuesta: falló ({result.error})."
+        blocks.append(f"### {result.agent} ({result.status})\n{body}")
+    if any(result.status != "ok" for result in results):
+        blocks.append("Resultado parcial: algunos agentes no respondieron.")
+    return "\n\n".join(blocks)
+
+
+@dataclass
+class FanOutConfig:
+    """
+    Configuración del modo fan-out de ``SupervisorChatGroup``.
+
+    Attributes:
+        max_parallel (int): Ramas ejecutándose a la vez como máximo. Defaults to 4.
+        branch_timeout (float | None): Segundos máximos por rama, contados
+            desde que empieza; las que lo superan cuentan como ``timeout``.
+            Defaults to 60.0.
+        reducer (Callable[[List[BranchResult]], str]): Combina los resultados
+            de las ramas antes del siguiente turno del supervisor.
+            Defaults to ``concat_results``.
+    """
+
+    max_parallel: int = 4
+    branch_timeout: float | None = 60.0
+    reducer: Callable[[List[BranchResult]], str] = field(default=concat_results)
+
+    def __post_init__(self):
+        if self.max_parallel < 1:
+            raise ValueError("max_parallel must be at least 1")
+
+
+def _content(message: Any) -> str:
+    content = message.get("content") if isinstance(message, dict) else getattr(message, "content", message)
+    if isinstance(content, list):
+        # Mensajes por bloques: solo el texto
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block) for block in content
+        )
+    return "" if content is None else str(content)
+
+
+def _final_output(result: Any) -> str:
+    """Respuesta final de un agente: el contenido de su último mensaje."""
+    messages = result.get("messages") if isinstance(result, dict) else None
+    if messages:
+        return _content(messages[-1])
+    return _content(result)
+
+
+def _branch_config(agent: Any, name: str, config: RunnableConfig | None) -> RunnableConfig:
+    """Config de una rama: hilo propio por agente y los callbacks de la llamada."""
+    config = config or {}
+    branch: Dict[str, Any] = {}
+    thread_id = (config.get("configurable") or {}).get("thread_id")
+    if thread_id is not None:
+        branch["configurable"] = {"thread_id": f"{thread_id}:{name}"}
+    # Con los callbacks, los tokens de la rama (también remota) llegan a quien hace stream
+    if config.get("callbacks") is not None:
+        branch["callbacks"] = config["callbacks"]
+    return branch
+
+
+def _task_input(task: str) -> Dict[str, Any]:
+    return {"messages": [{"role": "user", "content": task}]}
+
+
+async def _run_branch_async(
+    agent: Any,
+    name: str,
+    task: str,
+    config: RunnableConfig,
+    timeout: float | None,
+    semaphore: asyncio.Semaphore,
+) -> BranchResult:
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            # El plazo de la rama acota también las llamadas remotas que haga
+            with use_deadline(call_deadline(timeout)):
+                result = await asyncio.wait_for(agent.ainvoke(_task_input(task), config), timeout)
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            return BranchResult(name, task, "timeout", elapsed=time.perf_counter() - start)
+        except Exception as e:
+            logger.warning(f"Fan-out branch {name} failed: {type(e).__name__}: {e}")
+            return BranchResult(
+                name, task, "error", error=f"{type(e).__name__}: {e}",
+                elapsed=time.perf_counter() - start,
+            )
+        return BranchResult(name, task, "ok", output=_final_output(result), elapsed=time.perf_counter() - start)
+
+
+def _run_branch_sync(
+    agent: Any,
+    name: str,
+    task: str,
+    config: RunnableConfig,
+    timeout: float | None,
+    started: Dict[int, float],
+    index: int,
+    cancel: threading.Event,
+) -> BranchResult:
+    start = time.perf_counter()
+    started[index] = time.monotonic()
+    if cancel.is_set():
+        return BranchResult(name, task, "timeout")
+    kwargs: Dict[str, Any] = {"config": config}
+    if not isinstance(agent, RemoteAgent):
+        # Un agente local no se puede interrumpir: se detiene en su siguiente paso
+        kwargs = cancellable(kwargs, cancel)
+    try:
+        with use_deadline(call_deadline(timeout)):
+            result = agent.invoke(_task_input(task), **kwargs)
+    except DeadlineExceeded:
+        return BranchResult(name, task, "timeout", elapsed=time.perf_counter() - start)
+    except Exception as e:
+        if cancel.is_set():
+            return BranchResult(name, task, "timeout", elapsed=time.perf_counter() - start)
+        logger.warning(f"Fan-out branch {name} failed: {type(e).__name__}: {e}")
+        return BranchResult(
+            name, task, "error", error=f"{type(e).__name__}: {e}",
+            elapsed=time.perf_counter() - start,
+        )
+    return BranchResult(name, task, "ok", output=_final_output(result), elapsed=time.perf_counter() - start)
+
+
+class FanOut:
+    """
+    Ejecuta un reparto entre varios agentes y combina sus resultados.
+
+    Se usa como herramienta del supervisor (``as_tool``), pero también se
+    puede llamar directamente con ``run``/``arun``.
+    """
+
+    def __init__(self, agents: List[Any], config: FanOutConfig | None = None):
+        """
+        Inicializa el reparto.
+
+        Args:
+            agents (List[Any]): Agentes disponibles (``Pregel`` o ``RemoteAgent``), con nombre.
+            config (FanOutConfig | None, optional): Configuración del reparto.
+                Defaults to None.
+        """
+        self.config = config or FanOutConfig()
+        self.agents: Dict[str, Any] = {}
+        for agent in agents:
+            name = getattr(agent, "name", None)
+            if not name:
+                raise ValueError("Fan-out agents must have a name")
+            if name in self.agents:
+                raise ValueError(f"Agent with name '{name}' already exists. Agent names must be unique.")
+            self.agents[name] = agent
+
+    def _unknown(self, name: str, task: str) -> BranchResult:
+        return BranchResult(name, task, "error", error="unknown agent")
+
+    async def arun(self, tasks: List[Dict[str, str]], config: RunnableConfig | None = None) -> str:
+        """
+        Ejecuta las tareas a la vez y devuelve la salida del reductor.
+
+        Args:
+            tasks (List[Dict[str, str]]): Tareas ``{"agent", "task"}``.
+            config (RunnableConfig | None, optional): Config de la llamada del supervisor.
+                Defaults to None.
+
+        Returns:
+            str: Los resultados combinados.
+        """
+        semaphore = asyncio.Semaphore(self.config.max_parallel)
+
+        async def branch(item: Dict[str, str]) -> BranchResult:
+            name, task = item["agent"], item["task"]
+            agent = self.agents.get(name)
+            if agent is None:
+                return self._unknown(name, task)
+            return await _run_branch_async(
+                agent, name, task, _branch_config(agent, name, config),
+                self.config.branch_timeout, semaphore,
+            )
+
+        results = await asyncio.gather(*(branch(item) for item in tasks))
+        return self.config.reducer(list(results))
+
+    def run(self, tasks: List[Dict[str, str]], config: RunnableConfig | None = None) -> str:
+        """Versión síncrona de ``arun``: cada rama corre en un hilo."""
+        results: List[BranchResult | None] = [None] * len(tasks)
+        runnable: Dict[int, Any] = {}
+        for index, item in enumerate(tasks):
+            agent = self.agents.get(item["agent"])
+            if agent is None:
+                results[index] = self._unknown(item["agent"], item["task"])
+            else:
+                runnable[index] = agent
+        if runnable:
+            self._run_threads(tasks, runnable, results, config)
+        return self.config.reducer(list(results))
+
+    def _run_threads(
+        self,
+        tasks: List[Dict[str, str]],
+        runnable: Dict[int, Any],
+        results: List[BranchResult | None],
+        config: RunnableConfig | None,
+    ) -> None:
+        timeout = self.config.branch_timeout
+        started: Dict[int, float] = {}
+        events = {index: threading.Event() for index in runnable}
+        # Pool propio: las ramas vencidas pueden seguir hasta su siguiente paso
+        pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(self.config.max_parallel, len(runnable)),
+            thread_name_prefix="fan-out",
+        )
+        try:
+            pending = {}
+            for index, agent in runnable.items():
+                name, task = tasks[index]["agent"], tasks[index]["task"]
+                context = contextvars.copy_context()
+                future = pool.submit(
+                    context.run, _run_branch_sync, agent, name, task,
+                    _branch_config(agent, name, config), timeout, started, index, events[index],
+                )
+                pending[future] = index
+
+            while pending:
+                wait = None
+                if timeout is not None:
+                    now = time.monotonic()
+                    for future, index in list(pending.items()):
+                        if index in started and now - started[index] >= timeout:
+                            events[index].set()
+                            del pending[future]
+                            results[index] = BranchResult(
+                                tasks[index]["agent"], tasks[index]["task"], "timeout",
+                                elapsed=now - started[index],
+                            )
+                    if not pending:
+                        break
+                    # Hasta el próximo vencimiento; las ramas en cola aún no cuentan
+                    deadlines = [started[i] + timeout for i in pending.values() if i in started]
+                    wait = max(0.0, min(deadlines) - now) if deadlines else 0.05
+                    if len(deadlines) < len(pending):
+                        wait = min(wait, 0.05)
+                done, _ = concurrent.futures.wait(
+                    pending, timeout=wait, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+        finally:
+            # Las ramas que sigan vivas se detienen en su siguiente paso
+            for event in events.values():
+                event.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def as_tool(self) -> BaseTool:
+        """
+        Devuelve la herramienta ``dispatch_agents`` para el supervisor.
+
+        El esquema limita ``agent`` a los nombres conocidos, así que el LLM
+        solo puede repartir entre los agentes del grupo.
+        """
+        names = tuple(self.agents)
+        Task = create_model(
+            "Task",
+            agent=(Literal[names], Field(description="Nombre del agente que ejecuta la tarea.")),
+            task=(str, Field(description="Instrucciones completas y autocontenidas para el agente.")),
+        )
+
+        class DispatchInput(BaseModel):
+            tasks: List[Task] = Field(  # type: ignore[valid-type]
+                description="Tareas independientes que se ejecutan a la vez, una por agente.",
+                min_length=1,
+            )
+
+        def dispatch(tasks: List[Any], config: RunnableConfig) -> str:
+            return self.run([_task_dict(task) for task in tasks], config)
+
+        async def adispatch(tasks: List[Any], config: RunnableConfig) -> str:
+            return await self.arun([_task_dict(task) for task in tasks], config)
+
+        return StructuredTool.from_function(
+            func=dispatch,
+            coroutine=adispatch,
+            name=DISPATCH_TOOL_NAME,
+            description=(
+                "Encarga tareas independientes a varios agentes a la vez y devuelve "
+                "todas sus respuestas juntas. Úsala cuando la consulta necesite "
+                "información de más de un agente."
+            ),
+            args_schema=DispatchInput,
+        )
+
+
+def _task_dict(task: Any) -> Dict[str, str]:
+    if isinstance(task, BaseModel):
+        return task.model_dump()
+    return dict(task)
@@ -1,8 +1,15 @@
-from typing import Type, Any, Optional, Union, Callable
+import concurrent.futures
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Type, Any, Dict, Optional, Union, Callable
+from urllib.parse import urlparse
 
 from langchain_core.language_models import LanguageModelLike
 from langchain_core.tools import BaseTool
-from langgraph.prebuilt import ToolNode
+from langgraph.prebuilt import ToolNode, create_react_agent
 from langgraph.prebuilt.chat_agent_executor import (
     StateSchemaType,
     StructuredResponseSchema,
@@ -13,6 +20,36 @@ from langgraph_supervisor.agent_name import AgentNameMode
 from langgraph_supervisor.supervisor import OutputMode, create_supervisor
 
 from langgraph_server.agents import RemoteAgent
+from langgraph_server.agents.registry import Registry
+from langgraph_server.graphs.fanout import FanOut, FanOutConfig
+
+logger = logging.getLogger(__name__)
+
+# Prompts ya generados por hash de los metadatos de sus agentes
+_PROMPT_CACHE_SIZE = 128
+_prompt_cache: "OrderedDict[str, str]" = OrderedDict()
+_prompt_lock = threading.Lock()
+
+# Pool compartido para pedir los metadatos de varios agentes a la vez
+_metadata_pool: concurrent.futures.ThreadPoolExecutor | None = None
+_metadata_pool_lock = threading.Lock()
+
+
+def _get_metadata_pool() -> concurrent.futures.ThreadPoolExecutor:
+    global _metadata_pool
+    with _metadata_pool_lock:
+        if _metadata_pool is None:
+            _metadata_pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=16, thread_name_prefix="supervisor-info"
+            )
+        return _metadata_pool
+
+
+def _fallback_name(agent: Any) -> str:
+    """Nombre de un agente cuyos metadatos no se pudieron obtener (sin peticiones)."""
+    if isinstance(agent, RemoteAgent):
+        return urlparse(agent.base_url).path.rstrip("/").rsplit("/", 1)[-1] or agent.base_url
+    return getattr(agent, "name", None) or "Desconocido"
 
 
 class SupervisorChatGroup:
@@ -24,9 +61,11 @@ class SupervisorChatGroup:
     """
     def __new__(
         self,
-        agents: list[Pregel | RemoteAgent],
+        agents: list[Pregel | RemoteAgent | str],
         *,
         model: LanguageModelLike,
+        registry: Registry | None = None,
+        skills: list[str] | None = None,
         tools: list[BaseTool | Callable] | ToolNode | None = None,
         prompt: Prompt | None = None,
         response_format: Optional[
@@ -44,13 +83,17 @@ class SupervisorChatGroup:
         add_handoff_back_messages: Optional[bool] = None,
         supervisor_name: str = "supervisor",
         include_agent_name: AgentNameMode | None = None,
+        metadata_timeout: float = 5.0,
+        fan_out: FanOutConfig | bool | None = None,
     ):
         """
         Crea una instancia de un grupo de chat supervisado.
 
         Args:
-            agents (list[Pregel  |  RemoteAgent]): Lista de agentes que participarán en el chat.
+            agents (list[Pregel  |  RemoteAgent  |  str]): Lista de agentes que participarán en el chat. Los nombres (str) se resuelven en ``registry``.
             model (LanguageModelLike): Modelo de lenguaje a utilizar.
+            registry (Registry | None, optional): Registro de la malla del que se resuelven los agentes por nombre o habilidad. Defaults to None.
+            skills (list[str] | None, optional): Añade los agentes del registro que declaren alguna de estas habilidades. Defaults to None.
             tools (list[BaseTool  |  Callable] | ToolNode | None, optional): Lista de herramientas disponibles para los agentes. Defaults to None.
             prompt (Prompt | None, optional): Prompt para el supervisor. Defaults to None.
             response_format (Optional[Union[StructuredResponseSchema, tuple[str, StructuredResponseSchema]]], optional): Formato de respuesta estructurada. Defaults to None.
@@ -63,12 +106,17 @@ class SupervisorChatGroup:
             add_handoff_back_messages (Optional[bool], optional): Indica si se deben agregar mensajes de retorno de traspaso. Defaults to None.
             supervisor_name (str, optional): Nombre del supervisor. Defaults to "supervisor".
             include_agent_name (AgentNameMode | None, optional): Modo de inclusión del nombre del agente. Defaults to None.
+            metadata_timeout (float, optional): Segundos máximos para obtener los metadatos de los agentes (se piden a la vez); los que no responden aparecen en el prompt como no disponibles. Defaults to 5.0.
+            fan_out (FanOutConfig | bool | None, optional): Activa el modo fan-out: en lugar de traspasos, el supervisor encarga tareas a varios agentes en un mismo paso con la herramienta ``dispatch_agents``, que los ejecuta a la vez y le devuelve sus resultados combinados. ``True`` usa la configuración por defecto. En este modo no se aplican las opciones de traspaso (``output_mode``, ``add_handoff_messages``, ``handoff_tool_prefix``, ``add_handoff_back_messages``, ``include_agent_name``). Defaults to None.
 
         Returns:
             Any: Una instancia compilada del grupo de chat supervisado.
         """
+        # Paso 0: Resolver en el registro los agentes por nombre o habilidad
+        agents = SupervisorChatGroup.resolve_agents(agents, registry, skills)
+
         # Paso 1: Generar prompt base
-        base_prompt = SupervisorChatGroup.generate_prompt(agents)
+        base_prompt = SupervisorChatGroup.generate_prompt(agents, metadata_timeout)
 
         # Paso 2: Combinar con prompt extra si existe
         if prompt is not None:
@@ -83,6 +131,18 @@ class SupervisorChatGroup:
             tools = SupervisorChatGroup.infer_tools(agents)
 
         # Paso 4: Crear supervisor
+        if fan_out:
+            return SupervisorChatGroup.create_fan_out(
+                agents,
+                model=model,
+                tools=tools,
+                prompt=final_prompt,
+                response_format=response_format,
+                state_schema=state_schema,
+                config_schema=config_schema,
+                supervisor_name=supervisor_name,
+                config=fan_out if isinstance(fan_out, FanOutConfig) else FanOutConfig(),
+            )
         instance = create_supervisor(
             agents=agents,
             model=model,
@@ -102,12 +162,151 @@ class SupervisorChatGroup:
         return instance.compile()
 
     @staticmethod
-    def generate_prompt(agents: list[Pregel]) -> Prompt:
+    def create_fan_out(
+        agents: list[Pregel | RemoteAgent],
+        *,
+        model: LanguageModelLike,
+        tools: list[BaseTool | Callable] | ToolNode,
+        prompt: Prompt,
+        response_format: Any = None,
+        state_schema: StateSchemaType = None,
+        config_schema: Type[Any] | None = None,
+        supervisor_name: str = "supervisor",
+        config: FanOutConfig | None = None,
+    ) -> Any:
+        """
+        Crea el supervisor en modo fan-out.
+
+        Es un agente ReAct cuyo paso de herramientas incluye ``dispatch_agents``:
+        una sola llamada reparte tareas entre varios agentes y el supervisor
+        recibe los resultados combinados en su siguiente turno.
+
+        Returns:
+            Any: El supervisor compilado.
+        """
+        dispatch = FanOut(agents, config).as_tool()
+        if isinstance(tools, ToolNode):
+            tools = list(tools.tools_by_name.values())
+        if isinstance(prompt, str):
+            prompt = (
+                f"{prompt}\n\nPuedes encargar tareas a varios agentes a la vez con "
+                f"`{dispatch.name}`: agrupa en una sola llamada todas las "
+                "consultas independientes y combina después sus respuestas."
+            )
+        return create_react_agent(
+            model=model,
+            tools=[dispatch, *tools],
+            prompt=prompt,
+            response_format=response_format,
+            state_schema=state_schema,
+            context_schema=config_schema,
+            name=supervisor_name,
+        )
+
+    @staticmethod
+    def resolve_agents(
+        agents: list[Pregel | RemoteAgent | str],
+        registry: Registry | None = None,
+        skills: list[str] | None = None,
+    ) -> list[Pregel | RemoteAgent]:
+        """Sustituye los nombres por agentes del registro y añade los de ``skills``."""
+        if registry is None:
+            if skills or any(isinstance(agent, str) for agent in agents):
+                raise ValueError("Resolving agents by name or skill requires a registry")
+            return list(agents)
+
+        resolved = [
+            registry.resolve(agent) if isinstance(agent, str) else agent
+            for agent in agents
+        ]
+        for skill in skills or []:
+            for agent in registry.find(skill):
+                # Un agente puede declarar varias de las habilidades pedidas
+                if not any(agent is other for other in resolved):
+                    resolved.append(agent)
+        return resolved
+
+    @staticmethod
+    def gather_metadata(
+        agents: list[Pregel | RemoteAgent], timeout: float = 5.0
+    ) -> list[Dict[str, Any] | None]:
+        """
+        Obtiene los metadatos (``info()``) de todos los agentes a la vez.
+
+        Los ``RemoteAgent`` con metadatos en caché no hacen peticiones. Los que
+        no responden en ``timeout`` segundos (o fallan) se sustituyen por un
+        bloque ``{"name", "unavailable"}`` con un nombre deducido de su URL. El
+        agente no se modifica: puede estar compartido con otros supervisores.
+
+        Args:
+            agents (list[Pregel | RemoteAgent]): Los agentes.
+            timeout (float, optional): Espera máxima total. Defaults to 5.0.
+
+        Returns:
+            list[Dict[str, Any] | None]: Los metadatos de cada agente, en el
+            mismo orden; None si el agente no tiene ``info``.
+        """
+        results: list[Dict[str, Any] | None] = [None] * len(agents)
+        pending: Dict[concurrent.futures.Future, int] = {}
+        for index, agent in enumerate(agents):
+            cached = agent.cached_info() if isinstance(agent, RemoteAgent) else None
+            if cached is not None:
+                results[index] = cached
+            elif hasattr(agent, "info") and callable(agent.info):
+                pending[_get_metadata_pool().submit(agent.info)] = index
+        if not pending:
+            return results
+
+        done, _ = concurrent.futures.wait(pending, timeout=timeout)
+        for future, index in pending.items():
+            agent = agents[index]
+            if future in done and future.exception() is None:
+                results[index] = future.result()
+                continue
+            reason = "timeout" if future not in done else f"{type(future.exception()).__name__}"
+            name = _fallback_name(agent)
+            logger.warning(f"No metadata for agent {name} ({reason}); using a placeholder")
+            results[index] = {"name": name, "unavailable": reason}
+        return results
+
+    @staticmethod
+    def generate_prompt(agents: list[Pregel], timeout: float = 5.0) -> Prompt:
         """Genera un prompt base para el supervisor."""
+        return SupervisorChatGroup.render_prompt(
+            SupervisorChatGroup.gather_metadata(agents, timeout)
+        )
+
+    @staticmethod
+    def render_prompt(metadata: list[Dict[str, Any] | None]) -> str:
+        """
+        Construye el prompt a partir de los metadatos de los agentes.
+
+        El resultado se memoriza por el hash de los metadatos: reconstruir un
+        supervisor con los mismos agentes no vuelve a generarlo.
+
+        Args:
+            metadata (list[Dict[str, Any] | None]): Salida de ``gather_metadata``.
+
+        Returns:
+            str: El prompt del supervisor.
+        """
+        key = hashlib.sha256(
+            json.dumps(metadata, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        with _prompt_lock:
+            if key in _prompt_cache:
+                _prompt_cache.move_to_end(key)
+                return _prompt_cache[key]
+
         descriptions = []
-        for agent in agents:
-            if hasattr(agent, "info") and callable(agent.info):
-                agent_info = agent.info()
+        for agent_info in metadata:
+            if agent_info is not None and agent_info.get("unavailable"):
+                descriptions.append(
+                    f"### Agente: {agent_info['name']}\n"
+                    f"Información no disponible ({agent_info['unavailable']}). "
+                    "Elígelo solo si ningún otro agente encaja con la tarea."
+                )
+            elif agent_info is not None:
                 name = agent_info.get("name", "Desconocido")
                 desc = agent_info.get("description", "Sin descripción.")
                 skills = ", ".join(agent_info.get("skills", [])) or "No especificadas"
@@ -138,6 +337,10 @@ class SupervisorChatGroup:
             + "\n\nUsa esta información para tomar decisiones informadas."
         )
 
+        with _prompt_lock:
+            _prompt_cache[key] = prompt_text
+            while len(_prompt_cache) > _PROMPT_CACHE_SIZE:
+                _prompt_cache.popitem(last=False)
         return prompt_text
 
     @staticmethod
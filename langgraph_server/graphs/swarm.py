@@ -1,8 +1,261 @@
+"""
+Enjambre de agentes con traspasos directos entre ellos.
+
+A diferencia de ``SupervisorChatGroup``, no hay un nodo central: el agente
+activo responde y, si la conversación corresponde a otro, se la traspasa
+llamando a su herramienta ``transfer_to_<agente>`` (``create_handoff_tool``).
+El traspaso se reconoce en los mensajes que devuelve el agente, así que
+funciona igual con agentes locales y con ``RemoteAgent`` (la herramienta
+corre en el servidor del agente remoto).
+
+El agente activo se recuerda por ``thread_id``: los siguientes turnos del
+hilo van directamente a él, sin pasar por ningún LLM de enrutado.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Annotated, Any, Dict, List, Sequence
+
+from langchain_core.messages import AnyMessage, BaseMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.tools import BaseTool, tool
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from langgraph.pregel import Pregel
+from langgraph.types import Command
+from typing_extensions import TypedDict
+
+from langgraph_server.agents import RemoteAgent
+from langgraph_server.agents.registry import Registry
+
+logger = logging.getLogger(__name__)
+
+HANDOFF_TOOL_PREFIX = "transfer_to_"
+
+
+class SwarmState(TypedDict):
+    """Estado del enjambre: la conversación compartida y el agente activo."""
+
+    messages: Annotated[List[AnyMessage], add_messages]
+    active_agent: str | None
+
+
+def handoff_tool_name(agent_name: str) -> str:
+    """Nombre de la herramienta que traspasa la conversación a ``agent_name``."""
+    return f"{HANDOFF_TOOL_PREFIX}{agent_name}"
+
+
+def create_handoff_tool(agent_name: str, description: str | None = None) -> BaseTool:
+    """
+    Crea la herramienta con la que un agente traspasa la conversación a otro.
+
+    Se añade a las herramientas del agente que traspasa (local o servido con
+    ``Server``). Termina el turno del agente en cuanto se llama, y
+    ``ChatSwarm`` pasa la conversación a ``agent_name``.
+
+    Args:
+        agent_name (str): Nombre del agente destino.
+        description (str | None, optional): Descripción para el LLM. Defaults to None.
+
+    Returns:
+        BaseTool: La herramienta ``transfer_to_<agent_name>``.
+    """
+
+    @tool(
+        handoff_tool_name(agent_name),
+        description=description or f"Traspasa la conversación al agente {agent_name}.",
+        return_direct=True,
+    )
+    def handoff() -> str:
+        return f"Conversación traspasada a {agent_name}."
+
+    return handoff
+
+
+class _ActiveAgents:
+    """Último agente activo por ``thread_id`` (para enjambres sin checkpointer)."""
+
+    def __init__(self, max_threads: int):
+        self.max_threads = max_threads
+        self._agents: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, thread_id: str) -> str | None:
+        with self._lock:
+            return self._agents.get(thread_id)
+
+    def set(self, thread_id: str, agent_name: str) -> None:
+        with self._lock:
+            self._agents[thread_id] = agent_name
+            self._agents.move_to_end(thread_id)
+            while len(self._agents) > self.max_threads:
+                self._agents.popitem(last=False)
+
+
+def _thread_id(config: RunnableConfig | None) -> str | None:
+    thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+    return None if thread_id is None else str(thread_id)
+
+
+def _field(message: Any, name: str) -> Any:
+    if isinstance(message, dict):
+        return message.get(name)
+    return getattr(message, name, None)
+
+
+def _new_messages(known: Sequence[BaseMessage], result: Any) -> List[Any]:
+    """Mensajes que añadió el agente: los de su resultado que no estaban en la entrada."""
+    messages = result.get("messages") if isinstance(result, dict) else None
+    if not messages:
+        return []
+    ids = {message.id for message in known if message.id is not None}
+    if len(messages) >= len(known) and all(
+        _field(a, "id") == b.id for a, b in zip(messages, known)
+    ):
+        return list(messages[len(known):])
+    return [message for message in messages if _field(message, "id") not in ids]
+
+
+def _handoff_target(messages: List[Any], handoffs: Dict[str, str]) -> str | None:
+    """Destino del traspaso si el agente terminó su turno llamando a una herramienta de traspaso."""
+    for message in reversed(messages):
+        if isinstance(message, ToolMessage) or _field(message, "type") == "tool":
+            target = handoffs.get(_field(message, "name") or "")
+            if target is not None:
+                return target
+            continue
+        # El último mensaje que no es de herramienta cierra el turno
+        return None
+    return None
+
+
 class ChatSwarm:
     """
     Implementación base para un enjambre de chat.
 
     Esta clase sirve como punto de partida para crear sistemas de chat
-    donde múltiples agentes colaboran para resolver tareas complejas.
+    donde múltiples agentes colaboran para resolver tareas complejas: cada
+    agente atiende la conversación y la traspasa directamente al que
+    corresponda, sin un supervisor intermedio.
     """
-    pass
+
+    def __new__(
+        self,
+        agents: list[Pregel | RemoteAgent | str],
+        *,
+        default_agent: str | None = None,
+        registry: Registry | None = None,
+        checkpointer: BaseCheckpointSaver | None = None,
+        max_threads: int = 10_000,
+        name: str = "swarm",
+    ):
+        """
+        Crea un enjambre compilado.
+
+        Args:
+            agents (list[Pregel | RemoteAgent | str]): Agentes del enjambre, con
+                nombre único. Los nombres (str) se resuelven en ``registry``.
+                Cada uno traspasa la conversación con ``create_handoff_tool``.
+            default_agent (str | None, optional): Agente que atiende los hilos
+                nuevos. Defaults to None (el primero).
+            registry (Registry | None, optional): Registro de la malla del que
+                se resuelven los agentes por nombre. Defaults to None.
+            checkpointer (BaseCheckpointSaver | None, optional): Guarda la
+                conversación y el agente activo de cada hilo. Sin él, el
+                agente activo se recuerda en memoria por ``thread_id``.
+                Defaults to None.
+            max_threads (int, optional): Hilos recordados en memoria como
+                máximo (sin checkpointer). Defaults to 10_000.
+            name (str, optional): Nombre del grafo. Defaults to "swarm".
+
+        Returns:
+            Any: Una instancia compilada del enjambre.
+        """
+        # Import diferido: supervisor importa este paquete
+        from langgraph_server.graphs.supervisor import SupervisorChatGroup
+
+        agents = SupervisorChatGroup.resolve_agents(agents, registry)
+        if not agents:
+            raise ValueError("A swarm needs at least one agent")
+
+        named: Dict[str, Pregel | RemoteAgent] = {}
+        for agent in agents:
+            agent_name = getattr(agent, "name", None)
+            if not agent_name:
+                raise ValueError("Swarm agents must have a name")
+            if agent_name in named:
+                raise ValueError(
+                    f"Agent with name '{agent_name}' already exists. Agent names must be unique."
+                )
+            named[agent_name] = agent
+
+        default_agent = default_agent or next(iter(named))
+        if default_agent not in named:
+            raise ValueError(f"Default agent '{default_agent}' is not in the swarm")
+
+        handoffs = {handoff_tool_name(agent_name): agent_name for agent_name in named}
+        active = _ActiveAgents(max_threads)
+
+        def route(state: SwarmState, config: RunnableConfig) -> str:
+            agent_name = state.get("active_agent")
+            if agent_name is None and (thread_id := _thread_id(config)) is not None:
+                agent_name = active.get(thread_id)
+            if agent_name not in named:
+                agent_name = default_agent
+            return agent_name
+
+        builder = StateGraph(SwarmState)
+        for agent_name, agent in named.items():
+            builder.add_node(
+                agent_name,
+                ChatSwarm.agent_node(agent, agent_name, handoffs, active),
+                destinations=tuple(named),
+            )
+        builder.add_conditional_edges(START, route, list(named))
+        return builder.compile(checkpointer=checkpointer, name=name)
+
+    @staticmethod
+    def agent_node(
+        agent: Pregel | RemoteAgent,
+        agent_name: str,
+        handoffs: Dict[str, str],
+        active: _ActiveAgents,
+    ) -> RunnableLambda:
+        """
+        Crea el nodo de un agente del enjambre.
+
+        El nodo pasa la conversación al agente, añade sus mensajes nuevos y,
+        si terminó con un traspaso, salta directamente al agente destino.
+        """
+
+        def agent_config(config: RunnableConfig) -> RunnableConfig:
+            # Los agentes no guardan el hilo: la conversación es del enjambre.
+            # Los callbacks llevan sus tokens (también los remotos) a quien hace stream.
+            if config.get("callbacks") is None:
+                return {}
+            return {"callbacks": config["callbacks"]}
+
+        def finish(state: SwarmState, config: RunnableConfig, result: Any) -> Command:
+            messages = _new_messages(state["messages"], result)
+            target = _handoff_target(messages, handoffs)
+            next_agent = target or agent_name
+            if target is not None:
+                logger.debug(f"Swarm handoff {agent_name} -> {target}")
+            if (thread_id := _thread_id(config)) is not None:
+                active.set(thread_id, next_agent)
+            return Command(
+                goto=target if target is not None else END,
+                update={"messages": messages, "active_agent": next_agent},
+            )
+
+        def call(state: SwarmState, config: RunnableConfig) -> Command:
+            result = agent.invoke({"messages": state["messages"]}, agent_config(config))
+            return finish(state, config, result)
+
+        async def acall(state: SwarmState, config: RunnableConfig) -> Command:
+            result = await agent.ainvoke({"messages": state["messages"]}, agent_config(config))
+            return finish(state, config, result)
+
+        return RunnableLambda(call, afunc=acall, name=agent_name)
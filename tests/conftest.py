@@ -0,0 +1,65 @@
+"""
+Fixtures comunes de los tests.
+"""
+
+import threading
+import time
+import uuid
+from typing import Any, Callable, Iterator, Tuple
+
+import pytest
+import uvicorn
+
+from langgraph_server.agents import Server
+from langgraph_server.agents.inproc import INPROC_SCHEME, unregister_inproc
+from langgraph_server.agents.transport import UNIX_SCHEME
+
+from .graphs import EchoGraph
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+def echo() -> EchoGraph:
+    return EchoGraph()
+
+
+@pytest.fixture
+def serve() -> Iterator[Callable[..., Tuple[Server, str]]]:
+    """Crea servidores publicados en proceso y devuelve su URL ``inproc://``."""
+    names = []
+
+    def serve(**kwargs: Any) -> Tuple[Server, str]:
+        name = f"test-{uuid.uuid4().hex[:8]}"
+        names.append(name)
+        return Server(name=name, **kwargs), f"{INPROC_SCHEME}://{name}"
+
+    yield serve
+    for name in names:
+        unregister_inproc(name)
+
+
+@pytest.fixture
+def serve_uds(tmp_path) -> Iterator[Callable[[Server], str]]:
+    """Sirve un ``Server`` con uvicorn en un socket Unix y devuelve su URL ``unix://``."""
+    running = []
+
+    def serve_uds(server: Server) -> str:
+        path = str(tmp_path / f"{uuid.uuid4().hex[:8]}.sock")
+        uds = uvicorn.Server(uvicorn.Config(server.app, uds=path, log_level="warning"))
+        thread = threading.Thread(target=uds.run, daemon=True)
+        thread.start()
+        running.append((uds, thread))
+        deadline = time.monotonic() + 10.0
+        while not uds.started:
+            assert time.monotonic() < deadline, "uvicorn did not start"
+            time.sleep(0.01)
+        return f"{UNIX_SCHEME}://{path}:"
+
+    yield serve_uds
+    for uds, thread in running:
+        uds.should_exit = True
+        thread.join(10.0)
@@ -0,0 +1,111 @@
+"""
+Grafos deterministas sin LLM para los tests.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.config import get_stream_writer
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+
+class EchoGraph:
+    """
+    Grafo que responde con el último mensaje y cuenta sus ejecuciones.
+
+    Attributes:
+        calls (int): Ejecuciones del nodo.
+        delay (float): Espera de cada ejecución en segundos.
+        chunks (int): Chunks ``custom`` que emite cada ejecución.
+    """
+
+    def __init__(self, delay: float = 0.0, chunks: int = 0):
+        self.calls = 0
+        self.delay = delay
+        self.chunks = chunks
+
+    def _reply(self, state: MessagesState) -> Dict[str, Any]:
+        return {"messages": [AIMessage(content=f"echo: {state['messages'][-1].content}")]}
+
+    def node(self, state: MessagesState) -> Dict[str, Any]:
+        self.calls += 1
+        writer = get_stream_writer()
+        for i in range(self.chunks):
+            time.sleep(self.delay / max(self.chunks, 1))
+            writer({"i": i})
+        if not self.chunks:
+            time.sleep(self.delay)
+        return self._reply(state)
+
+    async def anode(self, state: MessagesState) -> Dict[str, Any]:
+        self.calls += 1
+        writer = get_stream_writer()
+        for i in range(self.chunks):
+            await asyncio.sleep(self.delay / max(self.chunks, 1))
+            writer({"i": i})
+        if not self.chunks:
+            await asyncio.sleep(self.delay)
+        return self._reply(state)
+
+    def compile(
+        self, checkpointer: Any = None, name: str = "echo", description: str | None = None
+    ) -> Any:
+        builder = StateGraph(MessagesState)
+        builder.add_node("agent", RunnableLambda(self.node, afunc=self.anode))
+        builder.add_edge(START, "agent")
+        builder.add_edge("agent", END)
+        graph = builder.compile(checkpointer=checkpointer, name=name)
+        # Metadatos de ``/info`` como los que añade ``Agent``
+        graph.info = lambda: {"name": name, "description": description, "skills": [], "tools": []}
+        return graph
+
+
+class HandoffGraph:
+    """
+    Agente de enjambre: traspasa la conversación a ``target`` o responde al
+    último mensaje del usuario.
+
+    Attributes:
+        name (str): Nombre del agente.
+        target (str | None): Agente al que traspasa; None para responder.
+        calls (int): Turnos atendidos.
+    """
+
+    def __init__(self, name: str, target: str | None = None):
+        self.name = name
+        self.target = target
+        self.calls = 0
+
+    def node(self, state: MessagesState) -> Dict[str, Any]:
+        self.calls += 1
+        if self.target is None:
+            asked = [m for m in state["messages"] if m.type == "human"][-1]
+            return {"messages": [AIMessage(content=f"{self.name}: {asked.content}")]}
+        tool = f"transfer_to_{self.target}"
+        call_id = f"call-{self.name}-{self.calls}"
+        return {
+            "messages": [
+                AIMessage(content="", tool_calls=[{"name": tool, "args": {}, "id": call_id}]),
+                ToolMessage(content=f"Conversación traspasada a {self.target}.", name=tool, tool_call_id=call_id),
+            ]
+        }
+
+    def compile(self) -> Any:
+        builder = StateGraph(MessagesState)
+        builder.add_node("agent", self.node)
+        builder.add_edge(START, "agent")
+        builder.add_edge("agent", END)
+        graph = builder.compile(name=self.name)
+        graph.info = lambda: {"name": self.name, "description": None, "skills": [], "tools": []}
+        return graph
+
+
+class ScriptedChatModel(GenericFakeChatModel):
+    """Modelo de chat falso que devuelve ``messages`` en orden y acepta herramientas."""
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        return self
@@ -0,0 +1,134 @@
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langgraph_server.agents import BalancerConfig, RemoteAgent
+from langgraph_server.agents import balancer as balancer_module
+from langgraph_server.agents.balancer import ReplicaBalancer
+
+from .graphs import EchoGraph
+
+URLS = ["http://r0/agent", "http://r1/agent", "http://r2/agent"]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj controlado por el test para las expulsiones."""
+    now = [1000.0]
+    monkeypatch.setattr(balancer_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_p2c_never_picks_the_most_loaded_replica():
+    balancer = ReplicaBalancer(URLS)
+    r0, r1, r2 = balancer.replicas
+    r0.outstanding, r1.outstanding, r2.outstanding = 0, 1, 10
+    picks = {balancer.pick().url for _ in range(200)}
+    # De cualquier pareja gana la de menor coste: r2 nunca, r0 siempre que sale
+    assert r2.url not in picks and r0.url in picks
+
+
+def test_p2c_weighs_latency(monkeypatch):
+    balancer = ReplicaBalancer(URLS[:2])
+    fast, slow = balancer.replicas
+    slow.latency = 1.0
+    fast.outstanding = 3
+    monkeypatch.setattr(balancer_module.random, "sample", lambda items, k: [slow, fast])
+    # (3 + 1) * 0.1 < (0 + 1) * 1.0
+    assert balancer.pick() is fast
+
+
+def test_rendezvous_is_sticky_and_moves_only_the_failed_replica(clock):
+    balancer = ReplicaBalancer(URLS)
+    keys = [f"thread-{i}" for i in range(60)]
+    owners = {key: balancer.pick(key) for key in keys}
+    assert all(balancer.pick(key) is owners[key] for key in keys)
+    assert len({owner.url for owner in owners.values()}) == 3
+
+    failed = balancer.replicas[0]
+    balancer.mark(failed, healthy=False)
+    moved = {key: balancer.pick(key) for key in keys}
+    for key in keys:
+        if owners[key] is failed:
+            assert moved[key] is not failed
+        else:
+            assert moved[key] is owners[key]
+
+    # Al readmitirla los hilos vuelven a su réplica
+    balancer.mark(failed, healthy=True)
+    assert all(balancer.pick(key) is owners[key] for key in keys)
+
+
+def test_sticky_can_be_disabled():
+    owner = ReplicaBalancer(URLS).pick("t1")
+    balancer = ReplicaBalancer(URLS, BalancerConfig(sticky=False))
+    # La réplica del hilo es la más cargada: sin afinidad P2C nunca la elige
+    next(r for r in balancer.replicas if r.url == owner.url).outstanding = 10
+    assert all(balancer.pick("t1").url != owner.url for _ in range(50))
+
+
+def test_consecutive_failures_eject_with_backoff(clock):
+    balancer = ReplicaBalancer(URLS[:2], BalancerConfig(failure_threshold=2, ejection_seconds=10.0))
+    bad, good = balancer.replicas
+    for _ in range(2):
+        balancer.observe(bad, balancer.acquire(bad), ok=False)
+        balancer.release(bad)
+    assert not bad.available(clock[0])
+    assert all(balancer.pick() is good for _ in range(20))
+
+    # Tras la expulsión vuelve; si falla otra vez, la expulsión dura el doble
+    clock[0] += 10.0
+    assert bad.available(clock[0])
+    for _ in range(2):
+        balancer.observe(bad, balancer.acquire(bad), ok=False)
+    assert bad.ejected_until == clock[0] + 20.0
+    # Un éxito reinicia la cuenta
+    clock[0] += 20.0
+    balancer.observe(bad, balancer.acquire(bad), ok=True)
+    assert bad.ejections == 0 and bad.failures == 0
+
+
+def test_all_ejected_tries_the_first_to_come_back(clock):
+    balancer = ReplicaBalancer(URLS[:2])
+    first, second = balancer.replicas
+    first.ejected_until = clock[0] + 30.0
+    second.ejected_until = clock[0] + 5.0
+    assert balancer.pick() is second
+    assert balancer.pick(exclude=[second]) is first
+
+
+@pytest.fixture
+def echoes(serve):
+    """Dos réplicas en proceso del mismo agente, cada una con su grafo."""
+    graphs, urls = [EchoGraph(), EchoGraph()], []
+    for echo in graphs:
+        server, url = serve()
+        server.add_agent(echo.compile(), "/echo")
+        urls.append(f"{url}/echo")
+    return graphs, urls
+
+
+def _say(text: str):
+    return {"messages": [HumanMessage(content=text)]}
+
+
+def test_remote_agent_fails_over_to_a_live_replica(echoes):
+    graphs, urls = echoes
+    # La primera réplica no existe: la conexión falla y se prueba la otra
+    agent = RemoteAgent(["inproc://caida/echo", urls[0]], balancer=BalancerConfig(failure_threshold=1))
+    dead, alive = agent.replicas.replicas
+    # La viva parece ocupada: P2C elige primero la caída
+    alive.outstanding = 100
+    assert agent.invoke(_say("hola"))["messages"][-1].content == "echo: hola"
+    assert dead.errors == 1 and not dead.available(balancer_module.time.monotonic())
+    assert graphs[0].calls == 1
+    alive.outstanding = 0
+    agent.close()
+
+
+def test_remote_agent_keeps_threads_on_one_replica(echoes):
+    graphs, urls = echoes
+    agent = RemoteAgent(urls)
+    for _ in range(4):
+        agent.invoke(_say("hola"), {"configurable": {"thread_id": "t1"}})
+    assert sorted(echo.calls for echo in graphs) == [0, 4]
+    agent.close()
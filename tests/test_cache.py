@@ -0,0 +1,118 @@
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langgraph_server.agents import RemoteAgent, ResponseCache
+from langgraph_server.agents import cache as cache_module
+from langgraph_server.agents.cache import canonical_hash
+
+
+def _say(text: str):
+    return {"messages": [HumanMessage(content=text)]}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj controlado por el test para las caducidades."""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    return now
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a")[:2] == (True, 1)
+    cache.set("c", 3)
+    assert cache.get("b")[0] is False
+    assert cache.get("a")[0] and cache.get("c")[0]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expires_entries(clock):
+    cache = ResponseCache(ttl=10.0)
+    cache.set("a", 1)
+    clock[0] += 4.0
+    assert cache.get("a") == (True, 1, 4.0)
+    clock[0] += 7.0
+    assert cache.get("a")[0] is False
+    assert cache.stats()["expirations"] == 1
+
+
+def test_disk_tier_survives_a_restart(tmp_path, clock):
+    cache = ResponseCache(disk_path=str(tmp_path), ttl=10.0)
+    cache.set("k1", _say("hola"))
+    cache.set("k2", "caduca")
+
+    restarted = ResponseCache(disk_path=str(tmp_path), ttl=10.0)
+    hit, value, _ = restarted.get("k1")
+    assert hit and value["messages"][0].content == "hola"
+    assert restarted.stats()["disk_hits"] == 1
+    # Tras leerla del disco vive también en memoria
+    restarted.get("k1")
+    assert restarted.stats()["hits"] == 1
+
+    clock[0] += 11.0
+    assert restarted.get("k2")[0] is False
+    assert not (tmp_path / "k2" / "k2.pkl").exists()
+    restarted.clear()
+    assert ResponseCache(disk_path=str(tmp_path)).get("k1")[0] is False
+
+
+def test_hash_ignores_volatile_config_and_message_ids():
+    a = canonical_hash("invoke", {"messages": [HumanMessage(content="x", id="1")]}, {"config": {"tags": ["a"]}})
+    b = canonical_hash("invoke", {"messages": [HumanMessage(content="x", id="2")]}, {"config": {"tags": ["b"]}})
+    assert a == b
+    assert a != canonical_hash("stream", {"messages": [HumanMessage(content="x")]}, {"config": {}})
+
+
+@pytest.fixture
+def cached(serve, echo):
+    echo.chunks = 3
+    server, url = serve()
+    cache = ResponseCache()
+    server.add_agent(echo.compile(), "/echo", cache=cache)
+    return f"{url}/echo", cache
+
+
+def test_server_honours_cache_control(cached, echo):
+    url, cache = cached
+    agent = RemoteAgent(url)
+    agent.invoke(_say("hola"))
+    agent.invoke(_say("hola"))
+    assert echo.calls == 1
+
+    # no-cache: ejecuta de nuevo pero guarda el resultado
+    no_cache = RemoteAgent(url, cache_control="no-cache")
+    no_cache.invoke(_say("hola"))
+    assert echo.calls == 2
+    assert cache.stats()["stores"] == 2
+
+    # no-store: ni lee ni guarda
+    no_store = RemoteAgent(url, cache_control="no-store")
+    no_store.invoke(_say("adiós"))
+    agent.invoke(_say("adiós"))
+    assert echo.calls == 4
+    for client in (agent, no_cache, no_store):
+        client.close()
+
+
+def test_threads_bypass_the_cache(cached, echo):
+    url, cache = cached
+    agent = RemoteAgent(url)
+    config = {"configurable": {"thread_id": "t1"}}
+    agent.invoke(_say("hola"), config)
+    agent.invoke(_say("hola"), config)
+    assert echo.calls == 2
+    assert cache.stats()["stores"] == 0
+    agent.close()
+
+
+def test_stream_replays_cached_chunks(cached, echo):
+    url, _ = cached
+    agent = RemoteAgent(url)
+    first = list(agent.stream(_say("hola"), stream_mode="custom"))
+    second = list(agent.stream(_say("hola"), stream_mode="custom"))
+    assert first == second == [{"i": 0}, {"i": 1}, {"i": 2}]
+    assert echo.calls == 1
+    agent.close()
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langgraph_server.agents import CheckpointStore, RemoteAgent
+from langgraph_server.agents.checkpoint import LocalCheckpointer
+
+from .graphs import EchoGraph
+
+THREAD = {"configurable": {"thread_id": "t1"}}
+
+
+def _say(text: str):
+    return {"messages": [HumanMessage(content=text)]}
+
+
+def _contents(state):
+    return [message.content for message in state["messages"]]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "state" / "agents.sqlite")
+
+
+def test_threads_survive_a_restart(path):
+    store = CheckpointStore(path)
+    graph = EchoGraph().compile(checkpointer=store.saver("/echo"))
+    graph.invoke(_say("uno"), THREAD)
+    graph.invoke(_say("dos"), THREAD)
+    store.close()
+
+    store = CheckpointStore(path)
+    graph = EchoGraph().compile(checkpointer=store.saver("/echo"))
+    assert _contents(graph.get_state(THREAD).values) == ["uno", "echo: uno", "dos", "echo: dos"]
+    # Tras el reinicio la lectura llega del disco; la siguiente, de memoria
+    graph.invoke(_say("tres"), THREAD)
+    assert len(graph.get_state(THREAD).values["messages"]) == 6
+    assert store.stats()["misses"] >= 1 and store.stats()["hits"] >= 1
+    store.close()
+
+
+@pytest.mark.anyio
+async def test_async_api_and_agent_scopes(path):
+    store = CheckpointStore(path)
+    math = EchoGraph().compile(checkpointer=store.saver("/math"))
+    rrhh = EchoGraph().compile(checkpointer=store.saver("/rrhh"))
+    await math.ainvoke(_say("suma"), THREAD)
+    await rrhh.ainvoke(_say("vacaciones"), THREAD)
+    # El mismo ``thread_id`` en dos agentes son hilos distintos
+    assert _contents((await math.aget_state(THREAD)).values) == ["suma", "echo: suma"]
+    assert _contents((await rrhh.aget_state(THREAD)).values) == ["vacaciones", "echo: vacaciones"]
+    assert len([c async for c in math.checkpointer.alist(THREAD)]) >= 2
+    store.close()
+
+
+def test_idle_threads_expire(path):
+    store = CheckpointStore(path, ttl=0.05)
+    graph = EchoGraph().compile(checkpointer=store.saver("/echo"))
+    graph.invoke(_say("uno"), THREAD)
+    store.flush()
+    time.sleep(0.1)
+    assert store.expire() == 1
+    assert graph.get_state(THREAD).values == {}
+    store.close()
+
+
+def test_server_attaches_the_store_to_agents_without_memory(serve, echo, path):
+    store = CheckpointStore(path)
+    server, url = serve(checkpoints=store)
+    agent = echo.compile()
+    server.add_agent(agent, "/echo")
+    assert isinstance(agent.checkpointer, LocalCheckpointer)
+
+    remote = RemoteAgent(f"{url}/echo")
+    remote.invoke(_say("uno"), THREAD)
+    result = remote.invoke(_say("dos"), THREAD)
+    assert _contents(result) == ["uno", "echo: uno", "dos", "echo: dos"]
+    remote.close()
+    store.close()
@@ -0,0 +1,50 @@
+import httpx
+import pytest
+
+from langgraph_server.agents import RemoteAgent
+from langgraph_server.graphs.swarm import ChatSwarm
+
+# Nada escucha en el puerto 9 (discard)
+UNREACHABLE = "http://127.0.0.1:9/rrhh"
+
+
+def test_properties_do_not_touch_the_network():
+    agent = RemoteAgent(UNREACHABLE)
+    assert agent.name == "rrhh"
+    assert agent.get_name() == "rrhh"
+    assert agent.description is None
+    assert agent.skills is None
+    with pytest.raises(httpx.ConnectError):
+        agent.info()
+    agent.close()
+
+
+def test_swarm_accepts_an_unreachable_agent():
+    agent = RemoteAgent(UNREACHABLE)
+    swarm = ChatSwarm([agent])
+    assert "rrhh" in swarm.nodes
+    agent.close()
+
+
+def test_properties_prefer_overrides_and_cached_metadata():
+    agent = RemoteAgent(UNREACHABLE, metadata={"name": "RRHH", "skills": ["nóminas"]})
+    assert agent.name == "RRHH"
+    assert agent.skills == ["nóminas"]
+    agent.description = "Recursos humanos"
+    assert agent.description == "Recursos humanos"
+    agent.close()
+
+
+@pytest.mark.anyio
+async def test_create_loads_metadata(serve, echo):
+    server, url = serve()
+    server.add_agent(echo.compile(name="RRHH", description="Recursos humanos"), "/rrhh")
+    agent = RemoteAgent(f"{url}/rrhh")
+    # Sin ``info``/``create`` la propiedad no pide nada y usa la URL
+    assert agent.name == "rrhh"
+    await agent.aclose()
+
+    agent = await RemoteAgent.create(f"{url}/rrhh")
+    assert agent.name == "RRHH"
+    assert agent.description == "Recursos humanos"
+    await agent.aclose()
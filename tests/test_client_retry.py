@@ -0,0 +1,94 @@
+import httpx
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langgraph_server.agents import HedgePolicy, RemoteAgent, RetryPolicy
+from langgraph_server.agents.client import _mutates_thread
+from langgraph_server.agents.idempotency import IdempotencyStore
+from langgraph_server.agents.retry import IDEMPOTENCY_HEADER
+from langgraph_server.agents.tracing import Tracer
+
+THREAD = {"configurable": {"thread_id": "t1"}}
+FAST_RETRY = RetryPolicy(max_attempts=3, backoff=0.0, max_backoff=0.0)
+
+
+@pytest.mark.parametrize(
+    "payload, mutates",
+    [
+        ({"input": {}, "config": None}, False),
+        ({"input": {}, "config": THREAD}, True),
+        ({"inputs": [{}, {}], "config": [{}, {"tags": ["x"]}]}, False),
+        ({"inputs": [{}, {}], "config": [{}, THREAD]}, True),
+        ({"inputs": [{}], "config": THREAD}, True),
+    ],
+)
+def test_mutates_thread_inspects_every_batch_item(payload, mutates):
+    assert _mutates_thread(payload) is mutates
+
+
+def test_batch_with_a_thread_is_never_hedged():
+    agent = RemoteAgent("http://127.0.0.1:9/echo", hedge=HedgePolicy())
+    assert agent._hedge_delay("batch", {"inputs": [{}], "config": [{}]}) is not None
+    assert agent._hedge_delay("batch", {"inputs": [{}, {}], "config": [{}, THREAD]}) is None
+    agent.close()
+
+
+@pytest.mark.parametrize("configs, attempts", [([{}, {}], 3), ([{}, THREAD], 1)])
+def test_batch_with_a_thread_is_not_replayed_after_sending(monkeypatch, configs, attempts):
+    agent = RemoteAgent("http://127.0.0.1:9/echo", retry=FAST_RETRY)
+    sent = []
+
+    def send_stream(path, content, payload, headers, deadline, span, picked):
+        sent.append(path)
+        # La petición llegó al servidor y la conexión se cortó antes del primer frame
+        raise httpx.ReadError("connection reset")
+        yield
+
+    monkeypatch.setattr(agent, "_send_stream_sync", send_stream)
+    with pytest.raises(httpx.ReadError):
+        agent.batch([{"messages": []}, {"messages": []}], configs)
+    assert len(sent) == attempts
+    agent.close()
+
+
+@pytest.mark.anyio
+async def test_unary_retries_reuse_the_execution(serve, echo):
+    server, url = serve()
+    server.add_agent(echo.compile(), "/echo")
+    agent = RemoteAgent(f"{url}/echo")
+    payload = {"input": {"messages": [HumanMessage(content="hola")]}}
+    # Dos intentos de la misma llamada lógica comparten Idempotency-Key
+    for _ in range(2):
+        result = await agent._request_async(
+            "ainvoke", json=payload, headers={IDEMPOTENCY_HEADER: "k1"}
+        )
+        assert result["messages"][-1].content == "echo: hola"
+    assert echo.calls == 1
+    await agent.aclose()
+
+
+def test_idempotency_key_only_with_retries_or_hedging():
+    span = Tracer().start_span("test")
+    for kwargs, sent in [({}, False), ({"retry": FAST_RETRY}, True), ({"hedge": HedgePolicy()}, True)]:
+        agent = RemoteAgent("http://127.0.0.1:9/echo", **kwargs)
+        assert (IDEMPOTENCY_HEADER in agent._call_headers(None, span)) is sent
+        agent.close()
+
+
+@pytest.mark.anyio
+async def test_idempotency_store_keeps_a_byte_budget():
+    store = IdempotencyStore(max_bytes=2000)
+
+    async def execute(text):
+        return {"messages": [HumanMessage(content=text)]}
+
+    await store.run("a", lambda: execute("a" * 600))
+    await store.run("b", lambda: execute("b" * 600))
+    # El tercero no cabe con los dos anteriores: se olvida el más antiguo
+    await store.run("c", lambda: execute("c" * 600))
+    assert store.stats()["entries"] == 2 and store.bytes <= 2000
+    assert (await store.run("c", lambda: execute("otro")))[1] is True
+    assert (await store.run("a", lambda: execute("otro")))[1] is False
+    # Un resultado mayor que el presupuesto no se recuerda
+    await store.run("big", lambda: execute("x" * 5000))
+    assert (await store.run("big", lambda: execute("x")))[1] is False
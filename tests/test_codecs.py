@@ -0,0 +1,89 @@
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+
+from langgraph_server.agents.codecs import (
+    DEFAULT_CODEC,
+    INPROC_CODEC,
+    LEGACY_CODEC,
+    codec_for_content_type,
+    get_codec,
+    negotiate,
+)
+
+CODECS = ["json", "msgpack", "jsonpickle"]
+
+STATE = {
+    "messages": [
+        HumanMessage(content="hola", id="h1"),
+        AIMessage(content="", id="a1", tool_calls=[{"name": "t", "args": {"x": 1}, "id": "c1"}]),
+        ToolMessage(content="42", tool_call_id="c1", id="t1"),
+    ],
+    "count": 3,
+    "nested": {"ok": True, "values": [1.5, None, "x"]},
+}
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_state_round_trip(name):
+    codec = get_codec(name)
+    decoded = codec.decode(codec.encode(STATE))
+    assert decoded["count"] == 3
+    assert decoded["nested"] == STATE["nested"]
+    assert [type(m) for m in decoded["messages"]] == [HumanMessage, AIMessage, ToolMessage]
+    assert decoded["messages"][1].tool_calls[0]["args"] == {"x": 1}
+
+
+@pytest.mark.parametrize("name", CODECS)
+@pytest.mark.parametrize("value", ["123", '{"a": 1}', "", "hola", 123, None, [1, "2"]])
+def test_plain_values_round_trip(name, value):
+    codec = get_codec(name)
+    assert codec.decode(codec.encode(value)) == value
+    assert codec.decode_response(codec.encode_response(value)) == value
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_frames_round_trip_across_chunk_boundaries(name):
+    codec = get_codec(name)
+    frames = [
+        {"ns": [], "mode": "messages", "data": [AIMessageChunk(content="to", id="m"), {"k": 1}]},
+        "123",
+        {"ns": ["sub"], "mode": "updates", "data": {"agent": {"n": 1}}},
+    ]
+    stream = b"".join(codec.encode_frame(frame) for frame in frames)
+    decoder = codec.frame_decoder()
+    decoded = []
+    for i in range(0, len(stream), 7):
+        decoded.extend(decoder.feed(stream[i : i + 7]))
+    assert len(decoded) == 3
+    assert decoded[1] == "123"
+    assert decoded[0]["data"][0].content == "to"
+    assert decoded[2]["ns"] == ["sub"]
+
+
+def test_legacy_response_is_a_json_string_envelope():
+    body = LEGACY_CODEC.encode_response({"a": 1})
+    assert body.startswith(b'"')
+    assert LEGACY_CODEC.decode_response(body) == {"a": 1}
+
+
+def test_negotiation_and_local_only_codecs():
+    assert negotiate("application/msgpack, application/json").name == "msgpack"
+    assert negotiate(None) is LEGACY_CODEC
+    assert codec_for_content_type("application/json; charset=utf-8") is DEFAULT_CODEC
+    # El codec en proceso nunca se acepta desde la red
+    assert negotiate(INPROC_CODEC.media_type) is LEGACY_CODEC
+    assert negotiate(INPROC_CODEC.media_type, local=True) is INPROC_CODEC
+
+
+def test_inproc_codec_hands_out_copies_and_releases_them():
+    obj = {"messages": [HumanMessage(content="hola")]}
+    pending = INPROC_CODEC.pending()
+    data = INPROC_CODEC.encode(obj)
+    shared = INPROC_CODEC.share(data)
+    decoded = INPROC_CODEC.decode(shared)
+    assert decoded == obj
+    assert decoded["messages"][0] is not obj["messages"][0]
+    with pytest.raises(ValueError):
+        INPROC_CODEC.decode(shared)
+    INPROC_CODEC.discard(data)
+    assert INPROC_CODEC.pending() == pending
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from langgraph_server.agents.deadline import (
+    DEADLINE_HEADER,
+    CancellationHandler,
+    DeadlineExceeded,
+    ExecutionCancelled,
+    bounded,
+    call_deadline,
+    current_deadline,
+    deadline_from_headers,
+    deadline_headers,
+    use_deadline,
+    wait_until,
+)
+
+
+def test_call_deadline_is_bounded_by_the_active_one():
+    assert call_deadline(None) is None
+    with use_deadline(time.monotonic() + 1.0) as active:
+        assert call_deadline(10.0) == active
+        assert call_deadline(0.1) < active
+    assert current_deadline() is None
+
+
+def test_headers_round_trip():
+    deadline = time.monotonic() + 5.0
+    headers = deadline_headers({}, deadline)
+    assert 4.0 < float(headers[DEADLINE_HEADER]) <= 5.0
+    assert abs(deadline_from_headers(headers) - deadline) < 0.1
+    assert deadline_from_headers({DEADLINE_HEADER: "nope"}) is None
+    with pytest.raises(DeadlineExceeded):
+        deadline_headers({}, time.monotonic() - 1.0)
+
+
+@pytest.mark.anyio
+async def test_wait_until_cancels_the_awaitable():
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    assert await wait_until(asyncio.sleep(0, "ok"), None) == "ok"
+    with pytest.raises(DeadlineExceeded):
+        await wait_until(slow(), time.monotonic() + 0.05)
+    assert cancelled.is_set()
+
+
+@pytest.mark.anyio
+async def test_bounded_cuts_the_stream_and_propagates_the_deadline():
+    deadline = time.monotonic() + 0.1
+    seen = []
+
+    async def chunks():
+        for i in range(100):
+            seen.append(current_deadline())
+            await asyncio.sleep(0.02)
+            yield i
+
+    received = []
+    with pytest.raises(DeadlineExceeded):
+        async for chunk in bounded(chunks(), deadline):
+            received.append(chunk)
+    assert 0 < len(received) < 100
+    assert set(seen) == {deadline}
+
+
+def test_cancellation_handler_stops_at_the_next_step():
+    event = threading.Event()
+    handler = CancellationHandler(event)
+    handler.on_chain_start({}, {})
+    event.set()
+    with pytest.raises(ExecutionCancelled):
+        handler.on_tool_start({}, "")
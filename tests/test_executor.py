@@ -0,0 +1,73 @@
+import asyncio
+import multiprocessing
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from langgraph_server.agents import ExecutorConfig, Server
+from langgraph_server.agents.executor import AgentExecutor
+
+from .graphs import EchoGraph
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_call_runs_in_pool_and_counts():
+    executor = AgentExecutor(EchoGraph().compile(), ExecutorConfig(max_workers=2))
+    result = await executor.call("invoke", {"messages": [HumanMessage(content="hola")]})
+    assert result["messages"][-1].content == "echo: hola"
+    stats = executor.stats()
+    assert stats["completed"] == 1 and stats["in_flight"] == 0
+    executor.shutdown()
+
+
+async def test_max_in_flight_limits_concurrency():
+    graph = EchoGraph(delay=0.05)
+    executor = AgentExecutor(graph.compile(), ExecutorConfig(max_workers=4, max_in_flight=1))
+    seen = []
+
+    async def one():
+        await executor.call("invoke", {"messages": [HumanMessage(content="x")]})
+        seen.append(executor.stats()["in_flight"])
+
+    await asyncio.gather(one(), one(), one())
+    assert executor.stats()["max_wait_seconds"] > 0.03
+    assert max(seen) <= 1
+    executor.shutdown()
+
+
+async def test_iterate_streams_and_releases_slot_on_early_exit():
+    graph = EchoGraph(chunks=5)
+    executor = AgentExecutor(graph.compile(), ExecutorConfig(max_workers=1))
+    chunks = executor.iterate({"messages": [HumanMessage(content="x")]}, stream_mode="custom")
+    async for chunk in chunks:
+        assert chunk == {"i": 0}
+        break
+    await chunks.aclose()
+    assert executor.stats()["in_flight"] == 0
+    executor.shutdown()
+
+
+async def test_process_pool_runs_with_fork():
+    executor = AgentExecutor(EchoGraph().compile(), ExecutorConfig(kind="process", max_workers=1))
+    result = await executor.call("invoke", {"messages": [HumanMessage(content="hola")]})
+    assert result["messages"][-1].content == "echo: hola"
+    executor.shutdown()
+
+
+def test_process_pool_rejects_agents_with_checkpointer():
+    agent = EchoGraph().compile(checkpointer=InMemorySaver())
+    with pytest.raises(ValueError, match="checkpointer"):
+        AgentExecutor(agent, ExecutorConfig(kind="process"))
+
+    server = Server()
+    with pytest.raises(ValueError, match="checkpointer"):
+        server.add_agent(agent, "/echo", executor=ExecutorConfig(kind="process"))
+    assert "/echo" not in server.registered_paths and "/echo" not in server.agents
+
+
+def test_process_pool_requires_fork(monkeypatch):
+    monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda: ["spawn", "forkserver"])
+    with pytest.raises(ValueError, match="fork"):
+        AgentExecutor(EchoGraph().compile(), ExecutorConfig(kind="process"))
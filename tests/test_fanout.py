@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from langgraph_server.graphs.fanout import DISPATCH_TOOL_NAME, FanOut, FanOutConfig
+from langgraph_server.graphs.supervisor import SupervisorChatGroup
+
+from .graphs import EchoGraph, ScriptedChatModel
+
+
+class Concurrency:
+    """Cuenta las ramas en curso y el máximo alcanzado."""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+
+    def exit(self):
+        with self._lock:
+            self.running -= 1
+
+
+class Tracked:
+    """Agente falso que registra su ejecución en un ``Concurrency`` compartido."""
+
+    def __init__(self, name: str, concurrency: Concurrency, delay: float = 0.05):
+        self.name = name
+        self.concurrency = concurrency
+        self.delay = delay
+
+    def invoke(self, input, config=None, **kwargs):
+        self.concurrency.enter()
+        time.sleep(self.delay)
+        self.concurrency.exit()
+        return {"messages": [AIMessage(content=self.name)]}
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.concurrency.enter()
+        await asyncio.sleep(self.delay)
+        self.concurrency.exit()
+        return {"messages": [AIMessage(content=self.name)]}
+
+
+@pytest.fixture
+def concurrency():
+    return Concurrency()
+
+
+@pytest.fixture
+def tracked(concurrency):
+    return [Tracked(f"a{i}", concurrency) for i in range(4)]
+
+
+def _partial_fan_out() -> FanOut:
+    agents = [EchoGraph(delay=0.5).compile(name="lento"), EchoGraph().compile(name="rapido")]
+    return FanOut(agents, FanOutConfig(branch_timeout=0.1))
+
+
+TASKS = [{"agent": "lento", "task": "hola"}, {"agent": "rapido", "task": "hola"}]
+
+
+def _assert_partial(output: str):
+    assert "### rapido (ok)\necho: hola" in output
+    assert "### lento (timeout)" in output
+    assert output.endswith("Resultado parcial: algunos agentes no respondieron.")
+
+
+def test_branch_timeout_gives_a_partial_result():
+    start = time.monotonic()
+    _assert_partial(_partial_fan_out().run(TASKS))
+    assert time.monotonic() - start < 0.4
+
+
+@pytest.mark.anyio
+async def test_branch_timeout_gives_a_partial_result_async():
+    start = time.monotonic()
+    _assert_partial(await _partial_fan_out().arun(TASKS))
+    assert time.monotonic() - start < 0.4
+
+
+def test_max_parallel_limits_branches(tracked, concurrency):
+    fan_out = FanOut(tracked, FanOutConfig(max_parallel=2))
+    fan_out.run([{"agent": agent.name, "task": "x"} for agent in tracked])
+    assert concurrency.peak == 2
+
+
+@pytest.mark.anyio
+async def test_max_parallel_limits_branches_async(tracked, concurrency):
+    fan_out = FanOut(tracked, FanOutConfig(max_parallel=2))
+    await fan_out.arun([{"agent": agent.name, "task": "x"} for agent in tracked])
+    assert concurrency.peak == 2
+
+
+@pytest.mark.anyio
+async def test_unknown_agents_and_custom_reducer():
+    def statuses(results):
+        return ",".join(f"{r.agent}={r.status}:{r.output or r.error}" for r in results)
+
+    fan_out = FanOut([EchoGraph().compile(name="eco")], FanOutConfig(reducer=statuses))
+    tasks = [{"agent": "eco", "task": "hola"}, {"agent": "nadie", "task": "hola"}]
+    expected = "eco=ok:echo: hola,nadie=error:unknown agent"
+    assert fan_out.run(tasks) == expected
+    assert await fan_out.arun(tasks) == expected
+
+
+def test_config_rejects_no_parallelism():
+    with pytest.raises(ValueError):
+        FanOutConfig(max_parallel=0)
+
+
+@pytest.mark.anyio
+async def test_supervisor_dispatches_through_the_tool():
+    call = {
+        "name": DISPATCH_TOOL_NAME,
+        "args": {"tasks": [{"agent": "ventas", "task": "cifras"}, {"agent": "rrhh", "task": "plantilla"}]},
+        "id": "call-1",
+    }
+    model = ScriptedChatModel(
+        messages=iter([AIMessage(content="", tool_calls=[call]), AIMessage(content="listo")])
+    )
+    agents = [EchoGraph().compile(name="ventas"), EchoGraph().compile(name="rrhh")]
+    supervisor = SupervisorChatGroup(agents, model=model, fan_out=FanOutConfig(branch_timeout=5.0))
+
+    result = await supervisor.ainvoke({"messages": [HumanMessage(content="informe")]})
+    [dispatched] = [m for m in result["messages"] if isinstance(m, ToolMessage)]
+    assert dispatched.name == DISPATCH_TOOL_NAME
+    assert "### ventas (ok)\necho: cifras" in dispatched.content
+    assert "### rrhh (ok)\necho: plantilla" in dispatched.content
+    assert result["messages"][-1].content == "listo"
@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from langgraph_server.agents import Registry, RegistryService, TransportRegistry
+
+
+@pytest.fixture
+def thread_errors(monkeypatch):
+    errors = []
+    monkeypatch.setattr(threading, "excepthook", lambda args: errors.append(args.exc_value))
+    return errors
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_watcher_follows_changes_and_releases_pool_on_close(serve, thread_errors):
+    service = RegistryService()
+    _, url = serve(registry_service=service)
+    transports = TransportRegistry()
+    registry = Registry(url, poll_timeout=0.5, registry=transports).start()
+    watcher = registry._watcher
+
+    service.register("lease", [{"url": "http://rrhh:8000/rrhh", "name": "rrhh"}])
+    _wait_for(lambda: [entry["name"] for entry in registry.entries()] == ["rrhh"])
+
+    # El long-poll en curso no bloquea el cierre; el hilo libera el pool al salir
+    registry.close()
+    watcher.join(2.0)
+    assert not watcher.is_alive()
+    assert transports.stats() == {}
+    assert thread_errors == []
+
+
+def test_watcher_survives_unexpected_errors(monkeypatch, thread_errors):
+    registry = Registry("http://127.0.0.1:9", registry=TransportRegistry())
+    calls = []
+    recovered = threading.Event()
+
+    def refresh(wait=None):
+        calls.append(wait)
+        if len(calls) == 2:
+            raise ValueError("malformed registry response")
+        if len(calls) > 2:
+            recovered.set()
+            time.sleep(0.01)
+        return False
+
+    monkeypatch.setattr(registry, "refresh", refresh)
+    registry.start()
+    assert recovered.wait(5.0)
+    watcher = registry._watcher
+    registry.stop()
+    assert not watcher.is_alive()
+    registry.close()
+    assert thread_errors == []
@@ -0,0 +1,76 @@
+import importlib
+import sys
+
+import pytest
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from langgraph_server.agents import RemoteAgent, relay
+from langgraph_server.agents.relay import sanitize_config
+
+
+def test_internal_keys_fall_back_to_their_values(monkeypatch):
+    expected = {
+        name: getattr(relay, name)
+        for name in (
+            "CONF",
+            "CONFIG_KEY_CHECKPOINT_ID",
+            "CONFIG_KEY_CHECKPOINT_MAP",
+            "CONFIG_KEY_CHECKPOINT_NS",
+            "CONFIG_KEY_STREAM",
+            "NS_SEP",
+        )
+    }
+    # Un langgraph sin el módulo privado
+    monkeypatch.setitem(sys.modules, "langgraph._internal._constants", None)
+    try:
+        fallback = importlib.reload(relay)
+        assert {name: getattr(fallback, name) for name in expected} == expected
+    finally:
+        monkeypatch.undo()
+        importlib.reload(relay)
+
+
+def test_sanitize_config_keeps_only_what_the_server_can_use():
+    config = {
+        "callbacks": [BaseCallbackHandler()],
+        "tags": ["a", object()],
+        "metadata": {"user": "ana", "langgraph_node": "x", "obj": object()},
+        "recursion_limit": 5,
+        "configurable": {
+            "thread_id": "t1",
+            "checkpoint_ns": "parent|node",
+            "__pregel_stream": object(),
+        },
+    }
+    assert sanitize_config(config) == {
+        "recursion_limit": 5,
+        "tags": ["a"],
+        "metadata": {"user": "ana"},
+        "configurable": {"thread_id": "t1"},
+    }
+
+
+@pytest.mark.anyio
+async def test_remote_node_streams_into_the_parent_graph(serve, echo):
+    echo.chunks = 3
+    server, url = serve()
+    server.add_agent(echo.compile(), "/echo")
+    remote = RemoteAgent(f"{url}/echo", codec="json")
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("remote", remote)
+    builder.add_edge(START, "remote")
+    builder.add_edge("remote", END)
+    parent = builder.compile()
+
+    chunks = [
+        chunk
+        async for chunk in parent.astream(
+            {"messages": [HumanMessage(content="hola")]}, stream_mode="custom", subgraphs=True
+        )
+    ]
+    assert [data for _, data in chunks] == [{"i": 0}, {"i": 1}, {"i": 2}]
+    assert all(ns and ns[0].startswith("remote") for ns, _ in chunks)
+    await remote.aclose()
@@ -0,0 +1,96 @@
+import os
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langgraph_server.agents import RemoteAgent, RingConfig, Server
+from langgraph_server.agents.codecs import get_codec
+from langgraph_server.agents.ring import (
+    RING_DIR,
+    RingFrameDecoder,
+    RingWriter,
+    SharedRing,
+    same_host,
+)
+
+
+@pytest.fixture
+def ring():
+    ring = SharedRing(RingConfig(size=4096, min_frame=64))
+    yield ring
+    ring.close()
+
+
+def test_frames_round_trip_through_the_ring(ring):
+    codec = get_codec("json")
+    writer = RingWriter.open(ring.name)
+    decoder = RingFrameDecoder(codec, ring)
+    # Pequeños (en línea), grandes (en el ring, dando la vuelta) y mayores que el ring
+    sizes = [10, 1000, 1500, 1500, 2000, 10, 5000]
+    frames = [{"i": i, "data": "x" * size} for i, size in enumerate(sizes)]
+    received = []
+    for frame in frames:
+        record = writer.frame(codec.encode(frame))
+        # Trozos arbitrarios, como llegan por el socket
+        received.extend(decoder.feed(record[:5]))
+        received.extend(decoder.feed(record[5:]))
+    assert received == frames
+    writer.close()
+
+
+def test_full_ring_falls_back_to_inline(ring):
+    codec = get_codec("json")
+    writer = RingWriter.open(ring.name)
+    records = [writer.frame(codec.encode({"data": "x" * 1500})) for _ in range(4)]
+    # Sin que el lector libere espacio solo caben dos en el ring
+    assert [len(record) < 100 for record in records] == [True, True, False, False]
+    decoder = RingFrameDecoder(codec, ring)
+    assert len(decoder.feed(b"".join(records))) == 4
+    writer.close()
+
+
+def test_writer_rejects_foreign_files(tmp_path, ring):
+    assert RingWriter.open(None) is None
+    assert RingWriter.open("../etc/passwd") is None
+    assert RingWriter.open(f"lgring-{'0' * 32}") is None
+    # Un fichero con nombre válido pero sin la cabecera del ring
+    name = f"lgring-{'f' * 32}"
+    path = os.path.join(RING_DIR, name)
+    with open(path, "wb") as f:
+        f.write(b"\0" * 8192)
+    try:
+        assert RingWriter.open(name) is None
+    finally:
+        os.unlink(path)
+
+
+def test_same_host():
+    assert same_host("unix:///tmp/a.sock:/echo")
+    assert same_host("http://127.0.0.1:8000/echo")
+    assert same_host("http://localhost:8000/echo")
+    assert not same_host("http://10.0.0.1:8000/echo")
+
+
+@pytest.mark.anyio
+async def test_stream_over_a_ring(serve_uds, echo, monkeypatch):
+    echo.chunks = 5
+    server = Server()
+    server.add_agent(echo.compile(), "/echo")
+    url = serve_uds(server)
+    written = []
+    frame = RingWriter.frame
+
+    def spy(self, payload):
+        record = frame(self, payload)
+        written.append(len(record) < len(payload))
+        return record
+
+    monkeypatch.setattr(RingWriter, "frame", spy)
+    agent = RemoteAgent(f"{url}/echo", ring=RingConfig(size=1 << 16, min_frame=1))
+    say = {"messages": [HumanMessage(content="hola")]}
+    chunks = [c async for c in agent.astream(say, stream_mode="custom")]
+    assert chunks == [{"i": i} for i in range(5)]
+    assert list(agent.stream(say, stream_mode="custom")) == chunks
+    # Todos los chunks viajaron por el ring, no por el socket
+    assert written == [True] * 10
+    await agent.aclose()
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from langgraph_server.agents import AdmissionConfig, Server
+
+pytestmark = pytest.mark.anyio
+
+PAYLOAD = json.dumps(
+    {"input": {"messages": [{"role": "user", "content": "hola"}]}, "stream_mode": "custom"}
+).encode("utf-8")
+
+
+def _scope(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"accept", b"application/json"),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+
+
+async def _call(server: Server, path: str, send) -> None:
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": PAYLOAD, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    await server.app(_scope(path), receive, send)
+
+
+@pytest.fixture
+def server(echo):
+    echo.chunks = 3
+    server = Server()
+    server.add_agent(echo.compile(), "/echo", admission=AdmissionConfig(max_concurrency=1))
+    return server
+
+
+@pytest.mark.parametrize("endpoint", ["stream", "astream"])
+async def test_disconnect_before_first_frame_releases_admission(server, echo, endpoint):
+    async def send(message):
+        if message["type"] == "http.response.start":
+            raise OSError("client gone")
+
+    for _ in range(2):
+        with pytest.raises(Exception):
+            await _call(server, f"/echo/{endpoint}", send)
+        assert server.admission["/echo"].stats()["in_flight"] == 0
+    # El generador no llegó a arrancar: el agente no se ejecutó
+    assert echo.calls == 0
+    assert dict(server.metrics.in_flight._values)[("/echo", endpoint)] == 0
+
+
+async def test_disconnect_mid_stream_releases_admission(server):
+    frames = []
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message["body"]:
+            frames.append(message["body"])
+            raise OSError("client gone")
+
+    with pytest.raises(Exception):
+        await _call(server, "/echo/astream", send)
+    assert len(frames) == 1
+    assert server.admission["/echo"].stats()["in_flight"] == 0
+
+
+async def test_complete_stream_releases_admission(server):
+    bodies = []
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            bodies.append(message["body"])
+
+    await _call(server, "/echo/astream", send)
+    frames = [json.loads(line) for line in b"".join(bodies).splitlines() if line]
+    assert [frame["data"] for frame in frames] == [{"i": 0}, {"i": 1}, {"i": 2}]
+    assert server.admission["/echo"].stats()["in_flight"] == 0
@@ -0,0 +1,78 @@
+import pytest
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from langgraph_server.agents import RemoteAgent
+from langgraph_server.agents.sessions import ThreadSessions
+
+THREAD = {"configurable": {"thread_id": "t1"}}
+
+
+@pytest.fixture
+def url(serve, echo):
+    server, url = serve()
+    server.add_agent(echo.compile(checkpointer=InMemorySaver()), "/echo")
+    return f"{url}/echo"
+
+
+def _contents(state):
+    return [message.content for message in state["messages"]]
+
+
+def _say(text: str):
+    return {"messages": [HumanMessage(content=text)]}
+
+
+def test_delta_calls_send_new_messages_and_return_full_history(url, echo):
+    agent = RemoteAgent(url, sessions=ThreadSessions())
+    first = agent.invoke(_say("uno"), THREAD)
+    # El llamante reenvía la conversación entera: solo viaja lo nuevo
+    second = agent.invoke({"messages": [*first["messages"], HumanMessage(content="dos")]}, THREAD)
+    assert _contents(second) == ["uno", "echo: uno", "dos", "echo: dos"]
+    stats = agent.sessions.stats()
+    assert stats["delta_calls"] == 1 and stats["messages_skipped"] == 2
+    assert echo.calls == 2
+    agent.close()
+
+
+@pytest.mark.anyio
+async def test_divergence_resyncs_without_executing_twice(url, echo):
+    a = RemoteAgent(url, sessions=ThreadSessions())
+    b = RemoteAgent(url, sessions=ThreadSessions())
+    await a.ainvoke(_say("uno"), THREAD)
+    await b.ainvoke(_say("dos"), THREAD)
+    # ``a`` conoce una versión antigua: 409 y sincronización completa
+    result = await a.ainvoke(_say("tres"), THREAD)
+    assert _contents(result) == ["uno", "echo: uno", "dos", "echo: dos", "tres", "echo: tres"]
+    assert a.sessions.stats()["divergences"] == 1
+    assert echo.calls == 3
+    await a.aclose()
+    await b.aclose()
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+@pytest.mark.anyio
+async def test_mismatched_delta_reads_state_instead_of_replaying(url, echo, asynchronous):
+    agent = RemoteAgent(url, sessions=ThreadSessions())
+    await agent.ainvoke(_say("uno"), THREAD)
+    prepare = agent.sessions.prepare
+
+    def evicting_prepare(*args, **kwargs):
+        # El hilo se olvida mientras la llamada está en curso (LRU o llamada simultánea)
+        prepared = prepare(*args, **kwargs)
+        agent.sessions._sessions.clear()
+        return prepared
+
+    agent.sessions.prepare = evicting_prepare
+    if asynchronous:
+        result = await agent.ainvoke(_say("dos"), THREAD)
+    else:
+        result = agent.invoke(_say("dos"), THREAD)
+    assert _contents(result) == ["uno", "echo: uno", "dos", "echo: dos"]
+    assert echo.calls == 2
+    agent.sessions.prepare = prepare
+    # La sesión queda sincronizada con el estado leído
+    result = await agent.ainvoke(_say("tres"), THREAD)
+    assert _contents(result)[-2:] == ["tres", "echo: tres"]
+    assert len(result["messages"]) == 6
+    await agent.aclose()
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langgraph_server.agents import RemoteAgent, SingleFlight
+
+from .graphs import EchoGraph
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = 0
+
+    async def execute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"answer": 42}
+
+    results = await asyncio.gather(*(flights.run("k", execute) for _ in range(10)))
+    assert calls == 1
+    assert [result for result, _ in results] == [{"answer": 42}] * 10
+    assert sorted(joined for _, joined in results) == [False] + [True] * 9
+    # Al terminar no se guarda nada: la siguiente vuelve a ejecutar
+    await flights.run("k", execute)
+    assert calls == 2
+    assert flights.stats() == {"in_flight": 0, "executions": 2, "shared": 9, "cancelled": 0}
+
+
+async def test_errors_reach_every_caller():
+    flights = SingleFlight()
+
+    async def execute():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        *(flights.run("k", execute) for _ in range(5)), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+async def test_execution_is_cancelled_when_everyone_leaves():
+    flights = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def execute():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiters = [asyncio.ensure_future(flights.run("k", execute)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1.0)
+    assert flights.stats()["cancelled"] == 1 and flights.stats()["in_flight"] == 0
+
+
+async def test_late_subscribers_replay_the_stream_from_the_start():
+    flights = SingleFlight()
+    produced = 0
+
+    async def chunks():
+        nonlocal produced
+        for i in range(5):
+            produced += 1
+            await asyncio.sleep(0.01)
+            yield i
+
+    async def consume(delay: float):
+        await asyncio.sleep(delay)
+        return [chunk async for chunk in flights.stream("k", chunks)]
+
+    results = await asyncio.gather(consume(0), consume(0.025), consume(0.035))
+    assert results == [[0, 1, 2, 3, 4]] * 3
+    assert produced == 5
+
+
+async def test_key_skips_threads_and_fresh_requests():
+    kwargs = {"config": {"tags": ["a"]}}
+    threaded = {"config": {"configurable": {"thread_id": "t"}}}
+    key = SingleFlight.key("invoke", {"q": 1}, kwargs)
+    assert key == SingleFlight.key("invoke", {"q": 1}, kwargs)
+    assert key != SingleFlight.key("invoke", {"q": 2}, kwargs)
+    assert SingleFlight.key("invoke", {"q": 1}, threaded) is None
+    assert SingleFlight.key("invoke", {"q": 1}, kwargs, cache_control="no-cache") is None
+
+
+async def test_server_shares_identical_requests(serve):
+    echo = EchoGraph(delay=0.1, chunks=2)
+    flights = SingleFlight()
+    server, url = serve()
+    server.add_agent(echo.compile(), "/echo", singleflight=flights)
+    agent = RemoteAgent(f"{url}/echo", codec="json")
+    say = {"messages": [HumanMessage(content="hola")]}
+
+    results = await asyncio.gather(*(agent.ainvoke(say) for _ in range(5)))
+    assert {result["messages"][-1].content for result in results} == {"echo: hola"}
+    assert echo.calls == 1
+
+    async def stream():
+        return [chunk async for chunk in agent.astream(say, stream_mode="custom")]
+
+    streams = await asyncio.gather(*(stream() for _ in range(3)))
+    assert streams == [[{"i": 0}, {"i": 1}]] * 3
+    assert echo.calls == 2
+    await agent.aclose()
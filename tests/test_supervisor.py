@@ -0,0 +1,18 @@
+from langgraph_server.agents import RemoteAgent
+from langgraph_server.graphs.supervisor import SupervisorChatGroup
+
+
+def test_metadata_failure_does_not_pin_the_name(serve, echo):
+    server, url = serve()
+    agent = RemoteAgent(f"{url}/rrhh")
+    # La ruta aún no existe: el supervisor usa un bloque provisional
+    [metadata] = SupervisorChatGroup.gather_metadata([agent], timeout=2.0)
+    assert metadata["name"] == "rrhh" and metadata["unavailable"]
+    assert "name" not in agent._overrides
+
+    # Un supervisor posterior ve el nombre real en el prompt y en el agente
+    server.add_agent(echo.compile(name="RRHH"), "/rrhh")
+    [metadata] = SupervisorChatGroup.gather_metadata([agent], timeout=2.0)
+    assert metadata["name"] == "RRHH"
+    assert agent.name == "RRHH"
+    agent.close()
@@ -0,0 +1,96 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from langgraph_server.graphs.swarm import ChatSwarm, _handoff_target
+
+from .graphs import HandoffGraph
+
+
+def _say(text: str):
+    return {"messages": [HumanMessage(content=text)]}
+
+
+def _thread(thread_id: str):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+@pytest.fixture
+def chain():
+    # recepción -> ventas -> soporte, que responde
+    return [HandoffGraph("recepcion", "ventas"), HandoffGraph("ventas", "soporte"), HandoffGraph("soporte")]
+
+
+def _swarm(chain, **kwargs):
+    return ChatSwarm([agent.compile() for agent in chain], **kwargs)
+
+
+def _calls(chain):
+    return [agent.calls for agent in chain]
+
+
+def test_handoff_chain_reaches_the_last_agent(chain):
+    result = _swarm(chain).invoke(_say("hola"))
+    assert result["active_agent"] == "soporte"
+    assert result["messages"][-1].content == "soporte: hola"
+    tools = [m.name for m in result["messages"] if m.type == "tool"]
+    assert tools == ["transfer_to_ventas", "transfer_to_soporte"]
+    assert _calls(chain) == [1, 1, 1]
+
+
+@pytest.mark.anyio
+async def test_handoff_chain_async(chain):
+    result = await _swarm(chain).ainvoke(_say("hola"))
+    assert result["messages"][-1].content == "soporte: hola"
+    assert _calls(chain) == [1, 1, 1]
+
+
+def test_follow_up_goes_to_the_active_agent_without_checkpointer(chain):
+    swarm = _swarm(chain)
+    swarm.invoke(_say("hola"), _thread("t1"))
+    result = swarm.invoke(_say("otra"), _thread("t1"))
+    assert result["messages"][-1].content == "soporte: otra"
+    assert _calls(chain) == [1, 1, 2]
+    # Un hilo nuevo empieza por el agente por defecto
+    swarm.invoke(_say("hola"), _thread("t2"))
+    assert _calls(chain) == [2, 2, 3]
+
+
+def test_follow_up_goes_to_the_active_agent_with_checkpointer(chain):
+    # Con un solo hilo en memoria, t1 solo se recuerda por el checkpoint
+    swarm = _swarm(chain, checkpointer=InMemorySaver(), max_threads=1)
+    swarm.invoke(_say("hola"), _thread("t1"))
+    swarm.invoke(_say("hola"), _thread("t2"))
+    result = swarm.invoke(_say("otra"), _thread("t1"))
+    assert [m.content for m in result["messages"] if m.type == "human"] == ["hola", "otra"]
+    assert result["messages"][-1].content == "soporte: otra"
+    assert _calls(chain) == [2, 2, 3]
+
+
+def test_in_memory_active_agents_are_bounded(chain):
+    swarm = _swarm(chain, max_threads=1)
+    swarm.invoke(_say("hola"), _thread("t1"))
+    swarm.invoke(_say("hola"), _thread("t2"))
+    # t1 se olvidó: vuelve a empezar por el agente por defecto
+    swarm.invoke(_say("otra"), _thread("t1"))
+    assert _calls(chain) == [3, 3, 3]
+    # Y ahora es t1 el que se recuerda
+    swarm.invoke(_say("otra"), _thread("t1"))
+    assert _calls(chain) == [3, 3, 4]
+
+
+def test_default_agent_must_belong_to_the_swarm(chain):
+    with pytest.raises(ValueError, match="not in the swarm"):
+        _swarm(chain, default_agent="nadie")
+
+
+def test_handoff_target_only_when_the_turn_ends_in_a_handoff():
+    handoffs = {"transfer_to_ventas": "ventas"}
+    handoff = ToolMessage(content="ok", name="transfer_to_ventas", tool_call_id="c1")
+    other_tool = ToolMessage(content="42", name="calculadora", tool_call_id="c2")
+    assert _handoff_target([AIMessage(content=""), handoff], handoffs) == "ventas"
+    assert _handoff_target([handoff, other_tool], handoffs) == "ventas"
+    # Si el agente sigue hablando tras el traspaso, el turno es suyo
+    assert _handoff_target([handoff, AIMessage(content="sigo yo")], handoffs) is None
+    assert _handoff_target([other_tool], handoffs) is None
+    assert _handoff_target([{"type": "tool", "name": "transfer_to_ventas"}], handoffs) == "ventas"
@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langgraph_server.agents import RemoteAgent, ResponseCache, Server
+from langgraph_server.agents.codecs import INPROC_CODEC
+
+
+def _say(text: str):
+    return {"messages": [HumanMessage(content=text)]}
+
+
+@pytest.fixture
+def inproc(serve, echo):
+    echo.chunks = 3
+    server, url = serve()
+    server.add_agent(echo.compile(), "/echo")
+    return f"{url}/echo"
+
+
+def test_inproc_sync_calls(inproc):
+    agent = RemoteAgent(inproc)
+    assert agent.codec is INPROC_CODEC
+    pending = INPROC_CODEC.pending()
+    assert agent.invoke(_say("hola"))["messages"][-1].content == "echo: hola"
+    assert list(agent.stream(_say("hola"), stream_mode="custom")) == [{"i": 0}, {"i": 1}, {"i": 2}]
+    outputs = agent.batch([_say("a"), _say("b")])
+    assert [output["messages"][-1].content for output in outputs] == ["echo: a", "echo: b"]
+    assert INPROC_CODEC.pending() == pending
+    agent.close()
+
+
+@pytest.mark.anyio
+async def test_inproc_async_calls_and_early_exit(inproc):
+    agent = RemoteAgent(inproc)
+    pending = INPROC_CODEC.pending()
+    assert (await agent.ainvoke(_say("hola")))["messages"][-1].content == "echo: hola"
+    async for chunk in agent.astream(_say("hola"), stream_mode="custom"):
+        assert chunk == {"i": 0}
+        break
+    # Los chunks que nadie llegó a leer no se quedan retenidos
+    for chunk in agent.stream(_say("hola"), stream_mode="custom"):
+        break
+    chunks = [c async for c in agent.astream(_say("hola"), stream_mode="custom")]
+    assert len(chunks) == 3
+    # El servidor puede enviar algún frame más antes de ver la desconexión
+    deadline = time.monotonic() + 2.0
+    while INPROC_CODEC.pending() != pending and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    assert INPROC_CODEC.pending() == pending
+    await agent.aclose()
+
+
+def test_inproc_copies_at_the_boundary(serve, echo):
+    server, url = serve()
+    server.add_agent(echo.compile(), "/echo", cache=ResponseCache())
+    agent = RemoteAgent(f"{url}/echo")
+    message = HumanMessage(content="hola")
+    result = agent.invoke({"messages": [message]})
+    # El servidor no toca la entrada de quien llama
+    assert message.id is None
+    assert result["messages"][0] is not message
+    # Cambiar un resultado no altera el que guarda la caché
+    result["messages"].append(HumanMessage(content="extra"))
+    result["messages"][-2].content = "editado"
+    cached = agent.invoke(_say("hola"))
+    assert echo.calls == 1
+    assert [m.content for m in cached["messages"]] == ["hola", "echo: hola"]
+    agent.close()
+
+
+def test_inproc_unknown_server():
+    agent = RemoteAgent("inproc://nadie/echo")
+    with pytest.raises(httpx.ConnectError):
+        agent.invoke(_say("hola"))
+    agent.close()
+
+
+@pytest.mark.anyio
+async def test_unix_socket(serve_uds, echo):
+    echo.chunks = 2
+    server = Server()
+    server.add_agent(echo.compile(), "/echo")
+    url = serve_uds(server)
+    agent = RemoteAgent(f"{url}/echo")
+    assert agent.invoke(_say("hola"))["messages"][-1].content == "echo: hola"
+    assert (await agent.ainvoke(_say("adiós")))["messages"][-1].content == "echo: adiós"
+    chunks = [c async for c in agent.astream(_say("hola"), stream_mode="custom")]
+    assert chunks == [{"i": 0}, {"i": 1}]
+    assert agent.info()["name"] == "echo"
+    await agent.aclose()
@@ -0,0 +1,18 @@
+import logging
+
+from langgraph_server.agents import Server
+from langgraph_server.agents import server as server_module
+
+
+def test_single_process_warns_about_max_requests(monkeypatch, caplog):
+    calls = []
+    monkeypatch.setattr(server_module.uvicorn, "run", lambda app, **kwargs: calls.append(kwargs))
+    with caplog.at_level(logging.WARNING, logger=server_module.__name__):
+        Server().run(max_requests=100)
+    assert calls[0]["limit_max_requests"] == 100
+    assert "exits after max_requests" in caplog.text
+
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger=server_module.__name__):
+        Server().run()
+    assert "max_requests" not in caplog.text